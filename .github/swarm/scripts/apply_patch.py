@@ -1,7 +1,290 @@
 #!/usr/bin/env python3
 """
 apply_patch.py - Aplica patches semánticos sobre agent.apS.yaml
+
+Aplica en lote operaciones por bloque sobre YAMLs de agentes con
+YAMLBlockEditor (AST, ver APS/YAML_AST_BEST_PRACTICE.md), nunca con
+reemplazos de texto:
+
+1. Agrupa las operaciones por archivo: cada YAML se carga una sola vez
+2. Aplica todas sus operaciones en memoria, en el orden del patch
+3. Valida una vez por archivo: estructura (SIDs únicos...) y lint
+   (yaml_lint + yaml_lint_v6): se rechaza si el patch añade errores
+4. Escribe todos los archivos como una transacción: o se aplican todos o
+   ninguno (YAMLBatchEditor.save_all)
+
+Una migración de SIDs sobre 100 agentes cuesta un parseo y una escritura por
+archivo, no una por operación.
+
+Formato del patch (YAML o JSON; rutas relativas al directorio de trabajo):
+
+    operations:
+      - file: swarm/agents/J2C/01-orchestrator.yaml
+        op: set_sid
+        block: Entry Guard                 # por nombre de bloque...
+        sid: BLK.verificar.control.active_agent.guard
+      - file: swarm/agents/J2C/01-orchestrator.yaml
+        op: set_sid
+        from_sid: TEMP_BLK_003             # ...o por su SID actual
+        sid: BLK.definir.rol.nuclear
+      - {file: ..., op: replace_content, block: Rol, content: "Nuevo texto"}
+      - {file: ..., op: set_field, block: Rol, field: accion, value: definir}
+      - {file: ..., op: rename_block, block: Rol, to: Rol principal}
+      - {file: ..., op: delete_block, block: Notas}
+
+    # Equivalente agrupado:
+    files:
+      swarm/agents/J2C/01-orchestrator.yaml:
+        - {op: set_sid, block: Entry Guard, sid: BLK.verificar.control.active_agent.guard}
+
+Uso:
+    python3 swarm/scripts/apply_patch.py migration.yaml
+    python3 swarm/scripts/apply_patch.py migration.yaml --dry-run --diff
+    python3 swarm/scripts/apply_patch.py migration.yaml --no-lint --backup
+
+Exit codes: 0 = aplicado, 1 = validación fallida (nada escrito), 2 = patch inválido
 """
 
+import argparse
+import difflib
+import json
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import sls
+
+TOOLING_DIR = sls.find_tooling_dir()
+sys.path.insert(0, str(TOOLING_DIR))
+
+from lib.yaml_cache import dump_yaml, load_yaml  # noqa: E402
+from lib.yaml_editor import YAMLBatchEditor, YAMLBlockEditor  # noqa: E402
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_BAD_PATCH = 2
+
+# op → campos obligatorios (además de file y block/from_sid)
+OPERATIONS = {
+    'set_sid': ('sid',),
+    'replace_content': ('content',),
+    'set_field': ('field', 'value'),
+    'rename_block': ('to',),
+    'delete_block': (),
+}
+
+
+class PatchError(Exception):
+    """Patch mal formado u operación que no se puede aplicar."""
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LECTURA DEL PATCH
+# ═══════════════════════════════════════════════════════════════════════════
+
+def load_patch(path: Path) -> 'OrderedDict[Path, List[Dict]]':
+    """
+    Operaciones agrupadas por archivo, en el orden del patch.
+
+    Raises:
+        PatchError: Si el formato o alguna operación no es válida
+    """
+    try:
+        data = load_yaml(path, copy=False, cache=False)
+    except Exception as e:
+        raise PatchError(f"No se pudo leer {path}: {e}")
+
+    operations = []
+    if isinstance(data, list):
+        operations = data
+    elif isinstance(data, dict):
+        operations = list(data.get('operations') or [])
+        for file, ops in (data.get('files') or {}).items():
+            if not isinstance(ops, list):
+                raise PatchError(f"files.{file}: se esperaba una lista de operaciones")
+            operations.extend(dict(op, file=file) for op in ops)
+    if not operations:
+        raise PatchError(f"{path}: sin operaciones ('operations' o 'files')")
+
+    grouped: 'OrderedDict[Path, List[Dict]]' = OrderedDict()
+    for i, op in enumerate(operations, start=1):
+        where = f"operación {i}"
+        if not isinstance(op, dict) or not op.get('file'):
+            raise PatchError(f"{where}: falta 'file'")
+        kind = op.get('op')
+        if kind not in OPERATIONS:
+            raise PatchError(f"{where}: op desconocida {kind!r} (disponibles: {', '.join(OPERATIONS)})")
+        if ('block' in op) == ('from_sid' in op):
+            raise PatchError(f"{where}: indica el bloque con 'block' o con 'from_sid' (uno de los dos)")
+        missing = [field for field in OPERATIONS[kind] if field not in op]
+        if missing:
+            raise PatchError(f"{where} ({kind}): faltan {', '.join(missing)}")
+        grouped.setdefault(Path(op['file']), []).append(dict(op, index=i))
+    return grouped
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# APLICACIÓN Y VALIDACIÓN (en memoria)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def apply_operation(editor: YAMLBlockEditor, op: Dict) -> None:
+    """Aplica una operación sobre el editor ya cargado."""
+    where = f"{editor.filepath}: operación {op['index']} ({op['op']})"
+    if 'from_sid' in op:
+        block_id = editor.find_block_by_sid(op['from_sid'])
+        if block_id is None:
+            raise PatchError(f"{where}: ningún bloque con SID '{op['from_sid']}'")
+    else:
+        block_id = op['block']
+        if editor.get_block(block_id) is None:
+            raise PatchError(f"{where}: no existe el bloque '{block_id}'")
+
+    kind = op['op']
+    if kind == 'set_sid':
+        editor.update_block_sid(block_id, op['sid'])
+    elif kind == 'replace_content':
+        editor.set_block_field(block_id, 'content', op['content'])
+    elif kind == 'set_field':
+        editor.set_block_field(block_id, op['field'], op['value'])
+    elif kind == 'rename_block':
+        try:
+            editor.rename_block(block_id, op['to'])
+        except ValueError as e:
+            raise PatchError(f"{where}: {e}")
+        source_map = (editor.data.get('agent') or {}).get('source_map')
+        if isinstance(source_map, dict) and block_id in source_map:
+            items = [(op['to'] if name == block_id else name, span) for name, span in source_map.items()]
+            source_map.clear()
+            source_map.update(items)
+    elif kind == 'delete_block':
+        editor.delete_block(block_id)
+        source_map = (editor.data.get('agent') or {}).get('source_map')
+        if isinstance(source_map, dict):
+            source_map.pop(block_id, None)
+
+
+def validate_editor(editor: YAMLBlockEditor, worker) -> Tuple[List[str], Dict]:
+    """
+    Valida el resultado de un archivo una sola vez, tras todas sus operaciones.
+
+    Returns:
+        (problemas que bloquean el patch, {'errors_before', 'errors_after', 'warnings_after'})
+    """
+    problems = editor.validate_structure()
+    counts = {}
+    if worker is not None and not problems:
+        before = worker.lint_data(editor.original_data)
+        after = worker.lint_data(editor.data)
+        counts = {'errors_before': before['errors'], 'errors_after': after['errors'],
+                  'warnings_after': after['warnings']}
+        if after['errors'] > before['errors']:
+            new = [f"[{linter}:{i['rule']}] {i['location']}: {i['message']}"
+                   for linter, issues in after['issues'].items() for i in issues
+                   if i['severity'] == 'error']
+            problems.append(f"el patch añade errores de lint ({before['errors']} → {after['errors']}): "
+                            + '; '.join(new[:5]))
+    return problems, counts
+
+
+def apply_patch(grouped: 'OrderedDict[Path, List[Dict]]', lint: bool = True,
+                dry_run: bool = False, backup: bool = False, diff: bool = False) -> Dict:
+    """
+    Aplica un patch agrupado (load_patch).
+
+    Returns:
+        {'files': [{'file', 'operations', 'modified', 'problems', ...lint}],
+         'written': [rutas], 'ok': bool, 'diffs': {ruta: diff unificado} (con diff=True)}
+
+    Raises:
+        PatchError: Si un archivo no existe o una operación no se puede aplicar
+    """
+    missing = [str(path) for path in grouped if not path.is_file()]
+    if missing:
+        raise PatchError(f"No existen: {', '.join(missing)}")
+
+    batch = YAMLBatchEditor(list(grouped))
+    try:
+        batch.load_all()
+    except Exception as e:
+        raise PatchError(f"YAML inválido: {e}")
+    worker = sls.LintWorker(TOOLING_DIR) if lint else None
+
+    files = []
+    diffs = {}
+    for editor, ops in zip(batch.editors, grouped.values()):
+        for op in ops:
+            apply_operation(editor, op)
+        problems, counts = validate_editor(editor, worker)
+        files.append(dict({'file': str(editor.filepath), 'operations': len(ops),
+                           'modified': editor.modified, 'problems': problems}, **counts))
+        if diff and editor.modified:
+            before = dump_yaml(editor.original_data, None, sort_keys=False, indent=2)
+            diffs[str(editor.filepath)] = ''.join(difflib.unified_diff(
+                before.splitlines(keepends=True), editor.render().splitlines(keepends=True),
+                fromfile=f"a/{editor.filepath}", tofile=f"b/{editor.filepath}"))
+
+    ok = not any(f['problems'] for f in files)
+    written = []
+    if ok and not dry_run:
+        written = [str(path) for path in batch.save_all(backup=backup)]
+    return {'files': files, 'written': written, 'ok': ok, 'diffs': diffs}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aplica en lote un patch de operaciones por bloque sobre YAMLs de agentes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Uso:', 1)[1]
+    )
+    parser.add_argument('patch', type=Path, help='Archivo de patch (.yaml/.json)')
+    parser.add_argument('--dry-run', action='store_true', help='Aplicar y validar sin escribir')
+    parser.add_argument('--diff', action='store_true', help='Mostrar el diff de cada archivo')
+    parser.add_argument('--no-lint', action='store_true', help='Validar solo la estructura (sin yaml_lint/v6)')
+    parser.add_argument('--backup', action='store_true', help='Guardar <archivo>.bak de cada YAML modificado')
+    parser.add_argument('--json', action='store_true', help='Resultado en JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        grouped = load_patch(args.patch)
+        result = apply_patch(grouped, lint=not args.no_lint, dry_run=args.dry_run,
+                             backup=args.backup, diff=args.diff)
+    except PatchError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(EXIT_BAD_PATCH)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        for f in result['files']:
+            icon = '❌' if f['problems'] else '✅' if f['modified'] else '➖'
+            lint = (f", lint: {f['errors_before']} → {f['errors_after']} errores"
+                    if 'errors_after' in f else '')
+            print(f"{icon} {f['file']}: {f['operations']} operaciones{lint}")
+            for problem in f['problems']:
+                print(f"   {problem}")
+        for diff in result['diffs'].values():
+            print(diff, end='')
+        total_ops = sum(f['operations'] for f in result['files'])
+        modified = sum(1 for f in result['files'] if f['modified'])
+        if not result['ok']:
+            print(f"\n❌ Patch rechazado: no se escribió ningún archivo ({result['seconds']:.2f}s)")
+        elif args.dry_run:
+            print(f"\n🔍 Dry-run: {total_ops} operaciones válidas, {modified} archivos cambiarían "
+                  f"({result['seconds']:.2f}s)")
+        else:
+            print(f"\n✅ {total_ops} operaciones aplicadas, {len(result['written'])} archivos escritos "
+                  f"({result['seconds']:.2f}s)")
+
+    sys.exit(EXIT_OK if result['ok'] else EXIT_INVALID)
+
+
 if __name__ == "__main__":
-    print("TODO")
+    main()
@@ -1,7 +1,668 @@
 #!/usr/bin/env python3
 """
 sls.py - Semantic Lint System para validación de agentes
+
+Servicio local de lint (HTTP en 127.0.0.1 o socket Unix) que carga reglas,
+vocabulario e inferencia de SIDs una sola vez por worker y valida payloads de
+agentes (.md o .yaml) con los checks de yaml_lint.py y yaml_lint_v6_semantic.py.
+Los agentes de Copilot llaman a un servicio ya caliente en lugar de lanzar un
+proceso Python por archivo.
+
+- Pool de procesos (--workers): cada worker importa los linters al arrancar
+- Lotes: los archivos de todas las peticiones en curso se agrupan (hasta
+  --batch-size, esperando como mucho --batch-window-ms) en un envío por worker
+- Caché de resultados por hash de contenido (LRU, --cache-size); un mismo
+  contenido pedido dos veces a la vez se evalúa una sola vez
+- Los .md se convierten en memoria como md2yaml.py (SIDs inferidos por reglas,
+  TEMP_* para el resto): mismos issues que el pipeline md2yaml → lint
+
+API (JSON):
+    POST /lint    {"files": [{"path": "agents/x.md", "content": "..."}],
+                   "linters": ["yaml_lint", "yaml_lint_v6"], "infer": true}
+               → {"results": [{"path", "kind", "hash", "cached", "errors", "warnings",
+                               "issues": {"yaml_lint": [...], "yaml_lint_v6": [...]}}],
+                  "summary": {"files", "errors", "warnings", "cached", "ms"}}
+    GET  /health  → {"status": "ok", "workers": N}
+    GET  /stats   → peticiones, archivos, lotes, caché, tiempo de lint
+
+Los issues tienen el formato de aps-tooling/lib/reporters.py (location,
+severity, message, rule y, si se conoce, md_file/md_line).
+
+Uso:
+    python3 swarm/scripts/sls.py serve --port 8765 --workers 4
+    python3 swarm/scripts/sls.py serve --socket /tmp/sls.sock
+
+    python3 swarm/scripts/sls.py lint swarm/agents/J2C/*.yaml --url http://127.0.0.1:8765
+    python3 swarm/scripts/sls.py lint 'swarm/agents/**/*.md' --socket /tmp/sls.sock --json
+    python3 swarm/scripts/sls.py stats --socket /tmp/sls.sock
+
+    curl -s --unix-socket /tmp/sls.sock http://sls/lint \\
+        -d '{"files": [{"path": "a.yaml", "content": "agent: {name: a, blocks: {}}"}]}'
+
+Exit codes de `lint`: 0 = sin issues, 1 = warnings, 2 = errores, 3 = servicio no disponible
 """
 
+import argparse
+import glob
+import hashlib
+import http.client
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_BATCH_WINDOW_MS = 2.0
+DEFAULT_CACHE_SIZE = 10000
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+REQUEST_TIMEOUT = 300
+
+LINTERS = ('yaml_lint', 'yaml_lint_v6')
+
+EXIT_OK = 0
+EXIT_WARNINGS = 1
+EXIT_ERRORS = 2
+EXIT_UNAVAILABLE = 3
+
+
+def find_tooling_dir() -> Path:
+    """aps-tooling/ del repo (funciona desde swarm/scripts y .github/swarm/scripts)."""
+    for parent in Path(__file__).resolve().parents:
+        candidate = parent / 'aps-tooling'
+        if (candidate / 'lib').is_dir() and (candidate / 'scripts').is_dir():
+            return candidate
+    raise SystemExit("❌ No se encontró aps-tooling/ en los directorios padre")
+
+
+def payload_kind(path: str, kind: Optional[str] = None) -> str:
+    """'md' o 'yaml' según el campo kind o la extensión."""
+    if kind in ('md', 'yaml'):
+        return kind
+    return 'md' if path.lower().endswith(('.md', '.markdown')) else 'yaml'
+
+
+def cache_key(kind: str, content: str, linters, infer: bool) -> str:
+    """Clave del resultado: todo lo que lo determina salvo la ruta."""
+    digest = hashlib.sha1(f"{kind}\x00{','.join(linters)}\x00{int(infer)}\x00".encode('utf-8'))
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WORKER (un proceso del pool: linters cargados una vez)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LintWorker:
+    """Linters, vocabulario e inferencia de SIDs cargados en un proceso."""
+
+    def __init__(self, tooling_dir: Path):
+        for path in (tooling_dir / 'scripts', tooling_dir):
+            if str(path) not in sys.path:
+                sys.path.insert(0, str(path))
+        import md2yaml
+        import yaml_lint
+        import yaml_lint_v6_semantic
+        from lib.lint_memo import ruleset_fingerprint
+        from lib.md_blocks import split_lines
+        from lib.yaml_cache import loads_yaml
+
+        self.md2yaml = md2yaml
+        self.yaml_lint = yaml_lint
+        self.split_lines = split_lines
+        self.loads_yaml = loads_yaml
+        self.inferencer = md2yaml.build_inferencer()
+        # Un guard por worker: validate_data reinicia su presupuesto en cada payload
+        self.v6 = yaml_lint_v6_semantic.SemanticValidator()
+        # Huella de lo que determina un resultado: conversión .md, linters y config del guard
+        self.ruleset = ruleset_fingerprint(
+            *(Path(m.__file__).resolve() for m in (md2yaml, yaml_lint, yaml_lint_v6_semantic)),
+            self.v6.guard.config_fingerprint())
+
+    def lint(self, item: Dict) -> Dict:
+        """Valida un payload {path, kind, content, linters, infer}."""
+        try:
+            data = self.load(item['path'], item['kind'], item['content'], item['infer'])
+        except Exception as e:
+            issues = {name: [{'location': 'FILE', 'severity': 'error', 'rule': 'YAML_INVALID',
+                              'message': f"Payload inválido: {e}"}] for name in item['linters']}
+            return self._result(issues)
+        return self.lint_data(data, item['linters'])
+
+    def load(self, path: str, kind: str, content: str, infer: bool = True):
+        """Estructura del agente: el YAML parseado o el .md convertido en memoria."""
+        if kind == 'md':
+            inferencer = self.inferencer if infer else None
+            return self.md2yaml.build_agent_struct(path, inferencer=inferencer,
+                                                   lines=self.split_lines(content))
+        return self.loads_yaml(content)
+
+    def lint_data(self, data, linters=LINTERS) -> Dict:
+        """
+        {errors, warnings, issues: {linter: [...]}, cacheable} de una estructura ya
+        cargada; cacheable=False si el RegexGuard desactivó alguna regla por tiempo
+        al validar esta estructura (resultado incompleto, que no debe reutilizarse).
+        Las desactivadas en peticiones anteriores no cuentan: validate_data
+        reinicia el ámbito del guard.
+        """
+        issues = {}
+        cacheable = True
+        if 'yaml_lint' in linters:
+            errors, _ = self.yaml_lint.lint_agent_data(data)
+            issues['yaml_lint'] = [e.to_issue() for e in errors]
+        if 'yaml_lint_v6' in linters:
+            self.v6.validate_data(data)  # Estructura inválida → errores 'structure', como el CLI
+            issues['yaml_lint_v6'] = list(self.v6.issues)
+            cacheable = not self.v6.guard.disabled_in_scope()
+        result = self._result(issues)
+        result['cacheable'] = cacheable
+        return result
+
+    @staticmethod
+    def _result(issues: Dict[str, List[Dict]]) -> Dict:
+        all_issues = [i for linter_issues in issues.values() for i in linter_issues]
+        return {
+            'errors': sum(1 for i in all_issues if i['severity'] == 'error'),
+            'warnings': sum(1 for i in all_issues if i['severity'] == 'warning'),
+            'issues': issues,
+        }
+
+
+_worker: Optional[LintWorker] = None
+
+
+def _init_worker(tooling_dir: str) -> None:
+    global _worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C lo gestiona el servidor
+    _worker = LintWorker(Path(tooling_dir))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def lint_chunk(items: List[Dict]) -> List[Dict]:
+    """Un lote de payloads en un worker: un envío y una respuesta por lote."""
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        try:
+            result = _worker.lint(item)
+        except Exception as e:
+            result = LintWorker._result({'sls': [{'location': 'FILE', 'severity': 'error', 'rule': 'INTERNAL',
+                                                  'message': f"{type(e).__name__}: {e}"}]})
+        result['lint_ms'] = (time.perf_counter() - start) * 1000
+        results.append(result)
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICIO: caché, lotes y pool
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ResultCache:
+    """LRU de resultados por cache_key()."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LintService:
+    """
+    Pool de workers con lotes entre peticiones y caché por contenido.
+
+    lint(files) es seguro entre hilos: cada petición HTTP lo llama desde su hilo.
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window_ms / 1000
+        self.cache = ResultCache(cache_size)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(str(find_tooling_dir()),))
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers * 2)  # Lotes en vuelo (backpressure)
+        self.started = time.time()
+        self.stats = {'requests': 0, 'files': 0, 'evaluated': 0, 'deduplicated': 0,
+                      'batches': 0, 'lint_ms': 0.0}
+        self._dispatcher = threading.Thread(target=self._dispatch, name='sls-batcher', daemon=True)
+        self._dispatcher.start()
+
+    def warm_up(self) -> None:
+        """Arranca todos los workers (carga de linters) antes de aceptar peticiones."""
+        futures = [self.pool.submit(_ping) for _ in range(self.workers * 2)]
+        for future in futures:
+            future.result()
+
+    def lint(self, files: List[Dict], linters=LINTERS, infer: bool = True) -> Dict:
+        """
+        Valida payloads {path, content, kind?}.
+
+        Returns:
+            {'results': [...], 'summary': {...}} en el orden de `files`
+        """
+        start = time.perf_counter()
+        linters = tuple(name for name in LINTERS if name in linters)
+        pending = []
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['files'] += len(files)
+        for f in files:
+            kind = payload_kind(f['path'], f.get('kind'))
+            key = cache_key(kind, f['content'], linters, infer)
+            cached = self.cache.get(key)
+            if cached is not None:
+                pending.append((f, kind, key, None, cached))
+                continue
+            item = {'path': f['path'], 'kind': kind, 'content': f['content'],
+                    'linters': linters, 'infer': infer}
+            pending.append((f, kind, key, self._submit(key, item), None))
+
+        results = []
+        for f, kind, key, future, cached in pending:
+            result = cached if cached is not None else future.result(timeout=REQUEST_TIMEOUT)
+            results.append({
+                'path': f['path'],
+                'kind': kind,
+                'hash': hashlib.sha1(f['content'].encode('utf-8')).hexdigest(),
+                'cached': cached is not None,
+                'errors': result['errors'],
+                'warnings': result['warnings'],
+                'issues': _with_path(result['issues'], f['path'], kind),
+            })
+        return {
+            'results': results,
+            'summary': {
+                'files': len(results),
+                'errors': sum(r['errors'] for r in results),
+                'warnings': sum(r['warnings'] for r in results),
+                'cached': sum(1 for r in results if r['cached']),
+                'ms': round((time.perf_counter() - start) * 1000, 1),
+            },
+        }
+
+    def _submit(self, key: str, item: Dict) -> Future:
+        """Encola un payload; si el mismo contenido ya está en evaluación, comparte su resultado."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['deduplicated'] += 1
+                return future
+            future = Future()
+            self._inflight[key] = future
+        self._queue.put((key, item, future))
+        return future
+
+    def _dispatch(self) -> None:
+        """Hilo de lotes: agrupa payloads de todas las peticiones y los envía al pool."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._slots.acquire()
+            try:
+                chunk = self.pool.submit(lint_chunk, [item for _, item, _ in batch])
+            except RuntimeError as e:  # Pool cerrado (apagado del servicio)
+                self._slots.release()
+                self._fail(batch, e)
+                continue
+            with self._lock:
+                self.stats['batches'] += 1
+            chunk.add_done_callback(lambda done, batch=batch: self._complete(batch, done))
+
+    def _complete(self, batch, done: Future) -> None:
+        self._slots.release()
+        try:
+            results = done.result()
+        except Exception as e:  # Worker caído (BrokenProcessPool)
+            self._fail(batch, e)
+            return
+        with self._lock:
+            self.stats['evaluated'] += len(results)
+            self.stats['lint_ms'] += sum(r.pop('lint_ms') for r in results)
+        for (key, _, future), result in zip(batch, results):
+            if result.pop('cacheable', True):
+                self.cache.put(key, result)
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(result)
+
+    def _fail(self, batch, error: Exception) -> None:
+        for key, _, future in batch:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(error)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['lint_ms'] = round(stats['lint_ms'], 1)
+        stats['avg_batch'] = round(stats['evaluated'] / stats['batches'], 2) if stats['batches'] else 0
+        stats.update({
+            'workers': self.workers,
+            'uptime_s': round(time.time() - self.started, 1),
+            'cache': {'entries': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses},
+        })
+        return stats
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _with_path(issues: Dict[str, List[Dict]], path: str, kind: str) -> Dict[str, List[Dict]]:
+    """
+    Issues del resultado (compartido en caché) para una ruta concreta: el mismo
+    contenido con otro nombre reporta su propio md_file.
+    """
+    if kind != 'md':
+        return issues
+    return {
+        linter: [dict(i, md_file=path) if 'md_file' in i else i for i in linter_issues]
+        for linter, linter_issues in issues.items()
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HTTP (TCP o socket Unix)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class SLSHandler(BaseHTTPRequestHandler):
+    server_version = 'SLS/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'workers': service.workers})
+        elif self.path == '/stats':
+            self._send(200, service.get_stats())
+        else:
+            self._send(404, {'error': f"Ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/lint':
+            self._send(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send(413, {'error': f"Petición de {length} bytes (máximo {MAX_REQUEST_BYTES})"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            files = request.get('files')
+            if files is None and 'content' in request:
+                files = [request]  # Un solo archivo sin envoltorio
+            if not isinstance(files, list) or not all(
+                    isinstance(f, dict) and isinstance(f.get('content'), str) for f in files):
+                raise ValueError("'files' debe ser una lista de {path, content}")
+            for i, f in enumerate(files):
+                f.setdefault('path', f'payload-{i}.{f.get("kind") or "yaml"}')
+            linters = request.get('linters') or LINTERS
+            unknown = set(linters) - set(LINTERS)
+            if unknown:
+                raise ValueError(f"Linters desconocidos: {sorted(unknown)} (disponibles: {list(LINTERS)})")
+        except (ValueError, AttributeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        try:
+            response = self.server.service.lint(files, linters, bool(request.get('infer', True)))
+        except Exception as e:
+            self._send(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, response)
+
+    def _send(self, status: int, body: Dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Socket de una ejecución anterior
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+
+def serve(args: argparse.Namespace) -> int:
+    service = LintService(args.workers, args.batch_size, args.batch_window_ms, args.cache_size)
+    start = time.perf_counter()
+    service.warm_up()
+    if args.socket:
+        server = UnixHTTPServer(args.socket, SLSHandler)
+        where = f"unix:{args.socket}"
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), SLSHandler)
+        where = f"http://{args.host}:{server.server_address[1]}"
+    server.service = service
+    server.verbose = args.log
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"🟢 SLS escuchando en {where} ({service.workers} workers listos en "
+          f"{time.perf_counter() - start:.2f}s, lotes de {service.batch_size})", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+        stats = service.get_stats()
+        print(f"🔴 SLS detenido: {stats['requests']} peticiones, {stats['files']} archivos, "
+              f"{stats['cache']['hits']} desde caché")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLIENTE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = REQUEST_TIMEOUT):
+        super().__init__('sls', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def open_connection(args: argparse.Namespace) -> http.client.HTTPConnection:
+    if args.socket:
+        return UnixHTTPConnection(args.socket)
+    url = args.url.split('://', 1)[-1].rstrip('/')
+    host, _, port = url.partition(':')
+    return http.client.HTTPConnection(host, int(port or 80), timeout=REQUEST_TIMEOUT)
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    headers = {'Content-Type': 'application/json'} if data is not None else {}
+    conn.request(method, path, body=data, headers=headers)
+    response = conn.getresponse()
+    payload = json.loads(response.read() or b'{}')
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}: {payload.get('error', payload)}")
+    return payload
+
+
+def expand(patterns: List[str]) -> List[str]:
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern])
+    return sorted(set(f for f in files if f.endswith(('.md', '.yaml', '.yml'))))
+
+
+def lint_client(args: argparse.Namespace) -> int:
+    files = expand(args.files)
+    if not files:
+        print("❌ No se encontraron archivos .md/.yaml")
+        return EXIT_ERRORS
+
+    results = []
+    summary = {'files': 0, 'errors': 0, 'warnings': 0, 'cached': 0, 'ms': 0.0}
+    try:
+        conn = open_connection(args)
+        for i in range(0, len(files), args.chunk):
+            payload = [{'path': f, 'content': Path(f).read_text(encoding='utf-8')}
+                       for f in files[i:i + args.chunk]]
+            response = request(conn, 'POST', '/lint', {
+                'files': payload, 'linters': args.linters, 'infer': not args.no_infer,
+            })
+            results.extend(response['results'])
+            for key in summary:
+                summary[key] += response['summary'][key]
+        conn.close()
+    except (OSError, RuntimeError, http.client.HTTPException) as e:
+        print(f"❌ SLS no disponible ({e}). Arráncalo con: python3 {Path(__file__).name} serve", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+
+    if args.json:
+        print(json.dumps({'results': results, 'summary': summary}, indent=2, ensure_ascii=False))
+    else:
+        for r in results:
+            icon = '❌' if r['errors'] else '⚠️ ' if r['warnings'] else '✅'
+            print(f"{icon} {r['path']}: {r['errors']} errores, {r['warnings']} warnings"
+                  + (' (caché)' if r['cached'] else ''))
+            for linter, issues in r['issues'].items():
+                for issue in issues:
+                    if issue['severity'] in ('error', 'warning') or args.verbose:
+                        where = f" ({issue['md_file']}:{issue['md_line']})" if issue.get('md_line') else ''
+                        print(f"   {issue['severity'].upper()} [{linter}:{issue['rule']}] "
+                              f"{issue['location']}: {issue['message']}{where}")
+        print(f"\n📊 {summary['files']} archivos ({summary['cached']} desde caché): "
+              f"{summary['errors']} errores, {summary['warnings']} warnings en {summary['ms']:.0f} ms")
+
+    if summary['errors']:
+        return EXIT_ERRORS
+    return EXIT_WARNINGS if summary['warnings'] else EXIT_OK
+
+
+def stats_client(args: argparse.Namespace) -> int:
+    try:
+        conn = open_connection(args)
+        print(json.dumps(request(conn, 'GET', '/stats'), indent=2, ensure_ascii=False))
+    except (OSError, RuntimeError, http.client.HTTPException) as e:
+        print(f"❌ SLS no disponible ({e})", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+    return EXIT_OK
+
+
+def add_address_args(parser: argparse.ArgumentParser, client: bool) -> None:
+    if client:
+        parser.add_argument('--url', default=f'http://{DEFAULT_HOST}:{DEFAULT_PORT}',
+                            help=f'URL del servicio (default: http://{DEFAULT_HOST}:{DEFAULT_PORT})')
+    else:
+        parser.add_argument('--host', default=DEFAULT_HOST, help=f'Interfaz (default: {DEFAULT_HOST})')
+        parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Puerto (default: {DEFAULT_PORT})')
+    parser.add_argument('--socket', metavar='PATH', help='Socket Unix en lugar de TCP')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Semantic Lint System: servicio de lint de agentes (.md/.yaml)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Uso:', 1)[1]
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_serve = sub.add_parser('serve', help='Arrancar el servicio')
+    add_address_args(p_serve, client=False)
+    p_serve.add_argument('--workers', type=int, default=None, help='Procesos de lint (default: CPUs)')
+    p_serve.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                         help=f'Archivos por envío a un worker (default: {DEFAULT_BATCH_SIZE})')
+    p_serve.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                         help=f'Espera máxima para completar un lote (default: {DEFAULT_BATCH_WINDOW_MS})')
+    p_serve.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                         help=f'Resultados en caché, 0 = sin caché (default: {DEFAULT_CACHE_SIZE})')
+    p_serve.add_argument('--log', action='store_true', help='Registrar cada petición en stderr')
+    p_serve.set_defaults(func=serve)
+
+    p_lint = sub.add_parser('lint', help='Validar archivos contra un servicio en marcha')
+    p_lint.add_argument('files', nargs='+', help='Archivos o patrones glob (.md/.yaml)')
+    add_address_args(p_lint, client=True)
+    p_lint.add_argument('--linters', type=lambda v: v.split(','), default=list(LINTERS),
+                        help=f"Linters separados por comas (default: {','.join(LINTERS)})")
+    p_lint.add_argument('--no-infer', action='store_true', help='.md sin inferencia de SIDs (todo TEMP_*)')
+    p_lint.add_argument('--chunk', type=int, default=200, help='Archivos por petición (default: 200)')
+    p_lint.add_argument('--json', action='store_true', help='Respuesta JSON completa')
+    p_lint.add_argument('-v', '--verbose', action='store_true', help='Incluir issues info')
+    p_lint.set_defaults(func=lint_client)
+
+    p_stats = sub.add_parser('stats', help='Estadísticas del servicio')
+    add_address_args(p_stats, client=True)
+    p_stats.set_defaults(func=stats_client)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
 if __name__ == "__main__":
-    print("TODO")
+    main()
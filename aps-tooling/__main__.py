@@ -0,0 +1,78 @@
+"""
+aps - Punto de entrada único de APS Tooling
+============================================
+
+Un comando por script de scripts/, con los mismos argumentos y exit codes:
+
+    python3 aps.pyz lint --batch 'swarm/agents/**/*.yaml'     # zipapp (make zipapp)
+    python3 aps-tooling lint --batch 'swarm/agents/**/*.yaml' # desde el repo
+    python3 aps.pyz --help                                     # lista de comandos
+
+El script se ejecuta como __main__ dentro del mismo proceso (desde su .pyc en
+el zipapp): no hay que resolver rutas de scripts ni depender del directorio
+de trabajo.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# comando → (módulo en scripts/, descripción)
+COMMANDS = {
+    'extract-goals': ('extract_goals_from_json', 'Export SwarmBuilder (JSON) → goals .md'),
+    'sid-assign': ('md_sid_assign', 'Asigna SIDs determinísticos en los .md'),
+    'md2yaml': ('md2yaml', 'Convierte goals .md → YAML de bloques'),
+    'enrich': ('enrich_yaml_with_llm', 'Enriquece YAMLs con accion/relacion/nivel/sid'),
+    'lint': ('yaml_lint', 'Linter de YAMLs de agentes'),
+    'lint-v2': ('yaml_lint_v2', 'Linter v2 (reglas de swarm/schemas)'),
+    'lint-v3': ('yaml_lint_v3', 'Linter v3 (reglas APS v3.5)'),
+    'lint-v4': ('yaml_lint_v4', 'Linter v4 (reglas configurables)'),
+    'lint-v5': ('yaml_lint_v5', 'Linter v5 (zero-config)'),
+    'lint-v6': ('yaml_lint_v6_semantic', 'Linter v6 (semántico por SID)'),
+    'pipeline': ('yaml_pipeline_cli', 'Pipeline md2yaml + lint en batch (CI)'),
+    'catalog': ('catalog_cli', 'Catálogo de bloques (SQLite + FTS5)'),
+    'sid-registry': ('sid_registry_cli', 'Registro central de SIDs'),
+    'lsp': ('aps_lsp', 'Servidor LSP (lint en vivo)'),
+}
+
+
+def usage() -> str:
+    lines = ['Uso: aps <comando> [argumentos...]', '', 'Comandos:']
+    lines += [f"  {name:<14} {description}" for name, (_, description) in COMMANDS.items()]
+    lines += ['', "Ayuda de un comando: aps <comando> --help"]
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print(usage())
+        sys.exit(0 if len(sys.argv) >= 2 else 1)
+    if sys.argv[1] == '--version':
+        from lib import __version__, __aps_version__
+        print(f"aps {__version__} (APS v{__aps_version__})")
+        sys.exit(0)
+
+    command = sys.argv[1]
+    if command not in COMMANDS:
+        print(f"❌ Comando desconocido: {command}\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+
+    # lib/ y scripts/ importables (los scripts se importan entre sí: catalog → yaml_lint)
+    for path in (ROOT / 'scripts', ROOT):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    spec = importlib.util.find_spec(COMMANDS[command][0])
+    # El script reemplaza a este módulo como __main__ (`if __name__`, pickle de ProcessPoolExecutor)
+    module = importlib.util.module_from_spec(spec)
+    module.__name__ = '__main__'
+    if module.__file__.endswith('.pyc'):
+        module.__file__ = module.__file__[:-1]  # El .py de al lado: misma huella de reglas (lint_memo) que el repo
+    sys.modules['__main__'] = module
+    sys.argv = [f'aps {command}'] + sys.argv[2:]
+    exec(spec.loader.get_code(spec.name), module.__dict__)
+
+
+if __name__ == '__main__':
+    main()
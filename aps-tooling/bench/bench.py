@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalado del pipeline APS.
+
+Genera swarms sintéticos (swarm_gen.py) de distintos tamaños y mide cada
+etapa (extract_goals, md_sid_assign, md2yaml, cada linter, SchemaValidator)
+en un proceso propio: tiempo, throughput en bloques/s y pico de RSS.
+
+Con --trials N cada tamaño se mide N veces (directorio de trabajo nuevo en cada
+repetición) y se guarda la mediana y las muestras. `compare` re-ejecuta la
+suite con los parámetros de una línea base guardada y falla (exit 1) si alguna
+etapa empeora más allá del umbral con un IC 95% que lo confirme (compare.py).
+`startup` mide los imports de cada CLI con -X importtime y falla si alguno
+supera el presupuesto (startup.py).
+
+Uso:
+    # Escalado 10 → 1.000 agentes
+    python3 aps-tooling/bench/bench.py run --agents 10,100,1000
+
+    # Solo linters, resultados en JSON
+    python3 aps-tooling/bench/bench.py run --agents 500 \\
+        --stages extract_goals,md2yaml,yaml_lint,yaml_lint_v6 --json bench.json
+
+    # Un export real en lugar del sintético
+    python3 aps-tooling/bench/bench.py run --swarm swarm/json/J2C-v1-Swarm-v3-5.json
+
+    # Línea base (5 repeticiones) y gate de regresión contra ella
+    python3 aps-tooling/bench/bench.py compare --update --agents 100,1000 --trials 5
+    python3 aps-tooling/bench/bench.py compare --threshold 0.15
+
+    # Presupuesto de arranque (imports de cada CLI, exit 1 si se pasa)
+    python3 aps-tooling/bench/bench.py startup --budget 80
+
+    # Solo generar el JSON
+    python3 aps-tooling/bench/bench.py gen -o /tmp/swarm.json --agents 10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+from swarm_gen import add_generator_args, generator_params, write_swarm
+from stages import STAGES
+from compare import compare_results, format_comparison, regressions
+from startup import CLIS, DEFAULT_BUDGET_MS, format_startup, run_startup
+from lib.md_blocks import split_blocks, split_lines
+
+DEFAULT_BASELINE = BENCH_DIR / 'baseline.json'
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════════════════
+
+def run_stage_process(stage: str, work: Path) -> Dict:
+    """Ejecuta una etapa en un proceso nuevo (RSS aislado) y retorna su medición."""
+    env = dict(os.environ)
+    env.pop('APS_YAML_CACHE', None)  # Sin caché en disco: cada etapa parsea en frío
+    proc = subprocess.run(
+        [sys.executable, str(BENCH_DIR / 'stages.py'), stage, str(work)],
+        capture_output=True, text=True, env=env
+    )
+    if proc.returncode != 0:
+        return {'stage': stage, 'error': (proc.stderr.strip().splitlines() or ['sin salida'])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def swarm_stats(swarm_path: Path) -> Dict:
+    """Agentes, bloques (como los verá md2yaml) y bytes de goals de un export existente."""
+    with open(swarm_path, 'r', encoding='utf-8') as f:
+        agents = json.load(f)['agents']
+    return {
+        'agents': len(agents),
+        'blocks': sum(len(split_blocks(split_lines(a.get('goals', '')))) for a in agents),
+        'bytes': sum(len(a.get('goals', '').encode('utf-8')) for a in agents),
+    }
+
+
+def prepare_workdir(work: Path, swarm: Optional[Path] = None,
+                    agents: int = 10, params: Optional[Dict] = None) -> Dict:
+    """Directorio de trabajo nuevo con el swarm (generado o copiado); retorna sus estadísticas."""
+    if work.exists():
+        shutil.rmtree(work)
+    work.mkdir(parents=True)
+    if swarm is not None:
+        shutil.copy2(swarm, work / 'swarm.json')
+        return swarm_stats(swarm)
+    return write_swarm(work / 'swarm.json', agents=agents, **(params or {}))
+
+
+def aggregate(samples: List[Dict], blocks: int) -> Dict:
+    """
+    Medición de una etapa a partir de sus repeticiones: mediana de tiempo y RSS
+    más las muestras (para la comparación estadística). Una repetición omitida
+    o con error marca la etapa entera.
+    """
+    for sample in samples:
+        if 'skipped' in sample or 'error' in sample:
+            return sample
+    result = dict(samples[0])
+    result['samples_s'] = [s['seconds'] for s in samples]
+    result['seconds'] = round(median(result['samples_s']), 6)
+    result['setup_s'] = round(median(s['setup_s'] for s in samples), 6)
+    rss = [s['peak_rss_kb'] for s in samples if s.get('peak_rss_kb')]
+    if rss:
+        result['samples_rss_kb'] = rss
+        result['peak_rss_kb'] = int(median(rss))
+    if result['seconds']:
+        result['blocks_per_s'] = round(blocks / result['seconds'], 1)
+    return result
+
+
+def run_size(work: Path, stages: List[str], swarm: Optional[Path] = None,
+             agents: int = 10, params: Optional[Dict] = None, trials: int = 1) -> Dict:
+    """
+    Mide las etapas en orden, `trials` veces (cada repetición parte de un
+    directorio de trabajo nuevo para que todas procesen la misma entrada).
+
+    Returns:
+        {'agents', 'blocks', 'bytes', 'swarm': estadísticas, 'trials',
+         'stages': {etapa: medición con mediana y muestras}}
+    """
+    samples: Dict[str, List[Dict]] = {stage: [] for stage in stages}
+    for _ in range(trials):
+        stats = prepare_workdir(work, swarm, agents, params)
+        for stage in stages:
+            samples[stage].append(run_stage_process(stage, work))
+
+    measured = {stage: aggregate(samples[stage], stats['blocks']) for stage in stages}
+    return {
+        'agents': stats['agents'],
+        'blocks': stats['blocks'],
+        'bytes': stats['bytes'],
+        'swarm': stats,
+        'trials': trials,
+        'stages': measured,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPORTE
+# ═══════════════════════════════════════════════════════════════════════════
+
+def format_table(run: Dict) -> str:
+    """Tabla de una ejecución: tiempo, throughput y RSS por etapa."""
+    lines = [
+        f"📊 {run['agents']:,} agentes · {run['blocks']:,} bloques · {run['bytes'] / 1e6:.1f} MB de goals",
+        f"   {'Etapa':<18} {'Tiempo':>10} {'Bloques/s':>12} {'RSS pico':>10}",
+        f"   {'-' * 18} {'-' * 10} {'-' * 12} {'-' * 10}",
+    ]
+    for stage, result in run['stages'].items():
+        if 'skipped' in result:
+            lines.append(f"   {stage:<18} ⏭️  omitida: {result['skipped']}")
+        elif 'error' in result:
+            lines.append(f"   {stage:<18} ❌ error: {result['error']}")
+        else:
+            rss = f"{result['peak_rss_kb'] / 1024:.1f} MB" if result.get('peak_rss_kb') else 'n/d'
+            lines.append(f"   {stage:<18} {result['seconds']:>9.3f}s "
+                         f"{result.get('blocks_per_s', 0):>12,.0f} {rss:>10}")
+    return '\n'.join(lines)
+
+
+def environment() -> Dict:
+    """Contexto de la medición (para comparar resultados entre máquinas)."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def parse_stages(value: str) -> List[str]:
+    stages = [s.strip() for s in value.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"etapas desconocidas: {', '.join(unknown)} (opciones: {', '.join(STAGES)})"
+        )
+    return stages
+
+
+def parse_sizes(value: str) -> List[int]:
+    try:
+        return [int(s) for s in value.split(',') if s.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"lista de tamaños inválida: '{value}'")
+
+
+def cmd_gen(args: argparse.Namespace) -> int:
+    stats = write_swarm(args.output, agents=args.agents, **generator_params(args))
+    print(f"✅ {args.output}: {stats['agents']:,} agentes, {stats['blocks']:,} bloques, "
+          f"{stats['bytes'] / 1e6:.1f} MB")
+    return 0
+
+
+def run_suite(sizes: List[int], stages: List[str], swarm: Optional[Path], params: Dict,
+              trials: int = 1, workdir: Optional[Path] = None, keep: bool = False) -> Dict:
+    """
+    Ejecuta la suite para cada tamaño e imprime la tabla de cada uno.
+
+    Returns:
+        Resultados en el formato de --json / línea base
+    """
+    base = workdir or Path(tempfile.mkdtemp(prefix='aps_bench_'))
+    results = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'params': {'swarm': str(swarm)} if swarm else params,
+        'stages': stages,
+        'trials': trials,
+        'runs': [],
+    }
+    try:
+        for size in ([None] if swarm else sizes):
+            work = base / (swarm.stem if swarm else f"agents_{size}")
+            run = run_size(work, stages, swarm=swarm, agents=size or 0, params=params, trials=trials)
+            results['runs'].append(run)
+            print(format_table(run) + '\n')
+    finally:
+        if not keep and not workdir:
+            shutil.rmtree(base, ignore_errors=True)
+    return results
+
+
+def save_results(results: Dict, path: Path, label: str = 'Resultados') -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"💾 {label}: {path}")
+
+
+def has_errors(results: Dict) -> bool:
+    return any('error' in r for run in results['runs'] for r in run['stages'].values())
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    results = run_suite(args.agents, args.stages, args.swarm, generator_params(args),
+                        args.trials, args.workdir, args.keep)
+    if args.json:
+        save_results(results, args.json)
+    return 1 if has_errors(results) else 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    if args.update:
+        results = run_suite(args.agents, args.stages, args.swarm, generator_params(args),
+                            args.trials or 5, args.workdir, args.keep)
+        if has_errors(results):
+            print("❌ Alguna etapa falló: no se actualiza la línea base")
+            return 1
+        save_results(results, args.baseline, 'Línea base')
+        return 0
+
+    if not args.baseline.exists():
+        print(f"❌ Línea base no encontrada: {args.baseline} (créala con --update)")
+        return 2
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if args.current:
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        # Mismos tamaños, etapas y parámetros del generador que la línea base
+        params = dict(baseline['params'])
+        swarm = Path(params.pop('swarm')) if 'swarm' in params else None
+        sizes = [run['agents'] for run in baseline['runs']]
+        stages = baseline.get('stages') or list(baseline['runs'][0]['stages'])
+        print(f"🔁 Re-ejecutando la suite de {args.baseline} "
+              f"({args.trials or baseline.get('trials', 5)} repeticiones)\n")
+        current = run_suite(sizes, stages, swarm, params, args.trials or baseline.get('trials', 5),
+                            args.workdir, args.keep)
+        if args.json:
+            save_results(current, args.json)
+
+    if baseline.get('environment') != current.get('environment'):
+        print("⚠️  Entorno distinto al de la línea base (Python/plataforma/CPUs): "
+              "los tiempos pueden no ser comparables")
+
+    rows = compare_results(baseline, current, args.threshold, args.rss_threshold, args.min_seconds)
+    print(f"📈 Comparación contra {args.baseline} (umbral: +{args.threshold:.0%} tiempo, "
+          f"+{args.rss_threshold:.0%} RSS)")
+    print(format_comparison(rows))
+
+    failed = regressions(rows)
+    if failed:
+        print(f"\n❌ FAIL: {len(failed)} etapas con regresión:")
+        for row in failed:
+            print(f"   - {row['stage']} ({row['agents']:,} agentes)")
+        return 1
+    print("\n✅ PASS: sin regresiones")
+    return 0
+
+
+def cmd_startup(args: argparse.Namespace) -> int:
+    rows = run_startup(args.cli, args.repeat, args.budget)
+    print(f"⏱️  Arranque: imports por CLI (mediana de {args.repeat}, sin el intérprete vacío)")
+    print(format_startup(rows))
+    if args.json:
+        save_results({'environment': environment(), 'startup': rows}, args.json)
+
+    over = [r for r in rows if not r['ok']]
+    if over:
+        print(f"\n❌ FAIL: {len(over)} CLIs por encima del presupuesto:")
+        for r in over:
+            print(f"   - {r['cli']}: {r['import_ms']:.1f} ms > {r['budget_ms']:.1f} ms")
+        return 1
+    print("\n✅ PASS: todos los CLIs dentro del presupuesto")
+    return 0
+
+
+def add_suite_args(parser: argparse.ArgumentParser, trials_default: Optional[int]) -> None:
+    """Opciones de ejecución de la suite (run y compare)."""
+    parser.add_argument('--agents', type=parse_sizes, default=[10, 100],
+                        help='Tamaños a medir, separados por comas (default: 10,100)')
+    parser.add_argument('--swarm', type=Path, help='Export SwarmBuilder existente en lugar del sintético')
+    parser.add_argument('--stages', type=parse_stages, default=list(STAGES),
+                        help=f"Etapas, separadas por comas (default: todas: {','.join(STAGES)})")
+    parser.add_argument('--trials', type=int, default=trials_default,
+                        help='Repeticiones por tamaño (se guarda la mediana y las muestras)')
+    parser.add_argument('--workdir', type=Path, help='Directorio de trabajo (se conserva)')
+    parser.add_argument('--keep', action='store_true', help='Conservar el directorio temporal')
+    parser.add_argument('--json', type=Path, metavar='PATH', help='Guardar resultados en JSON')
+    add_generator_args(parser)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark de escalado del pipeline APS',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Uso:', 1)[1]
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('gen', help='Generar un swarm sintético')
+    gen.add_argument('-o', '--output', type=Path, required=True, help='Archivo JSON de salida')
+    gen.add_argument('--agents', type=int, default=10, help='Número de agentes (default: 10)')
+    add_generator_args(gen)
+    gen.set_defaults(func=cmd_gen)
+
+    run = sub.add_parser('run', help='Medir las etapas del pipeline')
+    add_suite_args(run, trials_default=1)
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser('compare', help='Gate de regresión contra una línea base guardada')
+    compare.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                         help=f'Línea base JSON (default: {DEFAULT_BASELINE})')
+    compare.add_argument('--update', action='store_true',
+                         help='Medir con las opciones dadas y guardar como línea base (trials default: 5)')
+    compare.add_argument('--current', type=Path, metavar='PATH',
+                         help='Comparar un resultado ya medido (run --json) en lugar de re-ejecutar')
+    compare.add_argument('--threshold', type=float, default=0.2,
+                         help='Regresión de tiempo tolerada (default: 0.2 = +20%%)')
+    compare.add_argument('--rss-threshold', type=float, default=0.2,
+                         help='Regresión de pico de RSS tolerada (default: 0.2)')
+    compare.add_argument('--min-seconds', type=float, default=0.05,
+                         help='No evaluar por tiempo etapas más rápidas que esto (default: 0.05)')
+    add_suite_args(compare, trials_default=None)
+    compare.set_defaults(func=cmd_compare)
+
+    startup = sub.add_parser('startup', help='Presupuesto de arranque de los CLIs (-X importtime)')
+    startup.add_argument('--cli', type=lambda v: v.split(','), metavar='NOMBRES',
+                         help=f"CLIs a medir, separados por comas (default: todos: {','.join(n for n, _ in CLIS)})")
+    startup.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                         help=f'Presupuesto de imports por CLI en ms (default: {DEFAULT_BUDGET_MS:.0f})')
+    startup.add_argument('--repeat', type=int, default=5, help='Ejecuciones por CLI (default: 5)')
+    startup.add_argument('--json', type=Path, metavar='PATH', help='Guardar resultados en JSON')
+    startup.set_defaults(func=cmd_startup)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Comparación estadística de resultados de benchmark contra una línea base.
+
+Cada etapa se mide en varias repeticiones (trials). Para cada (tamaño, etapa)
+se compara la mediana actual con la de la línea base y se estima un intervalo
+de confianza del cociente actual/base por bootstrap (remuestreo con semilla
+fija: el mismo par de resultados da siempre el mismo veredicto).
+
+Veredicto por métrica (tiempo y pico de RSS):
+- ❌ regresión: cociente > 1 + umbral y el IC entero por encima de 1
+- ⚠️  ruido: cociente > 1 + umbral pero el IC incluye 1 (repetir con más trials)
+- 🚀 mejora: cociente < 1 / (1 + umbral) y el IC entero por debajo de 1
+- ✅ sin cambios
+"""
+
+import random
+from statistics import median
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+
+REGRESSION = 'regression'
+NOISE = 'noise'
+IMPROVEMENT = 'improvement'
+OK = 'ok'
+
+VERDICT_ICONS = {REGRESSION: '❌', NOISE: '⚠️ ', IMPROVEMENT: '🚀', OK: '✅'}
+
+
+def ratio_ci(
+    base: Sequence[float],
+    current: Sequence[float],
+    confidence: float = CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0
+) -> Tuple[float, float, float]:
+    """
+    Cociente de medianas actual/base y su intervalo de confianza por bootstrap.
+
+    Returns:
+        (cociente, límite inferior, límite superior)
+    """
+    base_median = median(base)
+    ratio = median(current) / base_median if base_median else float('inf')
+    if len(base) < 2 and len(current) < 2:
+        return ratio, ratio, ratio  # Una sola medición: sin dispersión que estimar
+
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        b = median(rng.choices(base, k=len(base)))
+        c = median(rng.choices(current, k=len(current)))
+        ratios.append(c / b if b else float('inf'))
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (resamples - 1))]
+    high = ratios[int((1 - tail) * (resamples - 1))]
+    return ratio, low, high
+
+
+def verdict(ratio: float, low: float, high: float, threshold: float) -> str:
+    """Clasifica un cociente actual/base según el umbral y su IC."""
+    if ratio > 1 + threshold:
+        return REGRESSION if low > 1 else NOISE
+    if ratio < 1 / (1 + threshold) and high < 1:
+        return IMPROVEMENT
+    return OK
+
+
+def compare_metric(base: Sequence[float], current: Sequence[float], threshold: float) -> Dict:
+    """Comparación de una métrica: medianas, cociente, IC y veredicto."""
+    ratio, low, high = ratio_ci(base, current)
+    return {
+        'base': median(base),
+        'current': median(current),
+        'ratio': round(ratio, 4),
+        'ci': [round(low, 4), round(high, 4)],
+        'verdict': verdict(ratio, low, high, threshold),
+    }
+
+
+def compare_results(
+    baseline: Dict,
+    current: Dict,
+    threshold: float = 0.2,
+    rss_threshold: float = 0.2,
+    min_seconds: float = 0.05
+) -> List[Dict]:
+    """
+    Compara dos resultados de bench.py (mismo formato que --json).
+
+    Args:
+        threshold: Regresión de tiempo tolerada (0.2 = +20%)
+        rss_threshold: Regresión de pico de RSS tolerada
+        min_seconds: Etapas con mediana base por debajo de este tiempo no se
+                     evalúan por tiempo (el ruido de arranque domina)
+
+    Returns:
+        Una fila por (tamaño, etapa) presente en ambos:
+        {'agents', 'stage', 'time': comparación | None, 'rss': comparación | None}
+    """
+    current_runs = {run['agents']: run for run in current['runs']}
+    rows = []
+    for base_run in baseline['runs']:
+        run = current_runs.get(base_run['agents'])
+        if run is None:
+            continue
+        for stage, base_stage in base_run['stages'].items():
+            cur_stage = run['stages'].get(stage)
+            if not cur_stage or not base_stage.get('samples_s') or not cur_stage.get('samples_s'):
+                continue  # Etapa omitida o con error en alguno de los dos
+            row = {'agents': base_run['agents'], 'stage': stage, 'time': None, 'rss': None}
+            if median(base_stage['samples_s']) >= min_seconds:
+                row['time'] = compare_metric(base_stage['samples_s'], cur_stage['samples_s'], threshold)
+            if base_stage.get('samples_rss_kb') and cur_stage.get('samples_rss_kb'):
+                row['rss'] = compare_metric(base_stage['samples_rss_kb'], cur_stage['samples_rss_kb'],
+                                            rss_threshold)
+            rows.append(row)
+    return rows
+
+
+def regressions(rows: List[Dict]) -> List[Dict]:
+    """Filas con alguna métrica en regresión."""
+    return [
+        row for row in rows
+        if any(row[m] and row[m]['verdict'] == REGRESSION for m in ('time', 'rss'))
+    ]
+
+
+def _format_metric(metric: Optional[Dict], unit: str) -> str:
+    if metric is None:
+        return f"{'—':>34}"
+    if unit == 's':
+        values = f"{metric['base']:.3f}→{metric['current']:.3f}s"
+    else:
+        values = f"{metric['base'] / 1024:.0f}→{metric['current'] / 1024:.0f}MB"
+    low, high = metric['ci']
+    return (f"{VERDICT_ICONS[metric['verdict']]} {values:>14} ×{metric['ratio']:.2f} "
+            f"[{low:.2f}, {high:.2f}]")
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """Tabla de la comparación: por etapa, tiempo y RSS (base→actual, cociente, IC)."""
+    lines = [f"   {'Agentes':>7} {'Etapa':<18} {'Tiempo (mediana, IC 95%)':<36} {'RSS pico':<36}"]
+    for row in rows:
+        lines.append(f"   {row['agents']:>7,} {row['stage']:<18} "
+                     f"{_format_metric(row['time'], 's'):<36} {_format_metric(row['rss'], 'kb'):<36}")
+    return '\n'.join(lines)
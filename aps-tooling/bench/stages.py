@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Etapas del pipeline para benchmarks.
+
+Cada etapa se ejecuta en un proceso propio (bench.py lanza este script) para
+que el pico de RSS sea el de la etapa y no el acumulado. El directorio de
+trabajo contiene:
+
+    swarm.json       Export SwarmBuilder (generado o real)
+    agents/*.md      extract_goals
+    agents/*.yaml    md2yaml
+
+Uso (interno):
+    python3 aps-tooling/bench/stages.py <etapa> <directorio de trabajo>
+    → imprime en stdout {"stage", "files", "setup_s", "seconds", "peak_rss_kb"}
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+TOOLING_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TOOLING_DIR))
+sys.path.insert(0, str(TOOLING_DIR / 'scripts'))
+
+try:
+    import resource
+except ImportError:  # Windows: sin RSS
+    resource = None
+
+RULES_V35 = TOOLING_DIR / 'schemas' / 'aps_v3.5_rules.yaml'
+RULES_V4 = TOOLING_DIR.parent / 'swarm' / 'rules' / 'validation_rules_v1.yaml'
+
+
+class StageSkipped(Exception):
+    """La etapa no puede ejecutarse en este entorno (p.ej. falta jsonschema)."""
+
+
+# Una etapa prepara lo que necesita (imports, reglas) y retorna la función medida,
+# que procesa todos los archivos y retorna cuántos procesó
+Stage = Callable[[Path], Callable[[], int]]
+
+
+def _mds(work: Path) -> List[Path]:
+    return sorted((work / 'agents').glob('*.md'))
+
+
+def _yamls(work: Path) -> List[Path]:
+    return sorted((work / 'agents').glob('*.yaml'))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ETAPAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def stage_extract_goals(work: Path):
+    from extract_goals_from_json import extract_goals
+
+    def run():
+        result = extract_goals(str(work / 'swarm.json'), str(work / 'agents'), force=True)
+        return len(result['files_created'])
+    return run
+
+
+def stage_md_sid_assign(work: Path):
+    from md_sid_assign import assign_sids
+    from lib.sid_index import SIDIndex
+
+    def run():
+        files = _mds(work)
+        index = SIDIndex(work / '.aps_cache' / 'sid_index.sqlite')
+        for f in files:
+            assign_sids(f, index=index)
+        index.close()
+        return len(files)
+    return run
+
+
+def stage_md2yaml(work: Path):
+    from md2yaml import build_inferencer, generate_yaml_for_agent
+    inferencer = build_inferencer()
+
+    def run():
+        files = _mds(work)
+        for f in files:
+            generate_yaml_for_agent(f, f.with_suffix('.yaml'), inferencer=inferencer)
+        return len(files)
+    return run
+
+
+def stage_yaml_lint(work: Path):
+    from yaml_lint import lint_yaml_file
+
+    def run():
+        files = _yamls(work)
+        for f in files:
+            lint_yaml_file(f)
+        return len(files)
+    return run
+
+
+def stage_yaml_lint_v2(work: Path):
+    from yaml_lint_v2 import lint_yaml_file, load_aps_rules
+    rules = load_aps_rules(str(RULES_V35))
+
+    def run():
+        files = _yamls(work)
+        for f in files:
+            lint_yaml_file(str(f), rules)
+        return len(files)
+    return run
+
+
+def stage_yaml_lint_v3(work: Path):
+    import yaml_lint_v3 as v3
+    from lib.yaml_cache import load_yaml
+    rules = v3.load_rules(RULES_V35)
+
+    def run():
+        files = _yamls(work)
+        for f in files:
+            # Mismo recorrido que yaml_lint_v3.main() para un archivo
+            data = load_yaml(f, copy=False)
+            if v3.validate_structure(data, rules):
+                continue
+            agent = data['agent']
+            name = agent.get('name', f.stem)
+            v3.validate_required_blocks(agent['blocks'], rules, name)
+            v3.validate_agent_semantic(name, agent['blocks'])
+        return len(files)
+    return run
+
+
+def stage_yaml_lint_v4(work: Path):
+    from yaml_lint_v4 import RuleEngine, SemanticValidator
+    from lib.regex_guard import RegexGuard
+    engine = RuleEngine(RULES_V4, RegexGuard())
+
+    def run():
+        files = _yamls(work)
+        for f in files:
+            SemanticValidator(engine).validate_file(f)
+        return len(files)
+    return run
+
+
+def stage_yaml_lint_v5(work: Path):
+    from yaml_lint_v5 import IntelligentRuleLearner, SimpleValidator
+
+    def run():
+        # Modo AUTO: aprender reglas del swarm y validar
+        files = _yamls(work)
+        validator = SimpleValidator(IntelligentRuleLearner().learn_from_swarm(files))
+        for f in files:
+            validator.validate_file(f)
+        return len(files)
+    return run
+
+
+def stage_yaml_lint_v6(work: Path):
+    from yaml_lint_v6_semantic import SemanticValidator
+
+    def run():
+        files = _yamls(work)
+        validator = SemanticValidator()
+        for f in files:
+            validator.validate_file(f)
+        return len(files)
+    return run
+
+
+def stage_schema_validator(work: Path):
+    try:
+        from lib.schema_validator import SchemaValidator
+    except ImportError as e:
+        raise StageSkipped(f"requiere jsonschema ({e})")
+    validator = SchemaValidator()
+    try:
+        validator.load_schema()
+    except FileNotFoundError as e:
+        raise StageSkipped(str(e))
+
+    def run():
+        files = _yamls(work)
+        for f in files:
+            validator.validate_file(f)
+        return len(files)
+    return run
+
+
+# Orden del pipeline: cada etapa usa la salida de las anteriores
+STAGES: Dict[str, Stage] = {
+    'extract_goals': stage_extract_goals,
+    'md_sid_assign': stage_md_sid_assign,
+    'md2yaml': stage_md2yaml,
+    'yaml_lint': stage_yaml_lint,
+    'yaml_lint_v2': stage_yaml_lint_v2,
+    'yaml_lint_v3': stage_yaml_lint_v3,
+    'yaml_lint_v4': stage_yaml_lint_v4,
+    'yaml_lint_v5': stage_yaml_lint_v5,
+    'yaml_lint_v6': stage_yaml_lint_v6,
+    'schema_validator': stage_schema_validator,
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════════════════
+
+def peak_rss_kb() -> int:
+    """
+    Pico de RSS de este proceso en KB (None si la plataforma no lo expone).
+
+    En Linux se lee VmHWM: ru_maxrss conserva tras exec el pico del proceso
+    padre (bench.py), así que todas las etapas pequeñas medirían lo mismo.
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS: bytes
+
+
+def run_stage(name: str, work: Path) -> Dict:
+    """
+    Ejecuta una etapa con la salida de las herramientas descartada.
+
+    Returns:
+        {'stage', 'files', 'setup_s', 'seconds', 'peak_rss_kb'} o
+        {'stage', 'skipped': motivo}
+    """
+    os.chdir(work)  # .aps_cache y reportes automáticos quedan en el directorio de trabajo
+    try:
+        # A /dev/null y no a un buffer: la salida retenida inflaría el pico de RSS
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            start = time.perf_counter()
+            run = STAGES[name](work)
+            setup = time.perf_counter() - start
+            start = time.perf_counter()
+            files = run()
+            seconds = time.perf_counter() - start
+    except StageSkipped as e:
+        return {'stage': name, 'skipped': str(e)}
+    return {
+        'stage': name,
+        'files': files,
+        'setup_s': round(setup, 6),
+        'seconds': round(seconds, 6),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in STAGES:
+        print(f"Uso: python3 stages.py <{'|'.join(STAGES)}> <directorio de trabajo>", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(run_stage(sys.argv[1], Path(sys.argv[2]).resolve())))
+
+
+if __name__ == '__main__':
+    main()
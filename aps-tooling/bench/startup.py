@@ -0,0 +1,108 @@
+"""
+Presupuesto de arranque de los CLIs (python -X importtime).
+
+Cada CLI se lanza con --help (o sin argumentos si no usa argparse) en un
+proceso nuevo con -X importtime; se suman los tiempos acumulados de los
+imports de nivel superior y se resta el del intérprete vacío (python -c pass).
+El resultado es lo que cuesta importar el script y sus dependencias, la parte
+del arranque que el código del repo controla.
+
+Los .pyc se generan antes de medir (compileall): con PYTHONDONTWRITEBYTECODE
+cada ejecución recompilaría los módulos del repo y mediría el compilador.
+"""
+
+import compileall
+import re
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Sequence
+
+TOOLING_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = 80.0
+
+# (nombre, argumentos). Sin argparse: sin argumentos imprimen el uso y salen
+CLIS = [
+    ('lib', ['-c', 'import lib']),
+    ('extract_goals_from_json', ['scripts/extract_goals_from_json.py', '--help']),
+    ('md_sid_assign', ['scripts/md_sid_assign.py', '--help']),
+    ('md2yaml', ['scripts/md2yaml.py']),
+    ('enrich_yaml_with_llm', ['scripts/enrich_yaml_with_llm.py', '--help']),
+    ('yaml_lint', ['scripts/yaml_lint.py', '--help']),
+    ('yaml_lint_v2', ['scripts/yaml_lint_v2.py']),
+    ('yaml_lint_v3', ['scripts/yaml_lint_v3.py']),
+    ('yaml_lint_v4', ['scripts/yaml_lint_v4.py', '--help']),
+    ('yaml_lint_v5', ['scripts/yaml_lint_v5.py', '--help']),
+    ('yaml_lint_v6_semantic', ['scripts/yaml_lint_v6_semantic.py', '--help']),
+    ('yaml_pipeline_cli', ['scripts/yaml_pipeline_cli.py', '--help']),
+    ('catalog_cli', ['scripts/catalog_cli.py', '--help']),
+    ('sid_registry_cli', ['scripts/sid_registry_cli.py', '--help']),
+    ('aps_lsp', ['scripts/aps_lsp.py', '--help']),
+    # Zipapp (make zipapp): se omite si no está construido
+    ('aps.pyz lint', ['dist/aps.pyz', 'lint', '--help']),
+]
+
+# Presupuestos propios (ms) de los CLIs que necesitan dependencias pesadas al importar
+BUDGETS_MS = {
+    'lib': 10.0,
+}
+
+# "import time:  self [us] | cumulative | nombre": nivel superior = un solo espacio tras "|"
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\S.*)$')
+
+
+def top_level_import_us(stderr: str) -> int:
+    """Suma del tiempo acumulado (µs) de los imports de nivel superior."""
+    total = 0
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            total += int(m.group(2))
+    return total
+
+
+def measure(argv: Sequence[str]) -> int:
+    """Tiempo de imports (µs) de `python -X importtime <argv>`."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=TOOLING_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return top_level_import_us(proc.stderr)
+
+
+def run_startup(names: Optional[List[str]] = None, repeat: int = 5,
+                default_budget: float = DEFAULT_BUDGET_MS) -> List[Dict]:
+    """
+    Mide cada CLI `repeat` veces (mediana) descontando el intérprete vacío.
+
+    Returns:
+        Lista de {'cli', 'import_ms', 'budget_ms', 'ok'}
+    """
+    compileall.compile_dir(TOOLING_DIR / 'lib', quiet=1)
+    compileall.compile_dir(TOOLING_DIR / 'scripts', quiet=1)
+
+    base_us = median(measure(['-c', 'pass']) for _ in range(repeat))
+    rows = []
+    for name, argv in CLIS:
+        if names and name not in names:
+            continue
+        if argv[0].endswith('.pyz') and not (TOOLING_DIR / argv[0]).exists():
+            continue
+        import_ms = max(0.0, (median(measure(argv) for _ in range(repeat)) - base_us) / 1000)
+        budget = BUDGETS_MS.get(name, default_budget)
+        rows.append({
+            'cli': name,
+            'import_ms': round(import_ms, 1),
+            'budget_ms': budget,
+            'ok': import_ms <= budget,
+        })
+    return rows
+
+
+def format_startup(rows: List[Dict]) -> str:
+    header = f"{'CLI':<26} {'Imports ms':>11} {'Presupuesto':>12}"
+    lines = [header, '-' * len(header)]
+    for r in rows:
+        icon = '✅' if r['ok'] else '❌'
+        lines.append(f"{r['cli']:<26} {r['import_ms']:>11.1f} {r['budget_ms']:>12.1f}  {icon}")
+    return '\n'.join(lines)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Generador de swarms sintéticos (export SwarmBuilder) para benchmarks.
+
+Produce JSON con la forma de swarm/json/J2C-v1-Swarm-v3-5.json (id, name,
+agents[{id, name, goals, model, ...}], swarm_type...) con tamaño configurable
+y los mismos tipos de defecto que J2C-TEST-Defects-v1.json, de modo que cada
+etapa del pipeline (extract_goals, md_sid_assign, md2yaml, linters) tenga
+trabajo real: SIDs que colisionan, encabezados duplicados, términos
+prohibidos, violaciones MVC...
+
+Determinista: la misma semilla y parámetros producen el mismo JSON.
+
+Uso:
+    python3 aps-tooling/bench/swarm_gen.py -o /tmp/bench.json --agents 1000
+    python3 aps-tooling/bench/swarm_gen.py -o /tmp/bench.json --agents 50 \\
+        --blocks 30 --goals-size 20000 --defect-rate 0.5 --seed 7
+"""
+
+import argparse
+import json
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.md_blocks import split_blocks, split_lines
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# VOCABULARIO
+# ═══════════════════════════════════════════════════════════════════════════
+
+TOPICS = ['Motivaciones', 'Stakeholders', 'AS-IS', 'Riesgos', 'Restricciones', 'GAP', 'Requisitos']
+
+VERBS = ['Capturar', 'Validar', 'Confirmar', 'Registrar', 'Preguntar por', 'Resumir', 'Priorizar',
+         'Documentar', 'Identificar', 'Clasificar', 'Contrastar', 'Revisar', 'Consolidar', 'Detallar']
+OBJECTS = ['los drivers de negocio', 'las dependencias técnicas', 'el inventario de aplicaciones',
+           'los interlocutores clave', 'las restricciones regulatorias', 'el calendario de migración',
+           'los riesgos operativos', 'la arquitectura actual', 'los requisitos no funcionales',
+           'las brechas de capacidad', 'el modelo de datos', 'los acuerdos de servicio',
+           'las integraciones externas', 'el plan de comunicación', 'los costes de operación']
+COMPLEMENTS = ['con el arquitecto responsable', 'antes de cerrar la fase', 'sin inventar datos',
+               'citando la fuente de cada dato', 'en formato de lista', 'pidiendo confirmación explícita',
+               'según la plantilla acordada', 'marcando lo pendiente', 'con nivel de confianza',
+               'y esperar la respuesta del usuario', 'en una sola pregunta', 'cuando el usuario lo indique']
+
+# Secciones que md_sid_assign numera (viñetas bajo encabezados en mayúsculas)
+SID_SECTIONS = ['GOALS', 'CONSTRAINTS', 'PROTOCOLS', 'HEURISTICS', 'POLICIES', 'OUTPUT']
+
+# Defectos inyectables (los de J2C-TEST-Defects-v1.json)
+DEFECTS = {
+    'missing_entry_guard': 'Entry Guard ausente',
+    'auto_advance': 'Salto automático por heurística',
+    'mvc_covered': "Modifica covered.* (violación MVC)",
+    'state_json_data': 'STATE_JSON con datos de proyecto',
+    'missing_loop_contract': 'Loop Contract ausente',
+    'contradictory_exit': 'Exit Strategy contradictoria',
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BLOQUES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _sentence(rng: random.Random) -> str:
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(COMPLEMENTS)}."
+
+
+def _paragraph(rng: random.Random, size: int) -> str:
+    """Texto de relleno de ~size caracteres."""
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = _sentence(rng)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(sentences)
+
+
+def _entry_guard(name: str) -> Tuple[str, str]:
+    return ('🛑 Entry Guard OBLIGATORIO (Verificar PRIMERO)',
+            f"Si `control.active_agent` != \"{name}\" → NO responder y devolver control al Orchestrator.\n"
+            f"Nunca activarse sin que el Orchestrator lo indique.")
+
+
+def _loop_contract() -> Tuple[str, str]:
+    return ('Loop Contract',
+            "1. Hacer UNA pregunta.\n2. Esperar la respuesta del usuario.\n"
+            "3. Repetir hasta que el usuario escriba \"listo\" (máximo 10 iteraciones).")
+
+
+def _exit_strategy(contradictory: bool) -> Tuple[str, str]:
+    body = "Salida:\n- Si el usuario confirma → devolver control al Orchestrator"
+    if contradictory:
+        body += "\n- Si cumplo heurística → salto automático por heurística y devuelvo control"
+    return ('Exit Strategy', body)
+
+
+def _state_json(topic: str, with_data: bool) -> Tuple[str, str]:
+    state = {'meta': {'session_id': '...'}, 'ada': {'phase': topic}, 'control': {'active_agent': '...'}}
+    if with_data:
+        state['proyecto'] = [{'tipo': 'estratégica', 'descripcion': '...'}]
+    return ('State JSON', "```json\n" + json.dumps(state, ensure_ascii=False, indent=2) + "\n```")
+
+
+def _sid_section(rng: random.Random, section: str, items: int, pool: List[str],
+                 collision_rate: float, counters: Counter) -> Tuple[str, str]:
+    """Sección con viñetas; una fracción repite el texto de un ítem anterior (mismo SID)."""
+    lines = []
+    for _ in range(items):
+        if pool and rng.random() < collision_rate:
+            text = rng.choice(pool)
+            counters['sid_collisions'] += 1
+        else:
+            text = _sentence(rng)
+            pool.append(text)
+        lines.append(f"- {text}")
+    return (section, '\n'.join(lines))
+
+
+def generate_agent(rng: random.Random, index: int, blocks: int, goals_size: int,
+                   sid_collision_rate: float, duplicate_rate: float, defect_rate: float,
+                   counters: Counter, sid_pool: List[str]) -> Dict:
+    """
+    Agente SwarmBuilder con `blocks` secciones y ~goals_size caracteres de goals.
+    """
+    if index == 0:
+        role, topic = 'Orchestrator', 'Orquestación'
+    elif index % 10 == 9:
+        role, topic = 'Helper', 'Ayuda'
+    else:
+        topic = TOPICS[index % len(TOPICS)]
+        role = topic.replace('-', '')
+    name = f"BENCH-{role}-{index:05d}"
+
+    defects = set()
+    if rng.random() < defect_rate:
+        defects.add(rng.choice(sorted(DEFECTS)))
+    for defect in defects:
+        counters[f"defect:{defect}"] += 1
+
+    sections: List[Tuple[str, str]] = []
+    if 'missing_entry_guard' not in defects:
+        sections.append(_entry_guard(name))
+    sections.append(('Rol', f"{_sentence(rng)} Fase: {topic}."))
+    for section in SID_SECTIONS:
+        sections.append(_sid_section(rng, section, 4, sid_pool, sid_collision_rate, counters))
+    if 'missing_loop_contract' not in defects:
+        sections.append(_loop_contract())
+    sections.append(_exit_strategy('contradictory_exit' in defects))
+    sections.append(_state_json(topic, 'state_json_data' in defects))
+    if 'auto_advance' in defects:
+        sections.append(('Protocolo de avance',
+                         "Si ≥2 respuestas capturadas: promoción automática a la siguiente fase, "
+                         "cambiar ada.phase y activar siguiente agente sin preguntar."))
+    if 'mvc_covered' in defects:
+        sections.append(('Actualización de cobertura',
+                         "```python\nif len(respuestas) >= 2:\n"
+                         f"    STATE_JSON.covered.{topic.replace('-', '')} = True\n```"))
+
+    # Relleno hasta `blocks` secciones; una fracción duplica una sección anterior
+    while len(sections) < blocks:
+        if len(sections) > 2 and rng.random() < duplicate_rate:
+            sections.append(rng.choice(sections[1:]))
+            counters['duplicate_blocks'] += 1
+        else:
+            sections.append((f"Instrucciones {topic} {len(sections) + 1}", _sentence(rng)))
+
+    # Reparto del tamaño de goals entre las secciones de instrucciones
+    base = sum(len(h) + len(b) + 8 for h, b in sections)
+    fillers = [i for i, (h, _) in enumerate(sections) if h.startswith('Instrucciones ')]
+    if fillers and goals_size > base:
+        extra = (goals_size - base) // len(fillers)
+        for i in fillers:
+            header, body = sections[i]
+            sections[i] = (header, body + '\n\n' + _paragraph(rng, extra))
+
+    goals = f"# {name} - Agente sintético de benchmark\n\n" + '\n\n---\n\n'.join(
+        f"## {header}\n\n{body}" for header, body in sections
+    ) + '\n'
+
+    return {
+        'id': f"{name}-v1",
+        'name': name,
+        'goals': goals,
+        'model': 'GPT-4.1',
+        'tools': [],
+        'description': f"Agente sintético ({topic}) para benchmarks de aps-tooling",
+        'mcp_servers': [],
+        'max_tools_calls': '5',
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SWARM
+# ═══════════════════════════════════════════════════════════════════════════
+
+def generate_swarm(
+    agents: int = 10,
+    blocks: int = 20,
+    goals_size: int = 10000,
+    sid_collision_rate: float = 0.05,
+    duplicate_rate: float = 0.05,
+    defect_rate: float = 0.2,
+    seed: int = 42
+) -> Tuple[Dict, Dict]:
+    """
+    Genera un export SwarmBuilder sintético.
+
+    Args:
+        agents: Número de agentes (10 → 10.000)
+        blocks: Secciones '##' por agente (mínimo las obligatorias, ~12)
+        goals_size: Tamaño aproximado de goals por agente (caracteres)
+        sid_collision_rate: Fracción de viñetas que repiten un ítem anterior (mismo SID)
+        duplicate_rate: Fracción de secciones de relleno que duplican una sección anterior
+        defect_rate: Probabilidad de que un agente tenga un defecto de DEFECTS
+        seed: Semilla del generador
+
+    Returns:
+        (swarm JSON, estadísticas {agents, blocks, bytes, sid_collisions,
+         duplicate_blocks, defects: {tipo: n}})
+    """
+    rng = random.Random(seed)
+    counters: Counter = Counter()
+    sid_pool: List[str] = []
+    swarm_id = f"BENCH-Swarm-{agents}"
+
+    agent_list = [
+        generate_agent(rng, i, blocks, goals_size, sid_collision_rate, duplicate_rate, defect_rate,
+                       counters, sid_pool)
+        for i in range(agents)
+    ]
+    swarm = {
+        'id': swarm_id,
+        'name': swarm_id,
+        'agents': agent_list,
+        'swarm_type': 'Benchmark',
+        'description': f"Swarm sintético de {agents} agentes para benchmarks de aps-tooling",
+        'swarm_custom_instruction': '',
+        'max_num_call_agents_by_conv': '25',
+        'max_num_msg_by_conversation': '25',
+    }
+
+    # Bloques tal como los verá md2yaml (cualquier encabezado, también '#' en bloques de código)
+    stats = {
+        'agents': agents,
+        'blocks': sum(len(split_blocks(split_lines(a['goals']))) for a in agent_list),
+        'bytes': sum(len(a['goals'].encode('utf-8')) for a in agent_list),
+        'sid_collisions': counters['sid_collisions'],
+        'duplicate_blocks': counters['duplicate_blocks'],
+        'defects': {k.split(':', 1)[1]: v for k, v in sorted(counters.items()) if k.startswith('defect:')},
+    }
+    return swarm, stats
+
+
+def write_swarm(path: Path, **params) -> Dict:
+    """Genera el swarm, lo guarda en `path` y retorna sus estadísticas."""
+    swarm, stats = generate_swarm(**params)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(swarm, f, ensure_ascii=False, indent=2)
+    return stats
+
+
+def add_generator_args(parser: argparse.ArgumentParser) -> None:
+    """Opciones del generador (compartidas con bench.py)."""
+    parser.add_argument('--blocks', type=int, default=20, help='Secciones por agente (default: 20)')
+    parser.add_argument('--goals-size', type=int, default=10000,
+                        help='Caracteres de goals por agente (default: 10000)')
+    parser.add_argument('--sid-collision-rate', type=float, default=0.05,
+                        help='Fracción de viñetas con SID repetido (default: 0.05)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.05,
+                        help='Fracción de secciones duplicadas (default: 0.05)')
+    parser.add_argument('--defect-rate', type=float, default=0.2,
+                        help='Probabilidad de defecto por agente (default: 0.2)')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla (default: 42)')
+
+
+def generator_params(args: argparse.Namespace) -> Dict:
+    return {
+        'blocks': args.blocks,
+        'goals_size': args.goals_size,
+        'sid_collision_rate': args.sid_collision_rate,
+        'duplicate_rate': args.duplicate_rate,
+        'defect_rate': args.defect_rate,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera un swarm SwarmBuilder sintético para benchmarks')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='Archivo JSON de salida')
+    parser.add_argument('--agents', type=int, default=10, help='Número de agentes (default: 10)')
+    add_generator_args(parser)
+    args = parser.parse_args()
+
+    stats = write_swarm(args.output, agents=args.agents, **generator_params(args))
+    print(f"✅ {args.output}: {stats['agents']} agentes, {stats['blocks']:,} bloques, "
+          f"{stats['bytes'] / 1e6:.1f} MB")
+    print(f"   SIDs repetidos: {stats['sid_collisions']}, bloques duplicados: {stats['duplicate_blocks']}, "
+          f"defectos: {sum(stats['defects'].values())}")
+
+
+if __name__ == '__main__':
+    main()
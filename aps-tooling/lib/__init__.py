@@ -9,24 +9,106 @@ Módulos:
 - confidence_system: Sistema de confianza HIGH/MEDIUM/LOW
 - yaml_editor: Manipulación robusta de YAML mediante AST
 - schema_validator: Validación contra schemas formales
+- sid_index: Índice persistente de SIDs (SQLite) para asignación incremental
+- sid_registry: Registro central de SIDs (dueño, disponibilidad, renombrados)
+- enrichment_engine: Motor asíncrono de enriquecimiento con backends intercambiables
+- enrichment_cache: Caché persistente (SQLite) de resultados de enriquecimiento
+- sid_inference: Inferencia determinista de SIDs por puntuación de palabras clave
+- regex_guard: Compilación segura de patrones de reglas con presupuesto de tiempo
+- profiler: Perfilado por regla de los linters (--profile)
+- yaml_cache: Carga de YAML con libyaml y caché (memoria + disco opcional)
+- catalog: Catálogo SQLite + FTS5 de bloques de todos los swarms
+- md_blocks: División de Markdown en bloques por encabezado y mapa de fuentes bloque → .md
+- lint_memo: Memo persistente (SQLite) de resultados de lint por bloque
+- reporters: Reportes de lint en streaming (consola, Markdown, JSON, JUnit, SARIF)
+- tracing: Spans del pipeline exportados a Chrome trace-event o JSONL (APS_TRACE)
+- memprofile: Perfil de memoria por etapa y agente con tracemalloc (--memprofile)
+- resources: Lectura de schemas/ y fuentes desde el repo o el zipapp aps.pyz
 """
 
+import importlib
+
 __version__ = "2.0.0"
 __aps_version__ = "3.5"
 
-from .vocabulary_loader import VocabularyLoader
-from .confidence_system import ConfidenceSystem, ConfidenceLevel
-from .yaml_editor import YAMLBlockEditor, YAMLBatchEditor
+# Carga perezosa (PEP 562): `import lib` o `from lib.x import y` no importa
+# todos los módulos (asyncio, sqlite3, jsonschema...); cada nombre se importa
+# la primera vez que se usa
+_LAZY = {
+    'VocabularyLoader': 'vocabulary_loader',
+    'ConfidenceSystem': 'confidence_system',
+    'ConfidenceLevel': 'confidence_system',
+    'YAMLBlockEditor': 'yaml_editor',
+    'YAMLBatchEditor': 'yaml_editor',
+    'SchemaValidator': 'schema_validator',
+    'SIDIndex': 'sid_index',
+    'SIDRegistry': 'sid_registry',
+    'EnrichmentEngine': 'enrichment_engine',
+    'CompletionBackend': 'enrichment_engine',
+    'LocalStandInBackend': 'enrichment_engine',
+    'EnrichmentCache': 'enrichment_cache',
+    'RuleBasedSIDInferencer': 'sid_inference',
+    'RegexGuard': 'regex_guard',
+    'RuleProfiler': 'profiler',
+    'load_yaml': 'yaml_cache',
+    'dump_yaml': 'yaml_cache',
+    'BlockCatalog': 'catalog',
+    'MdBlock': 'md_blocks',
+    'split_blocks': 'md_blocks',
+    'source_map': 'md_blocks',
+    'attach_md_locations': 'md_blocks',
+    'LintMemo': 'lint_memo',
+    'open_reporter': 'reporters',
+    'span': 'tracing',
+    'traced': 'tracing',
+    'MemoryProfiler': 'memprofile',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(f'.{module_name}', __name__)
+    except ImportError:
+        if name != 'SchemaValidator':
+            raise
+        value = None  # SchemaValidator requiere jsonschema (opcional)
+    else:
+        value = getattr(module, name)
+    globals()[name] = value  # Siguientes accesos sin pasar por __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
-# SchemaValidator requiere jsonschema (opcional)
-try:
-    from .schema_validator import SchemaValidator
-except ImportError:
-    SchemaValidator = None
 
 __all__ = [
     'VocabularyLoader',
     'ConfidenceSystem',
     'YAMLBlockEditor',
     'SchemaValidator',
+    'SIDIndex',
+    'SIDRegistry',
+    'EnrichmentEngine',
+    'CompletionBackend',
+    'LocalStandInBackend',
+    'EnrichmentCache',
+    'RuleBasedSIDInferencer',
+    'RegexGuard',
+    'RuleProfiler',
+    'load_yaml',
+    'dump_yaml',
+    'BlockCatalog',
+    'MdBlock',
+    'split_blocks',
+    'source_map',
+    'attach_md_locations',
+    'LintMemo',
+    'open_reporter',
+    'span',
+    'traced',
+    'MemoryProfiler',
 ]
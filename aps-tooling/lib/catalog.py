@@ -0,0 +1,379 @@
+"""
+Block Catalog - APS Tooling
+============================
+
+Catálogo SQLite de todos los bloques de todos los agentes de todos los swarms.
+
+Ingiere los JSON de SwarmBuilder (goals en Markdown, un bloque por encabezado)
+y los YAML generados por md2yaml (bloques con block_type/sid), más los issues
+de lint. Índices sobre sid, block_type y hash, e índice FTS5 sobre el contenido:
+- ¿Qué agentes tienen un Entry Guard que mencione X?    → search()
+- ¿Dónde aparece este SID?                             → find_blocks(sid=...)
+- ¿Qué SIDs/bloques cambiaron entre v3-4 y v3-5?       → diff_swarms()
+
+La ingesta es incremental: un archivo cuyo sha1 no cambió no se re-procesa.
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .md_blocks import split_blocks, split_lines
+from .sid_registry import sha1_text
+
+
+DEFAULT_CATALOG_PATH = Path('.aps_cache') / 'catalog.sqlite'
+
+ORIGIN_JSON = 'json'
+ORIGIN_YAML = 'yaml'
+
+_SCHEMA = """
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS swarms (
+    id    INTEGER PRIMARY KEY,
+    name  TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS agents (
+    id          INTEGER PRIMARY KEY,
+    swarm_id    INTEGER NOT NULL REFERENCES swarms(id) ON DELETE CASCADE,
+    name        TEXT NOT NULL,
+    origin      TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    source_sha1 TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    UNIQUE (swarm_id, name, origin)
+);
+CREATE INDEX IF NOT EXISTS idx_agents_source ON agents(source_file);
+
+CREATE TABLE IF NOT EXISTS blocks (
+    id         INTEGER PRIMARY KEY,
+    agent_id   INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+    position   INTEGER NOT NULL,
+    name       TEXT NOT NULL,
+    block_type TEXT,
+    sid        TEXT,
+    hash       TEXT NOT NULL,
+    content    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blocks_agent ON blocks(agent_id);
+CREATE INDEX IF NOT EXISTS idx_blocks_sid ON blocks(sid);
+CREATE INDEX IF NOT EXISTS idx_blocks_type ON blocks(block_type);
+CREATE INDEX IF NOT EXISTS idx_blocks_hash ON blocks(hash);
+
+CREATE TABLE IF NOT EXISTS lint_issues (
+    id       INTEGER PRIMARY KEY,
+    agent_id INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+    linter   TEXT NOT NULL,
+    block    TEXT,
+    severity TEXT NOT NULL,
+    code     TEXT,
+    message  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issues_agent ON lint_issues(agent_id);
+CREATE INDEX IF NOT EXISTS idx_issues_code ON lint_issues(code);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS blocks_fts USING fts5(
+    name, content, content='blocks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS blocks_ai AFTER INSERT ON blocks BEGIN
+    INSERT INTO blocks_fts(rowid, name, content) VALUES (new.id, new.name, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS blocks_ad AFTER DELETE ON blocks BEGIN
+    INSERT INTO blocks_fts(blocks_fts, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+END;
+"""
+
+def split_markdown_blocks(text: str) -> List[Tuple[str, str]]:
+    """
+    Divide Markdown en bloques por encabezado, igual que md2yaml (duplicados
+    auto-numerados "Nombre (2)").
+
+    Returns:
+        [(nombre, contenido)]
+    """
+    lines = split_lines(text)
+    return [(block.name, block.content(lines)) for block in split_blocks(lines)]
+
+
+class BlockCatalog:
+    """
+    Catálogo de bloques respaldado por SQLite + FTS5.
+
+    Ejemplo:
+        >>> catalog = BlockCatalog()
+        >>> catalog.ingest_swarm_json('swarm/json/J2C-v1-Swarm-v3-5.json')
+        >>> catalog.ingest_agent_yaml('swarm/agents/J2C-v1-Swarm-v3-5/01-J2Ci-Orchestrator.yaml')
+        >>> catalog.search('state_json', block_name='Entry Guard')
+        >>> catalog.diff_swarms('J2C-v1-Swarm-v3-4', 'J2C-v1-Swarm-v3-5', key='name')
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Abre (o crea) el catálogo.
+
+        Args:
+            db_path: Archivo SQLite. Si es None, usa .aps_cache/catalog.sqlite
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_CATALOG_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    # =========================================================================
+    # INGESTA
+    # =========================================================================
+
+    def _swarm_id(self, name: str) -> int:
+        self._conn.execute('INSERT OR IGNORE INTO swarms (name) VALUES (?)', (name,))
+        return self._conn.execute('SELECT id FROM swarms WHERE name = ?', (name,)).fetchone()[0]
+
+    def _replace_agent(self, swarm: str, name: str, origin: str, source_file: str,
+                       source_sha1: str, blocks: Iterable[Dict]) -> Optional[int]:
+        """
+        Sustituye un agente y sus bloques. Retorna su id, o None si el origen no cambió.
+        Debe llamarse dentro de una transacción.
+        """
+        swarm_id = self._swarm_id(swarm)
+        row = self._conn.execute(
+            'SELECT id, source_sha1 FROM agents WHERE swarm_id = ? AND name = ? AND origin = ?',
+            (swarm_id, name, origin)
+        ).fetchone()
+        if row and row['source_sha1'] == source_sha1:
+            return None
+        if row:
+            self._conn.execute('DELETE FROM agents WHERE id = ?', (row['id'],))
+
+        agent_id = self._conn.execute(
+            'INSERT INTO agents (swarm_id, name, origin, source_file, source_sha1, ingested_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (swarm_id, name, origin, source_file, source_sha1, self._now())
+        ).lastrowid
+        self._conn.executemany(
+            'INSERT INTO blocks (agent_id, position, name, block_type, sid, hash, content) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((agent_id, i, b['name'], b.get('block_type'), b.get('sid'),
+              sha1_text(b['content']), b['content']) for i, b in enumerate(blocks))
+        )
+        return agent_id
+
+    def ingest_swarm_json(self, path: Union[str, Path]) -> Dict:
+        """
+        Ingiere un JSON de SwarmBuilder: cada agente con sus goals divididos por encabezado.
+        El swarm se nombra por el archivo (los backups comparten el campo 'name').
+
+        Returns:
+            {'swarm', 'agents', 'skipped', 'blocks'}
+        """
+        path = Path(path)
+        raw = path.read_bytes()
+        data = json.loads(raw)
+        swarm = path.stem
+        digest = hashlib.sha1(raw).hexdigest()
+        result = {'swarm': swarm, 'agents': 0, 'skipped': 0, 'blocks': 0}
+
+        with self._conn:
+            names = []
+            for agent in data.get('agents', []):
+                names.append(agent.get('name', agent.get('id', '?')))
+                blocks = [{'name': name, 'content': content}
+                          for name, content in split_markdown_blocks(agent.get('goals', ''))]
+                agent_id = self._replace_agent(swarm, names[-1], ORIGIN_JSON, str(path), digest, blocks)
+                if agent_id is None:
+                    result['skipped'] += 1
+                else:
+                    result['agents'] += 1
+                    result['blocks'] += len(blocks)
+            # Agentes que ya no están en el JSON
+            self._conn.execute(
+                f"DELETE FROM agents WHERE origin = ? AND swarm_id = ? "
+                f"AND name NOT IN ({','.join('?' * len(names))})",
+                [ORIGIN_JSON, self._swarm_id(swarm)] + names
+            )
+        return result
+
+    def ingest_agent_yaml(self, path: Union[str, Path], swarm: Optional[str] = None) -> Optional[int]:
+        """
+        Ingiere un YAML de agente (estructura agent.blocks).
+
+        Args:
+            path: Archivo YAML
+            swarm: Nombre del swarm. Si es None, el directorio que lo contiene
+
+        Returns:
+            id del agente, o None si no cambió desde la última ingesta
+
+        Raises:
+            ValueError: Si el YAML no tiene estructura agent.blocks
+        """
+        from .yaml_cache import load_yaml  # PyYAML solo al ingerir YAML (search/stats no lo cargan)
+
+        path = Path(path)
+        data = load_yaml(path, copy=False, cache=False)  # Ingesta: una lectura por archivo
+        if not isinstance(data, dict) or 'blocks' not in data.get('agent', {}):
+            raise ValueError(f"{path}: no tiene estructura agent.blocks")
+
+        blocks = []
+        for name, block in data['agent']['blocks'].items():
+            block = block if isinstance(block, dict) else {'content': str(block)}
+            blocks.append({
+                'name': name,
+                'block_type': block.get('block_type'),
+                'sid': block.get('sid'),
+                'content': block.get('content') or '',
+            })
+        with self._conn:
+            return self._replace_agent(
+                swarm or path.parent.name, data['agent'].get('name', path.stem), ORIGIN_YAML,
+                str(path), hashlib.sha1(path.read_bytes()).hexdigest(), blocks
+            )
+
+    def record_lint_issues(self, agent_id: int, linter: str, issues: Iterable[Dict]) -> int:
+        """
+        Sustituye los issues de un linter para un agente.
+
+        Args:
+            issues: [{'block', 'severity', 'code', 'message'}]
+
+        Returns:
+            Número de issues guardados
+        """
+        rows = [(agent_id, linter, i.get('block'), i['severity'], i.get('code'), i['message'])
+                for i in issues]
+        with self._conn:
+            self._conn.execute('DELETE FROM lint_issues WHERE agent_id = ? AND linter = ?',
+                               (agent_id, linter))
+            self._conn.executemany(
+                'INSERT INTO lint_issues (agent_id, linter, block, severity, code, message) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+        return len(rows)
+
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+
+    _BLOCK_COLUMNS = ('s.name AS swarm, a.name AS agent, a.origin, b.name AS block, '
+                      'b.block_type, b.sid, b.hash')
+
+    @staticmethod
+    def _filters(swarm: Optional[str], origin: Optional[str]) -> Tuple[List[str], List]:
+        where, params = [], []
+        if swarm:
+            where.append('s.name = ?')
+            params.append(swarm)
+        if origin:
+            where.append('a.origin = ?')
+            params.append(origin)
+        return where, params
+
+    def search(self, text: str, block_name: Optional[str] = None, swarm: Optional[str] = None,
+               origin: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        Búsqueda full-text (sintaxis FTS5: palabras, "frases", OR, NOT, prefijo*).
+
+        Args:
+            text: Consulta FTS5 sobre nombre y contenido ('content: x' para solo contenido)
+            block_name: Filtra por nombre de bloque (LIKE, sin distinguir mayúsculas)
+        """
+        where, params = self._filters(swarm, origin)
+        if block_name:
+            where.append('b.name LIKE ?')
+            params.append(f'%{block_name}%')
+        sql = (f"SELECT {self._BLOCK_COLUMNS}, "
+               f"snippet(blocks_fts, 1, '[', ']', '…', 12) AS snippet "
+               f"FROM blocks_fts JOIN blocks b ON b.id = blocks_fts.rowid "
+               f"JOIN agents a ON a.id = b.agent_id JOIN swarms s ON s.id = a.swarm_id "
+               f"WHERE blocks_fts MATCH ? {''.join(' AND ' + w for w in where)} "
+               f"ORDER BY rank LIMIT ?")
+        return [dict(r) for r in self._conn.execute(sql, [text] + params + [limit])]
+
+    def find_blocks(self, sid: Optional[str] = None, block_type: Optional[str] = None,
+                    content_hash: Optional[str] = None, swarm: Optional[str] = None,
+                    origin: Optional[str] = None) -> List[Dict]:
+        """Bloques por SID, tipo o hash de contenido (consultas indexadas)."""
+        where, params = self._filters(swarm, origin)
+        for column, value in (('b.sid', sid), ('b.block_type', block_type), ('b.hash', content_hash)):
+            if value:
+                where.append(f'{column} = ?')
+                params.append(value)
+        sql = (f"SELECT {self._BLOCK_COLUMNS} FROM blocks b "
+               f"JOIN agents a ON a.id = b.agent_id JOIN swarms s ON s.id = a.swarm_id "
+               f"{'WHERE ' + ' AND '.join(where) if where else ''} "
+               f"ORDER BY s.name, a.name, b.position")
+        return [dict(r) for r in self._conn.execute(sql, params)]
+
+    def _block_map(self, swarm: str, key: str, origin: Optional[str]) -> Dict[Tuple[str, str], str]:
+        where, params = self._filters(swarm, origin)
+        where.append(f'b.{key} IS NOT NULL')
+        rows = self._conn.execute(
+            f"SELECT a.name AS agent, b.{key} AS k, b.hash FROM blocks b "
+            f"JOIN agents a ON a.id = b.agent_id JOIN swarms s ON s.id = a.swarm_id "
+            f"WHERE {' AND '.join(where)}", params
+        )
+        return {(r['agent'], r['k']): r['hash'] for r in rows}
+
+    def diff_swarms(self, old: str, new: str, key: str = 'sid',
+                    origin: Optional[str] = None) -> Dict:
+        """
+        Compara dos swarms por (agente, SID) o (agente, nombre de bloque).
+
+        Con key='sid', si alguno de los dos swarms no tiene bloques con SID
+        (p.ej. JSON de SwarmBuilder) se compara por nombre: por SID saldría
+        todo como añadido/eliminado, o nada.
+
+        Args:
+            key: 'sid' (YAML con SIDs) o 'name' (cualquier origen, p.ej. JSON de SwarmBuilder)
+
+        Returns:
+            {'key': clave usada, 'added', 'removed', 'changed'}: listas de (agente, sid|nombre)
+        """
+        if key not in ('sid', 'name'):
+            raise ValueError(f"key debe ser 'sid' o 'name', no '{key}'")
+        before = self._block_map(old, key, origin)
+        after = self._block_map(new, key, origin)
+        if key == 'sid' and not (before and after):
+            key = 'name'
+            before = self._block_map(old, key, origin)
+            after = self._block_map(new, key, origin)
+        return {
+            'key': key,
+            'added': sorted(after.keys() - before.keys()),
+            'removed': sorted(before.keys() - after.keys()),
+            'changed': sorted(k for k in before.keys() & after.keys() if before[k] != after[k]),
+        }
+
+    def lint_issues(self, swarm: Optional[str] = None, severity: Optional[str] = None,
+                    code: Optional[str] = None) -> List[Dict]:
+        """Issues de lint guardados, filtrables por swarm, severidad y código."""
+        where, params = self._filters(swarm, None)
+        for column, value in (('i.severity', severity), ('i.code', code)):
+            if value:
+                where.append(f'{column} = ?')
+                params.append(value)
+        sql = ("SELECT s.name AS swarm, a.name AS agent, i.linter, i.block, i.severity, i.code, i.message "
+               "FROM lint_issues i JOIN agents a ON a.id = i.agent_id JOIN swarms s ON s.id = a.swarm_id "
+               f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY s.name, a.name")
+        return [dict(r) for r in self._conn.execute(sql, params)]
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        """Consulta SQL libre (solo lectura por convención)."""
+        return [dict(r) for r in self._conn.execute(sql, tuple(params))]
+
+    def stats(self) -> Dict[str, int]:
+        """Número de filas por tabla."""
+        return {table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('swarms', 'agents', 'blocks', 'lint_issues')}
+
+    def close(self) -> None:
+        """Cierra la conexión SQLite."""
+        self._conn.close()
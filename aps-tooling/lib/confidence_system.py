@@ -17,6 +17,14 @@ class ConfidenceLevel(Enum):
     LOW = "LOW"        # Inferencia semántica sin match
 
 
+# Orden de confianza (mayor = más confiable)
+CONFIDENCE_RANK = {
+    ConfidenceLevel.LOW: 0,
+    ConfidenceLevel.MEDIUM: 1,
+    ConfidenceLevel.HIGH: 2,
+}
+
+
 class ConfidenceSystem:
     """
     Sistema de confianza para clasificar inferencias semánticas.
@@ -142,9 +150,9 @@ class ConfidenceSystem:
         relacion_eval = self.evaluate_relacion(relacion, content)
         nivel_eval = self.evaluate_nivel(nivel, block_type)
         
-        # Confianza global = mínima de las tres
+        # Confianza global = mínima de las tres (por rango, no por orden alfabético)
         confidences = [accion_eval[0], relacion_eval[0], nivel_eval[0]]
-        overall = min(confidences, key=lambda c: c.value)
+        overall = min(confidences, key=CONFIDENCE_RANK.get)
         
         return {
             'overall_confidence': overall,
@@ -0,0 +1,184 @@
+"""
+Enrichment Cache - APS Tooling
+===============================
+
+Caché persistente (SQLite local) de resultados de enriquecimiento semántico.
+
+La clave es hash(block_type, content, versión de prompt, versión de vocabulario),
+de modo que el mismo contenido repetido entre versiones del swarm o agentes
+duplicados no vuelve a pasar por el modelo. Eviction LRU por número de entradas.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from .resources import read_bytes
+from .vocabulary_loader import VocabularyLoader
+
+
+DEFAULT_CACHE_PATH = Path('.aps_cache') / 'enrichment_cache.sqlite'
+DEFAULT_MAX_ENTRIES = 50000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT PRIMARY KEY,
+    result    TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+"""
+
+
+def prompt_fingerprint(prompt_template: str, backend_name: str = '') -> str:
+    """Versión de prompt: backend + hash del template (cambiar el prompt invalida la caché)."""
+    digest = hashlib.sha1(prompt_template.encode('utf-8')).hexdigest()[:12]
+    return f"{backend_name}:{digest}"
+
+
+def vocabulary_fingerprint(vocab: Optional[VocabularyLoader] = None) -> str:
+    """
+    Versión de vocabulario: campo 'version' + hash del archivo (cubre ediciones
+    sin bump). El archivo puede estar dentro del zipapp.
+    """
+    vocab = vocab or VocabularyLoader()
+    digest = hashlib.sha1(read_bytes(vocab.vocab_path)).hexdigest()[:8]
+    return f"{vocab.version}:{digest}"
+
+
+class EnrichmentCache:
+    """
+    Caché de resultados de enriquecimiento respaldada por SQLite.
+
+    Ejemplo:
+        >>> cache = EnrichmentCache(prompt_version=prompt_fingerprint(PROMPT, 'local'))
+        >>> key = cache.key('BLK', content)
+        >>> cache.get(key) or cache.put(key, {'accion': ..., 'sid': ...})
+        >>> print(cache.format_stats())
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        prompt_version: str = '',
+        vocab_version: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Abre (o crea) la caché.
+
+        Args:
+            db_path: Archivo SQLite. Si es None, usa .aps_cache/enrichment_cache.sqlite
+            prompt_version: Huella del prompt/backend (ver prompt_fingerprint)
+            vocab_version: Huella del vocabulario. Si es None, se calcula del vocabulario por defecto
+            max_entries: Máximo de entradas; al superarlo se descartan las menos usadas
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_CACHE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.prompt_version = prompt_version
+        self.vocab_version = vocab_version if vocab_version is not None else vocabulary_fingerprint()
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+
+    def key(self, block_type: str, content: str) -> str:
+        """Clave de caché de un bloque."""
+        raw = '\x00'.join((block_type, content, self.prompt_version, self.vocab_version))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna el resultado cacheado (y lo marca como usado) o None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Consulta varias claves en una sola transacción.
+
+        Returns:
+            {key: resultado} solo para las claves presentes
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT key, result FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((k, json.loads(r)) for k, r in rows)
+
+        now = time.time()
+        with self._conn:
+            self._conn.executemany('UPDATE results SET last_used = ? WHERE key = ?',
+                                   ((now, k) for k in found))
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, result: Dict) -> None:
+        """Guarda un resultado."""
+        self.put_many({key: result})
+
+    def put_many(self, results: Dict[str, Dict]) -> None:
+        """Guarda varios resultados en una transacción y aplica la eviction LRU."""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO results (key, result, last_used) VALUES (?, ?, ?)',
+                ((k, json.dumps(v, ensure_ascii=False), now) for k, v in results.items())
+            )
+        self.stats['stores'] += len(results)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Descarta las entradas menos usadas hasta quedar en max_entries.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        excess = self.count() - self.max_entries
+        if excess <= 0:
+            return 0
+        with self._conn:
+            self._conn.execute(
+                'DELETE FROM results WHERE key IN '
+                '(SELECT key FROM results ORDER BY last_used LIMIT ?)', (excess,)
+            )
+        self.stats['evictions'] += excess
+        return excess
+
+    # =========================================================================
+    # ESTADÍSTICAS
+    # =========================================================================
+
+    def count(self) -> int:
+        """Número de entradas en caché."""
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def hit_rate(self) -> float:
+        """Proporción de aciertos (0-1) en esta sesión."""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def format_stats(self) -> str:
+        """Resumen legible de la sesión."""
+        s = self.stats
+        return (f"{s['hits']} aciertos, {s['misses']} fallos ({self.hit_rate():.0%} hit rate), "
+                f"{s['stores']} guardados, {s['evictions']} descartados, {self.count()} entradas")
+
+    def clear(self) -> None:
+        """Vacía la caché."""
+        with self._conn:
+            self._conn.execute('DELETE FROM results')
+
+    def close(self) -> None:
+        """Cierra la conexión SQLite."""
+        self._conn.close()
@@ -0,0 +1,348 @@
+"""
+Enrichment Engine - APS Tooling
+================================
+
+Motor asíncrono de enriquecimiento semántico de bloques (accion/relacion/nivel/sid).
+
+Envía bloques a un backend de completado intercambiable con:
+- Concurrencia acotada (semáforo)
+- Batching (varios bloques por prompt)
+- Reintentos con backoff exponencial
+- Rate limit por backend (token bucket)
+- Caché persistente opcional de resultados (ver enrichment_cache.py)
+
+Incluye `LocalStandInBackend`, un backend local determinista que permite
+probar y hacer pruebas de carga sin red ni modelo.
+"""
+
+import asyncio
+import importlib
+import json
+import re
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from .enrichment_cache import EnrichmentCache
+from .vocabulary_loader import VocabularyLoader
+
+
+# Separador de bloques dentro de un prompt por lotes
+BLOCK_SEPARATOR = '=== BLOQUE {id} ==='
+
+BATCH_SUFFIX = """
+**Responde SOLO con un array JSON**, un objeto por bloque y en el mismo orden,
+añadiendo a cada objeto el campo "id" del bloque:
+[{{"id": "...", "accion": "...", "relacion": "...", "nivel": "...", "sid": "..."}}]
+"""
+
+
+class BackendError(Exception):
+    """Error transitorio del backend (se reintenta)."""
+    pass
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class CompletionBackend:
+    """
+    Interfaz de backend de completado.
+
+    Subclases implementan `complete(prompt) -> str`. Los atributos de clase
+    `max_concurrency` y `requests_per_second` definen los límites del backend.
+    """
+
+    name = 'base'
+    max_concurrency = 8
+    requests_per_second: Optional[float] = None
+
+    async def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+
+class LocalStandInBackend(CompletionBackend):
+    """
+    Backend local determinista (sin red): infiere atributos por palabras clave
+    del vocabulario. Mismo prompt → misma respuesta.
+
+    Args:
+        latency_ms: Latencia simulada por petición (pruebas de carga)
+        fail_every: Si > 0, falla de forma determinista 1 de cada N peticiones
+        vocab: VocabularyLoader (si es None, crea uno)
+    """
+
+    name = 'local'
+    max_concurrency = 64
+    requests_per_second = None
+
+    SECTION_RE = re.compile(r'^=== BLOQUE (.+?) ===$', re.MULTILINE)
+    TYPE_RE = re.compile(r'^Tipo:\s*(\S+)', re.MULTILINE)
+
+    def __init__(self, latency_ms: float = 0, fail_every: int = 0,
+                 vocab: Optional[VocabularyLoader] = None):
+        self.latency_ms = latency_ms
+        self.fail_every = fail_every
+        self.vocab = vocab or VocabularyLoader()
+        self._calls = 0
+
+    async def complete(self, prompt: str) -> str:
+        self._calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self.fail_every and self._calls % self.fail_every == 0:
+            raise BackendError(f"Fallo simulado (petición {self._calls})")
+
+        parts = self.SECTION_RE.split(prompt)
+        if len(parts) > 1:
+            # parts = [prefijo, id1, sección1, id2, sección2, ...]
+            answers = []
+            for block_id, section in zip(parts[1::2], parts[2::2]):
+                answer = self._infer_section(section)
+                answer['id'] = block_id
+                answers.append(answer)
+            return json.dumps(answers, ensure_ascii=False)
+        return json.dumps(self._infer_section(prompt), ensure_ascii=False)
+
+    def _infer_section(self, section: str) -> Dict:
+        """Extrae tipo y contenido de la sección de un bloque del prompt."""
+        type_match = self.TYPE_RE.search(section)
+        start = section.find('Contenido:')
+        end = section.rfind('**Tu tarea')
+        content = section[start + len('Contenido:'):end] if start != -1 and end > start else ''
+        return self._infer(type_match.group(1) if type_match else 'BLK', content.strip())
+
+    def _infer(self, block_type: str, content: str) -> Dict:
+        """Primer término del vocabulario presente en el contenido (o uno fijo por hash)."""
+        text = content.lower()
+        seed = zlib.crc32(content.encode('utf-8'))
+
+        def pick(options: List[str], default: str) -> str:
+            for option in options:
+                if any(part in text for part in option.split('.') if len(part) > 3):
+                    return option
+            return options[seed % len(options)] if options else default
+
+        accion = pick(self.vocab.get_acciones_permitidas(), 'procesar')
+        relacion = pick(self.vocab.get_relaciones_permitidas(), 'datos.input')
+        nivel = pick(self.vocab.get_niveles_permitidos(), 'workflow')
+        return {
+            'accion': accion,
+            'relacion': relacion,
+            'nivel': nivel,
+            'sid': f"{block_type}.{accion}.{relacion}.{nivel}",
+        }
+
+
+BACKENDS: Dict[str, Callable[..., CompletionBackend]] = {
+    'local': LocalStandInBackend,
+}
+
+
+def get_backend(spec: str, **kwargs) -> CompletionBackend:
+    """
+    Instancia un backend por nombre registrado ('local') o ruta 'modulo:Clase'.
+    """
+    if spec in BACKENDS:
+        return BACKENDS[spec](**kwargs)
+    if ':' in spec:
+        module_name, class_name = spec.split(':', 1)
+        return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+    raise ValueError(f"Backend desconocido: '{spec}' (disponibles: {', '.join(BACKENDS)})")
+
+
+# =============================================================================
+# RATE LIMIT
+# =============================================================================
+
+class RateLimiter:
+    """Token bucket asíncrono (peticiones por segundo)."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# =============================================================================
+# MOTOR
+# =============================================================================
+
+class EnrichmentEngine:
+    """
+    Motor de enriquecimiento concurrente.
+
+    Ejemplo:
+        >>> engine = EnrichmentEngine(LocalStandInBackend(), prompt_template=ENRICHMENT_PROMPT)
+        >>> results = engine.run([{'id': 'a', 'block_name': 'Entry Guard',
+        ...                        'block_type': 'BLK', 'content': '...'}])
+        >>> results['a'].keys()
+        dict_keys(['accion', 'relacion', 'nivel', 'sid'])
+    """
+
+    def __init__(
+        self,
+        backend: CompletionBackend,
+        prompt_template: str,
+        concurrency: int = 8,
+        batch_size: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        rate_limit: Optional[float] = None,
+        cache: Optional[EnrichmentCache] = None
+    ):
+        """
+        Args:
+            backend: Backend de completado
+            prompt_template: Prompt por bloque con {block_name}, {block_type}, {content}
+            concurrency: Máximo de peticiones en vuelo (acotado por backend.max_concurrency)
+            batch_size: Bloques por prompt
+            max_retries: Reintentos por lote ante error o respuesta inválida
+            retry_backoff: Espera base (s) del backoff exponencial
+            rate_limit: Peticiones/s (si es None, usa backend.requests_per_second)
+            cache: EnrichmentCache consultada antes de enviar cualquier petición
+        """
+        self.backend = backend
+        self.prompt_template = prompt_template
+        self.concurrency = max(1, min(concurrency, backend.max_concurrency))
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rate_limit = rate_limit if rate_limit is not None else backend.requests_per_second
+        self.cache = cache
+        self.stats = {'blocks': 0, 'cached_blocks': 0, 'requests': 0, 'retries': 0,
+                      'failed_blocks': 0, 'elapsed_s': 0.0}
+
+    # -------------------------------------------------------------------------
+
+    def build_prompt(self, batch: List[Dict]) -> str:
+        """Construye el prompt de un lote (un solo bloque usa el template tal cual)."""
+        def render(block):
+            return self.prompt_template.format(
+                block_name=block.get('block_name', ''),
+                block_type=block.get('block_type', 'BLK'),
+                content=block.get('content', ''),
+            )
+
+        if len(batch) == 1:
+            return render(batch[0])
+        parts = [f"{BLOCK_SEPARATOR.format(id=b['id'])}\n{render(b)}" for b in batch]
+        return '\n\n'.join(parts) + '\n' + BATCH_SUFFIX.format()
+
+    @staticmethod
+    def parse_response(response: str, batch: List[Dict]) -> Dict[str, Dict]:
+        """
+        Parsea la respuesta JSON del backend.
+
+        Raises:
+            ValueError: Si la respuesta no contiene un resultado por bloque
+        """
+        match = re.search(r'(\[.*\]|\{.*\})', response, re.DOTALL)
+        if not match:
+            raise ValueError("Respuesta sin JSON")
+        parsed = json.loads(match.group(1))
+        if isinstance(parsed, dict):
+            parsed = [dict(parsed, id=batch[0]['id'])] if len(batch) == 1 else []
+
+        by_id = {str(item.get('id')): item for item in parsed if isinstance(item, dict)}
+        results = {}
+        for block in batch:
+            item = by_id.get(str(block['id']))
+            if not item or not all(item.get(k) for k in ('accion', 'relacion', 'nivel', 'sid')):
+                raise ValueError(f"Respuesta incompleta para bloque {block['id']}")
+            results[block['id']] = {k: item[k] for k in ('accion', 'relacion', 'nivel', 'sid')}
+        return results
+
+    async def _run_batch(self, batch, semaphore, limiter) -> Dict[str, Dict]:
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire()
+                self.stats['requests'] += 1
+                try:
+                    response = await self.backend.complete(self.build_prompt(batch))
+                    return self.parse_response(response, batch)
+                except (BackendError, ValueError) as e:
+                    error = e
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        # Lote agotado: los bloques quedan pendientes para revisión manual
+        self.stats['failed_blocks'] += len(batch)
+        return {b['id']: {'error': str(error)} for b in batch}
+
+    async def enrich_blocks(self, blocks: List[Dict]) -> Dict[str, Dict]:
+        """
+        Enriquece bloques de forma concurrente.
+
+        Con caché, los aciertos no llegan al backend y los bloques con el mismo
+        contenido se envían una sola vez.
+
+        Args:
+            blocks: Lista de {'id', 'block_name', 'block_type', 'content'}
+
+        Returns:
+            {id: {'accion', 'relacion', 'nivel', 'sid'}} o {id: {'error': str}}
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = RateLimiter(self.rate_limit) if self.rate_limit else None
+
+        results = {}
+        dispatch = blocks
+        if self.cache is not None:
+            keys = {b['id']: self.cache.key(b.get('block_type', 'BLK'), b.get('content', ''))
+                    for b in blocks}
+            cached = self.cache.get_many(keys.values())
+            results = {bid: dict(cached[k]) for bid, k in keys.items() if k in cached}
+            self.stats['cached_blocks'] += len(results)
+            # Un representante por contenido pendiente
+            unique = {}
+            for b in blocks:
+                if b['id'] not in results:
+                    unique.setdefault(keys[b['id']], b)
+            dispatch = list(unique.values())
+
+        batches = [dispatch[i:i + self.batch_size] for i in range(0, len(dispatch), self.batch_size)]
+        for partial in await asyncio.gather(
+            *(self._run_batch(batch, semaphore, limiter) for batch in batches)
+        ):
+            results.update(partial)
+
+        if self.cache is not None:
+            self.cache.put_many({keys[b['id']]: results[b['id']] for b in dispatch
+                                 if 'error' not in results[b['id']]})
+            for b in blocks:
+                if b['id'] not in results:
+                    results[b['id']] = dict(results[unique[keys[b['id']]]['id']])
+
+        self.stats['blocks'] += len(blocks)
+        self.stats['elapsed_s'] += time.perf_counter() - start
+        return results
+
+    def run(self, blocks: List[Dict]) -> Dict[str, Dict]:
+        """Versión síncrona de enrich_blocks()."""
+        return asyncio.run(self.enrich_blocks(blocks))
+
+    def format_stats(self) -> str:
+        """Resumen legible de la ejecución."""
+        s = self.stats
+        rate = s['blocks'] / s['elapsed_s'] if s['elapsed_s'] else 0
+        return (f"{s['blocks']} bloques ({s['cached_blocks']} desde caché), "
+                f"{s['requests']} peticiones, {s['retries']} reintentos, "
+                f"{s['failed_blocks']} fallidos en {s['elapsed_s']:.2f}s ({rate:.0f} bloques/s)")
@@ -0,0 +1,234 @@
+"""
+Lint Memo - APS Tooling
+========================
+
+Memo persistente (SQLite local) de resultados de lint por bloque.
+
+Cada linter divide su trabajo en dos fases:
+
+1. Reglas por bloque → un resumen JSON por bloque (issues + los datos que
+   necesitan las comprobaciones globales: SID, claves de STATE_JSON, palabras...)
+2. Comprobaciones globales (unicidad, bloques obligatorios, consistencia de
+   STATE_JSON, duplicados) recalculadas a partir de los resúmenes
+
+La clave de cada resumen es hash(linter, versión del conjunto de reglas, contexto,
+nombre del bloque, datos del bloque): al editar una línea de un agente de 40
+bloques solo se vuelve a evaluar ese bloque. Cambiar las reglas o el código del
+linter cambia la versión y deja obsoletas todas las entradas (eviction LRU).
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from .resources import read_bytes
+
+
+DEFAULT_MEMO_PATH = Path('.aps_cache') / 'lint_memo.sqlite'
+DEFAULT_MAX_ENTRIES = 200000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key       TEXT PRIMARY KEY,
+    linter    TEXT NOT NULL,
+    summary   TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used);
+"""
+
+
+def ruleset_fingerprint(*sources: Union[str, Path]) -> str:
+    """
+    Versión del conjunto de reglas: hash de los archivos (código del linter,
+    archivo de reglas) y cadenas (configuración) que determinan el resultado.
+    Las rutas pueden apuntar dentro del zipapp.
+    """
+    digest = hashlib.sha1()
+    for source in sources:
+        if isinstance(source, Path):
+            digest.update(read_bytes(source))
+        else:
+            digest.update(str(source).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()[:16]
+
+
+class LintMemo:
+    """
+    Memo de resúmenes por bloque respaldado por SQLite.
+
+    Ejemplo:
+        >>> memo = LintMemo('yaml_lint', ruleset_fingerprint(Path(__file__)))
+        >>> summaries = memo.evaluate(blocks, summarize_block)
+        >>> print(memo.format_stats())
+    """
+
+    def __init__(
+        self,
+        linter: str,
+        ruleset_version: str,
+        db_path: Optional[Union[str, Path]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Abre (o crea) el memo.
+
+        Args:
+            linter: Nombre del linter (separa los resúmenes de cada uno)
+            ruleset_version: Huella de reglas + código (ver ruleset_fingerprint)
+            db_path: Archivo SQLite. Si es None, usa .aps_cache/lint_memo.sqlite
+            max_entries: Máximo de entradas; al superarlo se descartan las menos usadas
+        """
+        self.linter = linter
+        self.ruleset_version = ruleset_version
+        self.db_path = Path(db_path) if db_path else DEFAULT_MEMO_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+
+    def key(self, block_name: str, block_data: Any, context: str = '') -> str:
+        """Clave de un bloque: sus datos completos bajo esta versión de reglas y contexto."""
+        payload = json.dumps([block_name, block_data], sort_keys=True, ensure_ascii=False, default=str)
+        raw = '\x00'.join((self.linter, self.ruleset_version, context, payload))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # =========================================================================
+    # EVALUACIÓN
+    # =========================================================================
+
+    def evaluate(
+        self,
+        blocks: Dict[str, Any],
+        summarize: Callable[[str, Any], Dict],
+        context: str = '',
+        guard=None
+    ) -> Dict[str, Dict]:
+        """
+        Resumen de cada bloque, evaluando solo los que no están en el memo.
+
+        Args:
+            blocks: {nombre: datos del bloque}
+            summarize: Reglas por bloque; debe retornar un dict serializable a JSON
+            context: Lo que además del bloque condiciona el resultado (p.ej. rol del agente)
+            guard: RegexGuard de las reglas. Mientras tenga alguna regla desactivada,
+                   los resúmenes no se guardan (les faltan los issues de esa regla)
+
+        Returns:
+            {nombre: resumen} en el orden de `blocks`
+        """
+        keys = {name: self.key(name, data, context) for name, data in blocks.items()}
+        cached = self.get_many(keys.values())
+
+        summaries = {}
+        fresh = {}
+        for name, data in blocks.items():
+            summary = cached.get(keys[name])
+            if summary is None:
+                summary = summarize(name, data)
+                if not guard or guard.disabled_count() == 0:
+                    fresh[keys[name]] = summary
+            summaries[name] = summary
+
+        if fresh:
+            self.put_many(fresh)
+        return summaries
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Consulta varias claves en una sola transacción.
+
+        Returns:
+            {key: resumen} solo para las claves presentes
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT key, summary FROM summaries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((k, json.loads(s)) for k, s in rows)
+
+        now = time.time()
+        with self._conn:
+            self._conn.executemany('UPDATE summaries SET last_used = ? WHERE key = ?',
+                                   ((now, k) for k in found))
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, summaries: Dict[str, Dict]) -> None:
+        """Guarda varios resúmenes en una transacción y aplica la eviction LRU."""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO summaries (key, linter, summary, last_used) VALUES (?, ?, ?, ?)',
+                ((k, self.linter, json.dumps(v, ensure_ascii=False, default=str), now)
+                 for k, v in summaries.items())
+            )
+        self.stats['stores'] += len(summaries)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Descarta las entradas menos usadas hasta quedar en max_entries.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        excess = self.count() - self.max_entries
+        if excess <= 0:
+            return 0
+        with self._conn:
+            self._conn.execute(
+                'DELETE FROM summaries WHERE key IN '
+                '(SELECT key FROM summaries ORDER BY last_used LIMIT ?)', (excess,)
+            )
+        self.stats['evictions'] += excess
+        return excess
+
+    # =========================================================================
+    # ESTADÍSTICAS
+    # =========================================================================
+
+    def count(self) -> int:
+        """Número de entradas en el memo (todos los linters)."""
+        return self._conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+
+    def format_stats(self) -> str:
+        """Resumen legible de la sesión."""
+        s = self.stats
+        total = s['hits'] + s['misses']
+        return f"{s['hits']}/{total} bloques desde memo, {s['misses']} re-evaluados"
+
+    def clear(self) -> None:
+        """Vacía el memo de este linter."""
+        with self._conn:
+            self._conn.execute('DELETE FROM summaries WHERE linter = ?', (self.linter,))
+
+    def close(self) -> None:
+        """Cierra la conexión SQLite."""
+        self._conn.close()
+
+
+def evaluate_blocks(
+    blocks: Dict[str, Any],
+    summarize: Callable[[str, Any], Dict],
+    memo: Optional[LintMemo] = None,
+    context: str = '',
+    guard=None
+) -> Dict[str, Dict]:
+    """Como LintMemo.evaluate; sin memo evalúa todos los bloques."""
+    if memo is None:
+        return {name: summarize(name, data) for name, data in blocks.items()}
+    return memo.evaluate(blocks, summarize, context, guard)
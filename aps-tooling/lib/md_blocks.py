@@ -0,0 +1,185 @@
+"""
+Markdown Blocks - APS Tooling
+==============================
+
+División de Markdown en bloques por encabezado (la misma que usa md2yaml),
+conservando los límites de línea de cada bloque para poder re-procesar solo
+la región editada (servidor LSP) o mapear hallazgos a líneas del .md.
+
+Los encabezados repetidos se auto-numeran ("Nombre (2)") para que el linter
+los detecte como duplicados.
+
+Mapa de fuentes: md2yaml guarda en `agent.source_map` la posición de cada
+bloque en el .md (líneas y offsets en bytes); los linters la añaden a sus
+issues (md_file, md_line, md_end_line, md_offset, md_end_offset) para no
+tener que buscar el encabezado en el .md al revisar un reporte.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+HEADER_RE = re.compile(r'^(#{1,6})\s*(.+)$')
+AUTO_NUMBER_RE = re.compile(r' \(\d+\)$')
+
+
+class MdBlock(NamedTuple):
+    """Bloque Markdown: encabezado en `header_line`, cuerpo hasta `end_line` (exclusivo)."""
+    raw_name: str
+    name: str
+    header_line: int
+    end_line: int
+
+    def body_lines(self, lines: Sequence[str]) -> List[str]:
+        """Líneas del cuerpo (sin el encabezado), sin espacios finales."""
+        return [line.rstrip() for line in lines[self.header_line + 1:self.end_line]]
+
+    def content(self, lines: Sequence[str]) -> str:
+        """Contenido del bloque tal como lo guarda md2yaml."""
+        return '\n'.join(self.body_lines(lines)).strip()
+
+    def shifted(self, delta: int) -> 'MdBlock':
+        return self._replace(header_line=self.header_line + delta, end_line=self.end_line + delta)
+
+
+def scan_headers(lines: Sequence[str], start: int = 0, end: Optional[int] = None) -> List[MdBlock]:
+    """
+    Bloques cuyos encabezados están en lines[start:end]. El último termina en `end`.
+    Los nombres quedan sin numerar (ver number_duplicates).
+    """
+    end = len(lines) if end is None else end
+    headers = []
+    for i in range(start, end):
+        match = HEADER_RE.match(lines[i])
+        if match:
+            headers.append((i, match.group(2).strip()))
+    return [
+        MdBlock(raw, raw, line, headers[k + 1][0] if k + 1 < len(headers) else end)
+        for k, (line, raw) in enumerate(headers)
+    ]
+
+
+def number_duplicates(blocks: Iterable[MdBlock]) -> List[MdBlock]:
+    """Asigna nombres únicos: la segunda aparición de "X" pasa a "X (2)", etc."""
+    counts: Dict[str, int] = {}
+    numbered = []
+    for block in blocks:
+        counts[block.raw_name] = counts.get(block.raw_name, 0) + 1
+        n = counts[block.raw_name]
+        numbered.append(block._replace(name=block.raw_name if n == 1 else f"{block.raw_name} ({n})"))
+    return numbered
+
+
+def split_lines(text: str) -> List[str]:
+    """Líneas de un documento (equivalente a iterar el archivo, sin saltos de línea)."""
+    return text.split('\n')
+
+
+def split_blocks(lines: Sequence[str]) -> List[MdBlock]:
+    """
+    Divide un documento (lista de líneas) en bloques por encabezado.
+    El texto anterior al primer encabezado no forma parte de ningún bloque.
+    """
+    return number_duplicates(scan_headers(lines))
+
+
+# =============================================================================
+# MAPA DE FUENTES (bloque → posición en el .md)
+# =============================================================================
+
+def source_map(lines: Sequence[str], blocks: Optional[Sequence[MdBlock]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Posición de cada bloque en el documento:
+    {nombre: {'line', 'end_line', 'offset', 'end_offset'}}
+
+    Líneas 1-based e inclusivas (del encabezado a la última línea no vacía del
+    cuerpo). Offsets en bytes UTF-8: [offset, end_offset) cubre esas líneas.
+    Para offsets exactos las líneas deben conservar '\r' (leer sin traducir saltos).
+    """
+    blocks = split_blocks(lines) if blocks is None else blocks
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line.encode('utf-8')) + 1)
+
+    positions = {}
+    for block in blocks:
+        last = block.end_line - 1
+        while last > block.header_line and not lines[last].strip():
+            last -= 1
+        positions[block.name] = {
+            'line': block.header_line + 1,
+            'end_line': last + 1,
+            'offset': starts[block.header_line],
+            'end_offset': starts[last] + len(lines[last].encode('utf-8')),
+        }
+    return positions
+
+
+def read_source_lines(md_path: Union[str, Path]) -> List[str]:
+    """Líneas de un .md sin traducir saltos de línea (offsets en bytes exactos)."""
+    return split_lines(Path(md_path).read_bytes().decode('utf-8'))
+
+
+def agent_source_map(agent: Dict, yaml_path: Optional[Union[str, Path]] = None) -> Tuple[Optional[str], Dict]:
+    """
+    (.md fuente, mapa de fuentes) de un agente YAML.
+
+    Usa `agent.source_map` si md2yaml lo guardó; si no (YAML anterior), lo
+    calcula desde `agent.source_md` o el .md hermano del YAML, si existen.
+
+    Returns:
+        (ruta del .md o None, {nombre de bloque: posición}) — mapa vacío si no hay fuente
+    """
+    md_file = agent.get('source_md')
+    positions = agent.get('source_map')
+    if isinstance(positions, dict):
+        return md_file, positions
+
+    candidates = [Path(md_file)] if md_file else []
+    if yaml_path is not None:
+        candidates.append(Path(yaml_path).with_suffix('.md'))
+    for candidate in candidates:
+        if candidate.is_file():
+            try:
+                return str(candidate), source_map(read_source_lines(candidate))
+            except (OSError, UnicodeDecodeError):
+                continue
+    return md_file, {}
+
+
+def md_location(location: str, md_file: Optional[str], positions: Dict) -> Dict:
+    """
+    Campos md_* para un issue según su 'location' ("A vs B" → A).
+    Vacío si la ubicación no es un bloque del mapa (GLOBAL, FILE...).
+    """
+    position = positions.get(location) or positions.get(location.split(' vs ', 1)[0])
+    if not md_file or not position:
+        return {}
+    return {
+        'md_file': md_file,
+        'md_line': position['line'],
+        'md_end_line': position['end_line'],
+        'md_offset': position['offset'],
+        'md_end_offset': position['end_offset'],
+    }
+
+
+def attach_md_locations(issues: Iterable[Dict], agent: Dict,
+                        yaml_path: Optional[Union[str, Path]] = None) -> None:
+    """Añade (in place) la posición en el .md a los issues de bloque de un agente."""
+    md_file, positions = agent_source_map(agent, yaml_path)
+    if not positions:
+        return
+    for issue in issues:
+        issue.update(md_location(issue['location'], md_file, positions))
+
+
+def format_md_location(issue: Dict) -> str:
+    """'agente.md:12-20' para un issue con md_line; '' si no la tiene."""
+    if not issue.get('md_line'):
+        return ''
+    lines = str(issue['md_line'])
+    if issue.get('md_end_line', issue['md_line']) != issue['md_line']:
+        lines += f"-{issue['md_end_line']}"
+    return f"{Path(issue['md_file']).name}:{lines}"
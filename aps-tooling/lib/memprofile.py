@@ -0,0 +1,297 @@
+"""
+Memory Profiler - APS Tooling
+==============================
+
+Perfil de memoria por etapa y por agente (--memprofile) con tracemalloc:
+
+- Pico: memoria máxima que la etapa necesitó por encima de la que estaba viva
+  al entrar (lo que hay que tener libre para procesar un agente)
+- Retenida: lo que la etapa deja vivo al salir (acumulación entre agentes:
+  issues, resultados, reportes). Es lo que crece con el tamaño del swarm
+- Sitios de asignación: snapshots en los límites de las etapas de nivel
+  superior (sin agente); para cada una, las líneas que más crecieron, y al
+  final las que más memoria retienen
+
+Los snapshots que el propio perfil mantiene vivos durante una etapa no cuentan
+en el pico ni en la memoria retenida.
+
+Cada sitio se identifica por la línea que asigna y, si es de una biblioteca
+(yaml, json, sqlite3), la última línea de aps-tooling que la llamó.
+
+Uso:
+    >>> mem = MemoryProfiler()
+    >>> with mem.stage('lint'):
+    ...     for f in files:
+    ...         with mem.stage('validate', agent=f.stem):
+    ...             validator.validate_file(f)
+    >>> print(mem.format_report())
+    >>> mem.save_json('memprofile.json')
+
+Sin --memprofile se usa NULL_MEMPROFILER: tracemalloc no se importa ni se activa.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_FRAMES = 8
+DEFAULT_TOP = 10
+
+TOOLING_DIR = str(Path(__file__).resolve().parent.parent)
+
+# Archivos de aps-tooling: en el zipapp el bytecode lleva rutas relativas (lib/x.py)
+_TOOLING_PREFIXES = (TOOLING_DIR, 'lib/', 'scripts/', '__main__.py')
+
+# Asignaciones del propio perfilado (en cualquier frame de la pila) y del sistema de imports
+_FILTERS: List = []
+
+
+def _import_tracemalloc() -> None:
+    """Importa tracemalloc (arrastra pickle y linecache) solo al crear un perfil real."""
+    global tracemalloc
+    import tracemalloc
+    if not _FILTERS:
+        _FILTERS.extend([
+            tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+            # Nombre del bytecode, no __file__ (en el zipapp: lib/memprofile.py frente a .../memprofile.pyc)
+            tracemalloc.Filter(False, _import_tracemalloc.__code__.co_filename, all_frames=True),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ])
+
+
+class _Stage:
+    """Contexto de una etapa: memoria viva al entrar y pico observado."""
+
+    __slots__ = ('profiler', 'name', 'agent', 'start', 'peak', 'snapshot', 'held')
+
+    def __init__(self, profiler, name, agent):
+        self.profiler = profiler
+        self.name = name
+        self.agent = agent
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class MemoryProfiler:
+    """Acumula pico y memoria retenida por etapa y por agente."""
+
+    enabled = True
+
+    def __init__(self, frames: int = DEFAULT_FRAMES, top: int = DEFAULT_TOP):
+        """
+        Args:
+            frames: Frames guardados por asignación (más = sitios más precisos, más lento)
+            top: Sitios de asignación por lista en el reporte
+        """
+        _import_tracemalloc()
+        self.top = top
+        self._started_here = not tracemalloc.is_tracing()
+        if self._started_here:
+            tracemalloc.start(frames)
+        self._stack: List[_Stage] = []
+        self._stages: Dict[str, Dict] = {}
+        self._agents: Dict[str, Dict] = {}
+        self._growth: Dict[str, List[Dict]] = {}
+        self._held = 0  # Bytes de los snapshots abiertos (se descuentan del máximo absoluto)
+        self._final: Optional[List[Dict]] = None
+
+    def stage(self, name: str, agent: Optional[str] = None) -> _Stage:
+        """
+        Context manager de una etapa. Sin `agent` es una etapa de nivel superior
+        (se toman snapshots en sus límites); con `agent`, solo contadores.
+        """
+        return _Stage(self, name, agent)
+
+    # =========================================================================
+    # MEDICIÓN
+    # =========================================================================
+
+    def _fold_peak(self) -> int:
+        """Lleva el pico actual a las etapas abiertas y lo reinicia (etapas anidadas)."""
+        current, peak = tracemalloc.get_traced_memory()
+        for open_stage in self._stack:
+            open_stage.peak = max(open_stage.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _enter(self, st: _Stage) -> None:
+        st.start = self._fold_peak()
+        st.snapshot, st.held = None, 0
+        if st.agent is None:
+            st.snapshot = self._snapshot()
+            current = tracemalloc.get_traced_memory()[0]
+            st.held = current - st.start
+            self._held += st.held
+            st.start = current
+            tracemalloc.reset_peak()  # El snapshot no es memoria de ninguna etapa
+        st.peak = st.start
+        self._stack.append(st)
+
+    def _exit(self, st: _Stage) -> None:
+        end = self._fold_peak()
+        self._stack.pop()
+        peak = st.peak - st.start
+        retained = end - st.start
+
+        row = self._stages.setdefault(st.name, {
+            'stage': st.name, 'calls': 0, 'peak_kb': 0.0, 'peak_agent': None,
+            'retained_kb': 0.0, 'max_traced_kb': 0.0,
+        })
+        row['calls'] += 1
+        if peak / 1024 >= row['peak_kb']:
+            row['peak_kb'] = round(peak / 1024, 1)
+            row['peak_agent'] = st.agent
+        row['retained_kb'] = round(row['retained_kb'] + retained / 1024, 1)
+        row['max_traced_kb'] = max(row['max_traced_kb'], round((st.peak - self._held) / 1024, 1))
+
+        if st.agent is not None:
+            agent = self._agents.setdefault(st.agent, {
+                'agent': st.agent, 'peak_kb': 0.0, 'peak_stage': None, 'retained_kb': 0.0,
+            })
+            if peak / 1024 >= agent['peak_kb']:
+                agent['peak_kb'] = round(peak / 1024, 1)
+                agent['peak_stage'] = st.name
+            agent['retained_kb'] = round(agent['retained_kb'] + retained / 1024, 1)
+
+        if st.snapshot is not None:
+            diff = self._snapshot().compare_to(st.snapshot, 'traceback')
+            self._growth[st.name] = self._sites(
+                ((d.traceback, d.size_diff, d.count_diff) for d in diff), self.top
+            )
+            st.snapshot = diff = None
+            self._held -= st.held
+            tracemalloc.reset_peak()
+
+    def _snapshot(self) -> 'tracemalloc.Snapshot':
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    @staticmethod
+    def _site(traceback: 'tracemalloc.Traceback') -> Tuple[str, Optional[str]]:
+        """(línea que asigna, última línea de aps-tooling en la pila si la primera no lo es)."""
+        frames = list(traceback)[::-1]  # Traceback va del más antiguo al más reciente
+        if not frames:
+            return '<desconocido>', None
+        where = _relative(f"{frames[0].filename}:{frames[0].lineno}")
+        if frames[0].filename.startswith(_TOOLING_PREFIXES):
+            return where, None
+        for frame in frames[1:]:
+            if frame.filename.startswith(_TOOLING_PREFIXES):
+                return where, _relative(f"{frame.filename}:{frame.lineno}")
+        return where, None
+
+    @classmethod
+    def _sites(cls, stats, limit: int) -> List[Dict]:
+        """Agrupa (traceback, bytes, asignaciones) por sitio y retorna los `limit` mayores."""
+        grouped: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        for traceback, size, count in stats:
+            key = cls._site(traceback)
+            total = grouped.setdefault(key, [0, 0])
+            total[0] += size
+            total[1] += count
+        rows = [
+            {'site': site, 'via': via, 'kb': round(size / 1024, 1), 'count': count}
+            for (site, via), (size, count) in grouped.items() if size > 0
+        ]
+        return sorted(rows, key=lambda r: -r['kb'])[:limit]
+
+    def finish(self) -> None:
+        """Snapshot final (sitios que retienen memoria) y fin de tracemalloc."""
+        if self._final is not None:
+            return
+        stats = self._snapshot().statistics('traceback')
+        self._final = self._sites(((s.traceback, s.size, s.count) for s in stats), self.top)
+        if self._started_here:
+            tracemalloc.stop()
+
+    # =========================================================================
+    # SALIDA
+    # =========================================================================
+
+    def to_dict(self) -> Dict:
+        self.finish()
+        return {
+            'stages': sorted(self._stages.values(), key=lambda r: -r['peak_kb']),
+            'agents': sorted(self._agents.values(), key=lambda r: -r['peak_kb']),
+            'stage_growth_sites': self._growth,
+            'retained_sites': self._final,
+        }
+
+    def save_json(self, path: Union[str, Path]) -> None:
+        """Guarda el perfil en JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding='utf-8')
+
+    def format_report(self, agents: int = 10) -> str:
+        """Tablas de etapas, agentes con mayor pico y sitios de asignación."""
+        data = self.to_dict()
+        header = (f"{'Etapa':<28} {'Llamadas':>9} {'Pico KB':>10} {'Retenida KB':>12} "
+                  f"{'Traced máx KB':>14}  Agente del pico")
+        lines = [header, '-' * len(header)]
+        for r in data['stages']:
+            lines.append(f"{r['stage']:<28} {r['calls']:>9} {r['peak_kb']:>10.1f} "
+                         f"{r['retained_kb']:>12.1f} {r['max_traced_kb']:>14.1f}  {r['peak_agent'] or '-'}")
+
+        if data['agents']:
+            lines += ['', f"{'Agente':<40} {'Pico KB':>10} {'Retenida KB':>12}  Etapa del pico"]
+            for r in data['agents'][:agents]:
+                name = r['agent'] if len(r['agent']) <= 40 else r['agent'][:37] + '...'
+                lines.append(f"{name:<40} {r['peak_kb']:>10.1f} {r['retained_kb']:>12.1f}  {r['peak_stage']}")
+
+        sections = [(f"Crecimiento en '{name}'", sites) for name, sites in data['stage_growth_sites'].items()]
+        sections.append(('Memoria retenida al final', data['retained_sites']))
+        for title, sites in sections:
+            if not sites:
+                continue
+            lines += ['', f"📍 {title}:"]
+            for s in sites:
+                via = f"  (vía {s['via']})" if s['via'] else ''
+                lines.append(f"   {s['kb']:>10.1f} KB {s['count']:>8} asign.  {s['site']}{via}")
+        return '\n'.join(lines)
+
+
+def _relative(location: str) -> str:
+    """Ruta relativa a aps-tooling; fuera de él, solo paquete/archivo (yaml/constructor.py:412)."""
+    if location.startswith(TOOLING_DIR):
+        return location[len(TOOLING_DIR) + 1:]
+    if location.startswith(_TOOLING_PREFIXES):
+        return location
+    path = Path(location)
+    return f"{path.parent.name}/{path.name}" if path.parent.name else location
+
+
+class _NullMemoryProfiler(MemoryProfiler):
+    """Perfil de memoria desactivado: etapas sin coste ni efecto."""
+
+    enabled = False
+    _STAGE = _NullStage()
+
+    def __init__(self):
+        pass
+
+    def stage(self, name: str, agent: Optional[str] = None):
+        return self._STAGE
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_MEMPROFILER = _NullMemoryProfiler()
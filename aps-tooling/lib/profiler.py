@@ -0,0 +1,167 @@
+"""
+Rule Profiler - APS Tooling
+============================
+
+Perfilado por regla de los linters (--profile): número de llamadas, tiempo
+total/medio/p95/máximo, bytes inspeccionados y número de hits.
+
+Uso:
+    >>> profiler = RuleProfiler()
+    >>> with profiler.measure('DENY_TERM:handoff.*autom', len(content)) as m:
+    ...     m.hits = len(pattern.findall(content))
+    >>> print(profiler.format_table())
+    >>> profiler.save_json('lint_profile.json')
+
+Sin --profile se usa NULL_PROFILER, cuyas mediciones no hacen nada.
+"""
+
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+
+class _Measure:
+    """Contexto de medición de una llamada (acumula hits)."""
+
+    __slots__ = ('profiler', 'rule_id', 'bytes_scanned', 'hits', '_start')
+
+    def __init__(self, profiler, rule_id, bytes_scanned):
+        self.profiler = profiler
+        self.rule_id = rule_id
+        self.bytes_scanned = bytes_scanned
+        self.hits = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.rule_id, time.perf_counter() - self._start,
+                             self.bytes_scanned, self.hits)
+        return False
+
+
+class _NullMeasure:
+    __slots__ = ('hits',)
+
+    def __init__(self):
+        self.hits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RuleProfiler:
+    """Acumula métricas por ID de regla."""
+
+    enabled = True
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._hits: Dict[str, int] = defaultdict(int)
+
+    def measure(self, rule_id: str, bytes_scanned: int = 0) -> _Measure:
+        """Context manager que mide una llamada; asignar `.hits` dentro del bloque."""
+        return _Measure(self, rule_id, bytes_scanned)
+
+    def record(self, rule_id: str, elapsed_s: float, bytes_scanned: int = 0, hits: int = 0) -> None:
+        """Registra una llamada ya medida."""
+        self._samples[rule_id].append(elapsed_s * 1000)
+        self._bytes[rule_id] += bytes_scanned
+        self._hits[rule_id] += hits
+
+    def merge(self, data: Dict) -> None:
+        """Incorpora el JSON de otro profiler (p.ej. de un subproceso) generado con samples."""
+        for rule in data.get('rules', []):
+            rule_id = rule['rule_id']
+            self._samples[rule_id].extend(rule.get('samples_ms', []))
+            self._bytes[rule_id] += rule.get('bytes', 0)
+            self._hits[rule_id] += rule.get('hits', 0)
+
+    # =========================================================================
+    # SALIDA
+    # =========================================================================
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], pct: float) -> float:
+        if not sorted_values:
+            return 0.0
+        index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+        return sorted_values[index]
+
+    def summary(self, include_samples: bool = False) -> List[Dict]:
+        """Métricas por regla, ordenadas por tiempo total descendente."""
+        rows = []
+        for rule_id, samples in self._samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+            row = {
+                'rule_id': rule_id,
+                'calls': len(ordered),
+                'total_ms': round(total, 3),
+                'mean_ms': round(total / len(ordered), 4) if ordered else 0.0,
+                'p95_ms': round(self._percentile(ordered, 95), 4),
+                'max_ms': round(ordered[-1], 4) if ordered else 0.0,
+                'bytes': self._bytes[rule_id],
+                'hits': self._hits[rule_id],
+            }
+            if include_samples:
+                row['samples_ms'] = [round(s, 4) for s in samples]
+            rows.append(row)
+        return sorted(rows, key=lambda r: (-r['total_ms'], r['rule_id']))
+
+    def to_dict(self, include_samples: bool = False) -> Dict:
+        rules = self.summary(include_samples)
+        return {
+            'total_ms': round(sum(r['total_ms'] for r in rules), 3),
+            'rules': rules,
+        }
+
+    def save_json(self, path: Union[str, Path], include_samples: bool = False) -> None:
+        """Guarda el perfil en JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(include_samples), indent=2, ensure_ascii=False),
+                        encoding='utf-8')
+
+    def format_table(self, limit: Optional[int] = None) -> str:
+        """Tabla ordenada por tiempo total (las reglas más caras primero)."""
+        rows = self.summary()
+        if limit:
+            rows = rows[:limit]
+        total = sum(r['total_ms'] for r in rows) or 1.0
+        header = (f"{'Regla':<52} {'Llamadas':>9} {'Total ms':>10} {'%':>6} "
+                  f"{'p95 ms':>9} {'Máx ms':>9} {'KB':>9} {'Hits':>6}")
+        lines = [header, '-' * len(header)]
+        for r in rows:
+            rule_id = r['rule_id'] if len(r['rule_id']) <= 52 else r['rule_id'][:49] + '...'
+            lines.append(
+                f"{rule_id:<52} {r['calls']:>9} {r['total_ms']:>10.2f} "
+                f"{100 * r['total_ms'] / total:>5.1f}% {r['p95_ms']:>9.3f} {r['max_ms']:>9.3f} "
+                f"{r['bytes'] / 1024:>9.1f} {r['hits']:>6}"
+            )
+        return '\n'.join(lines)
+
+
+class _NullProfiler(RuleProfiler):
+    """Profiler desactivado: mediciones sin coste ni efecto."""
+
+    enabled = False
+    _MEASURE = _NullMeasure()
+
+    def measure(self, rule_id: str, bytes_scanned: int = 0):
+        self._MEASURE.hits = 0
+        return self._MEASURE
+
+    def record(self, rule_id: str, elapsed_s: float, bytes_scanned: int = 0, hits: int = 0) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,480 @@
+"""
+Regex Guard - APS Tooling
+==========================
+
+Carga segura de patrones regex de archivos de reglas (validation_rules_v1.yaml,
+reglas de dominio, patrones de texto de los linters).
+
+- Análisis estático: detecta cuantificadores anidados (backtracking exponencial)
+  y cadenas de gaps `.*` no acotados (backtracking polinómico)
+- Reescritura: `.*` / `.+` → `.{0,N}` / `.{1,N}` cuando es seguro (sin DOTALL;
+  `.` ya no cruza líneas, así que el gap queda acotado a N caracteres de la línea)
+- Presupuesto de tiempo en ejecución: límite por llamada (interrumpe la búsqueda
+  vía SIGALRM cuando es posible) y límite acumulado por regla en cada ámbito
+  (un archivo, ver begin_scope); una regla que lo supera se desactiva hasta el
+  siguiente ámbito y el linter la reporta como error (sus checks no se aplicaron)
+"""
+
+import re
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .profiler import NULL_PROFILER
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+    import sre_constants
+
+
+MAXREPEAT = sre_constants.MAXREPEAT
+_REPEAT_OPS = tuple(
+    op for op in (getattr(sre_constants, name, None)
+                  for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'))
+    if op is not None
+)
+_POSSESSIVE = getattr(sre_constants, 'POSSESSIVE_REPEAT', None)
+
+DEFAULT_MAX_GAP = 500
+DEFAULT_CALL_BUDGET_MS = 250
+DEFAULT_TOTAL_BUDGET_MS = 2000
+DEFAULT_SLOW_MS = 50
+
+
+class RegexTimeout(Exception):
+    """Una búsqueda superó el presupuesto por llamada."""
+    pass
+
+
+# =============================================================================
+# ANÁLISIS ESTÁTICO
+# =============================================================================
+
+def _is_unbounded_any(op, av) -> bool:
+    """True para `.*`, `.+`, `.*?` (repetición no acotada de ANY)."""
+    return (op in _REPEAT_OPS and op != _POSSESSIVE and av[1] == MAXREPEAT
+            and len(av[2]) == 1 and av[2][0][0] == sre_constants.ANY)
+
+
+def _has_unbounded_repeat(items) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            if av[1] == MAXREPEAT and op != _POSSESSIVE:
+                return True
+            if _has_unbounded_repeat(av[2]):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _has_unbounded_repeat(av[-1]):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_has_unbounded_repeat(b) for b in av[1]):
+                return True
+    return False
+
+
+def _first_literal(items):
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            return av
+        if op == sre_constants.SUBPATTERN:
+            return _first_literal(av[-1])
+        return None
+    return None
+
+
+def _walk(items, in_repeat: bool, findings: List[Tuple[str, str]]) -> None:
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            lo, hi, sub = av
+            unbounded = hi == MAXREPEAT and op != _POSSESSIVE
+            if unbounded and _has_unbounded_repeat(sub):
+                findings.append(('nested_quantifier',
+                                 "Cuantificador anidado no acotado (p.ej. (a+)+): backtracking exponencial"))
+            _walk(sub, in_repeat or unbounded, findings)
+        elif op == sre_constants.SUBPATTERN:
+            _walk(av[-1], in_repeat, findings)
+        elif op == sre_constants.BRANCH:
+            branches = av[1]
+            if in_repeat:
+                firsts = [_first_literal(b) for b in branches]
+                firsts = [f for f in firsts if f is not None]
+                if len(firsts) != len(set(firsts)):
+                    findings.append(('overlapping_alternation',
+                                     "Alternativas solapadas dentro de una repetición: backtracking exponencial"))
+            for branch in branches:
+                _walk(branch, in_repeat, findings)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _walk(av[1], in_repeat, findings)
+        # ATOMIC_GROUP y POSSESSIVE_REPEAT no retroceden: no se inspeccionan
+
+
+def _count_gaps(items) -> int:
+    count = 0
+    for op, av in items:
+        if _is_unbounded_any(op, av):
+            count += 1
+        elif op == sre_constants.SUBPATTERN:
+            count += _count_gaps(av[-1])
+        elif op == sre_constants.BRANCH:
+            count += max((_count_gaps(b) for b in av[1]), default=0)
+    return count
+
+
+def analyze_pattern(pattern: str, flags: int = 0) -> List[Dict]:
+    """
+    Analiza un patrón y retorna los riesgos de backtracking detectados.
+
+    Returns:
+        Lista de {'kind', 'message'}; kind ∈ nested_quantifier,
+        overlapping_alternation, unbounded_gaps, invalid
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, sre_constants.error) as e:
+        return [{'kind': 'invalid', 'message': f"Patrón inválido: {e}"}]
+
+    findings: List[Tuple[str, str]] = []
+    _walk(list(parsed), False, findings)
+    gaps = _count_gaps(list(parsed))
+    if gaps >= 2:
+        findings.append(('unbounded_gaps',
+                         f"{gaps} gaps '.*' no acotados: backtracking O(n^{gaps}) en textos largos"))
+
+    seen = set()
+    return [{'kind': k, 'message': m} for k, m in findings if not (k in seen or seen.add(k))]
+
+
+def _children(op, av) -> List:
+    """Sub-secuencias de un nodo del árbol de sre_parse."""
+    if op in _REPEAT_OPS:
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+        return [av]
+    if op == sre_constants.GROUPREF_EXISTS:
+        return [b for b in av[1:] if b is not None]
+    return []
+
+
+def _has_scoped_dotall(items) -> bool:
+    """True si algún grupo activa DOTALL solo en su ámbito: (?s:...)."""
+    for op, av in items:
+        if op == sre_constants.SUBPATTERN and av[1] & re.DOTALL:
+            return True
+        if any(_has_scoped_dotall(sub) for sub in _children(op, av)):
+            return True
+    return False
+
+
+def _dotall(pattern: str, flags: int) -> bool:
+    """True si `.` cruza saltos de línea en alguna parte: re.S, (?s) o (?s:...)."""
+    if flags & re.DOTALL:
+        return True
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, sre_constants.error):
+        return True  # Patrón que no se analiza: no se reescribe
+    return bool(parsed.state.flags & re.DOTALL) or _has_scoped_dotall(list(parsed))
+
+
+def rewrite_unbounded_gaps(pattern: str, max_gap: int = DEFAULT_MAX_GAP, flags: int = 0) -> str:
+    """
+    Reescribe gaps `.*` / `.+` (y sus variantes lazy) como `.{0,N}` / `.{1,N}`.
+
+    Solo se aplica sin DOTALL (ni re.S, ni (?s), ni grupos (?s:...)): `.` no cruza saltos de línea, de modo que el gap
+    ya estaba limitado a la línea y acotarlo a N caracteres no cambia los
+    matches salvo en líneas de más de N caracteres entre anclas. Los
+    cuantificadores posesivos (`.*+`) se dejan intactos.
+    """
+    if _dotall(pattern, flags):
+        return pattern
+
+    out = []
+    i, n = 0, len(pattern)
+    in_class = False
+    while i < n:
+        ch = pattern[i]
+        if ch == '\\':
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            if ch == ']':
+                in_class = False
+            out.append(ch)
+            i += 1
+            continue
+        if ch == '[':
+            in_class = True
+            out.append(ch)
+            # ']' inmediatamente tras '[' o '[^' es literal
+            j = i + 1
+            if j < n and pattern[j] == '^':
+                out.append('^')
+                j += 1
+            if j < n and pattern[j] == ']':
+                out.append(']')
+                j += 1
+            i = j
+            continue
+        if ch == '.' and i + 1 < n and pattern[i + 1] in '*+':
+            if i + 2 < n and pattern[i + 2] == '+':
+                out.append(pattern[i:i + 3])  # posesivo
+                i += 3
+                continue
+            low = '0' if pattern[i + 1] == '*' else '1'
+            out.append(f'.{{{low},{max_gap}}}')
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+
+    rewritten = ''.join(out)
+    try:
+        re.compile(rewritten, flags)
+    except re.error:
+        return pattern
+    return rewritten
+
+
+# =============================================================================
+# GUARD
+# =============================================================================
+
+class GuardedPattern:
+    """Patrón compilado cuya ejecución pasa por el presupuesto de su RegexGuard."""
+
+    __slots__ = ('rule_id', 'source', 'pattern', 'regex', 'findings', 'guard')
+
+    def __init__(self, rule_id, source, pattern, regex, findings, guard):
+        self.rule_id = rule_id
+        self.source = source          # patrón original
+        self.pattern = pattern        # patrón efectivo (posiblemente reescrito)
+        self.regex = regex
+        self.findings = findings
+        self.guard = guard
+
+    def search(self, text: str, pos: int = 0, endpos: Optional[int] = None):
+        """Como re.Pattern.search; None si la regla está desactivada o excede el presupuesto."""
+        return self.guard._run(self, 'search', text, pos, len(text) if endpos is None else endpos)
+
+    def finditer(self, text: str) -> List[re.Match]:
+        """Todos los matches (lista, evaluada bajo presupuesto)."""
+        return self.guard._run(self, 'finditer', text) or []
+
+    def __repr__(self):
+        return f"GuardedPattern({self.rule_id!r}, {self.pattern!r})"
+
+
+class RegexGuard:
+    """
+    Compila y ejecuta patrones de reglas con análisis estático y presupuesto de tiempo.
+
+    Ejemplo:
+        >>> guard = RegexGuard()
+        >>> rule = guard.compile('exit.no_return', r'NO\\s+devuelve.*control', re.IGNORECASE)
+        >>> rule.search(content)
+        >>> for line in guard.format_report():
+        ...     print(line)
+    """
+
+    def __init__(
+        self,
+        call_budget_ms: float = DEFAULT_CALL_BUDGET_MS,
+        total_budget_ms: float = DEFAULT_TOTAL_BUDGET_MS,
+        slow_ms: float = DEFAULT_SLOW_MS,
+        max_gap: int = DEFAULT_MAX_GAP,
+        rewrite: bool = True,
+        strict: bool = False,
+        profiler=None
+    ):
+        """
+        Args:
+            call_budget_ms: Límite por búsqueda; al superarlo la regla se desactiva
+            total_budget_ms: Límite acumulado por regla en cada ámbito (begin_scope)
+            slow_ms: Umbral para reportar una regla como lenta
+            max_gap: N de la reescritura `.*` → `.{0,N}`
+            rewrite: Reescribir gaps no acotados
+            strict: Desactivar al cargar los patrones con riesgo exponencial
+            profiler: RuleProfiler que recibe cada búsqueda (tiempo, bytes, hits)
+        """
+        self.call_budget_ms = call_budget_ms
+        self.total_budget_ms = total_budget_ms
+        self.slow_ms = slow_ms
+        self.max_gap = max_gap
+        self.rewrite = rewrite
+        self.strict = strict
+        self.profiler = profiler or NULL_PROFILER
+        self.stats: Dict[str, Dict] = {}
+        self._cache: Dict[Tuple[str, str, int], GuardedPattern] = {}
+
+    def _rule_stats(self, rule_id: str) -> Dict:
+        if rule_id not in self.stats:
+            self.stats[rule_id] = {
+                'rule_id': rule_id, 'pattern': '', 'rewritten': None, 'findings': [],
+                'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'disabled': None,
+                'permanent': False, 'scope_ms': 0.0, 'disabled_scopes': 0, 'last_disabled': None,
+            }
+        return self.stats[rule_id]
+
+    def compile(self, rule_id: str, pattern: str, flags: int = 0) -> GuardedPattern:
+        """Analiza, reescribe (si procede) y compila un patrón de regla."""
+        key = (rule_id, pattern, flags)
+        if key in self._cache:
+            return self._cache[key]
+
+        # Una regla puede agrupar varios patrones (p.ej. must_contain_any):
+        # las estadísticas y hallazgos se acumulan por regla
+        stats = self._rule_stats(rule_id)
+        findings = analyze_pattern(pattern, flags)
+        effective = pattern
+        if self.rewrite and '.' in pattern:
+            effective = rewrite_unbounded_gaps(pattern, self.max_gap, flags)
+        if findings or not stats['pattern']:
+            stats['pattern'] = pattern
+            stats['rewritten'] = effective if effective != pattern else None
+        stats['findings'].extend(f for f in findings if f not in stats['findings'])
+
+        regex = None
+        try:
+            regex = re.compile(effective, flags)
+        except re.error as e:
+            stats['disabled'] = f"patrón inválido: {e}"
+            stats['permanent'] = True
+        if self.strict and any(f['kind'] in ('nested_quantifier', 'overlapping_alternation')
+                               for f in findings):
+            stats['disabled'] = 'riesgo de backtracking exponencial (modo estricto)'
+            stats['permanent'] = True
+
+        guarded = GuardedPattern(rule_id, pattern, effective, regex, findings, self)
+        self._cache[key] = guarded
+        return guarded
+
+    def search(self, rule_id: str, pattern: str, text: str, flags: int = 0):
+        """Atajo: compile (cacheado) + search."""
+        return self.compile(rule_id, pattern, flags).search(text)
+
+    def is_disabled(self, rule_id: str) -> bool:
+        return bool(self.stats.get(rule_id, {}).get('disabled'))
+
+    def disabled_count(self) -> int:
+        """Número de reglas desactivadas ahora (por patrón o por tiempo en este ámbito)."""
+        return sum(1 for s in self.stats.values() if s['disabled'])
+
+    def begin_scope(self) -> None:
+        """
+        Empieza un ámbito de presupuesto (un archivo o un validate): reinicia el
+        tiempo acumulado por regla y reactiva las reglas desactivadas por tiempo.
+        Las desactivadas por el patrón (inválido, modo estricto) siguen así.
+        """
+        for stats in self.stats.values():
+            stats['scope_ms'] = 0.0
+            if not stats['permanent']:
+                stats['disabled'] = None
+
+    def disabled_in_scope(self) -> List[Dict]:
+        """Reglas desactivadas por tiempo en el ámbito actual: sus checks no se aplicaron."""
+        return [s for s in self.stats.values() if s['disabled'] and not s['permanent']]
+
+    def config_fingerprint(self) -> str:
+        """Configuración que cambia qué patrones se aplican, presupuestos incluidos (versiona resultados)."""
+        return (f"gap={self.max_gap}:rewrite={self.rewrite}:strict={self.strict}"
+                f":call={self.call_budget_ms}:total={self.total_budget_ms}")
+
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _can_use_timer() -> bool:
+        return (hasattr(signal, 'setitimer')
+                and threading.current_thread() is threading.main_thread()
+                and signal.getitimer(signal.ITIMER_REAL)[0] == 0)
+
+    def _run(self, guarded: GuardedPattern, method: str, text: str, *args):
+        stats = self.stats[guarded.rule_id]
+        if stats['disabled'] or guarded.regex is None:
+            return None
+
+        use_timer = self._can_use_timer()
+        if use_timer:
+            def on_alarm(signum, frame):
+                raise RegexTimeout()
+            previous = signal.signal(signal.SIGALRM, on_alarm)
+
+        start = time.perf_counter()
+        result = None
+        timed_out = False
+        try:
+            # Dentro del try: con presupuestos mínimos la alarma puede saltar ya aquí
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, self.call_budget_ms / 1000)
+            if method == 'search':
+                result = guarded.regex.search(text, *args)
+            else:
+                result = list(guarded.regex.finditer(text))
+        except RegexTimeout:
+            timed_out = True
+        finally:
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        stats['calls'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['scope_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        hits = len(result) if isinstance(result, list) else int(result is not None)
+        self.profiler.record(guarded.rule_id, elapsed_ms / 1000, len(text), hits)
+
+        if timed_out or elapsed_ms > self.call_budget_ms:
+            self._disable(stats, f"búsqueda de {elapsed_ms:.0f} ms sobre {len(text)} caracteres "
+                                 f"(límite {self.call_budget_ms:g} ms/llamada)")
+            return None
+        if stats['scope_ms'] > self.total_budget_ms:
+            self._disable(stats, f"{stats['scope_ms']:.0f} ms acumulados en el archivo "
+                                 f"(límite {self.total_budget_ms:g} ms/regla)")
+        return result
+
+    @staticmethod
+    def _disable(stats: Dict, reason: str) -> None:
+        stats['disabled'] = reason
+        stats['last_disabled'] = reason
+        stats['disabled_scopes'] += 1
+
+    # -------------------------------------------------------------------------
+
+    def report(self) -> List[Dict]:
+        """Reglas con riesgos estáticos, lentas o desactivadas (desactivadas y más lentas primero)."""
+        flagged = [
+            s for s in self.stats.values()
+            if s['findings'] or s['disabled'] or s['disabled_scopes'] or s['max_ms'] >= self.slow_ms
+        ]
+        return sorted(flagged, key=lambda s: (not (s['disabled'] or s['disabled_scopes']),
+                                              -s['total_ms'], s['rule_id']))
+
+    def format_report(self) -> List[str]:
+        """Líneas legibles del reporte (vacío si no hay nada que reportar)."""
+        lines = []
+        for s in self.report():
+            if s['permanent']:
+                lines.append(f"⛔ Regla '{s['rule_id']}' desactivada: {s['disabled']}")
+            elif s['disabled_scopes']:
+                lines.append(f"⛔ Regla '{s['rule_id']}' desactivada en {s['disabled_scopes']} archivo(s), "
+                             f"última: {s['last_disabled']}")
+            elif s['max_ms'] >= self.slow_ms:
+                lines.append(f"🐢 Regla '{s['rule_id']}' lenta: máx {s['max_ms']:.1f} ms, "
+                             f"total {s['total_ms']:.1f} ms en {s['calls']} llamadas")
+            for finding in s['findings']:
+                if finding['kind'] != 'invalid':
+                    lines.append(f"⚠️  Regla '{s['rule_id']}': {finding['message']}")
+            if s['rewritten']:
+                lines.append(f"   ↳ reescrita: {s['pattern']!r} → {s['rewritten']!r}")
+        return lines
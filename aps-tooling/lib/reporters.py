@@ -0,0 +1,530 @@
+"""
+Reporters - APS Tooling
+========================
+
+Escritores de reportes de lint en streaming: consola, Markdown, JSON, JUnit y SARIF.
+
+Todos reciben los issues archivo a archivo (start_file → add... → end_file) y
+mantienen los conteos por severidad de forma incremental, así que un lote de
+cientos de agentes no acumula los issues de todos los archivos en memoria ni
+los re-filtra por severidad al final. Solo se retienen los issues del archivo
+en curso (para agruparlos por severidad en consola/Markdown/JUnit).
+
+Un issue es un dict {'location', 'severity' (error|warning|info), 'message'}
+con 'rule' opcional (ID de la regla que lo generó) y, si se conoce la posición
+del bloque en el .md fuente, md_file/md_line/md_end_line/md_offset/md_end_offset
+(ver md_blocks.attach_md_locations).
+
+Uso:
+    >>> reporter = open_reporter('sarif', 'lint.sarif', tool_name='yaml_lint_v6_semantic')
+    >>> for path in files:
+    ...     reporter.report_file(path, validate(path))
+    >>> counts = reporter.close()     # {'error': 3, 'warning': 12, 'info': 1}
+"""
+
+import hashlib
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+from .md_blocks import format_md_location
+
+
+SEVERITIES = ('error', 'warning', 'info')
+
+# Recomendaciones por issue: [(tipo, texto)] con tipo 'action' | 'doc' | 'template'
+Advice = Callable[[Dict], List[Tuple[str, str]]]
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'error': 'error', 'warning': 'warning', 'info': 'note'}
+
+
+def _no_advice(issue: Dict) -> List[Tuple[str, str]]:
+    return []
+
+
+class IssueReporter:
+    """
+    Base de los reporters: conteos incrementales y buffer del archivo en curso.
+
+    Las subclases escriben en `self.stream` desde _begin, _write_file_header,
+    _write_issue, _write_file y _write_footer.
+    """
+
+    # Si False, los issues no se retienen por archivo (se escriben al llegar)
+    buffers_file = True
+
+    def __init__(self, stream: Optional[TextIO] = None, title: str = ''):
+        self.stream = stream or sys.stdout
+        self.title = title
+        self.counts: Counter = Counter({severity: 0 for severity in SEVERITIES})
+        self.files = 0
+        self._current: Optional[str] = None
+        self._file_issues: Dict[str, List[Dict]] = {}
+        self._file_counts: Counter = Counter()
+        self._begun = False
+        self._owned_stream: Optional[TextIO] = None
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def start_file(self, path: Union[str, Path]) -> None:
+        """Abre la sección de un archivo (cierra la anterior si sigue abierta)."""
+        if self._current is not None:
+            self.end_file()
+        self._ensure_begun()
+        self._current = str(path)
+        self._file_issues = {severity: [] for severity in SEVERITIES}
+        self._file_counts = Counter()
+        self.files += 1
+        self._write_file_header(self._current)
+
+    def add(self, issue: Dict) -> None:
+        """Registra un issue del archivo en curso."""
+        severity = issue['severity']
+        self.counts[severity] += 1
+        self._file_counts[severity] += 1
+        if self.buffers_file:
+            self._file_issues.setdefault(severity, []).append(issue)
+        else:
+            self._write_issue(issue)
+
+    def end_file(self) -> None:
+        """Cierra la sección del archivo en curso."""
+        if self._current is None:
+            return
+        self._write_file(self._current, self._file_issues)
+        self._current = None
+        self._file_issues = {}
+
+    def report_file(self, path: Union[str, Path], issues: Iterable[Dict]) -> None:
+        """Atajo: start_file + add de cada issue + end_file."""
+        self.start_file(path)
+        for issue in issues:
+            self.add(issue)
+        self.end_file()
+
+    def close(self) -> Dict[str, int]:
+        """Escribe el pie (resumen) y retorna los conteos por severidad."""
+        self.end_file()
+        self._ensure_begun()
+        self._write_footer()
+        self.stream.flush()
+        if self._owned_stream is not None:
+            self._owned_stream.close()
+        return dict(self.counts)
+
+    # =========================================================================
+    # GANCHOS
+    # =========================================================================
+
+    def _ensure_begun(self) -> None:
+        if not self._begun:
+            self._begun = True
+            self._begin()
+
+    def _begin(self) -> None:
+        pass
+
+    def _write_file_header(self, path: str) -> None:
+        pass
+
+    def _write_issue(self, issue: Dict) -> None:
+        pass
+
+    def _write_file(self, path: str, issues: Dict[str, List[Dict]]) -> None:
+        pass
+
+    def _write_footer(self) -> None:
+        pass
+
+    def _status(self) -> Tuple[str, str, str]:
+        """(icono, estado, próximo paso) según los conteos acumulados."""
+        if self.counts['error']:
+            return ('🚫', 'VALIDACIÓN FALLIDA - Bloquea integración',
+                    'Corregir errores críticos en archivos .md fuente')
+        if self.counts['warning']:
+            return ('⚠️ ', 'VALIDACIÓN CON WARNINGS - Requiere revisión',
+                    'Revisar warnings antes de integrar')
+        return ('✅', 'LISTO PARA INTEGRACIÓN', '')
+
+
+# =============================================================================
+# CONSOLA
+# =============================================================================
+
+class ConsoleReporter(IssueReporter):
+    """Reporte de terminal: issues de cada archivo al terminar de validarlo, resumen al final."""
+
+    ADVICE_LABELS = {'action': '💡 Acción', 'doc': '📖 Ver', 'template': '📝 Template'}
+
+    def __init__(self, stream: Optional[TextIO] = None, title: str = '', advice: Advice = _no_advice):
+        super().__init__(stream, title)
+        self.advice = advice
+
+    def _print(self, text: str = '') -> None:
+        self.stream.write(text + '\n')
+
+    def _write_file(self, path: str, issues: Dict[str, List[Dict]]) -> None:
+        sections = (
+            ('error', '❌ ERRORES CRÍTICOS', '❌'),
+            ('warning', '⚠️  WARNINGS', '⚠️ '),
+        )
+        for severity, heading, icon in sections:
+            if not issues[severity]:
+                continue
+            # Numeración continua en todo el lote
+            first = self.counts[severity] - len(issues[severity]) + 1
+            self._print(f"\n{heading}: {len(issues[severity])}")
+            self._print("-" * 80)
+            for idx, issue in enumerate(issues[severity], first):
+                where = format_md_location(issue)
+                self._print(f"\n{idx}. 📍 Ubicación: {issue['location']}" + (f" ({where})" if where else ''))
+                self._print(f"   {icon} Problema: {issue['message']}")
+                for kind, text in self.advice(issue):
+                    self._print(f"   {self.ADVICE_LABELS[kind]}: {text}")
+
+        if issues['info']:
+            self._print(f"\nℹ️  INFORMACIÓN: {len(issues['info'])}")
+            self._print("-" * 80)
+            for issue in issues['info']:
+                self._print(f"\n   ℹ️  {issue['message']}")
+                for kind, text in self.advice(issue):
+                    self._print(f"   {self.ADVICE_LABELS[kind]}: {text}")
+
+        if not any(issues.values()):
+            self._print("\n✅ Sin problemas detectados")
+        self._print()
+
+    def _write_footer(self) -> None:
+        icon, status, next_step = self._status()
+        self._print("=" * 80)
+        self._print("📊 RESUMEN EJECUTIVO")
+        self._print("=" * 80)
+        self._print(f"   📄 Archivos:          {self.files}")
+        self._print(f"   ❌ Errores críticos:  {self.counts['error']}")
+        self._print(f"   ⚠️  Warnings:          {self.counts['warning']}")
+        self._print(f"   ℹ️  Información:       {self.counts['info']}")
+        self._print(f"\n   {icon} Estado: {status}")
+        if next_step:
+            self._print(f"   📝 Próximo paso: {next_step}")
+        self._print("=" * 80 + "\n")
+
+
+# =============================================================================
+# MARKDOWN
+# =============================================================================
+
+class MarkdownReporter(IssueReporter):
+    """Reporte Markdown: una sección por archivo y el resumen ejecutivo al final."""
+
+    ADVICE_LABELS = {'action': 'Acción recomendada', 'doc': 'Documentación', 'template': 'Template SID'}
+
+    def __init__(self, stream: Optional[TextIO] = None, title: str = '', advice: Advice = _no_advice,
+                 generator: str = ''):
+        super().__init__(stream, title or 'Reporte de Validación')
+        self.advice = advice
+        self.generator = generator
+
+    def _advice_lines(self, issue: Dict) -> str:
+        return ''.join(
+            f"**{self.ADVICE_LABELS[kind]}**: {text if kind == 'action' else f'`{text}`'}\n\n"
+            for kind, text in self.advice(issue)
+        )
+
+    def _begin(self) -> None:
+        self.stream.write(f"# {self.title}\n\n")
+        self.stream.write(f"**Fecha**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n")
+
+    def _write_file(self, path: str, issues: Dict[str, List[Dict]]) -> None:
+        n_err, n_warn, n_info = (len(issues[s]) for s in SEVERITIES)
+        parts = [f"## 📄 `{path}`\n\n",
+                 f"❌ {n_err} errores · ⚠️  {n_warn} warnings · ℹ️  {n_info} información\n\n"]
+
+        for severity, heading in (('error', '### ❌ Errores Críticos'), ('warning', '### ⚠️  Warnings')):
+            if not issues[severity]:
+                continue
+            parts.append(f"{heading}\n\n")
+            first = self.counts[severity] - len(issues[severity]) + 1
+            for idx, issue in enumerate(issues[severity], first):
+                where = format_md_location(issue)
+                parts.append(f"#### {idx}. {issue['location']}" + (f" (`{where}`)" if where else '') + "\n\n")
+                parts.append(f"**Problema**: {issue['message']}\n\n")
+                parts.append(self._advice_lines(issue))
+
+        if issues['info']:
+            parts.append("### ℹ️  Información\n\n")
+            for issue in issues['info']:
+                parts.append(f"- {issue['message']}\n")
+                for kind, text in self.advice(issue):
+                    parts.append(f"  - **{self.ADVICE_LABELS[kind]}**: {text}\n")
+            parts.append("\n")
+
+        parts.append("---\n\n")
+        self.stream.write(''.join(parts))
+
+    def _write_footer(self) -> None:
+        icon, status, next_step = self._status()
+        parts = [
+            "## 📊 Resumen Ejecutivo\n\n",
+            f"- 📄 **Archivos validados**: {self.files}\n",
+            f"- ❌ **Errores críticos**: {self.counts['error']}\n",
+            f"- ⚠️  **Warnings**: {self.counts['warning']}\n",
+            f"- ℹ️  **Información**: {self.counts['info']}\n\n",
+            f"**Estado**: {icon} {status}\n\n",
+        ]
+        if next_step:
+            parts.append(f"**Próximo paso**: {next_step}\n\n")
+        if self.generator:
+            parts.append(f"---\n\n*Generado por {self.generator}*\n")
+        self.stream.write(''.join(parts))
+
+
+# =============================================================================
+# JSON
+# =============================================================================
+
+class JSONReporter(IssueReporter):
+    """
+    JSON en streaming: {"files": [{"file", "issues": [...]}, ...], "summary": {...}}.
+    Cada issue se escribe al llegar.
+    """
+
+    buffers_file = False
+
+    def _begin(self) -> None:
+        self.stream.write('{\n  "files": [')
+
+    def _write_file_header(self, path: str) -> None:
+        sep = ',' if self.files > 1 else ''
+        self.stream.write(f'{sep}\n    {{"file": {json.dumps(path, ensure_ascii=False)}, "issues": [')
+        self._first_issue = True
+
+    def _write_issue(self, issue: Dict) -> None:
+        sep = '' if self._first_issue else ','
+        self._first_issue = False
+        self.stream.write(f'{sep}\n      {json.dumps(issue, ensure_ascii=False)}')
+
+    def _write_file(self, path: str, issues: Dict[str, List[Dict]]) -> None:
+        counts = json.dumps({s: self._file_counts[s] for s in SEVERITIES})
+        close = ']' if self._first_issue else '\n    ]'
+        self.stream.write(f'{close}, "counts": {counts}}}')
+
+    def _write_footer(self) -> None:
+        summary = {'files': self.files, **{s: self.counts[s] for s in SEVERITIES}}
+        self.stream.write(f'\n  ],\n  "summary": {json.dumps(summary)}\n}}\n')
+
+
+# =============================================================================
+# JUNIT
+# =============================================================================
+
+class JUnitReporter(IssueReporter):
+    """
+    JUnit XML: un <testsuite> por archivo y un <testcase> por issue.
+    Los errores son <failure>; warnings e info quedan como casos aprobados con
+    <system-out>, de modo que el CI solo falla por errores. Un archivo sin
+    issues produce un único caso aprobado.
+    """
+
+    def _begin(self) -> None:
+        # Import diferido: xml.sax.saxutils arrastra urllib.request, http.client y email
+        from xml.sax.saxutils import quoteattr
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.stream.write(f'<testsuites name={quoteattr(self.title or "aps-lint")}>\n')
+
+    def _write_file(self, path: str, issues: Dict[str, List[Dict]]) -> None:
+        from xml.sax.saxutils import escape, quoteattr
+        all_issues = [issue for severity in SEVERITIES for issue in issues[severity]]
+        tests = max(1, len(all_issues))
+        parts = [f'  <testsuite name={quoteattr(path)} tests="{tests}" '
+                 f'failures="{len(issues["error"])}" errors="0">\n']
+        if not all_issues:
+            parts.append(f'    <testcase classname={quoteattr(path)} name="validación"/>\n')
+        for issue in all_issues:
+            name = f"{issue.get('rule', issue['severity'])}: {issue['location']}"
+            parts.append(f'    <testcase classname={quoteattr(path)} name={quoteattr(name)}>\n')
+            if issue['severity'] == 'error':
+                parts.append(f'      <failure type="error" message={quoteattr(issue["message"])}>'
+                             f'{escape(issue["message"])}</failure>\n')
+            else:
+                parts.append(f'      <system-out>{escape(issue["severity"].upper())}: '
+                             f'{escape(issue["message"])}</system-out>\n')
+            parts.append('    </testcase>\n')
+        parts.append('  </testsuite>\n')
+        self.stream.write(''.join(parts))
+
+    def _write_footer(self) -> None:
+        self.stream.write('</testsuites>\n')
+
+
+# =============================================================================
+# SARIF
+# =============================================================================
+
+class SarifReporter(IssueReporter):
+    """
+    SARIF 2.1.0 en streaming: los resultados se escriben al llegar y el bloque
+    `tool` (metadatos de reglas) se escribe al final del run.
+
+    - Ubicación: si el issue no trae 'line', se toma de las marcas del YAML
+      (yaml_cache.block_marks, calculadas una vez por archivo) según el bloque
+      de 'location' ("A vs B" → A; GLOBAL → clave 'blocks')
+    - relatedLocations: el bloque en el .md fuente (líneas y bytes) si el issue trae md_line
+    - partialFingerprints["apsRuleSid/v1"]: hash de regla + SID del bloque (o
+      regla + ubicación + mensaje si no hay SID), con un ordinal si se repite en
+      el archivo. No depende de líneas, así que sobrevive a ediciones de otros bloques
+    """
+
+    buffers_file = False
+
+    FINGERPRINT_KEY = 'apsRuleSid/v1'
+
+    def __init__(self, stream: Optional[TextIO] = None, title: str = '', tool_name: str = 'aps-lint',
+                 tool_version: str = '', rules: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        Args:
+            tool_name / tool_version: tool.driver
+            rules: {rule_id: (severidad por defecto, descripción)} del linter.
+                   Las reglas no declaradas que aparezcan se añaden sin descripción
+        """
+        super().__init__(stream, title)
+        self.tool_name = tool_name
+        self.tool_version = tool_version
+        self._rules: Dict[str, Dict] = {}
+        self._rule_index: Dict[str, int] = {}
+        for rule_id, (severity, description) in (rules or {}).items():
+            self._declare_rule(rule_id, {
+                'id': rule_id,
+                'shortDescription': {'text': description},
+                'defaultConfiguration': {'level': SARIF_LEVELS.get(severity.lower(), 'note')},
+            })
+        self._first_result = True
+        self._marks: Dict[str, Dict] = {}
+        self._fingerprints: Counter = Counter()
+
+    def _declare_rule(self, rule_id: str, descriptor: Dict) -> int:
+        if rule_id not in self._rule_index:
+            self._rule_index[rule_id] = len(self._rules)
+            self._rules[rule_id] = descriptor
+        return self._rule_index[rule_id]
+
+    def _begin(self) -> None:
+        self.stream.write(f'{{\n  "$schema": "{SARIF_SCHEMA}",\n  "version": "2.1.0",\n'
+                          f'  "runs": [\n    {{\n      "columnKind": "unicodeCodePoints",\n'
+                          f'      "results": [')
+
+    def _write_file_header(self, path: str) -> None:
+        from .yaml_cache import block_marks
+        self._marks = block_marks(path) if path.endswith(('.yaml', '.yml')) else {}
+        self._fingerprints = Counter()
+
+    def _block_mark(self, location: str) -> Optional[Dict]:
+        """Marca del bloque al que se refiere una ubicación de issue."""
+        if location in self._marks:
+            return self._marks[location]
+        first = location.split(' vs ', 1)[0]
+        if first in self._marks:
+            return self._marks[first]
+        return self._marks.get('')
+
+    def _fingerprint(self, rule_id: str, issue: Dict, sid: Optional[str]) -> str:
+        basis = f"{rule_id}\x00{sid}" if sid else f"{rule_id}\x00{issue['location']}\x00{issue['message']}"
+        digest = hashlib.sha256(basis.encode('utf-8')).hexdigest()[:32]
+        self._fingerprints[digest] += 1
+        return f"{digest}:{self._fingerprints[digest]}"
+
+    @staticmethod
+    def _md_related_location(issue: Dict) -> Dict:
+        region = {'startLine': issue['md_line'], 'endLine': issue.get('md_end_line', issue['md_line'])}
+        if issue.get('md_end_offset') is not None:
+            region['byteOffset'] = issue['md_offset']
+            region['byteLength'] = issue['md_end_offset'] - issue['md_offset']
+        return {
+            'id': 1,
+            'physicalLocation': {'artifactLocation': {'uri': Path(issue['md_file']).as_posix()},
+                                 'region': region},
+            'message': {'text': 'Bloque en el .md fuente'},
+        }
+
+    def _write_issue(self, issue: Dict) -> None:
+        rule_id = issue.get('rule') or issue['severity']
+        rule_index = self._declare_rule(rule_id, {'id': rule_id})
+        mark = self._block_mark(issue['location'])
+        sid = issue.get('sid') or (mark or {}).get('sid')
+
+        physical = {'artifactLocation': {'uri': Path(self._current).as_posix()}}
+        position = issue if issue.get('line') else (mark or {})
+        if position.get('line'):
+            region = {'startLine': position['line']}
+            if position.get('column'):
+                region['startColumn'] = position['column']
+            if position.get('end_line'):
+                region['endLine'] = position['end_line']
+            physical['region'] = region
+
+        result = {
+            'ruleId': rule_id,
+            'ruleIndex': rule_index,
+            'level': SARIF_LEVELS.get(issue['severity'], 'note'),
+            'message': {'text': issue['message']},
+            'locations': [{
+                'physicalLocation': physical,
+                'logicalLocations': [{'name': issue['location'], 'kind': 'member'}],
+            }],
+            'partialFingerprints': {self.FINGERPRINT_KEY: self._fingerprint(rule_id, issue, sid)},
+        }
+        if issue.get('md_line'):
+            result['relatedLocations'] = [self._md_related_location(issue)]
+        if sid:
+            result['properties'] = {'sid': sid}
+        sep = '' if self._first_result else ','
+        self._first_result = False
+        self.stream.write(f'{sep}\n        {json.dumps(result, ensure_ascii=False)}')
+
+    def _write_footer(self) -> None:
+        driver = {'name': self.tool_name, 'rules': list(self._rules.values())}
+        if self.tool_version:
+            driver['version'] = self.tool_version
+        tool = json.dumps({'driver': driver}, ensure_ascii=False)
+        self.stream.write(f'\n      ],\n      "tool": {tool}\n    }}\n  ]\n}}\n')
+
+
+# =============================================================================
+# FÁBRICA
+# =============================================================================
+
+REPORTERS = {
+    'markdown': MarkdownReporter,
+    'json': JSONReporter,
+    'junit': JUnitReporter,
+    'sarif': SarifReporter,
+}
+
+REPORT_SUFFIXES = {'markdown': '.md', 'json': '.json', 'junit': '.xml', 'sarif': '.sarif'}
+
+
+def open_reporter(fmt: str, path: Optional[Union[str, Path]] = None, **kwargs) -> IssueReporter:
+    """
+    Crea un reporter del formato dado escribiendo en `path` (o stdout si es None).
+
+    Args:
+        fmt: 'markdown' | 'json' | 'junit' | 'sarif'
+        path: Archivo de salida
+        **kwargs: Argumentos del reporter (title, advice, tool_name...)
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    if fmt not in REPORTERS:
+        raise ValueError(f"Formato de reporte desconocido: '{fmt}' (opciones: {', '.join(REPORTERS)})")
+    if path is None:
+        return REPORTERS[fmt](**kwargs)
+    handle = open(path, 'w', encoding='utf-8')
+    reporter = REPORTERS[fmt](handle, **kwargs)
+    reporter._owned_stream = handle  # close() cierra el archivo
+    return reporter
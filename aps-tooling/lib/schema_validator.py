@@ -5,11 +5,20 @@ Schema Validator - APS Tooling
 Validador de schemas YAML contra aps_agent_schema_v1.yaml y otros schemas.
 """
 
-import yaml
 import jsonschema
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+from .yaml_cache import load_yaml
+from .tracing import traced
+
+
+def _trace_attrs(data, errors: List[Dict]) -> Dict:
+    """Atributos del span de validate_data: agente, bloques y errores."""
+    agent = data.get('agent') if isinstance(data, dict) else None
+    agent = agent if isinstance(agent, dict) else {}
+    return {'agent': agent.get('name'), 'blocks': len(agent.get('blocks') or {}), 'errors': len(errors)}
+
 
 class SchemaValidator:
     """
@@ -51,11 +60,11 @@ class SchemaValidator:
         if not self.schema_path.exists():
             raise FileNotFoundError(f"Schema no encontrado: {self.schema_path}")
         
-        with open(self.schema_path, 'r', encoding='utf-8') as f:
-            self.schema = yaml.safe_load(f)
+        self.schema = load_yaml(self.schema_path, copy=False)
         
         return self.schema
     
+    @traced('schema_validator.validate_data', lambda errors, self, data: _trace_attrs(data, errors))
     def validate_data(self, data: Dict) -> List[Dict]:
         """
         Valida un diccionario contra el schema.
@@ -104,8 +113,7 @@ class SchemaValidator:
         if not filepath.exists():
             raise FileNotFoundError(f"Archivo no encontrado: {filepath}")
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        data = load_yaml(filepath, copy=False)
         
         return self.validate_data(data)
     
@@ -304,8 +312,7 @@ class APSValidator(SchemaValidator):
         """
         filepath = Path(filepath)
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        data = load_yaml(filepath, copy=False)
         
         schema_errors = self.validate_data(data)
         duplicate_sids = self.validate_sids_unique(data)
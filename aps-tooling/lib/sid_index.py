@@ -0,0 +1,173 @@
+"""
+SID Index - APS Tooling
+========================
+
+Índice persistente de SIDs (SID → archivo, línea, sha1) en SQLite local.
+
+Permite que la asignación de SIDs sea incremental (solo se re-escanean los
+archivos cuyo hash de contenido cambió) y que la detección de colisiones
+(_A, _B, ...) sea global a todo el repositorio, no solo al archivo actual.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+DEFAULT_INDEX_PATH = Path('.aps_cache') / 'sid_index.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    sha1 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sids (
+    sid  TEXT NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    sha1 TEXT,
+    PRIMARY KEY (sid, path)
+);
+CREATE INDEX IF NOT EXISTS idx_sids_path ON sids(path);
+"""
+
+
+def content_sha1(content: str) -> str:
+    """SHA1 completo del contenido de un archivo (clave de re-escaneo)."""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class SIDIndex:
+    """
+    Índice persistente de SIDs respaldado por SQLite.
+
+    Ejemplo:
+        >>> index = SIDIndex()
+        >>> if index.needs_rescan('agent.md', sha1):
+        ...     index.replace_file('agent.md', sha1, [('G_X_1A2B', 12, '1a2b3c4d')])
+        >>> index.is_taken('G_X_1A2B')
+        True
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Abre (o crea) el índice.
+
+        Args:
+            db_path: Ruta al archivo SQLite. Si es None, usa .aps_cache/sid_index.sqlite
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_INDEX_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        """Normaliza la ruta usada como clave."""
+        return str(Path(path).resolve())
+
+    # =========================================================================
+    # ARCHIVOS
+    # =========================================================================
+
+    def get_file_hashes(self) -> Dict[str, str]:
+        """Retorna {ruta: sha1} de todos los archivos indexados."""
+        return dict(self._conn.execute('SELECT path, sha1 FROM files'))
+
+    def needs_rescan(self, path: Union[str, Path], sha1: str) -> bool:
+        """True si el archivo no está indexado o su contenido cambió."""
+        row = self._conn.execute(
+            'SELECT sha1 FROM files WHERE path = ?', (self._key(path),)
+        ).fetchone()
+        return row is None or row[0] != sha1
+
+    def replace_file(
+        self,
+        path: Union[str, Path],
+        sha1: Optional[str],
+        markers: Iterable[Tuple[str, int, Optional[str]]]
+    ) -> None:
+        """
+        Sustituye todas las entradas de un archivo en una sola transacción.
+
+        Args:
+            path: Ruta del archivo Markdown
+            sha1: Hash del contenido. Si es None, el archivo queda pendiente
+                  de re-escaneo en la próxima ejecución.
+            markers: Iterable de (sid, línea, sha1_item)
+        """
+        key = self._key(path)
+        with self._conn:
+            self._conn.execute('DELETE FROM sids WHERE path = ?', (key,))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO sids (sid, path, line, sha1) VALUES (?, ?, ?, ?)',
+                ((sid, key, line, item_sha1) for sid, line, item_sha1 in markers)
+            )
+            if sha1 is None:
+                self._conn.execute('DELETE FROM files WHERE path = ?', (key,))
+            else:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO files (path, sha1) VALUES (?, ?)', (key, sha1)
+                )
+
+    def prune_missing(self) -> int:
+        """
+        Elimina del índice los archivos que ya no existen en disco.
+
+        Returns:
+            Número de archivos eliminados
+        """
+        missing = [p for (p,) in self._conn.execute('SELECT path FROM files') if not Path(p).exists()]
+        with self._conn:
+            for p in missing:
+                self._conn.execute('DELETE FROM sids WHERE path = ?', (p,))
+                self._conn.execute('DELETE FROM files WHERE path = ?', (p,))
+        return len(missing)
+
+    # =========================================================================
+    # SIDs
+    # =========================================================================
+
+    def is_taken(self, sid: str, exclude: Optional[Union[str, Path]] = None) -> bool:
+        """
+        True si el SID ya está asignado en cualquier archivo indexado.
+
+        Args:
+            exclude: Ignorar las entradas de este archivo (p.ej. el que se está re-escaneando)
+        """
+        if exclude is None:
+            row = self._conn.execute('SELECT 1 FROM sids WHERE sid = ?', (sid,)).fetchone()
+        else:
+            row = self._conn.execute(
+                'SELECT 1 FROM sids WHERE sid = ? AND path != ?', (sid, self._key(exclude))
+            ).fetchone()
+        return row is not None
+
+    def lookup(self, sid: str) -> Optional[Dict]:
+        """
+        Retorna la ubicación de un SID (la primera, si está duplicado entre archivos).
+
+        Returns:
+            {'sid', 'path', 'line', 'sha1'} o None si no existe
+        """
+        row = self._conn.execute(
+            'SELECT sid, path, line, sha1 FROM sids WHERE sid = ? ORDER BY path LIMIT 1', (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'sid': row[0], 'path': row[1], 'line': row[2], 'sha1': row[3]}
+
+    def get_file_sids(self, path: Union[str, Path]) -> List[str]:
+        """Retorna los SIDs indexados de un archivo, ordenados por línea."""
+        return [sid for (sid,) in self._conn.execute(
+            'SELECT sid FROM sids WHERE path = ? ORDER BY line', (self._key(path),)
+        )]
+
+    def count(self) -> int:
+        """Número total de SIDs indexados."""
+        return self._conn.execute('SELECT COUNT(*) FROM sids').fetchone()[0]
+
+    def close(self) -> None:
+        """Cierra la conexión SQLite."""
+        self._conn.close()
@@ -0,0 +1,134 @@
+"""
+SID Inference - APS Tooling
+============================
+
+Inferencia determinista de accion/relacion/nivel por puntuación de palabras clave.
+
+Cada bloque se tokeniza una sola vez y las tres dimensiones se puntúan en la
+misma pasada mediante un índice invertido (palabra clave → dimensión/valor).
+Se elige el argmax por dimensión y la confianza combina la evidencia
+(ganador claro) con ConfidenceSystem (término en vocabulario).
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .confidence_system import ConfidenceSystem, ConfidenceLevel
+
+
+DIMENSIONS = ('accion', 'relacion', 'nivel')
+
+# El nombre del bloque (encabezado) pesa más que el contenido
+NAME_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens en minúsculas (palabras Unicode, '_' incluido)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class RuleBasedSIDInferencer:
+    """
+    Motor de inferencia de SIDs por palabras clave.
+
+    Ejemplo:
+        >>> inferencer = RuleBasedSIDInferencer(ACCION_KEYWORDS, RELACION_KEYWORDS, NIVEL_KEYWORDS)
+        >>> result = inferencer.infer('Entry Guard', 'Verificar control.active_agent...', 'BLK')
+        >>> result['sid'], result['confidence']
+        ('BLK.verificar.control.active_agent.guard', <ConfidenceLevel.HIGH: 'HIGH'>)
+    """
+
+    def __init__(
+        self,
+        accion_keywords: Dict[str, List[str]],
+        relacion_keywords: Dict[str, List[str]],
+        nivel_keywords: Dict[str, List[str]],
+        confidence_system: Optional[ConfidenceSystem] = None
+    ):
+        """
+        Args:
+            accion_keywords: {accion: [palabras clave]}
+            relacion_keywords: {relacion: [palabras clave]}
+            nivel_keywords: {nivel: [palabras clave]}
+            confidence_system: ConfidenceSystem (si es None, crea uno)
+        """
+        self.cs = confidence_system or ConfidenceSystem()
+        self.max_ngram = 1
+        # Índice invertido: tupla de tokens → [(dimensión, valor)]
+        self._index: Dict[Tuple[str, ...], List[Tuple[str, str]]] = defaultdict(list)
+        self._order: Dict[str, Dict[str, int]] = {}
+
+        for dimension, keywords in zip(DIMENSIONS, (accion_keywords, relacion_keywords, nivel_keywords)):
+            self._order[dimension] = {value: i for i, value in enumerate(keywords)}
+            for value, words in keywords.items():
+                for word in words:
+                    key = tuple(tokenize(word))
+                    if key:
+                        self._index[key].append((dimension, value))
+                        self.max_ngram = max(self.max_ngram, len(key))
+
+    def score(self, block_name: str, content: str) -> Dict[str, Dict[str, int]]:
+        """
+        Puntúa las tres dimensiones en una sola pasada por los tokens.
+
+        Returns:
+            {dimensión: {valor: puntuación}}
+        """
+        scores = {dimension: defaultdict(int) for dimension in DIMENSIONS}
+        for tokens, weight in ((tokenize(block_name), NAME_WEIGHT), (tokenize(content), 1)):
+            for i in range(len(tokens)):
+                for n in range(1, self.max_ngram + 1):
+                    hits = self._index.get(tuple(tokens[i:i + n]))
+                    if hits:
+                        for dimension, value in hits:
+                            scores[dimension][value] += weight
+        return scores
+
+    def _argmax(self, dimension: str, scores: Dict[str, int]) -> Tuple[Optional[str], bool]:
+        """(ganador, decisivo). Empates se resuelven por el orden del diccionario."""
+        if not scores:
+            return None, False
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], self._order[dimension][kv[0]]))
+        decisive = len(ranked) == 1 or ranked[0][1] > ranked[1][1]
+        return ranked[0][0], decisive
+
+    def infer(self, block_name: str, content: str, block_type: str) -> Dict:
+        """
+        Infiere accion/relacion/nivel/sid de un bloque.
+
+        Returns:
+            {
+                'accion', 'relacion', 'nivel': str o None,
+                'sid': str o None,
+                'confidence': ConfidenceLevel,
+                'evaluation': Dict (ConfidenceSystem) o None,
+                'scores': {dimensión: {valor: puntuación}}
+            }
+        """
+        scores = self.score(block_name, content)
+        result = {'scores': scores, 'evaluation': None, 'sid': None}
+        decisive = True
+        for dimension in DIMENSIONS:
+            value, clear = self._argmax(dimension, scores[dimension])
+            result[dimension] = value
+            decisive = decisive and clear
+
+        if not all(result[d] for d in DIMENSIONS):
+            result['confidence'] = ConfidenceLevel.LOW
+            return result
+
+        evaluation = self.cs.evaluate_sid_complete(
+            result['accion'], result['relacion'], result['nivel'], content, block_type
+        )
+        confidence = evaluation['overall_confidence']
+        # Sin ganador claro en alguna dimensión, nunca HIGH
+        if not decisive and confidence == ConfidenceLevel.HIGH:
+            confidence = ConfidenceLevel.MEDIUM
+
+        result['evaluation'] = evaluation
+        result['confidence'] = confidence
+        result['sid'] = f"{block_type}.{result['accion']}.{result['relacion']}.{result['nivel']}"
+        return result
@@ -0,0 +1,401 @@
+"""
+SID Registry - APS Tooling
+===========================
+
+Registro central de SIDs del repositorio respaldado por SQLite.
+
+Registra cada SID con su archivo fuente, nombre de bloque, sha1 del contenido
+e historial (alta, renombrado, baja). Responde mediante consultas indexadas:
+- ¿Quién es el dueño de este SID?          → owner()
+- ¿Está libre este SID?                     → is_free()
+- ¿De qué SID fue renombrado?               → renamed_from()
+
+Los SIDs viven en un `scope`: '' (global) para los marcadores Markdown de
+md_sid_assign, y el nombre del agente para los SIDs semánticos de los YAML
+(que solo deben ser únicos dentro de su agente).
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+
+DEFAULT_REGISTRY_PATH = Path('.aps_cache') / 'sid_registry.sqlite'
+
+GLOBAL_SCOPE = ''
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sids (
+    scope        TEXT NOT NULL,
+    sid          TEXT NOT NULL,
+    source_file  TEXT NOT NULL,
+    block_name   TEXT NOT NULL,
+    content_sha1 TEXT,
+    origin       TEXT,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (scope, sid)
+);
+CREATE INDEX IF NOT EXISTS idx_sids_block ON sids(scope, source_file, block_name);
+CREATE INDEX IF NOT EXISTS idx_sids_sha1 ON sids(content_sha1);
+
+CREATE TABLE IF NOT EXISTS sid_history (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope        TEXT NOT NULL,
+    sid          TEXT NOT NULL,
+    previous_sid TEXT,
+    event        TEXT NOT NULL,
+    source_file  TEXT,
+    block_name   TEXT,
+    content_sha1 TEXT,
+    at           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_sid ON sid_history(scope, sid);
+"""
+
+
+def is_placeholder_sid(sid: Optional[str]) -> bool:
+    """True para SIDs vacíos o temporales (TEMP_*), que no se registran."""
+    return not sid or sid.startswith('TEMP_') or sid == '<<PENDING_AI>>'
+
+
+def sha1_text(text: str) -> str:
+    """SHA1 del contenido de un bloque (normalizado con strip)."""
+    return hashlib.sha1(str(text).strip().encode('utf-8')).hexdigest()
+
+
+def agent_yaml_entries(data: Dict) -> List[Dict]:
+    """
+    Construye las entradas de registro de un YAML de agente (agent.blocks).
+
+    Returns:
+        Lista de {'sid', 'block_name', 'content_sha1'}
+    """
+    agent = data.get('agent', data) if isinstance(data, dict) else {}
+    blocks = agent.get('blocks', {}) or {}
+    return [
+        {
+            'sid': block.get('sid'),
+            'block_name': block_name,
+            'content_sha1': sha1_text(block.get('content', '')),
+        }
+        for block_name, block in blocks.items()
+        if isinstance(block, dict)
+    ]
+
+
+class SIDRegistry:
+    """
+    Registro central de SIDs con historial de renombrados.
+
+    Ejemplo:
+        >>> registry = SIDRegistry()
+        >>> registry.register('BLK.verificar.control.active_agent.guard',
+        ...                   'agent.md', 'Entry Guard', sha1, scope='J2Ci-Greeter')
+        True
+        >>> registry.sync_file('agent.md', [{'sid': ..., 'block_name': ...}], scope='J2Ci-Greeter')
+        {'registered': 0, 'renamed': 1, 'released': 0, 'conflicts': []}
+        >>> registry.owner('BLK.verificar.control.active_agent.guard', scope='J2Ci-Greeter')
+        {'sid': ..., 'source_file': '/ruta/absoluta/agent.md', 'block_name': 'Entry Guard', ...}
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Abre (o crea) el registro.
+
+        Args:
+            db_path: Ruta al archivo SQLite. Si es None, usa .aps_cache/sid_registry.sqlite
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_REGISTRY_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        """Normaliza la ruta del archivo fuente (misma clave con cualquier CWD o grafía)."""
+        return str(Path(path).resolve())
+
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+
+    def owner(self, sid: str, scope: str = GLOBAL_SCOPE) -> Optional[Dict]:
+        """
+        Retorna el dueño actual de un SID.
+
+        Returns:
+            {'sid', 'scope', 'source_file', 'block_name', 'content_sha1', 'origin',
+             'updated_at'} o None si el SID está libre
+        """
+        row = self._conn.execute(
+            'SELECT * FROM sids WHERE scope = ? AND sid = ?', (scope, sid)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def is_free(self, sid: str, scope: str = GLOBAL_SCOPE) -> bool:
+        """True si el SID no está asignado en el scope."""
+        return self._conn.execute(
+            'SELECT 1 FROM sids WHERE scope = ? AND sid = ?', (scope, sid)
+        ).fetchone() is None
+
+    def sid_for_block(self, source_file: str, block_name: str,
+                      scope: str = GLOBAL_SCOPE) -> Optional[str]:
+        """Retorna el SID registrado para un bloque concreto (o None)."""
+        row = self._conn.execute(
+            'SELECT sid FROM sids WHERE scope = ? AND source_file = ? AND block_name = ?',
+            (scope, self._key(source_file), block_name)
+        ).fetchone()
+        return row['sid'] if row else None
+
+    def renamed_from(self, sid: str, scope: str = GLOBAL_SCOPE) -> Optional[str]:
+        """Retorna el SID anterior del último renombrado hacia `sid` (o None)."""
+        row = self._conn.execute(
+            "SELECT previous_sid FROM sid_history "
+            "WHERE scope = ? AND sid = ? AND event = 'rename' ORDER BY id DESC LIMIT 1",
+            (scope, sid)
+        ).fetchone()
+        return row['previous_sid'] if row else None
+
+    def history(self, sid: str, scope: str = GLOBAL_SCOPE) -> List[Dict]:
+        """Retorna el historial de eventos de un SID en orden cronológico."""
+        return [dict(row) for row in self._conn.execute(
+            'SELECT * FROM sid_history WHERE scope = ? AND sid = ? ORDER BY id', (scope, sid)
+        )]
+
+    def count(self, scope: Optional[str] = None) -> int:
+        """Número de SIDs registrados (en un scope, o en total)."""
+        if scope is None:
+            return self._conn.execute('SELECT COUNT(*) FROM sids').fetchone()[0]
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM sids WHERE scope = ?', (scope,)
+        ).fetchone()[0]
+
+    # =========================================================================
+    # REGISTRO
+    # =========================================================================
+
+    def _register_one(self, entry: Dict, now: str) -> Optional[Dict]:
+        """
+        Registra una entrada dentro de la transacción en curso.
+
+        Returns:
+            None si se registró, o el dueño en conflicto
+        """
+        scope = entry.get('scope', GLOBAL_SCOPE)
+        sid = entry['sid']
+        source_file = self._key(entry['source_file'])
+        block_name = entry['block_name']
+        content_sha1 = entry.get('content_sha1')
+
+        current = self._conn.execute(
+            'SELECT * FROM sids WHERE scope = ? AND sid = ?', (scope, sid)
+        ).fetchone()
+        if current is None:
+            self._conn.execute(
+                'INSERT INTO sids (scope, sid, source_file, block_name, content_sha1, origin, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (scope, sid, source_file, block_name, content_sha1, entry.get('origin'), now)
+            )
+            self._log(scope, sid, None, 'register', source_file, block_name, content_sha1, now)
+            return None
+
+        if (current['source_file'], current['block_name']) != (source_file, block_name):
+            return dict(current)
+
+        if current['content_sha1'] != content_sha1:
+            self._conn.execute(
+                'UPDATE sids SET content_sha1 = ?, updated_at = ? WHERE scope = ? AND sid = ?',
+                (content_sha1, now, scope, sid)
+            )
+            self._log(scope, sid, None, 'update', source_file, block_name, content_sha1, now)
+        return None
+
+    def _log(self, scope, sid, previous_sid, event, source_file, block_name, content_sha1, now):
+        self._conn.execute(
+            'INSERT INTO sid_history (scope, sid, previous_sid, event, source_file, block_name, '
+            'content_sha1, at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (scope, sid, previous_sid, event, source_file, block_name, content_sha1, now)
+        )
+
+    def register(
+        self,
+        sid: str,
+        source_file: Union[str, Path],
+        block_name: str,
+        content_sha1: Optional[str] = None,
+        scope: str = GLOBAL_SCOPE,
+        origin: Optional[str] = None
+    ) -> bool:
+        """
+        Registra (o actualiza) un SID para un bloque.
+
+        Returns:
+            True si se registró, False si el SID pertenece a otro bloque
+        """
+        conflicts = self.register_many([{
+            'sid': sid, 'source_file': source_file, 'block_name': block_name,
+            'content_sha1': content_sha1, 'scope': scope, 'origin': origin
+        }])
+        return not conflicts
+
+    def register_many(self, entries: Iterable[Dict]) -> List[Dict]:
+        """
+        Registra muchas entradas en una sola transacción.
+
+        Args:
+            entries: Iterable de dicts con 'sid', 'source_file', 'block_name' y
+                     opcionalmente 'content_sha1', 'scope', 'origin'.
+                     Los SIDs temporales (TEMP_*) se ignoran.
+
+        Returns:
+            Lista de conflictos: {'entry': entrada, 'owner': dueño actual}
+        """
+        conflicts = []
+        now = self._now()
+        with self._conn:
+            for entry in entries:
+                if is_placeholder_sid(entry.get('sid')):
+                    continue
+                owner = self._register_one(entry, now)
+                if owner is not None:
+                    conflicts.append({'entry': entry, 'owner': owner})
+        return conflicts
+
+    def sync_file(
+        self,
+        source_file: Union[str, Path],
+        entries: Iterable[Dict],
+        scope: str = GLOBAL_SCOPE,
+        origin: Optional[str] = None
+    ) -> Dict:
+        """
+        Sincroniza todos los SIDs de un archivo en una sola transacción.
+
+        Un SID nuevo cuyo bloque tenía antes otro SID (que ya no aparece en el
+        archivo) se registra como renombrado; los SIDs que desaparecen se liberan.
+
+        Args:
+            source_file: Archivo fuente
+            entries: Iterable de dicts con 'sid', 'block_name' y opcionalmente 'content_sha1'
+
+        Returns:
+            {'registered': int, 'renamed': int, 'released': int, 'conflicts': [...]}
+        """
+        with self._conn:
+            return self._sync_file_tx(source_file, entries, scope, origin, self._now())
+
+    def sync_many(self, files: Iterable[Dict]) -> Dict:
+        """
+        Sincroniza muchos archivos en una única transacción (registro de un swarm completo).
+
+        Args:
+            files: Iterable de dicts con 'source_file', 'entries' y opcionalmente
+                   'scope' y 'origin' (mismos argumentos que sync_file)
+
+        Returns:
+            Totales agregados con el mismo formato que sync_file
+        """
+        totals = {'registered': 0, 'renamed': 0, 'released': 0, 'conflicts': []}
+        now = self._now()
+        with self._conn:
+            for item in files:
+                result = self._sync_file_tx(
+                    item['source_file'], item['entries'],
+                    item.get('scope', GLOBAL_SCOPE), item.get('origin'), now
+                )
+                for key in ('registered', 'renamed', 'released'):
+                    totals[key] += result[key]
+                totals['conflicts'].extend(result['conflicts'])
+        return totals
+
+    def _sync_file_tx(self, source_file: Union[str, Path], entries: Iterable[Dict], scope: str,
+                      origin: Optional[str], now: str) -> Dict:
+        """Cuerpo de sync_file; se ejecuta dentro de la transacción del llamante."""
+        source_file = self._key(source_file)
+        result = {'registered': 0, 'renamed': 0, 'released': 0, 'conflicts': []}
+        entries = [e for e in entries if not is_placeholder_sid(e.get('sid'))]
+        new_sids = {e['sid'] for e in entries}
+
+        current = self._conn.execute(
+            'SELECT sid, block_name FROM sids WHERE scope = ? AND source_file = ?',
+            (scope, source_file)
+        ).fetchall()
+        registered = {row['sid'] for row in current}
+        stale_by_block = {}
+        for row in current:
+            if row['sid'] not in new_sids:
+                stale_by_block.setdefault(row['block_name'], []).append(row['sid'])
+
+        for entry in entries:
+            entry = dict(entry, source_file=source_file, scope=scope)
+            entry.setdefault('origin', origin)
+            sid = entry['sid']
+            stale = stale_by_block.get(entry['block_name'])
+            if sid not in registered and stale and self.is_free(sid, scope):
+                previous_sid = stale.pop(0)
+                self._conn.execute(
+                    'UPDATE sids SET sid = ?, content_sha1 = ?, updated_at = ? '
+                    'WHERE scope = ? AND sid = ?',
+                    (sid, entry.get('content_sha1'), now, scope, previous_sid)
+                )
+                self._log(scope, sid, previous_sid, 'rename', source_file,
+                          entry['block_name'], entry.get('content_sha1'), now)
+                result['renamed'] += 1
+                continue
+
+            owner = self._register_one(entry, now)
+            if owner is not None:
+                result['conflicts'].append({'entry': entry, 'owner': owner})
+            elif sid not in registered:
+                result['registered'] += 1
+
+        for block_name, sids in stale_by_block.items():
+            for sid in sids:
+                self._conn.execute('DELETE FROM sids WHERE scope = ? AND sid = ?', (scope, sid))
+                self._log(scope, sid, None, 'release', source_file, block_name, None, now)
+                result['released'] += 1
+
+        return result
+
+    def rename(self, old_sid: str, new_sid: str, scope: str = GLOBAL_SCOPE) -> bool:
+        """
+        Renombra un SID conservando su dueño.
+
+        Returns:
+            True si se renombró, False si old_sid no existe o new_sid está ocupado
+        """
+        current = self.owner(old_sid, scope)
+        if current is None or not self.is_free(new_sid, scope):
+            return False
+        now = self._now()
+        with self._conn:
+            self._conn.execute(
+                'UPDATE sids SET sid = ?, updated_at = ? WHERE scope = ? AND sid = ?',
+                (new_sid, now, scope, old_sid)
+            )
+            self._log(scope, new_sid, old_sid, 'rename', current['source_file'],
+                      current['block_name'], current['content_sha1'], now)
+        return True
+
+    def release(self, sid: str, scope: str = GLOBAL_SCOPE) -> bool:
+        """Libera un SID (queda en el historial). Retorna False si no existía."""
+        current = self.owner(sid, scope)
+        if current is None:
+            return False
+        now = self._now()
+        with self._conn:
+            self._conn.execute('DELETE FROM sids WHERE scope = ? AND sid = ?', (scope, sid))
+            self._log(scope, sid, None, 'release', current['source_file'],
+                      current['block_name'], current['content_sha1'], now)
+        return True
+
+    def close(self) -> None:
+        """Cierra la conexión SQLite."""
+        self._conn.close()
@@ -0,0 +1,270 @@
+"""
+Tracing - APS Tooling
+======================
+
+Spans ligeros del pipeline (extract_goals, md2yaml, md_sid_assign,
+enriquecimiento, linters, SchemaValidator) con atributos (archivo, agente,
+bloques, bytes) exportados a un archivo local:
+
+- APS_TRACE=trace.json   → Chrome trace-event (abrir en chrome://tracing o
+  https://ui.perfetto.dev): un evento "X" por span, anidados por tiempo
+- APS_TRACE=trace.jsonl  → JSONL, un evento por línea (mismos campos)
+
+La activación es por variable de entorno para que los subprocesos del pipeline
+(yaml_pipeline_cli.py → md2yaml.py, yaml_lint.py) escriban en la misma traza:
+cada proceso agrega sus eventos al final del archivo (O_APPEND, una escritura
+por lote). En formato Chrome se usa la variante de array sin "]" final, que
+los visores aceptan y permite agregar sin reescribir el archivo.
+
+Sin APS_TRACE, span() retorna un span nulo compartido: el coste es una
+comprobación por llamada, sin reloj ni asignaciones. Los atributos caros de
+calcular se agregan solo si `sp.enabled`.
+
+Uso:
+    >>> from lib.tracing import span
+    >>> with span('md2yaml.extract_blocks', file=str(md_path)) as sp:
+    ...     blocks = ...
+    ...     sp.set(blocks=len(blocks))
+    ...     if sp.enabled:
+    ...         sp.set(bytes=sum(len(b['content']) for b in blocks.values()))
+
+    >>> @traced('yaml_lint_v6.validate_file',
+    ...         lambda counts, self, path: agent_file_attrs(path, errors=counts[0]))
+    ... def validate_file(self, path): ...
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+TRACE_ENV = 'APS_TRACE'
+
+# Eventos retenidos antes de escribir (un write por lote)
+FLUSH_EVERY = 256
+
+PathLike = Union[str, Path]
+
+
+class _Span:
+    """Span activo: mide desde __enter__ hasta __exit__ y acumula atributos."""
+
+    __slots__ = ('tracer', 'name', 'attrs', '_ts', '_start')
+
+    enabled = True
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        """Agrega atributos conocidos durante el span (bloques, resultados)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._ts = time.time_ns() // 1000  # Reloj de pared: comparable entre procesos
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, self._ts, (time.perf_counter() - self._start) * 1e6, self.attrs)
+        return False
+
+
+class _NullSpan:
+    """Span de la traza desactivada: no mide ni guarda nada."""
+
+    __slots__ = ()
+
+    enabled = False
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Acumula eventos de un proceso y los agrega al archivo de traza."""
+
+    def __init__(self, path: PathLike, fmt: Optional[str] = None):
+        """
+        Args:
+            path: Archivo de traza (se crea si no existe; si existe se agrega al final)
+            fmt: 'chrome' o 'jsonl' (default: por extensión, .jsonl → jsonl)
+        """
+        self.path = Path(path)
+        self.format = fmt or ('jsonl' if self.path.suffix == '.jsonl' else 'chrome')
+        self.pid = os.getpid()
+        self._events: List[Dict] = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+            'args': {'name': Path(sys.argv[0]).name or 'python'},
+        }]
+        self._flush_every = FLUSH_EVERY
+        self._lock = threading.Lock()
+        self._create()
+        atexit.register(self.flush)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # Los workers de ProcessPoolExecutor terminan sin atexit: escribir cada evento
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events = []
+        self._flush_every = 1
+
+    def _create(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if self.format == 'chrome':
+                f.write('[\n')
+
+    def record(self, name: str, ts_us: int, dur_us: float, attrs: Dict) -> None:
+        """Registra un span terminado (evento "complete" de Chrome)."""
+        event = {
+            'name': name,
+            'cat': name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': ts_us,
+            'dur': round(dur_us, 1),
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+            'args': attrs,
+        }
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) >= self._flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Agrega los eventos pendientes al archivo."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._events:
+            return
+        sep = ',\n' if self.format == 'chrome' else '\n'
+        data = ''.join(json.dumps(e, ensure_ascii=False, default=str) + sep for e in self._events)
+        self._events = []
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data.encode('utf-8'))
+        finally:
+            os.close(fd)
+
+
+def _from_env() -> Optional[Tracer]:
+    value = os.environ.get(TRACE_ENV, '').strip()
+    return Tracer(Path(value).resolve()) if value and value != '0' else None
+
+
+_tracer: Optional[Tracer] = _from_env()
+
+
+def span(name: str, **attrs) -> Union[_Span, _NullSpan]:
+    """
+    Context manager de un span; usar `.set(...)` dentro para agregar atributos.
+
+    Args:
+        name: 'etapa.operación' (la etapa es la categoría en el visor)
+        **attrs: Atributos iniciales (file, agent, blocks, bytes, ...)
+    """
+    if _tracer is None:
+        return NULL_SPAN
+    return _Span(_tracer, name, attrs)
+
+
+def traced(name: str, attrs: Optional[Callable[..., Dict]] = None):
+    """
+    Decorador: un span por llamada.
+
+    Args:
+        name: Nombre del span
+        attrs: attrs(resultado, *args, **kwargs) → atributos; solo se evalúa
+               con la traza activa
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(_tracer, name, {}) as sp:
+                result = fn(*args, **kwargs)
+                if attrs is not None:
+                    sp.set(**attrs(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorate
+
+
+def agent_file_attrs(path: PathLike, **extra) -> Dict:
+    """
+    Atributos de un YAML de agente: archivo, agente, bloques y bytes.
+
+    Los bloques salen de la caché en proceso de yaml_cache (el linter acaba de
+    cargar el archivo), así que no se vuelve a parsear.
+    """
+    from .yaml_cache import load_yaml
+
+    path = Path(path)
+    attrs = {'file': str(path), 'agent': path.stem}
+    try:
+        attrs['bytes'] = path.stat().st_size
+        agent = load_yaml(path, copy=False).get('agent') or {}
+        attrs['agent'] = agent.get('name', path.stem)
+        attrs['blocks'] = len(agent.get('blocks') or {})
+    except Exception:
+        pass  # Archivo ilegible o YAML inválido: el linter ya lo reporta
+    attrs.update(extra)
+    return attrs
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def start_trace(path: PathLike) -> Tracer:
+    """
+    Activa la traza en este proceso y en sus subprocesos (exporta APS_TRACE).
+
+    El archivo se reinicia: una ejecución = una traza.
+    """
+    global _tracer
+    path = Path(path).resolve()
+    if path.exists():
+        path.unlink()
+    os.environ[TRACE_ENV] = str(path)
+    if _tracer is not None:
+        _tracer.flush()
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def load_events(path: PathLike) -> List[Dict]:
+    """Lee una traza en cualquiera de los dos formatos (Chrome con o sin "]" final, JSONL)."""
+    text = Path(path).read_text(encoding='utf-8').strip()
+    if text.startswith('['):
+        body = text.rstrip(']').rstrip().rstrip(',')
+        return json.loads(body + ']')
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
@@ -5,10 +5,11 @@ Vocabulary Loader - APS Tooling
 Carga y gestiona el vocabulario centralizado de SIDs desde sid_vocabulary_v1.yaml
 """
 
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from .resources import TOOLING_DIR, exists, load_yaml_resource
+
 
 class VocabularyLoader:
     """
@@ -30,9 +31,8 @@ class VocabularyLoader:
                        Si es None, usa la ruta por defecto
         """
         if vocab_path is None:
-            # Ruta por defecto relativa al módulo
-            lib_dir = Path(__file__).parent
-            vocab_path = lib_dir.parent / 'schemas' / 'sid_vocabulary_v1.yaml'
+            # Ruta por defecto relativa al módulo (también dentro del zipapp)
+            vocab_path = TOOLING_DIR / 'schemas' / 'sid_vocabulary_v1.yaml'
         
         self.vocab_path = Path(vocab_path)
         self._vocab = None
@@ -40,14 +40,13 @@ class VocabularyLoader:
     
     def _load(self):
         """Carga el vocabulario desde el archivo YAML."""
-        if not self.vocab_path.exists():
+        if not exists(self.vocab_path):
             raise FileNotFoundError(
                 f"Vocabulario no encontrado: {self.vocab_path}\n"
                 f"Asegúrate de que sid_vocabulary_v1.yaml existe en aps-tooling/schemas/"
             )
         
-        with open(self.vocab_path, 'r', encoding='utf-8') as f:
-            self._vocab = yaml.safe_load(f)
+        self._vocab = load_yaml_resource(self.vocab_path)
     
     @property
     def version(self) -> str:
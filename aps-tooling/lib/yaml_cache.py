@@ -0,0 +1,267 @@
+"""
+YAML Cache - APS Tooling
+=========================
+
+Carga de YAML compartida por todos los scripts:
+
+- Parsea con libyaml (yaml.CSafeLoader) cuando está disponible; si no, cae al
+  SafeLoader puro de PyYAML
+- Serializa con SafeDumper puro: CSafeDumper escapa los caracteres fuera del BMP
+  (emojis de los encabezados → "\\U0001F6D1") y corta líneas distinto, lo que
+  cambiaría todos los YAML generados. Escribir es un coste menor frente a parsear
+- Caché en proceso por (ruta, mtime, tamaño): un mismo archivo leído por varios
+  validadores en un proceso se parsea una sola vez. Es un LRU acotado
+  (MEMORY_MAX_ENTRIES archivos, MEMORY_MAX_BYTES de YAML fuente); las lecturas
+  de una sola vez (ingesta, conversión) pasan cache=False y no la ocupan
+- Caché opcional en disco (pickle por hash de contenido) compartida entre procesos
+  de un mismo job de CI: APS_YAML_CACHE=1 (usa .aps_cache/yaml) o APS_YAML_CACHE=<dir>
+- block_marks(): línea/columna de cada bloque de un agente (marcas del árbol de
+  nodos YAML), calculadas una vez por archivo para ubicar issues en los reportes
+
+Uso:
+    >>> from lib.yaml_cache import load_yaml, dump_yaml
+    >>> data = load_yaml('agent.yaml')                  # copia propia, se puede modificar
+    >>> data = load_yaml('agent.yaml', copy=False)      # solo lectura (sin deepcopy)
+    >>> dump_yaml(data, 'agent.yaml', sort_keys=False)
+"""
+
+import copy as _copy
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import yaml
+
+
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SafeDumper = yaml.SafeDumper
+HAS_LIBYAML = SafeLoader is not yaml.SafeLoader
+
+DEFAULT_DISK_CACHE_DIR = Path('.aps_cache') / 'yaml'
+DISK_CACHE_ENV = 'APS_YAML_CACHE'
+
+# La huella del loader entra en la clave: un pickle de otro loader/versión no se reutiliza
+_LOADER_TAG = f"{SafeLoader.__name__}:{yaml.__version__}:{pickle.HIGHEST_PROTOCOL}"
+
+# Límites de la caché en memoria (el tamaño del archivo fuente aproxima el del árbol parseado)
+MEMORY_MAX_ENTRIES = 512
+MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+PathLike = Union[str, Path]
+
+_memory: 'OrderedDict[str, Tuple[int, int, Any]]' = OrderedDict()
+_marks: 'OrderedDict[str, Tuple[int, int, Dict]]' = OrderedDict()
+_memory_bytes = 0
+_stats = {'memory_hits': 0, 'disk_hits': 0, 'parses': 0, 'evictions': 0}
+
+
+def _disk_cache_dir() -> Optional[Path]:
+    value = os.environ.get(DISK_CACHE_ENV, '').strip()
+    if not value or value == '0':
+        return None
+    return DEFAULT_DISK_CACHE_DIR if value == '1' else Path(value)
+
+
+def loads_yaml(text: Union[str, bytes]) -> Any:
+    """Parsea YAML desde texto con el loader más rápido disponible."""
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def _load_from_disk(raw: bytes) -> Any:
+    """Parsea `raw` usando (y alimentando) la caché en disco si está activa."""
+    cache_dir = _disk_cache_dir()
+    if cache_dir is None:
+        _stats['parses'] += 1
+        return loads_yaml(raw)
+
+    digest = hashlib.sha256(_LOADER_TAG.encode() + b'\x00' + raw).hexdigest()
+    cache_file = cache_dir / f"{digest}.pickle"
+    try:
+        with open(cache_file, 'rb') as f:
+            data = pickle.load(f)
+        _stats['disk_hits'] += 1
+        return data
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    _stats['parses'] += 1
+    data = loads_yaml(raw)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # La caché en disco es best-effort
+    return data
+
+
+def _remember(key: str, mtime_ns: int, size: int, data: Any) -> None:
+    """Guarda un archivo parseado en el LRU en memoria, descartando los menos usados."""
+    global _memory_bytes
+    _forget(key)
+    if size > MEMORY_MAX_BYTES:
+        return
+    _memory[key] = (mtime_ns, size, data)
+    _memory_bytes += size
+    while len(_memory) > MEMORY_MAX_ENTRIES or _memory_bytes > MEMORY_MAX_BYTES:
+        _, (_, evicted_size, _) = _memory.popitem(last=False)
+        _memory_bytes -= evicted_size
+        _stats['evictions'] += 1
+
+
+def _forget(key: str) -> None:
+    global _memory_bytes
+    cached = _memory.pop(key, None)
+    if cached:
+        _memory_bytes -= cached[1]
+
+
+def load_yaml(path: PathLike, copy: bool = True, cache: bool = True) -> Any:
+    """
+    Carga un archivo YAML con caché.
+
+    Args:
+        path: Ruta del archivo
+        copy: Si True (default) retorna una copia que el llamador puede modificar.
+              Los validadores de solo lectura pueden usar copy=False.
+        cache: Si False, no se guarda en la caché en memoria (archivos que el
+               proceso lee una sola vez); una entrada ya cacheada sí se usa.
+
+    Raises:
+        OSError: Si el archivo no se puede leer
+        yaml.YAMLError: Si el YAML es inválido
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    st = path.stat()
+
+    cached = _memory.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _stats['memory_hits'] += 1
+        _memory.move_to_end(key)
+        data = cached[2]
+    else:
+        data = _load_from_disk(path.read_bytes())
+        if cache:
+            _remember(key, st.st_mtime_ns, st.st_size, data)
+        else:
+            _forget(key)  # La entrada (si la había) es de otra versión del archivo
+
+    return _copy.deepcopy(data) if copy else data
+
+
+def dump_yaml(data: Any, stream: Optional[Union[PathLike, Any]] = None, **kwargs) -> Optional[str]:
+    """
+    Serializa con SafeDumper (mismos kwargs que yaml.dump; allow_unicode por defecto).
+
+    Args:
+        data: Datos a serializar
+        stream: Ruta, stream abierto o None (retorna el texto)
+    """
+    kwargs.setdefault('allow_unicode', True)
+    if isinstance(stream, (str, Path)):
+        invalidate(stream)
+        with open(stream, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, Dumper=SafeDumper, **kwargs)
+        return None
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
+
+
+def _scalar(node) -> Optional[str]:
+    return node.value if isinstance(node, yaml.ScalarNode) else None
+
+
+def _mapping_get(node, key: str):
+    if isinstance(node, yaml.MappingNode):
+        for key_node, value_node in node.value:
+            if _scalar(key_node) == key:
+                return key_node, value_node
+    return None, None
+
+
+def _span(key_node, value_node) -> Dict[str, int]:
+    """Región 1-based desde la clave hasta el final del valor (sin la línea siguiente)."""
+    start, end = key_node.start_mark, value_node.end_mark
+    # Un mapping de bloque termina donde empieza la clave siguiente (misma indentación o menor)
+    ends_at_next_key = end.line > start.line and end.column <= start.column
+    return {
+        'line': start.line + 1,
+        'column': start.column + 1,
+        'end_line': end.line if ends_at_next_key else end.line + 1,
+    }
+
+
+def block_marks(path: PathLike) -> Dict[str, Dict]:
+    """
+    Posición de cada bloque de un YAML de agente (agent.blocks o blocks en la raíz).
+
+    Returns:
+        {nombre: {'line', 'column', 'end_line', 'sid'}} con líneas/columnas 1-based;
+        la clave '' corresponde a la clave 'blocks' (ubicación de issues globales).
+        Vacío si el archivo no se puede leer o no tiene bloques.
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    cached = _marks.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _marks.move_to_end(key)
+        return cached[2]
+
+    marks: Dict[str, Dict] = {}
+    try:
+        root = yaml.compose(path.read_bytes(), Loader=SafeLoader)
+    except (OSError, yaml.YAMLError):
+        root = None
+    agent_key, agent = _mapping_get(root, 'agent')
+    blocks_key, blocks = _mapping_get(agent if agent is not None else root, 'blocks')
+    if isinstance(blocks, yaml.MappingNode):
+        marks[''] = _span(blocks_key, blocks)
+        for name_node, block_node in blocks.value:
+            name = _scalar(name_node)
+            if name is None:
+                continue
+            _, sid_node = _mapping_get(block_node, 'sid')
+            marks[name] = {**_span(name_node, block_node), 'sid': _scalar(sid_node) if sid_node else None}
+
+    _marks[key] = (st.st_mtime_ns, st.st_size, marks)
+    _marks.move_to_end(key)
+    while len(_marks) > MEMORY_MAX_ENTRIES:
+        _marks.popitem(last=False)
+    return marks
+
+
+def invalidate(path: PathLike) -> None:
+    """Descarta las entradas en memoria de un archivo (p.ej. tras reescribirlo)."""
+    key = str(Path(path).resolve())
+    _forget(key)
+    _marks.pop(key, None)
+
+
+def clear_cache() -> None:
+    """Vacía la caché en memoria y las estadísticas."""
+    global _memory_bytes
+    _memory.clear()
+    _memory_bytes = 0
+    _marks.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+def cache_info() -> Dict[str, Any]:
+    """Estadísticas de la caché: aciertos en memoria/disco, parseos, descartes LRU, entradas, loader."""
+    return {
+        **_stats,
+        'entries': len(_memory),
+        'bytes': _memory_bytes,
+        'loader': SafeLoader.__name__,
+        'disk_cache': str(_disk_cache_dir()) if _disk_cache_dir() else None,
+    }
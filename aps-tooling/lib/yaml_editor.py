@@ -6,10 +6,36 @@ Editor YAML basado en AST para manipulación semántica segura.
 Reemplaza el método DEPRECATED string-replace.
 """
 
+import copy
+import os
+import tempfile
 import yaml
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
+from .yaml_cache import load_yaml, dump_yaml, invalidate
+
+
+def write_text_atomic(path: Union[str, Path], text: str) -> None:
+    """Escribe un archivo vía temporal en el mismo directorio + rename (nunca queda a medias)."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        else:  # mkstemp crea con 0600: un archivo nuevo lleva los permisos por defecto (umask)
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    invalidate(path)
+
 
 class YAMLBlockEditor:
     """
@@ -55,9 +81,9 @@ class YAMLBlockEditor:
         if not self.filepath.exists():
             raise FileNotFoundError(f"No existe: {self.filepath}")
         
-        with open(self.filepath, 'r', encoding='utf-8') as f:
-            self.data = yaml.safe_load(f)
-            self.original_data = yaml.safe_load(open(self.filepath, 'r'))
+        # Un solo parseo: ambas son copias independientes de la entrada en caché
+        self.data = load_yaml(self.filepath)
+        self.original_data = load_yaml(self.filepath)
         
         return self.data
     
@@ -73,13 +99,26 @@ class YAMLBlockEditor:
         
         # Crear backup si se solicita
         if backup and self.filepath.exists():
-            backup_path = self.filepath.with_suffix(self.filepath.suffix + '.bak')
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.original_data, f, allow_unicode=True, sort_keys=False)
+            self.write_backup()
         
-        # Guardar archivo
-        with open(self.filepath, 'w', encoding='utf-8') as f:
-            yaml.dump(self.data, f, allow_unicode=True, sort_keys=False, indent=2)
+        # Guardar archivo (atómico: un fallo a mitad no deja el YAML truncado)
+        write_text_atomic(self.filepath, self.render())
+    
+    def render(self) -> str:
+        """Texto YAML de los datos actuales (el mismo formato que save())."""
+        if self.data is None:
+            raise RuntimeError("No hay datos cargados. Llama a load() primero.")
+        return dump_yaml(self.data, None, sort_keys=False, indent=2)
+    
+    def write_backup(self) -> Path:
+        """Guarda los datos originales en <archivo>.bak."""
+        backup_path = self.filepath.with_suffix(self.filepath.suffix + '.bak')
+        dump_yaml(self.original_data, backup_path, sort_keys=False)
+        return backup_path
+    
+    @property
+    def modified(self) -> bool:
+        return self.data != self.original_data
     
     def get_field(self, path: str) -> Any:
         """
@@ -164,6 +203,21 @@ class YAMLBlockEditor:
         
         return False
     
+    def _blocks(self, create: bool = False) -> Optional[Dict[str, Dict]]:
+        """
+        Dict de bloques: agent.blocks en los YAML de agentes (md2yaml), blocks
+        en el formato plano. Los nombres de bloque pueden contener puntos, así
+        que se accede al dict directamente en lugar de con get_field().
+        """
+        if self.data is None:
+            raise RuntimeError("No hay datos cargados. Llama a load() primero.")
+        container = self.data.get('agent') if isinstance(self.data.get('agent'), dict) else self.data
+        if not isinstance(container.get('blocks'), dict):
+            if not create:
+                return None
+            container['blocks'] = {}
+        return container['blocks']
+    
     def add_block(self, block_id: str, block_data: Dict) -> None:
         """
         Añade un nuevo bloque a la sección 'blocks'.
@@ -172,10 +226,7 @@ class YAMLBlockEditor:
             block_id: ID del bloque (ej: 'BLK-001')
             block_data: Datos del bloque
         """
-        if 'blocks' not in self.data:
-            self.data['blocks'] = {}
-        
-        self.data['blocks'][block_id] = block_data
+        self._blocks(create=True)[block_id] = block_data
     
     def get_all_blocks(self) -> Dict[str, Dict]:
         """
@@ -184,7 +235,11 @@ class YAMLBlockEditor:
         Returns:
             Diccionario con todos los bloques
         """
-        return self.get_field('blocks') or {}
+        return self._blocks() or {}
+    
+    def get_block(self, block_id: str) -> Optional[Dict]:
+        """Bloque por nombre, o None si no existe."""
+        return self.get_all_blocks().get(block_id)
     
     def update_block_sid(self, block_id: str, new_sid: str) -> bool:
         """
@@ -197,13 +252,62 @@ class YAMLBlockEditor:
         Returns:
             True si se actualizó, False si el bloque no existe
         """
-        path = f'blocks.{block_id}.sid'
-        if self.get_field(f'blocks.{block_id}') is None:
+        return self.set_block_field(block_id, 'sid', new_sid)
+    
+    def set_block_field(self, block_id: str, field: str, value: Any) -> bool:
+        """
+        Establece un campo de un bloque (sid, content, accion...).
+        
+        Returns:
+            True si se actualizó, False si el bloque no existe
+        """
+        block = self.get_block(block_id)
+        if not isinstance(block, dict):
+            return False
+        block[field] = value
+        return True
+    
+    def rename_block(self, block_id: str, new_id: str) -> bool:
+        """
+        Renombra un bloque conservando su posición.
+        
+        Returns:
+            True si se renombró, False si el bloque no existe
+        
+        Raises:
+            ValueError: Si ya existe un bloque con el nombre nuevo
+        """
+        blocks = self.get_all_blocks()
+        if block_id not in blocks:
             return False
+        if new_id != block_id and new_id in blocks:
+            raise ValueError(f"Ya existe un bloque '{new_id}'")
+        items = list(blocks.items())
+        blocks.clear()
+        for name, block in items:
+            blocks[new_id if name == block_id else name] = block
+        return True
+    
+    def delete_block(self, block_id: str) -> bool:
+        """
+        Elimina un bloque.
         
-        self.set_field(path, new_sid)
+        Returns:
+            True si se eliminó, False si no existía
+        """
+        blocks = self.get_all_blocks()
+        if block_id not in blocks:
+            return False
+        del blocks[block_id]
         return True
     
+    def find_block_by_sid(self, sid: str) -> Optional[str]:
+        """Nombre del bloque con ese SID exacto, o None."""
+        for block_id, block in self.get_all_blocks().items():
+            if isinstance(block, dict) and block.get('sid') == sid:
+                return block_id
+        return None
+    
     def get_blocks_by_sid_pattern(self, pattern: str) -> List[str]:
         """
         Busca bloques que contengan un patrón en su SID.
@@ -237,12 +341,33 @@ class YAMLBlockEditor:
             errors.append("El documento debe ser un objeto YAML")
             return errors
         
-        # Validar campos requeridos para agentes
-        if 'agent_name' not in self.data:
+        # Validar campos requeridos para agentes (md2yaml: agent.name; formato plano: agent_name)
+        agent = self.data.get('agent')
+        if isinstance(agent, dict):
+            if 'name' not in agent:
+                errors.append("Falta campo requerido: 'agent.name'")
+            container = agent
+        elif 'agent_name' not in self.data:
             errors.append("Falta campo requerido: 'agent_name'")
+            container = self.data
+        else:
+            container = self.data
         
-        if 'blocks' in self.data and not isinstance(self.data['blocks'], dict):
+        if 'blocks' in container and not isinstance(container['blocks'], dict):
             errors.append("El campo 'blocks' debe ser un diccionario")
+            return errors
+        
+        # SIDs definitivos únicos dentro del agente (TEMP_* son provisionales)
+        seen: Dict[str, str] = {}
+        for block_id, block in (container.get('blocks') or {}).items():
+            if not isinstance(block, dict):
+                errors.append(f"El bloque '{block_id}' debe ser un diccionario")
+                continue
+            sid = block.get('sid')
+            if isinstance(sid, str) and sid and not sid.startswith('TEMP_'):
+                if sid in seen:
+                    errors.append(f"SID duplicado '{sid}' en '{seen[sid]}' y '{block_id}'")
+                seen.setdefault(sid, block_id)
         
         return errors
 
@@ -273,10 +398,48 @@ class YAMLBatchEditor:
             editor.load()
         self.loaded = True
     
-    def save_all(self, backup: bool = True) -> None:
-        """Guarda todos los archivos."""
-        for editor in self.editors:
-            editor.save(backup=backup)
+    def save_all(self, backup: bool = True) -> List[Path]:
+        """
+        Guarda los archivos modificados como una transacción: primero se
+        serializan todos y se escriben a temporales; después se reemplazan los
+        originales. Si falla un reemplazo se restauran los ya escritos.
+        
+        Returns:
+            Rutas escritas
+        """
+        pending = [(editor, editor.render()) for editor in self.editors if editor.modified]
+        staged = []
+        try:
+            for editor, text in pending:
+                fd, tmp = tempfile.mkstemp(dir=editor.filepath.parent,
+                                           prefix=f'.{editor.filepath.name}.', suffix='.tmp')
+                staged.append(tmp)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.chmod(tmp, editor.filepath.stat().st_mode & 0o777)
+            if backup:
+                for editor, _ in pending:
+                    editor.write_backup()
+            
+            originals = []
+            try:
+                for (editor, _), tmp in zip(pending, staged):
+                    original = editor.filepath.read_bytes()
+                    os.replace(tmp, editor.filepath)
+                    originals.append((editor.filepath, original))
+            except BaseException:
+                for path, original in originals:
+                    write_text_atomic(path, original.decode('utf-8'))
+                raise
+        finally:
+            for tmp in staged:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+        
+        for editor, _ in pending:
+            invalidate(editor.filepath)
+            editor.original_data = copy.deepcopy(editor.data)
+        return [editor.filepath for editor, _ in pending]
     
     def apply_to_all(self, func) -> None:
         """
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+APS Language Server - lint en vivo de goals Markdown en el editor.
+
+Servidor LSP (JSON-RPC sobre stdio, solo stdlib) construido sobre los linters
+existentes. Mantiene en memoria las reglas compiladas, el vocabulario y el
+modelo de bloques de cada documento abierto:
+
+- Sincronización incremental: cada edición re-divide solo la región afectada,
+  acotada por los encabezados (mismos límites que md2yaml.extract_blocks_from_md)
+- Cada bloque se lintea solo si su contenido cambió (memo por contenido)
+- Diagnósticos: DENY_TERMS con contexto de negación (yaml_lint), encabezados
+  duplicados (AUTO_NUMBERED_BLOCK) y SIDs citados en el texto contra el vocabulario
+- Quick-fix: sinónimo de acción → forma canónica (VocabularyLoader.get_canonical_accion)
+
+Uso:
+    python3 aps_lsp.py                        # servidor por stdio (lo lanza el editor)
+    python3 aps_lsp.py --check agent.md       # diagnósticos + latencia, sin editor
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.md_blocks import MdBlock, number_duplicates, scan_headers, split_blocks, split_lines
+from lib.vocabulary_loader import VocabularyLoader
+from md2yaml import BLOCK_TYPE_MAP, get_block_type
+from yaml_lint import (
+    DENY_TERMS, DENY_TERMS_RE, DENY_TERMS_EXEMPT_TYPES, VALID_BLOCK_TYPES, is_negation_context
+)
+
+SERVER_NAME = 'aps-lsp'
+
+SEVERITY = {'ERROR': 1, 'WARNING': 2, 'INFO': 3, 'HINT': 4}
+
+# SID citado en el texto: <TYPE>.<accion>.<relacion...>.<nivel>
+_SID_TYPES = sorted(set(VALID_BLOCK_TYPES) | set(BLOCK_TYPE_MAP.values()), key=len, reverse=True)
+SID_REF_RE = re.compile(
+    rf"\b(?P<type>{'|'.join(_SID_TYPES)})\.(?P<accion>[a-z_]+)\.(?P<rest>[a-z_]+(?:\.[a-z_]+)+)\b"
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# POSICIONES (LSP usa unidades UTF-16)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def utf16_to_index(line: str, units: int) -> int:
+    """Columna LSP (UTF-16) → índice Python."""
+    count = 0
+    for i, ch in enumerate(line):
+        if count >= units:
+            return i
+        count += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def index_to_utf16(line: str, index: int) -> int:
+    """Índice Python → columna LSP (UTF-16)."""
+    return index + sum(1 for ch in line[:index] if ord(ch) > 0xFFFF)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LINT POR BLOQUE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class BlockLinter:
+    """
+    Reglas por bloque con memo por contenido. Los hallazgos usan posiciones
+    relativas al cuerpo del bloque (línea, columna inicio, columna fin), así
+    siguen siendo válidos cuando el bloque se desplaza en el documento.
+    """
+
+    def __init__(self, vocab: Optional[VocabularyLoader] = None):
+        self.vocab = vocab or VocabularyLoader()
+        self._memo: Dict[Tuple[str, str], List[Dict]] = {}
+        self.stats = {'linted': 0, 'memo_hits': 0}
+
+    def lint(self, block_name: str, body: str) -> List[Dict]:
+        key = (block_name, body)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.stats['memo_hits'] += 1
+            return cached
+        self.stats['linted'] += 1
+        findings = self._deny_terms(block_name, body) + self._sid_refs(body)
+        if len(self._memo) > 5000:
+            self._memo.clear()
+        self._memo[key] = findings
+        return findings
+
+    @staticmethod
+    def _position(body: str, offset: int) -> Tuple[int, int]:
+        line = body.count('\n', 0, offset)
+        return line, offset - (body.rfind('\n', 0, offset) + 1)
+
+    def _finding(self, body, start, end, severity, code, message, data=None) -> Dict:
+        line, col = self._position(body, start)
+        end_line, end_col = self._position(body, end)
+        finding = {'line': line, 'col': col, 'end_line': end_line, 'end_col': end_col,
+                   'severity': severity, 'code': code, 'message': message}
+        if data:
+            finding['data'] = data
+        return finding
+
+    def _deny_terms(self, block_name: str, body: str) -> List[Dict]:
+        """Mismo criterio que yaml_lint: ERROR si hay un uso fuera de contexto de negación."""
+        if get_block_type(block_name) in DENY_TERMS_EXEMPT_TYPES:
+            return []
+        findings = []
+        for pattern, deny_re in zip(DENY_TERMS, DENY_TERMS_RE):
+            for match in deny_re.finditer(body):
+                if is_negation_context(body, match):
+                    findings.append(self._finding(
+                        body, match.start(), match.end(), 'WARNING', 'DENY_TERM_CONTEXT',
+                        f"Término prohibido en contexto de negación/antipatrón: '{pattern[:30]}...' "
+                        f"(verificar que es descriptivo y no prescriptivo)"
+                    ))
+                else:
+                    findings.append(self._finding(
+                        body, match.start(), match.end(), 'ERROR', 'DENY_TERM',
+                        f"Término prohibido detectado: patrón '{pattern[:30]}...'"
+                    ))
+        return findings
+
+    def _sid_refs(self, body: str) -> List[Dict]:
+        """SIDs citados en el texto validados contra el vocabulario."""
+        findings = []
+        for match in SID_REF_RE.finditer(body):
+            accion = match.group('accion')
+            *relacion, nivel = match.group('rest').split('.')
+            result = self.vocab.validate_sid_components(accion, '.'.join(relacion), nivel)
+            canonical = self.vocab.get_canonical_accion(accion)
+            if canonical:
+                findings.append(self._finding(
+                    body, match.start('accion'), match.end('accion'), 'WARNING', 'SID_SYNONYM',
+                    f"Acción '{accion}' es sinónimo de '{canonical}' en {match.group(0)}",
+                    {'replacement': canonical}
+                ))
+            for message in result['errors'] + [w for w in result['warnings'] if 'sinónimo' not in w]:
+                findings.append(self._finding(
+                    body, match.start(), match.end(), 'WARNING', 'SID_VOCABULARY',
+                    f"{match.group(0)}: {message}"
+                ))
+        return findings
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MODELO DE DOCUMENTO
+# ═══════════════════════════════════════════════════════════════════════════
+
+class AgentDocument:
+    """Líneas y bloques de un .md abierto, actualizados de forma incremental."""
+
+    def __init__(self, uri: str, text: str):
+        self.uri = uri
+        self.lines = split_lines(text)
+        self.blocks: List[MdBlock] = split_blocks(self.lines)
+
+    def apply_change(self, change: Dict) -> None:
+        """Aplica un TextDocumentContentChangeEvent (completo o por rango)."""
+        if 'range' not in change:
+            self.__init__(self.uri, change['text'])
+            return
+
+        start, end = change['range']['start'], change['range']['end']
+        l1, l2 = start['line'], min(end['line'], len(self.lines) - 1)
+        prefix = self.lines[l1][:utf16_to_index(self.lines[l1], start['character'])]
+        suffix = self.lines[l2][utf16_to_index(self.lines[l2], end['character']):]
+        new_lines = (prefix + change['text'] + suffix).split('\n')
+        self.lines[l1:l2 + 1] = new_lines
+        delta = len(new_lines) - (l2 - l1 + 1)
+        self._resplit(l1, l2, delta)
+
+    def _resplit(self, l1: int, l2: int, delta: int) -> None:
+        """
+        Re-divide solo la región entre el encabezado anterior a la edición y el
+        siguiente encabezado no tocado; los bloques posteriores solo se desplazan.
+        """
+        before = [i for i, b in enumerate(self.blocks) if b.header_line < l1]
+        first = before[-1] if before else None
+        after = next((i for i, b in enumerate(self.blocks) if b.header_line > l2), len(self.blocks))
+
+        region_start = self.blocks[first].header_line if first is not None else 0
+        region_end = self.blocks[after].header_line + delta if after < len(self.blocks) else len(self.lines)
+        # La región empieza en un encabezado no editado (o en la línea 0): los bloques
+        # anteriores conservan sus límites
+        head = self.blocks[:first] if first is not None else []
+        tail = [b.shifted(delta) for b in self.blocks[after:]]
+        region = scan_headers(self.lines, region_start, region_end)
+        self.blocks = number_duplicates(head + region + tail)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DIAGNÓSTICOS Y QUICK-FIXES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def diagnostics_for(doc: AgentDocument, linter: BlockLinter) -> List[Dict]:
+    """Diagnósticos LSP del documento (posiciones en UTF-16)."""
+    diagnostics = []
+
+    def diagnostic(line, col, end_line, end_col, severity, code, message, data=None):
+        d = {
+            'range': {
+                'start': {'line': line, 'character': index_to_utf16(doc.lines[line], col)},
+                'end': {'line': end_line, 'character': index_to_utf16(doc.lines[end_line], end_col)},
+            },
+            'severity': SEVERITY[severity],
+            'code': code,
+            'source': SERVER_NAME,
+            'message': message,
+        }
+        if data:
+            d['data'] = data
+        diagnostics.append(d)
+
+    for block in doc.blocks:
+        header = doc.lines[block.header_line]
+        if block.name != block.raw_name:
+            diagnostic(block.header_line, 0, block.header_line, len(header), 'ERROR', 'AUTO_NUMBERED_BLOCK',
+                       f"Bloque duplicado: '{block.raw_name}' → eliminar duplicados en el .md")
+
+        body = '\n'.join(block.body_lines(doc.lines))
+        first_line = block.header_line + 1
+        for f in linter.lint(block.name, body):
+            diagnostic(first_line + f['line'], f['col'], first_line + f['end_line'], f['end_col'],
+                       f['severity'], f['code'], f['message'], f.get('data'))
+    return diagnostics
+
+
+def code_actions(uri: str, diagnostics: List[Dict]) -> List[Dict]:
+    """Quick-fixes para los diagnósticos SID_SYNONYM del rango pedido."""
+    actions = []
+    for d in diagnostics:
+        replacement = (d.get('data') or {}).get('replacement')
+        if d.get('code') != 'SID_SYNONYM' or not replacement:
+            continue
+        actions.append({
+            'title': f"Usar acción canónica '{replacement}'",
+            'kind': 'quickfix',
+            'diagnostics': [d],
+            'isPreferred': True,
+            'edit': {'changes': {uri: [{'range': d['range'], 'newText': replacement}]}},
+        })
+    return actions
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVIDOR JSON-RPC
+# ═══════════════════════════════════════════════════════════════════════════
+
+class APSLanguageServer:
+    """Servidor LSP mínimo sobre stdio (Content-Length + JSON-RPC 2.0)."""
+
+    def __init__(self, stdin=None, stdout=None, log=False):
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self.log = log
+        self.linter = BlockLinter()
+        self.documents: Dict[str, AgentDocument] = {}
+        self.shutdown_requested = False
+
+    # --- transporte -------------------------------------------------------
+
+    def read_message(self) -> Optional[Dict]:
+        length = None
+        while True:
+            line = self.stdin.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return json.loads(self.stdin.read(length)) if length else None
+
+    def send(self, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.stdout.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+        self.stdout.flush()
+
+    def notify(self, method: str, params: Dict) -> None:
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    # --- ciclo ------------------------------------------------------------
+
+    def serve(self) -> int:
+        while True:
+            message = self.read_message()
+            if message is None:
+                return 1
+            method = message.get('method')
+            if method == 'exit':
+                return 0 if self.shutdown_requested else 1
+            try:
+                result = self.dispatch(method, message.get('params') or {})
+                if 'id' in message:
+                    self.send({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+            except Exception as e:
+                if 'id' in message:
+                    self.send({'jsonrpc': '2.0', 'id': message['id'],
+                               'error': {'code': -32603, 'message': str(e)}})
+                elif self.log:
+                    print(f"❌ {method}: {e}", file=sys.stderr)
+
+    def dispatch(self, method: str, params: Dict):
+        if method == 'initialize':
+            return {
+                'capabilities': {
+                    'textDocumentSync': {'openClose': True, 'change': 2},  # 2 = incremental
+                    'codeActionProvider': {'codeActionKinds': ['quickfix']},
+                },
+                'serverInfo': {'name': SERVER_NAME},
+            }
+        if method == 'shutdown':
+            self.shutdown_requested = True
+            return None
+        if method == 'textDocument/didOpen':
+            doc = params['textDocument']
+            self.documents[doc['uri']] = AgentDocument(doc['uri'], doc['text'])
+            self.publish(doc['uri'])
+        elif method == 'textDocument/didChange':
+            doc = self.documents.get(params['textDocument']['uri'])
+            if doc is not None:
+                for change in params['contentChanges']:
+                    doc.apply_change(change)
+                self.publish(doc.uri)
+        elif method == 'textDocument/didClose':
+            uri = params['textDocument']['uri']
+            self.documents.pop(uri, None)
+            self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+        elif method == 'textDocument/codeAction':
+            return code_actions(params['textDocument']['uri'], params['context'].get('diagnostics', []))
+        return None
+
+    def publish(self, uri: str) -> None:
+        start = time.perf_counter()
+        diagnostics = diagnostics_for(self.documents[uri], self.linter)
+        self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': diagnostics})
+        if self.log:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"⏱️  {uri}: {len(diagnostics)} diagnósticos en {elapsed_ms:.1f} ms "
+                  f"({self.linter.stats['linted']} bloques linteados, "
+                  f"{self.linter.stats['memo_hits']} memo)", file=sys.stderr)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MODO --check
+# ═══════════════════════════════════════════════════════════════════════════
+
+def check_file(path: Path) -> int:
+    """Diagnósticos de un .md y latencia de apertura y de una edición de un carácter."""
+    linter = BlockLinter()
+    text = path.read_text(encoding='utf-8')
+
+    start = time.perf_counter()
+    doc = AgentDocument(path.resolve().as_uri(), text)
+    diagnostics = diagnostics_for(doc, linter)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    for d in diagnostics:
+        pos = d['range']['start']
+        level = {v: k for k, v in SEVERITY.items()}[d['severity']]
+        print(f"{path.name}:{pos['line'] + 1}:{pos['character'] + 1}: {level} [{d['code']}] {d['message']}")
+
+    # Edición simulada: insertar un carácter en mitad del documento
+    line = len(doc.lines) // 2
+    start = time.perf_counter()
+    doc.apply_change({'range': {'start': {'line': line, 'character': 0}, 'end': {'line': line, 'character': 0}},
+                      'text': ' '})
+    diagnostics_for(doc, linter)
+    edit_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n⏱️  Apertura: {open_ms:.1f} ms ({len(doc.blocks)} bloques) | "
+          f"edición: {edit_ms:.1f} ms ({linter.stats['memo_hits']} bloques desde memo)")
+    return 1 if any(d['severity'] == SEVERITY['ERROR'] for d in diagnostics) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor LSP APS (lint en vivo de goals Markdown)')
+    parser.add_argument('--stdio', action='store_true', help='Servidor por stdio (por defecto)')
+    parser.add_argument('--log', action='store_true', help='Latencia de cada publicación en stderr')
+    parser.add_argument('--check', type=Path, metavar='MD', help='Lintear un archivo y salir')
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check_file(args.check))
+    sys.exit(APSLanguageServer(log=args.log).serve())
+
+
+if __name__ == '__main__':
+    main()
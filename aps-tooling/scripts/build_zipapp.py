@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Empaqueta APS Tooling en un zipapp ejecutable (aps.pyz).
+
+Contenido:
+- __main__.py (comando `aps`), lib/ y scripts/ con su .pyc precompilado al lado
+  (hash sin verificar: zipimport lo usa sin comparar con el fuente ni compilar)
+- schemas/*.yaml, las reglas por defecto de yaml_lint_v4 (rules/, copia de
+  swarm/rules/validation_rules_v1.yaml) y schemas/snapshot.marshal: los mismos
+  YAML ya parseados (lib/resources.py los carga sin PyYAML)
+
+Los .pyc valen para la versión de Python que construye; con otra versión
+zipimport compila los .py en memoria y el resultado es el mismo, solo más lento.
+Las entradas llevan fecha fija: dos builds del mismo árbol dan el mismo archivo.
+
+Uso:
+    python3 aps-tooling/scripts/build_zipapp.py                 # aps-tooling/dist/aps.pyz
+    python3 aps-tooling/scripts/build_zipapp.py -o /tmp/aps.pyz --compress
+    make -C aps-tooling zipapp
+
+    python3 aps-tooling/dist/aps.pyz lint --batch 'swarm/agents/**/*.yaml'
+"""
+
+import argparse
+import marshal
+import os
+import py_compile
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import yaml
+
+TOOLING_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = TOOLING_DIR / 'dist' / 'aps.pyz'
+INTERPRETER = '/usr/bin/env python3'
+
+SNAPSHOT_NAME = 'schemas/snapshot.marshal'
+
+# Archivos del repo fuera de aps-tooling/ que se empaquetan: (ruta en el repo, ruta en el zipapp)
+REPO_RESOURCES = [
+    ('swarm/rules/validation_rules_v1.yaml', 'rules/validation_rules_v1.yaml'),
+]
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def collect_sources() -> List[Tuple[Path, str]]:
+    """(archivo, ruta en el zipapp) de todo lo que se empaqueta."""
+    files = [(TOOLING_DIR / '__main__.py', '__main__.py')]
+    for pattern in ('lib/*.py', 'scripts/*.py', 'schemas/*.yaml'):
+        for path in sorted(TOOLING_DIR.glob(pattern)):
+            if path.resolve() != Path(__file__).resolve():
+                files.append((path, path.relative_to(TOOLING_DIR).as_posix()))
+    files += [(TOOLING_DIR.parent / source, arcname) for source, arcname in REPO_RESOURCES]
+    return files
+
+
+def compile_pyc(source: Path, arcname: str, tmp_dir: Path) -> bytes:
+    """Bytecode de un .py (hash sin verificar, válido sin mtime)."""
+    cfile = tmp_dir / (arcname.replace('/', '_') + 'c')
+    py_compile.compile(str(source), cfile=str(cfile), dfile=arcname, doraise=True,
+                       invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    return cfile.read_bytes()
+
+
+def build_snapshot(files: List[Tuple[Path, str]]) -> Tuple[bytes, List[str]]:
+    """
+    Snapshot marshal de los YAML de schemas/: {ruta: marshal(datos)}.
+
+    Returns:
+        (snapshot, rutas que marshal no puede serializar y quedan como YAML)
+    """
+    entries: Dict[str, bytes] = {}
+    skipped = []
+    for path, arcname in files:
+        if not arcname.endswith('.yaml'):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        try:
+            entries[arcname] = marshal.dumps(data)
+        except ValueError:
+            skipped.append(arcname)  # Tipos que marshal no admite (fechas...)
+    return marshal.dumps(entries), skipped
+
+
+def _write(zf: zipfile.ZipFile, arcname: str, data: bytes, compression: int) -> None:
+    info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE)
+    info.compress_type = compression
+    info.external_attr = 0o644 << 16
+    zf.writestr(info, data)
+
+
+def build_zipapp(output: Path = DEFAULT_OUTPUT, compress: bool = False) -> Dict:
+    """
+    Construye el zipapp.
+
+    Args:
+        output: Archivo .pyz de salida
+        compress: Deflate (más pequeño); por defecto sin comprimir (arranque más rápido)
+
+    Returns:
+        {'output', 'bytes', 'modules', 'schemas', 'snapshot_skipped', 'python'}
+    """
+    files = collect_sources()
+    snapshot, skipped = build_snapshot(files)
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(output.name + '.tmp')
+    modules = 0
+    with tempfile.TemporaryDirectory(prefix='aps_zipapp_') as tmp:
+        with open(tmp_output, 'wb') as f:
+            f.write(f'#!{INTERPRETER}\n'.encode('utf-8'))
+            with zipfile.ZipFile(f, 'w') as zf:
+                for path, arcname in files:
+                    _write(zf, arcname, path.read_bytes(), compression)
+                    if arcname.endswith('.py'):
+                        _write(zf, arcname + 'c', compile_pyc(path, arcname, Path(tmp)), compression)
+                        modules += 1
+                _write(zf, SNAPSHOT_NAME, snapshot, compression)
+    os.chmod(tmp_output, 0o755)
+    os.replace(tmp_output, output)
+
+    return {
+        'output': str(output),
+        'bytes': output.stat().st_size,
+        'modules': modules,
+        'schemas': sum(1 for _, arcname in files if arcname.endswith('.yaml')),
+        'snapshot_skipped': skipped,
+        'python': f'{sys.version_info.major}.{sys.version_info.minor}',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Empaqueta APS Tooling en un zipapp (aps.pyz)')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f'Archivo de salida (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--compress', action='store_true',
+                        help='Comprimir (deflate): más pequeño, arranque algo más lento')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = build_zipapp(args.output, args.compress)
+    print(f"📦 {result['output']}: {result['bytes'] / 1024:.0f} KB, {result['modules']} módulos "
+          f"(.pyc para Python {result['python']}), {result['schemas']} schemas "
+          f"({time.perf_counter() - start:.2f}s)")
+    for arcname in result['snapshot_skipped']:
+        print(f"⚠️  {arcname}: no serializable con marshal, se parsea como YAML al cargarlo")
+    print(f"   Uso: python3 {result['output']} --help")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+CLI del catálogo de bloques (SQLite + FTS5).
+
+Ingiere los JSON de SwarmBuilder y los YAML de agentes de todos los swarms y
+responde consultas en milisegundos sin volver a parsear archivos.
+
+Uso:
+    python3 catalog_cli.py ingest "swarm/json/*.json" "swarm/agents/**/*.yaml" --lint
+    python3 catalog_cli.py search "state_json NOT session_id" --block "Entry Guard"
+    python3 catalog_cli.py sid BLK.verificar.control.active_agent.guard
+    python3 catalog_cli.py diff J2C-v1-Swarm-v3-4 J2C-v1-Swarm-v3-5 --by name
+    python3 catalog_cli.py issues --severity ERROR
+    python3 catalog_cli.py sql "SELECT block_type, COUNT(*) n FROM blocks GROUP BY block_type"
+"""
+
+import argparse
+import glob
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.catalog import BlockCatalog, DEFAULT_CATALOG_PATH, ORIGIN_JSON, ORIGIN_YAML
+
+
+def expand(patterns):
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(pattern, recursive=True))
+    return sorted(set(files))
+
+
+def ingest(catalog, patterns, swarm=None, lint=False):
+    """Ingiere .json (swarms) y .yaml (agentes). Retorna el número de archivos con error."""
+    if lint:
+        from yaml_lint import lint_yaml_file  # Solo `index --lint` necesita el linter
+    agents = skipped = blocks = failures = 0
+    start = time.perf_counter()
+    for f in expand(patterns):
+        path = Path(f)
+        try:
+            if path.suffix == '.json':
+                result = catalog.ingest_swarm_json(path)
+                agents += result['agents']
+                skipped += result['skipped']
+                blocks += result['blocks']
+            elif path.suffix in ('.yaml', '.yml'):
+                agent_id = catalog.ingest_agent_yaml(path, swarm)
+                if agent_id is None:
+                    skipped += 1
+                    continue
+                agents += 1
+                if lint:
+                    errors, _ = lint_yaml_file(path)
+                    catalog.record_lint_issues(agent_id, 'yaml_lint', (
+                        {'block': e.block, 'severity': e.severity, 'code': e.code, 'message': e.message}
+                        for e in errors
+                    ))
+        except (ValueError, OSError) as e:
+            print(f"⚠️  {path}: {e}")
+            failures += 1
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats = catalog.stats()
+    print(f"🗂️  {agents} agentes ingeridos, {skipped} sin cambios ({elapsed_ms:.0f} ms)")
+    print(f"   Catálogo: {stats['swarms']} swarms, {stats['agents']} agentes, "
+          f"{stats['blocks']} bloques, {stats['lint_issues']} issues")
+    return failures
+
+
+def print_rows(rows, as_json):
+    if as_json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    for row in rows:
+        location = f"{row['swarm']} / {row['agent']} ({row['origin']}) :: {row['block']}"
+        print(f"• {location}")
+        if row.get('sid'):
+            print(f"    sid: {row['sid']}")
+        if row.get('snippet'):
+            print(f"    {' '.join(row['snippet'].split())}")
+    print(f"\n{len(rows)} resultados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catálogo de bloques APS (SQLite + FTS5)')
+    parser.add_argument('--db', default=str(DEFAULT_CATALOG_PATH),
+                        help=f'Archivo SQLite del catálogo (default: {DEFAULT_CATALOG_PATH})')
+    parser.add_argument('--json', action='store_true', help='Salida JSON')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help='Ingerir JSON de swarms y YAML de agentes')
+    p.add_argument('patterns', nargs='+', help='Archivos o patrones glob')
+    p.add_argument('--swarm', help='Swarm de los YAML (default: directorio que los contiene)')
+    p.add_argument('--lint', action='store_true', help='Guardar también los issues de yaml_lint')
+
+    origin_choices = [ORIGIN_JSON, ORIGIN_YAML]
+
+    p = sub.add_parser('search', help='Búsqueda full-text en el contenido (sintaxis FTS5)')
+    p.add_argument('text')
+    p.add_argument('--block', help='Filtrar por nombre de bloque (p.ej. "Entry Guard")')
+    p.add_argument('--swarm')
+    p.add_argument('--origin', choices=origin_choices)
+    p.add_argument('--limit', type=int, default=50)
+
+    p = sub.add_parser('sid', help='Bloques con este SID')
+    p.add_argument('sid')
+    p.add_argument('--swarm')
+
+    p = sub.add_parser('type', help='Bloques de un block_type')
+    p.add_argument('block_type')
+    p.add_argument('--swarm')
+
+    p = sub.add_parser('diff', help='SIDs/bloques añadidos, eliminados y cambiados entre swarms')
+    p.add_argument('old')
+    p.add_argument('new')
+    p.add_argument('--by', choices=['sid', 'name'], default='sid')
+    p.add_argument('--origin', choices=origin_choices)
+
+    p = sub.add_parser('issues', help='Issues de lint guardados')
+    p.add_argument('--swarm')
+    p.add_argument('--severity')
+    p.add_argument('--code')
+
+    p = sub.add_parser('sql', help='Consulta SQL libre')
+    p.add_argument('query')
+
+    sub.add_parser('stats', help='Filas por tabla')
+
+    args = parser.parse_args()
+    catalog = BlockCatalog(args.db)
+    try:
+        run(catalog, args)
+    except sqlite3.OperationalError as e:
+        # Sintaxis FTS5 de `search` o SQL de `sql` inválidos
+        print(f"❌ Consulta inválida: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+def run(catalog, args):
+    if args.command == 'ingest':
+        sys.exit(1 if ingest(catalog, args.patterns, args.swarm, args.lint) else 0)
+
+    elif args.command == 'search':
+        print_rows(catalog.search(args.text, args.block, args.swarm, args.origin, args.limit), args.json)
+
+    elif args.command == 'sid':
+        print_rows(catalog.find_blocks(sid=args.sid, swarm=args.swarm), args.json)
+
+    elif args.command == 'type':
+        print_rows(catalog.find_blocks(block_type=args.block_type, swarm=args.swarm), args.json)
+
+    elif args.command == 'diff':
+        diff = catalog.diff_swarms(args.old, args.new, args.by, args.origin)
+        if args.json:
+            print(json.dumps(diff, indent=2, ensure_ascii=False))
+        else:
+            if diff['key'] != args.by:
+                print("ℹ️  Sin SIDs en alguno de los swarms: comparando por nombre de bloque")
+            for kind, icon in (('added', '➕'), ('removed', '➖'), ('changed', '✏️ ')):
+                print(f"{icon} {kind}: {len(diff[kind])}")
+                for agent, key in diff[kind]:
+                    print(f"    {agent} :: {key}")
+
+    elif args.command == 'issues':
+        rows = catalog.lint_issues(args.swarm, args.severity, args.code)
+        if args.json:
+            print(json.dumps(rows, indent=2, ensure_ascii=False))
+        else:
+            for row in rows:
+                print(f"{row['severity']:<8} [{row['code']}] {row['swarm']} / {row['agent']} :: "
+                      f"{row['block']}: {row['message']}")
+            print(f"\n{len(rows)} issues")
+
+    elif args.command == 'sql':
+        print(json.dumps(catalog.query(args.query), indent=2, ensure_ascii=False))
+
+    elif args.command == 'stats':
+        print(json.dumps(catalog.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
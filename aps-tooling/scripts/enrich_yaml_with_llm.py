@@ -3,14 +3,24 @@
 Genera YAMLs de agentes SWARM con placeholders semánticos.
 Añade: accion=<<PENDING_AI>>, relacion=<<PENDING_AI>>, nivel=<<PENDING_AI>>, sid=TEMP_XXX_NNN
 
-El agente Copilot @sid-generator reemplazará los placeholders con SIDs semánticos reales.
+El agente Copilot @sid-generator reemplazará los placeholders con SIDs semánticos reales,
+o bien --backend envía los bloques a un backend de completado (lib/enrichment_engine.py)
+y escribe directamente los SIDs semánticos.
 """
 
+import argparse
+import glob
 import yaml
 import sys
 import json
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.sid_registry import SIDRegistry, DEFAULT_REGISTRY_PATH, agent_yaml_entries
+from lib.enrichment_cache import EnrichmentCache, DEFAULT_CACHE_PATH, prompt_fingerprint
+from lib.yaml_cache import load_yaml, dump_yaml
+from lib.tracing import span
+
 # Prompt para el LLM (puedes usar con OpenAI API, Anthropic, etc.)
 ENRICHMENT_PROMPT = """
 Analiza este bloque de un agente SWARM y extrae los atributos semánticos:
@@ -56,87 +66,196 @@ def analyze_block_semantic(block_type, block_index):
     }
 
 
-def enrich_yaml_file(input_path, output_path=None):
+def _pending_blocks(data):
+    """Bloques sin SID real (sin 'sid' o con SID temporal TEMP_)."""
+    return [
+        (name, block) for name, block in data['agent']['blocks'].items()
+        if isinstance(block, dict) and str(block.get('sid', 'TEMP_')).startswith('TEMP_')
+    ]
+
+
+def enrich_yaml_files(files, registry=None, engine=None):
+    """
+    Enriquece varios YAML de agente en una sola pasada.
+
+    Sin motor, genera placeholders TEMP_ para @sid-generator. Con un
+    EnrichmentEngine, todos los bloques pendientes del swarm se envían
+    juntos al backend (concurrencia y batching entre archivos); los bloques
+    cuyo lote falla tras los reintentos, o cuyo SID ya usa otro bloque del
+    agente, quedan con placeholder.
+
+    Args:
+        files: Lista de (input_path, output_path)
+        registry: SIDRegistry opcional para sincronizar los SIDs reales
+        engine: EnrichmentEngine opcional
+
+    Returns:
+        Número de archivos enriquecidos
+    """
+    loaded = []
+    for input_path, output_path in files:
+        data = load_yaml(input_path, cache=False)
+        if not isinstance(data, dict) or 'agent' not in data or 'blocks' not in data['agent']:
+            print(f"⚠️  {input_path}: no tiene estructura agent.blocks esperada")
+            continue
+        loaded.append((Path(input_path), Path(output_path), data, _pending_blocks(data)))
+
+    results = {}
+    if engine is not None:
+        jobs = [
+            {
+                'id': f"{file_idx}:{block_name}",
+                'block_name': block_name,
+                'block_type': block.get('block_type', 'BLK'),
+                'content': block.get('content', ''),
+            }
+            for file_idx, (_, _, _, pending) in enumerate(loaded)
+            for block_name, block in pending
+        ]
+        if jobs:
+            with span('enrich.backend', blocks=len(jobs), files=len(loaded)):
+                results = engine.run(jobs)
+
+    for file_idx, (input_path, output_path, data, pending) in enumerate(loaded):
+        with span('enrich.agent', file=str(output_path), agent=data['agent'].get('name', input_path.stem),
+                  blocks=len(pending)) as sp:
+            blocks = data['agent']['blocks']
+            enriched_count = 0
+            # SIDs ya usados en el agente: un SID repetido se deja a @sid-generator (como md2yaml)
+            pending_names = {name for name, _ in pending}
+            used_sids = {str(block.get('sid')) for name, block in blocks.items()
+                         if isinstance(block, dict) and name not in pending_names and block.get('sid')}
+
+            for block_index, (block_name, block_data) in enumerate(pending, start=1):
+                block_type = block_data.get('block_type', 'BLK')
+                semantic = results.get(f"{file_idx}:{block_name}", {})
+                if 'sid' not in semantic or semantic['sid'] in used_sids:
+                    semantic = analyze_block_semantic(block_type, block_index)
+                else:
+                    used_sids.add(semantic['sid'])
+                    enriched_count += 1
+
+                # Insertar atributos (mantener orden: block_type, accion, relacion, nivel, sid, content)
+                blocks[block_name] = {
+                    'block_type': block_type,
+                    'accion': semantic['accion'],
+                    'relacion': semantic['relacion'],
+                    'nivel': semantic['nivel'],
+                    'sid': semantic['sid'],
+                    'content': block_data.get('content', '')
+                }
+            sp.set(enriched=enriched_count)
+
+            # Guardar YAML enriquecido
+            dump_yaml(data, output_path, default_flow_style=False, sort_keys=False)
+
+            if registry is not None:
+                source = data['agent'].get('source_md', str(input_path))
+                result = registry.sync_file(source, agent_yaml_entries(data),
+                                            scope=data['agent'].get('name', input_path.stem),
+                                            origin='enrich')
+                for conflict in result['conflicts']:
+                    print(f"⚠️  SID '{conflict['entry']['sid']}' ya registrado por "
+                          f"{conflict['owner']['source_file']} ({conflict['owner']['block_name']})")
+
+        placeholders = len(pending) - enriched_count
+        if engine is None:
+            print(f"✅ {input_path.name}: {placeholders} bloques con placeholders generados")
+        else:
+            print(f"✅ {input_path.name}: {enriched_count} bloques enriquecidos"
+                  + (f", {placeholders} con placeholder" if placeholders else ""))
+
+    if engine is None:
+        print("   → Siguiente paso: @sid-generator para SIDs semánticos")
+    return len(loaded)
+
+
+def enrich_yaml_file(input_path, output_path=None, registry=None, engine=None):
     """
     Lee un YAML de agente, enriquece bloques con atributos semánticos,
     y guarda el resultado.
+
+    Si se pasa un SIDRegistry, los SIDs reales resultantes se sincronizan
+    con el registro central (scope = nombre del agente). Si se pasa un
+    EnrichmentEngine, los atributos se obtienen del backend en lugar de
+    dejar placeholders.
     """
     if output_path is None:
         output_path = input_path
-    
-    # Leer YAML preservando orden
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
-    if 'agent' not in data or 'blocks' not in data['agent']:
-        print(f"⚠️  {input_path}: no tiene estructura agent.blocks esperada")
-        return False
-    
-    blocks = data['agent']['blocks']
-    enriched_count = 0
-    block_index = 0
-    
-    for block_name, block_data in blocks.items():
-        if not isinstance(block_data, dict):
-            continue
-        
-        block_type = block_data.get('block_type', 'BLK')
-        content = block_data.get('content', '')
-        
-        # Si ya tiene SID real (no temporal), saltar
-        if 'sid' in block_data and not block_data['sid'].startswith('TEMP_'):
-            continue
-        
-        # Analizar y generar placeholder temporal
-        block_index += 1
-        semantic = analyze_block_semantic(block_type, block_index)
-        
-        # Insertar atributos (mantener orden: block_type, accion, relacion, nivel, sid, content)
-        ordered_block = {
-            'block_type': block_type,
-            'accion': semantic['accion'],
-            'relacion': semantic['relacion'],
-            'nivel': semantic['nivel'],
-            'sid': semantic['sid'],
-            'content': content
-        }
-        
-        blocks[block_name] = ordered_block
-        enriched_count += 1
-    
-    # Guardar YAML enriquecido
-    with open(output_path, 'w', encoding='utf-8') as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-    
-    print(f"✅ {input_path.name}: {enriched_count} bloques con placeholders generados")
-    print("   → Siguiente paso: @sid-generator para SIDs semánticos")
-    return True
+    return enrich_yaml_files([(input_path, output_path)], registry=registry, engine=engine) == 1
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python3 enrich_yaml_with_llm.py <archivo.yaml> [output.yaml]")
-        print("  o: python3 enrich_yaml_with_llm.py --batch swarm/agents/*.yaml")
+    parser = argparse.ArgumentParser(
+        description='Enriquece YAMLs de agentes con atributos semánticos (accion/relacion/nivel/sid)'
+    )
+    parser.add_argument('input', nargs='?', help='Archivo YAML de agente')
+    parser.add_argument('output', nargs='?', help='Archivo de salida (default: sobrescribe input)')
+    parser.add_argument('--batch', metavar='PATTERN', help='Patrón glob de YAMLs (modo batch)')
+    parser.add_argument('--registry', nargs='?', const=str(DEFAULT_REGISTRY_PATH), default=None,
+                        help='Sincronizar con el registro de SIDs (ruta opcional .sqlite)')
+    parser.add_argument('--backend', default=None,
+                        help="Backend de completado: 'local' o 'modulo:Clase' "
+                             "(sin backend: placeholders para @sid-generator)")
+    parser.add_argument('--concurrency', type=int, default=8, help='Peticiones en vuelo (default: 8)')
+    parser.add_argument('--batch-size', type=int, default=4, help='Bloques por prompt (default: 4)')
+    parser.add_argument('--retries', type=int, default=3, help='Reintentos por lote (default: 3)')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='Peticiones/s (default: límite del backend)')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Caché de resultados del backend (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='No consultar ni guardar resultados en caché')
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help="Latencia simulada del backend 'local' (pruebas de carga)")
+    args = parser.parse_args()
+
+    if not args.input and not args.batch:
+        parser.print_usage()
+        print("  o: python3 enrich_yaml_with_llm.py --batch 'swarm/agents/*.yaml' --backend local")
         sys.exit(1)
-    
-    if sys.argv[1] == '--batch':
+
+    registry = SIDRegistry(args.registry) if args.registry else None
+
+    engine = None
+    if args.backend:
+        # asyncio solo se importa con backend: sin él, el arranque no lo paga
+        from lib.enrichment_engine import EnrichmentEngine, get_backend
+
+        backend_kwargs = {'latency_ms': args.latency_ms} if args.backend == 'local' else {}
+        backend = get_backend(args.backend, **backend_kwargs)
+        cache = None
+        if not args.no_cache:
+            cache = EnrichmentCache(args.cache,
+                                    prompt_version=prompt_fingerprint(ENRICHMENT_PROMPT, backend.name))
+        engine = EnrichmentEngine(
+            backend,
+            prompt_template=ENRICHMENT_PROMPT,
+            cache=cache,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        )
+
+    if args.batch:
         # Modo batch: procesar múltiples archivos
-        import glob
-        pattern = sys.argv[2] if len(sys.argv) > 2 else 'swarm/agents/*.yaml'
-        files = glob.glob(pattern)
-        
+        files = sorted(glob.glob(args.batch, recursive=True))
+
         print(f"🔄 Enriqueciendo {len(files)} archivos YAML...")
-        success = 0
-        for f in files:
-            if enrich_yaml_file(Path(f)):
-                success += 1
-        
+        success = enrich_yaml_files([(f, f) for f in files], registry=registry, engine=engine)
+
         print(f"\n✅ Completado: {success}/{len(files)} archivos enriquecidos")
     else:
         # Modo simple: un archivo
-        input_file = Path(sys.argv[1])
-        output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else input_file
-        enrich_yaml_file(input_file, output_file)
+        input_file = Path(args.input)
+        output_file = Path(args.output) if args.output else input_file
+        enrich_yaml_file(input_file, output_file, registry=registry, engine=engine)
+
+    if engine is not None:
+        print(f"⚡ Motor ({engine.backend.name}): {engine.format_stats()}")
+        if engine.cache is not None:
+            print(f"💾 Caché: {engine.cache.format_stats()}")
 
 
 if __name__ == '__main__':
@@ -13,6 +13,9 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.tracing import span
+
 def validate_json_structure(json_data: dict) -> Tuple[bool, str]:
     """
     Valida que el JSON tenga la estructura esperada de SwarmBuilder.
@@ -62,6 +65,14 @@ def extract_goals(json_path: str, output_dir: str = None, force: bool = False) -
             'errors': List[str]
         }
     """
+    with span('extract_goals.swarm', file=str(json_path)) as sp:
+        result = _extract_goals(json_path, output_dir, force)
+        sp.set(agents=result['total_agents'], files=len(result['files_created']),
+               errors=len(result['errors']))
+    return result
+
+
+def _extract_goals(json_path: str, output_dir: str, force: bool) -> Dict[str, any]:
     result = {
         'success': False,
         'files_created': [],
@@ -137,8 +148,11 @@ def extract_goals(json_path: str, output_dir: str = None, force: bool = False) -
         filepath = output_path / filename
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(goals_content)
+            with span('extract_goals.agent', agent=agent_name, file=str(filepath)) as sp:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(goals_content)
+                if sp.enabled:
+                    sp.set(bytes=len(goals_content.encode('utf-8')))
             result['files_created'].append(str(filepath))
         except Exception as e:
             result['errors'].append(f"Error escribiendo {filename}: {e}")
@@ -1,7 +1,16 @@
 import re
+import sys
 import yaml
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.sid_registry import SIDRegistry, DEFAULT_REGISTRY_PATH, agent_yaml_entries
+from lib.sid_inference import RuleBasedSIDInferencer
+from lib.confidence_system import ConfidenceLevel
+from lib.yaml_cache import dump_yaml
+from lib.md_blocks import read_source_lines, source_map, split_blocks
+from lib.tracing import span
+
 # Diccionario parametrizable de abreviaturas de tipo de bloque
 BLOCK_TYPE_MAP = {
     'Motivaciones': 'GOAL',
@@ -18,133 +27,178 @@ BLOCK_TYPE_MAP = {
 }
 
 # Mapeos para inferir acción, relación y nivel
+# (claves = términos permitidos en schemas/sid_vocabulary_v1.yaml)
 ACCION_KEYWORDS = {
     'verificar': ['guard', 'validar', 'comprobar', 'verificar', 'entry guard'],
-    'instruir': ['instrucciones', 'protocolo', 'reglas', 'guía', 'procedimiento'],
+    'informar': ['instrucciones', 'protocolo', 'reglas', 'guía', 'procedimiento'],
     'detectar': ['detectar', 'identificar', 'reconocer', 'paso'],
     'generar': ['output', 'salida', 'generar', 'producir'],
     'capturar': ['capturar', 'recopilar', 'obtener', 'preguntar'],
-    'coordinar': ['coordinar', 'activar', 'delegar', 'flujo'],
-    'resumir': ['resumen', 'resumir', 'consolidar'],
+    'delegar': ['coordinar', 'activar', 'delegar', 'flujo', 'handoff', 'transferir'],
+    'reportar': ['resumen', 'resumir', 'consolidar'],
+    'prohibir': ['prohibido', 'prohibir', 'nunca', 'antipatrón'],
+    'actualizar': ['actualizar', 'actualización', 'persistir'],
+    'formatear': ['formato', 'plantilla', 'template'],
 }
 
 RELACION_KEYWORDS = {
     'control.active_agent': ['control', 'active_agent', 'guard', 'entry'],
-    'usuario.respuesta': ['usuario', 'respuesta', 'primera', 'output'],
-    'agente': ['agente', 'agent', 'swarm', 'orquestador'],
-    'fase': ['fase', 'phase', 'motivaciones', 'stakeholders', 'asis', 'riesgos', 'gap', 'requisitos'],
-    'estado': ['estado', 'state', 'json', 'session'],
+    'usuario.input': ['usuario', 'primera', 'entrada', 'input'],
+    'datos.output': ['output', 'salida', 'respuesta'],
+    'handoff.target': ['agente', 'agent', 'swarm', 'orquestador', 'siguiente agente'],
+    'control.flujo': ['fase', 'phase', 'motivaciones', 'stakeholders', 'asis', 'riesgos', 'gap', 'requisitos'],
+    'control.estado': ['estado', 'state', 'json', 'session'],
+    'state_json': ['state_json', 'session_id'],
+    'migracion.drivers': ['drivers', 'motivos', 'motivación'],
 }
 
 NIVEL_KEYWORDS = {
     'guard': ['guard', 'entry', 'validación'],
-    'tactical': ['táctica', 'tactical', 'operación'],
-    'strategic': ['estratégico', 'strategic', 'objetivo'],
-    'general': ['general', 'protocolo', 'instrucción'],
+    'workflow': ['táctica', 'tactical', 'operación', 'paso', 'flujo', 'workflow'],
+    'policy': ['estratégico', 'strategic', 'objetivo'],
+    'protocol': ['general', 'protocolo', 'instrucción', 'handoff', 'state_json'],
+    'template': ['plantilla', 'template', 'formato'],
+    'example': ['example', 'ejemplo'],
+    'antipattern': ['antipatrón', 'antipatron', 'antipattern'],
+    'constraint': ['restricción', 'restricciones', 'límite'],
 }
 
-def extract_blocks_from_md(md_path):
+PENDING_AI = '<<PENDING_AI>>'
+
+
+def build_inferencer():
+    """Motor de inferencia por palabras clave con los diccionarios de este módulo."""
+    return RuleBasedSIDInferencer(ACCION_KEYWORDS, RELACION_KEYWORDS, NIVEL_KEYWORDS)
+
+
+def get_block_type(block_name):
+    """
+    Infiere el tipo de bloque basado en el nombre.
+    Detecta marcadores especiales como [EXAMPLE] o [ANTIPATRÓN].
+    """
+    name_upper = block_name.upper()
+    
+    # Detectar marcadores especiales (exentos de DENY_TERMS)
+    if '[EXAMPLE]' in name_upper or '[EJEMPLO]' in name_upper:
+        return 'EXAMPLE'
+    if '[ANTIPATRÓN]' in name_upper or '[ANTIPATRON]' in name_upper:
+        return 'ANTIPATTERN'
+    
+    # Mapeo estándar
+    for key in BLOCK_TYPE_MAP:
+        if key.lower() in block_name.lower():
+            return BLOCK_TYPE_MAP[key]
+    return 'BLK'
+
+
+def extract_blocks_from_md(md_path, inferencer=None, positions=None, lines=None):
     """
     Extrae bloques explícitos de un archivo Markdown usando encabezados.
     Devuelve un diccionario con el nombre del bloque, su tipo y su contenido.
     Auto-numera bloques duplicados para que el linter los detecte posteriormente.
     Genera placeholders para accion, relacion, nivel y SIDs temporales.
+
+    Si se pasa un RuleBasedSIDInferencer, los bloques con confianza HIGH reciben
+    directamente su SID semántico; el resto queda con placeholder para la IA.
+
+    Si se pasa un dict en `positions`, se rellena con la posición de cada bloque
+    en el .md (lib.md_blocks.source_map: líneas y offsets en bytes).
+
+    Con `lines` (lib.md_blocks.split_lines del texto) no se lee md_path: el
+    contenido llega en memoria (p.ej. un payload de sls.py).
     """
-    blocks = {}
-    block_counts = {}  # Contador de apariciones de cada nombre de bloque
-    temp_sid_counter = 1  # Contador para SIDs temporales
-    current_block = None
-    current_content = []
-    header_pattern = re.compile(r'^(#{1,6})\s*(.+)$')
-
-    def get_block_type(block_name):
-        """
-        Infiere el tipo de bloque basado en el nombre.
-        Detecta marcadores especiales como [EXAMPLE] o [ANTIPATRÓN].
-        """
-        name_upper = block_name.upper()
-        
-        # Detectar marcadores especiales (exentos de DENY_TERMS)
-        if '[EXAMPLE]' in name_upper or '[EJEMPLO]' in name_upper:
-            return 'EXAMPLE'
-        if '[ANTIPATRÓN]' in name_upper or '[ANTIPATRON]' in name_upper:
-            return 'ANTIPATTERN'
-        
-        # Mapeo estándar
-        for key in BLOCK_TYPE_MAP:
-            if key.lower() in block_name.lower():
-                return BLOCK_TYPE_MAP[key]
-        return 'BLK'
-
-    with open(md_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            match = header_pattern.match(line)
-            if match:
-                if current_block:
-                    content = '\n'.join(current_content).strip()
-                    block_type = get_block_type(current_block)
-                    
-                    blocks[current_block] = {
-                        'block_type': block_type,
-                        'accion': '<<PENDING_AI>>',
-                        'relacion': '<<PENDING_AI>>',
-                        'nivel': '<<PENDING_AI>>',
-                        'sid': f'TEMP_{block_type}_{temp_sid_counter:03d}',
-                        'content': content
-                    }
-                    temp_sid_counter += 1
-                
-                # Detectar duplicados y auto-numerar
-                raw_block_name = match.group(2).strip()
-                if raw_block_name in block_counts:
-                    block_counts[raw_block_name] += 1
-                    current_block = f"{raw_block_name} ({block_counts[raw_block_name]})"
-                else:
-                    block_counts[raw_block_name] = 1
-                    current_block = raw_block_name
-                
-                current_content = []
-            else:
-                if current_block:
-                    current_content.append(line.rstrip())
-        if current_block:
-            content = '\n'.join(current_content).strip()
-            block_type = get_block_type(current_block)
-            
-            blocks[current_block] = {
-                'block_type': block_type,
-                'accion': '<<PENDING_AI>>',
-                'relacion': '<<PENDING_AI>>',
-                'nivel': '<<PENDING_AI>>',
-                'sid': f'TEMP_{block_type}_{temp_sid_counter:03d}',
-                'content': content
-            }
+    used_sids = set()
+
+    def make_block(block_name, content, counter):
+        """Bloque con SID inferido (confianza HIGH) o con placeholders para la IA."""
+        block_type = get_block_type(block_name)
+
+        if inferencer is not None:
+            result = inferencer.infer(block_name, content, block_type)
+            # Un SID repetido en el agente se deja a la IA para no generar duplicados
+            if result['confidence'] == ConfidenceLevel.HIGH and result['sid'] not in used_sids:
+                used_sids.add(result['sid'])
+                metadata = inferencer.cs.format_metadata(result['evaluation'])
+                return {
+                    'block_type': block_type,
+                    'accion': result['accion'],
+                    'relacion': result['relacion'],
+                    'nivel': result['nivel'],
+                    'sid': result['sid'],
+                    'confidence': metadata['confidence'],
+                    'inference_method': metadata['inference_method'],
+                    'content': content
+                }
+
+        return {
+            'block_type': block_type,
+            'accion': PENDING_AI,
+            'relacion': PENDING_AI,
+            'nivel': PENDING_AI,
+            'sid': f'TEMP_{block_type}_{counter:03d}',
+            'content': content
+        }
+
+    with span('md2yaml.extract_blocks', file=str(md_path), agent=Path(md_path).stem) as sp:
+        # Límites de bloque por encabezado (lib.md_blocks, compartidos con el servidor LSP)
+        if lines is None:
+            lines = read_source_lines(md_path)
+        md_blocks = split_blocks(lines)
+        if positions is not None:
+            positions.update(source_map(lines, md_blocks))
+        blocks = {
+            block.name: make_block(block.name, block.content(lines), counter)
+            for counter, block in enumerate(md_blocks, start=1)
+        }
+        sp.set(blocks=len(blocks))
+        if sp.enabled:
+            sp.set(bytes=sum(len(line.encode('utf-8')) for line in lines))
     return blocks
 
-def generate_yaml_for_agent(md_path, yaml_path):
-    blocks = extract_blocks_from_md(md_path)
-    agent_struct = {
+def build_agent_struct(md_path, inferencer=None, lines=None):
+    """
+    Estructura del YAML de un agente ({'agent': {name, source_md, blocks, source_map}})
+    sin escribirla. Con `lines`, el Markdown se toma de memoria (ver extract_blocks_from_md).
+    """
+    positions = {}
+    blocks = extract_blocks_from_md(md_path, inferencer=inferencer, positions=positions, lines=lines)
+    return {
         'agent': {
             'name': Path(md_path).stem,
             'source_md': str(md_path),
-            'blocks': blocks
+            'blocks': blocks,
+            'source_map': positions
         }
     }
-    with open(yaml_path, 'w', encoding='utf-8') as f:
-        yaml.dump(agent_struct, f, allow_unicode=True, sort_keys=False)
 
-def process_file(md_file):
+def generate_yaml_for_agent(md_path, yaml_path, registry=None, inferencer=None):
+    """
+    Genera el YAML de un agente. Si se pasa un SIDRegistry, sincroniza los SIDs
+    reales (no TEMP_*) de los bloques con el registro central.
+
+    Returns:
+        (bloques totales, bloques con SID inferido)
+    """
+    agent_struct = build_agent_struct(md_path, inferencer=inferencer)
+    dump_yaml(agent_struct, yaml_path, sort_keys=False)
+    if registry is not None:
+        registry.sync_file(md_path, agent_yaml_entries(agent_struct),
+                           scope=agent_struct['agent']['name'], origin='md2yaml')
+    blocks = agent_struct['agent']['blocks']
+    inferred = sum(1 for b in blocks.values() if not b['sid'].startswith('TEMP_'))
+    return len(blocks), inferred
+
+def process_file(md_file, inferencer=None, registry=None):
     """
     Procesa un único archivo .md y genera su correspondiente .yaml.
-    Retorna True si tuvo éxito, False en caso contrario.
+    Retorna (bloques, inferidos) si tuvo éxito, None en caso contrario.
     """
     yaml_file = str(Path(md_file).with_suffix('.yaml'))
     try:
-        generate_yaml_for_agent(md_file, yaml_file)
-        return True
+        return generate_yaml_for_agent(md_file, yaml_file, registry=registry, inferencer=inferencer)
     except Exception as e:
         print(f"❌ Error procesando {Path(md_file).name}: {e}")
-        return False
+        return None
 
 def collect_files(args):
     """
@@ -200,11 +254,27 @@ def collect_files(args):
 if __name__ == "__main__":
     import sys
     
+    # --no-infer: todos los bloques quedan con placeholders (comportamiento anterior)
+    inferencer = None
+    if '--no-infer' in sys.argv:
+        sys.argv.remove('--no-infer')
+    else:
+        inferencer = build_inferencer()
+
+    # --registry[=RUTA]: sincronizar los SIDs inferidos con el registro central
+    registry = None
+    for arg in list(sys.argv[1:]):
+        if arg == '--registry' or arg.startswith('--registry='):
+            sys.argv.remove(arg)
+            registry = SIDRegistry(arg.partition('=')[2] or DEFAULT_REGISTRY_PATH)
+
     if len(sys.argv) < 2:
         print("Uso: python md2yaml.py <archivo.md> [salida.yaml]")
         print("  o: python md2yaml.py <directorio/>")
         print("  o: python md2yaml.py <patrón.md>")
         print("  o: python md2yaml.py archivo1.md archivo2.md ...")
+        print("  Opcional: --no-infer para no inferir SIDs (todo queda para la IA)")
+        print(f"  Opcional: --registry[=RUTA] para sincronizar los SIDs con el registro ({DEFAULT_REGISTRY_PATH})")
         exit(1)
     
     # Caso especial: modo simple con archivo de salida explícito
@@ -212,8 +282,8 @@ if __name__ == "__main__":
     if len(sys.argv) == 3 and not sys.argv[2].endswith('.md') and Path(sys.argv[1]).is_file():
         md_path = sys.argv[1]
         yaml_path = sys.argv[2]
-        generate_yaml_for_agent(md_path, yaml_path)
-        print(f"✅ YAML generado en {yaml_path}")
+        total, inferred = generate_yaml_for_agent(md_path, yaml_path, registry=registry, inferencer=inferencer)
+        print(f"✅ YAML generado en {yaml_path} ({inferred}/{total} SIDs inferidos)")
         exit(0)
     
     # Modo batch: recolectar archivos de todos los argumentos
@@ -228,9 +298,9 @@ if __name__ == "__main__":
         # Modo simple: un solo archivo
         md_file = files_to_process[0]
         yaml_file = str(Path(md_file).with_suffix('.yaml'))
-        success = process_file(md_file)
-        if success:
-            print(f"✅ YAML generado: {yaml_file}")
+        result = process_file(md_file, inferencer, registry)
+        if result:
+            print(f"✅ YAML generado: {yaml_file} ({result[1]}/{result[0]} SIDs inferidos)")
             exit(0)
         else:
             exit(1)
@@ -238,12 +308,21 @@ if __name__ == "__main__":
         # Modo batch: múltiples archivos
         print(f"🔄 Procesando {len(files_to_process)} archivos Markdown...")
         success_count = 0
+        total_blocks = total_inferred = 0
         
         for i, md_file in enumerate(files_to_process, 1):
             yaml_file = str(Path(md_file).with_suffix('.yaml'))
-            if process_file(md_file):
+            result = process_file(md_file, inferencer, registry)
+            if result:
                 print(f"✅ [{i}/{len(files_to_process)}] {Path(md_file).name} → {Path(yaml_file).name}")
                 success_count += 1
+                total_blocks += result[0]
+                total_inferred += result[1]
         
         print(f"\n✅ Completado: {success_count}/{len(files_to_process)} archivos convertidos")
+        if inferencer is not None:
+            print(f"🧠 SIDs inferidos por reglas: {total_inferred}/{total_blocks} bloques "
+                  f"(el resto queda para enriquecimiento IA)")
+        if registry is not None:
+            print(f"📒 Registro: {registry.count()} SIDs en {registry.db_path}")
         exit(0 if success_count == len(files_to_process) else 1)
@@ -9,6 +9,14 @@ Ejemplo: G_CAPTURAR_MOTIVACIONES_7B3F
 Uso:
     python3 md_sid_assign.py <archivo.md>
     python3 md_sid_assign.py --batch swarm/agents/*.md
+    python3 md_sid_assign.py --batch "swarm/agents/**/*.md" --jobs 8
+
+Con --index[=RUTA] (opcional; sin ruta, .aps_cache/sid_index.sqlite) la
+asignación es incremental: solo se re-escanean los archivos cuyo hash cambió y
+las colisiones se comprueban contra todos los archivos indexados. El índice es
+la única autoridad de colisiones; --registry solo la asume sin índice.
+Con --registry, las colisiones que reporta el registro (SIDs de otro archivo)
+se listan y el exit code es 1.
 """
 
 import re
@@ -16,7 +24,12 @@ import hashlib
 import unicodedata
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.sid_index import SIDIndex, DEFAULT_INDEX_PATH, content_sha1
+from lib.sid_registry import SIDRegistry, DEFAULT_REGISTRY_PATH, sha1_text
+from lib.tracing import span
 
 # Prefijos por sección
 SECTION_PREFIXES = {
@@ -131,25 +144,149 @@ def extract_sections(content: str) -> Dict[str, List[Tuple[int, str, str]]]:
     return sections
 
 
-def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
+def find_sid_markers(content: str) -> List[Tuple[str, int, Optional[str], str]]:
     """
-    Procesa un archivo Markdown, asigna SIDs faltantes y actualiza sha1.
-    Retorna True si hubo cambios.
+    Localiza los marcadores <!--sid:...--> de un contenido.
+    Retorna: [(sid, line_num, sha1, item_text), ...] con line_num 1-based.
+    """
+    markers = []
+    line_num = 1
+    last_pos = 0
+    for match in SID_MARKER_REGEX.finditer(content):
+        line_num += content.count('\n', last_pos, match.start())
+        last_pos = match.start()
+        markers.append((match.group(1), line_num, match.group(2), match.group(3).strip()))
+    return markers
+
+
+def scan_markdown(md_path: Path, known_sha1: Optional[str] = None) -> Dict:
+    """
+    Lee un archivo y, si su hash difiere de known_sha1, extrae marcadores y secciones.
+    Función pura (sin efectos) para poder ejecutarse en paralelo con --jobs.
+
+    Retorna:
+        {'path', 'content', 'sha1', 'changed', 'markers', 'sections'}
     """
     with open(md_path, 'r', encoding='utf-8') as f:
         content = f.read()
-    
-    original_content = content
-    lines = content.split('\n')
-    
-    # Extraer SIDs existentes para detectar colisiones
-    existing_sids = {}
-    for match in SID_MARKER_REGEX.finditer(content):
-        sid = match.group(1)
-        existing_sids[sid] = match.group(3).strip()
-    
+
+    sha1 = content_sha1(content)
+    scan = {
+        'path': md_path,
+        'content': content,
+        'sha1': sha1,
+        'changed': sha1 != known_sha1,
+        'markers': [],
+        'sections': {},
+    }
+    if scan['changed']:
+        scan['markers'] = find_sid_markers(content)
+        scan['sections'] = extract_sections(content)
+    return scan
+
+
+def marker_registry_entries(content: str) -> List[Dict]:
+    """Entradas para SIDRegistry a partir de los marcadores de un Markdown."""
+    entries = []
+    for sid, _line, _sha1, item_text in find_sid_markers(content):
+        item_text = ITEM_REGEX.sub(r'\2', item_text)  # quitar la viñeta "- "
+        entries.append({'sid': sid, 'block_name': item_text, 'content_sha1': sha1_text(item_text)})
+    return entries
+
+
+def assign_sids(
+    md_path: Path,
+    dry_run: bool = False,
+    index: Optional[SIDIndex] = None,
+    scan: Optional[Dict] = None,
+    registry: Optional[SIDRegistry] = None,
+    reserved: Optional[Set[str]] = None,
+    conflicts: Optional[List[Dict]] = None
+) -> bool:
+    """
+    Procesa un archivo Markdown, asigna SIDs faltantes y actualiza sha1.
+    Retorna True si hubo cambios.
+
+    Args:
+        md_path: Archivo Markdown
+        dry_run: Simular sin escribir cambios (ni el .md, ni el índice, ni el registro)
+        index: SIDIndex persistente. Si se indica, las colisiones se comprueban
+               contra todo el repositorio indexado y el índice se actualiza.
+        scan: Resultado previo de scan_markdown() (evita releer el archivo)
+        registry: SIDRegistry central. Los SIDs del archivo se sincronizan con
+                  él; solo decide las colisiones si no hay índice (ver _sid_authority).
+        reserved: SIDs simulados por el dry-run en archivos anteriores del batch
+                  (en memoria); se amplía con los de este archivo.
+        conflicts: Lista donde acumular las colisiones que reporta el registro
+                   (SIDs de este archivo registrados por otro).
+    """
+    with span('md_sid_assign.file', file=str(md_path), agent=md_path.stem) as sp:
+        if scan is None:
+            scan = scan_markdown(md_path)
+        changed = _assign_sids(md_path, dry_run, index, scan, registry, reserved, conflicts)
+        sp.set(changed=changed)
+        if sp.enabled:
+            sp.set(bytes=len(scan['content'].encode('utf-8')),
+                   items=sum(len(items) for items in scan['sections'].values()),
+                   markers=len(scan['markers']))
+    return changed
+
+
+def _sid_authority(md_path: Path, dry_run: bool, index: Optional[SIDIndex],
+                   registry: Optional[SIDRegistry], markers: List[Tuple]):
+    """
+    Predicado "SID ocupado" de una única fuente: el índice (todos los archivos
+    indexados), si no el registro (scope global, el de los marcadores Markdown),
+    si no los marcadores del propio archivo. Con índice, el registro solo se
+    sincroniza: sus SIDs globales salen de los mismos marcadores.
+    """
+    existing = {sid for sid, _line, _sha1, _text in markers}
+    if index is not None:
+        if dry_run:
+            return lambda sid: sid in existing or index.is_taken(sid, exclude=md_path)
+        # El archivo queda pendiente de re-escaneo (sha1=None) hasta escribirlo
+        index.replace_file(md_path, None, ((sid, line, sha1) for sid, line, sha1, _ in markers))
+        return index.is_taken
+    if registry is not None:
+        return lambda sid: sid in existing or not registry.is_free(sid)
+    return existing.__contains__
+
+
+def sync_registry(registry: SIDRegistry, md_path: Path, content: str,
+                  conflicts: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Sincroniza los marcadores del archivo con el registro e informa de las
+    colisiones (SIDs que el registro atribuye a otro archivo o bloque).
+
+    Returns:
+        Lista de colisiones ({'entry', 'owner'}); también se añaden a `conflicts`
+    """
+    result = registry.sync_file(md_path, marker_registry_entries(content), origin='md_sid_assign')
+    for conflict in result['conflicts']:
+        entry, owner = conflict['entry'], conflict['owner']
+        print(f"⚠️  Colisión '{entry['sid']}': {md_path.name} ({entry['block_name']}) "
+              f"vs {owner['source_file']} ({owner['block_name']})")
+    if conflicts is not None:
+        conflicts.extend(result['conflicts'])
+    return result['conflicts']
+
+
+def _assign_sids(md_path: Path, dry_run: bool, index: Optional[SIDIndex], scan: Dict,
+                 registry: Optional[SIDRegistry], reserved: Optional[Set[str]] = None,
+                 conflicts: Optional[List[Dict]] = None) -> bool:
+    if not scan['changed']:
+        print(f"✅ {md_path.name}: sin cambios (hash indexado)")
+        return False
+
+    content = scan['content']
+    original_lines = content.split('\n')
+    lines = list(original_lines)
+
+    is_taken = _sid_authority(md_path, dry_run, index, registry, scan['markers'])
+    reserved = set() if reserved is None else reserved
+
     # Extraer secciones e ítems
-    sections = extract_sections(content)
+    sections = scan['sections']
     
     changes = []
     new_sids = {}
@@ -161,12 +298,10 @@ def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
         prefix = SECTION_PREFIXES[section_name]
         
         for line_num, indent, item_text in items:
-            # Verificar si ya tiene SID
-            line_content = lines[line_num]
-            
             # Buscar si las líneas anteriores tienen <!--sid:...-->
+            # (sobre el texto original: `lines` ya contiene marcadores recién insertados)
             has_sid = False
-            if line_num > 0 and '<!--sid:' in lines[line_num - 1]:
+            if line_num > 0 and '<!--sid:' in original_lines[line_num - 1]:
                 has_sid = True
             
             if not has_sid:
@@ -176,7 +311,7 @@ def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
                 # Verificar colisiones
                 collision_count = 0
                 original_sid = sid
-                while sid in existing_sids or sid in new_sids:
+                while is_taken(sid) or sid in new_sids or sid in reserved:
                     collision_count += 1
                     sid = f"{original_sid}_{chr(64 + collision_count)}"  # _A, _B, _C...
                 
@@ -192,6 +327,10 @@ def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
                 changes.append(f"  + {sid}: {item_text[:50]}...")
     
     if not changes:
+        if index is not None and not dry_run:
+            index.replace_file(md_path, scan['sha1'], ((sid, line, sha1) for sid, line, sha1, _ in scan['markers']))
+        if registry is not None and not dry_run:
+            sync_registry(registry, md_path, content, conflicts)
         print(f"✅ {md_path.name}: sin cambios (todos los ítems ya tienen SID)")
         return False
     
@@ -199,6 +338,8 @@ def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
     new_content = '\n'.join(lines)
     
     if dry_run:
+        # Reservas en memoria para que el resto del batch vea las colisiones (el índice no se toca)
+        reserved.update(new_sids)
         print(f"🔍 {md_path.name}: {len(changes)} SIDs a generar (dry-run)")
         for change in changes[:5]:  # Mostrar solo primeros 5
             print(change)
@@ -207,6 +348,14 @@ def assign_sids(md_path: Path, dry_run: bool = False) -> bool:
     # Guardar
     with open(md_path, 'w', encoding='utf-8') as f:
         f.write(new_content)
+
+    if index is not None:
+        index.replace_file(
+            md_path, content_sha1(new_content),
+            ((sid, line, sha1) for sid, line, sha1, _ in find_sid_markers(new_content))
+        )
+    if registry is not None:
+        sync_registry(registry, md_path, new_content, conflicts)
     
     print(f"✅ {md_path.name}: {len(changes)} SIDs asignados")
     for change in changes[:3]:  # Mostrar solo primeros 3
@@ -222,29 +371,70 @@ def main():
     parser.add_argument('files', nargs='+', help='Archivos .md a procesar')
     parser.add_argument('--batch', action='store_true', help='Procesar múltiples archivos')
     parser.add_argument('--dry-run', action='store_true', help='Simular sin escribir cambios')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Procesos para el escaneo en paralelo (default: 1)')
+    parser.add_argument('--index', nargs='?', const=str(DEFAULT_INDEX_PATH), default=None,
+                        help='Índice SQLite de SIDs: asignación incremental y colisiones entre archivos '
+                             f'(default si se indica sin ruta: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--no-index', action='store_true',
+                        help='Sin índice persistente (default; anula --index)')
+    parser.add_argument('--registry', nargs='?', const=str(DEFAULT_REGISTRY_PATH), default=None,
+                        help='Sincronizar con el registro central de SIDs '
+                             f'(default si se indica sin ruta: {DEFAULT_REGISTRY_PATH})')
     
     args = parser.parse_args()
     
     if args.batch:
         import glob
-        pattern = args.files[0] if args.files else 'swarm/agents/*.md'
-        files = glob.glob(pattern)
-        files = [Path(f) for f in files if f.endswith('.md')]
+        files = []
+        for pattern in args.files or ['swarm/agents/*.md']:
+            files.extend(glob.glob(pattern, recursive=True))
+        files = [Path(f) for f in sorted(set(files)) if f.endswith('.md')]
     else:
         files = [Path(f) for f in args.files]
     
     print(f"🔄 Procesando {len(files)} archivos Markdown...")
-    
+
+    missing = [f for f in files if not f.exists()]
+    for f in missing:
+        print(f"⚠️  {f}: no existe")
+    files = [f for f in files if f.exists()]
+
+    index = SIDIndex(args.index) if args.index and not args.no_index else None
+    registry = SIDRegistry(args.registry) if args.registry else None
+    known = index.get_file_hashes() if index is not None else {}
+    if index is not None and not args.dry_run:
+        index.prune_missing()
+    known_hashes = [known.get(SIDIndex._key(f)) for f in files]
+
+    # Fase 1: lectura + escaneo (paralelizable, sin efectos)
+    if args.jobs > 1 and len(files) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing: solo con --jobs
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            scans = list(pool.map(scan_markdown, files, known_hashes, chunksize=4))
+    else:
+        scans = [scan_markdown(f, h) for f, h in zip(files, known_hashes)]
+
+    # Fase 2: asignación en orden determinista (colisiones contra el índice)
     changed = 0
-    for f in files:
-        if not f.exists():
-            print(f"⚠️  {f}: no existe")
-            continue
-        
-        if assign_sids(f, dry_run=args.dry_run):
+    reserved = set()  # SIDs simulados por --dry-run
+    conflicts = []  # Colisiones que reporta el registro
+    for f, scan in zip(files, scans):
+        if assign_sids(f, dry_run=args.dry_run, index=index, scan=scan, registry=registry,
+                       reserved=reserved, conflicts=conflicts):
             changed += 1
+
+    if index is not None:
+        print(f"\n🗂️  Índice: {index.count()} SIDs en {index.db_path}")
+        index.close()
+    if registry is not None:
+        print(f"📒 Registro: {registry.count()} SIDs en {registry.db_path}")
+        registry.close()
     
-    print(f"\n✅ Completado: {changed}/{len(files)} archivos modificados")
+    print(f"\n✅ Completado: {changed}/{len(files) + len(missing)} archivos modificados")
+    if conflicts:
+        print(f"❌ {len(conflicts)} colisiones con el registro de SIDs")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+CLI del registro central de SIDs (SQLite).
+
+Registra en una sola transacción todos los SIDs de un swarm (marcadores
+<!--sid:...--> de los .md y SIDs semánticos de los .yaml) y responde
+consultas de dueño, disponibilidad e historial.
+
+Uso:
+    python3 sid_registry_cli.py sync "swarm/agents/J2C-v1-Swarm-v3-5/*.yaml"
+    python3 sid_registry_cli.py sync "swarm/agents/**/*.md"
+    python3 sid_registry_cli.py owner G_CAPTURAR_MOTIVACIONES_7B3F
+    python3 sid_registry_cli.py free BLK.verificar.control.active_agent.guard --scope J2Ci-Greeter
+    python3 sid_registry_cli.py history BLK.detectar.salida.protocol --scope J2Ci-Greeter
+"""
+
+import argparse
+import glob
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.yaml_cache import load_yaml
+from lib.sid_registry import SIDRegistry, DEFAULT_REGISTRY_PATH, GLOBAL_SCOPE, agent_yaml_entries
+from md_sid_assign import marker_registry_entries
+
+
+def collect_sync_items(patterns):
+    """
+    Construye los items de SIDRegistry.sync_many() a partir de patrones glob.
+
+    Returns:
+        Lista de {'source_file', 'entries', 'scope', 'origin'}
+    """
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(pattern, recursive=True))
+
+    items = []
+    for f in sorted(set(files)):
+        path = Path(f)
+        if path.suffix == '.md':
+            content = path.read_text(encoding='utf-8')
+            items.append({
+                'source_file': str(path),
+                'entries': marker_registry_entries(content),
+                'scope': GLOBAL_SCOPE,
+                'origin': 'md_sid_assign',
+            })
+        elif path.suffix in ('.yaml', '.yml'):
+            data = load_yaml(path, copy=False, cache=False)
+            if not isinstance(data, dict) or 'agent' not in data:
+                print(f"⚠️  {path}: no tiene estructura agent.blocks (ignorado)")
+                continue
+            items.append({
+                'source_file': data['agent'].get('source_md', str(path)),
+                'entries': agent_yaml_entries(data),
+                'scope': data['agent'].get('name', path.stem),
+                'origin': 'yaml',
+            })
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Registro central de SIDs APS')
+    parser.add_argument('--db', default=str(DEFAULT_REGISTRY_PATH),
+                        help=f'Archivo SQLite del registro (default: {DEFAULT_REGISTRY_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_sync = sub.add_parser('sync', help='Registrar SIDs de archivos .md/.yaml')
+    p_sync.add_argument('patterns', nargs='+', help='Archivos o patrones glob')
+
+    for name, help_text in (('owner', '¿Quién es el dueño de este SID?'),
+                            ('free', '¿Está libre este SID?'),
+                            ('history', 'Historial de un SID (altas, renombrados, bajas)')):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('sid')
+        p.add_argument('--scope', default=GLOBAL_SCOPE,
+                       help="Scope del SID ('' global para marcadores .md, nombre del agente para YAML)")
+
+    args = parser.parse_args()
+    registry = SIDRegistry(args.db)
+
+    if args.command == 'sync':
+        items = collect_sync_items(args.patterns)
+        start = time.perf_counter()
+        totals = registry.sync_many(items)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"📒 {len(items)} archivos sincronizados en {elapsed_ms:.1f} ms")
+        print(f"   Registrados: {totals['registered']}, renombrados: {totals['renamed']}, "
+              f"liberados: {totals['released']}")
+        for conflict in totals['conflicts']:
+            entry, owner = conflict['entry'], conflict['owner']
+            print(f"   ⚠️  Colisión '{entry['sid']}': {entry['source_file']} ({entry['block_name']}) "
+                  f"vs {owner['source_file']} ({owner['block_name']})")
+        print(f"   Total en registro: {registry.count()} SIDs")
+        sys.exit(1 if totals['conflicts'] else 0)
+
+    elif args.command == 'owner':
+        owner = registry.owner(args.sid, args.scope)
+        if owner is None:
+            print(f"ℹ️  '{args.sid}' no está registrado")
+            sys.exit(1)
+        renamed_from = registry.renamed_from(args.sid, args.scope)
+        if renamed_from:
+            owner['renamed_from'] = renamed_from
+        print(json.dumps(owner, indent=2, ensure_ascii=False))
+
+    elif args.command == 'free':
+        free = registry.is_free(args.sid, args.scope)
+        print(f"{'✅ libre' if free else '❌ ocupado'}: {args.sid}")
+        sys.exit(0 if free else 1)
+
+    elif args.command == 'history':
+        print(json.dumps(registry.history(args.sid, args.scope), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,9 +12,18 @@ import yaml
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from collections import Counter
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.profiler import RuleProfiler, NULL_PROFILER
+from lib.memprofile import MemoryProfiler, NULL_MEMPROFILER
+from lib.yaml_cache import load_yaml
+from lib.lint_memo import LintMemo, DEFAULT_MEMO_PATH, evaluate_blocks, ruleset_fingerprint
+from lib.reporters import open_reporter
+from lib.md_blocks import agent_source_map, format_md_location, md_location
+from lib.tracing import agent_file_attrs, traced
+
 # Bloques obligatorios (por nombre o patrón en content)
 REQUIRED_BLOCKS = {
     'entry_guard': {
@@ -73,6 +82,18 @@ NEGATION_PATTERNS = [
     r'(?i)mal:\s*',                                  # "Mal: devuelvo tras heurística"
 ]
 
+# Compilados una vez; la negación se evalúa solo en una ventana alrededor de cada match
+DENY_TERMS_RE = [re.compile(p, re.IGNORECASE) for p in DENY_TERMS]
+NEGATION_RE = re.compile(
+    '|'.join(f"(?:{p.removeprefix('(?i)')})" for p in NEGATION_PATTERNS), re.IGNORECASE
+)
+
+# Máximo de caracteres inspeccionados a cada lado del match (misma línea/frase)
+NEGATION_WINDOW = 120
+
+# Fin de frase: punto/punto y coma/exclamación seguidos de espacio
+SENTENCE_BREAK_RE = re.compile(r'[.;!?](?=\s)')
+
 # Block types válidos (incluyendo tipos especiales exentos de DENY_TERMS)
 VALID_BLOCK_TYPES = ['BLK', 'INS', 'OUT', 'VAR', 'GOAL', 'CONST', 'REQ', 'EXAMPLE', 'ANTIPATTERN']
 
@@ -91,40 +112,239 @@ EXEMPT_AGENTS = [
     'J2Ci-Greeter',                 # One-shot welcome/LSRG
 ]
 
+# Metadatos de reglas (SARIF): código → (severidad por defecto, descripción)
+LINT_RULES = {
+    'YAML_INVALID': ('ERROR', 'El archivo no es YAML válido'),
+    'READ_ERROR': ('ERROR', 'No se pudo leer el archivo'),
+    'MISSING_AGENT': ('ERROR', "Falta la clave 'agent' en la raíz"),
+    'MISSING_NAME': ('ERROR', "Falta 'agent.name'"),
+    'MISSING_BLOCKS': ('ERROR', "Falta 'agent.blocks'"),
+    'INVALID_TYPE': ('ERROR', "'blocks' no es un diccionario"),
+    'BLOCK_INVALID': ('WARNING', 'El bloque no es un diccionario'),
+    'MISSING_ATTRS': ('ERROR', 'Faltan atributos semánticos obligatorios del bloque'),
+    'INVALID_BLOCK_TYPE': ('WARNING', 'block_type fuera de los tipos válidos'),
+    'SID_FORMAT': ('WARNING', 'SID mal formado (esperado <type>.<accion>.<relacion>.<nivel>)'),
+    'SID_MISMATCH': ('WARNING', 'El tipo del SID no coincide con block_type'),
+    'MISSING_SID': ('ERROR', "Falta el atributo 'sid'"),
+    'DENY_TERM': ('ERROR', 'Término prohibido usado de forma prescriptiva'),
+    'DENY_TERM_CONTEXT': ('WARNING', 'Término prohibido en contexto de negación/antipatrón'),
+    'EXEMPT_DENY_TERMS': ('INFO', 'Bloque EXAMPLE/ANTIPATTERN exento de DENY_TERMS'),
+    'SID_DUPLICATE': ('ERROR', 'SID repetido dentro del agente'),
+    'AUTO_NUMBERED_BLOCK': ('ERROR', 'Encabezado duplicado en el .md fuente (bloque auto-numerado)'),
+}
+
 
 class LintError:
-    def __init__(self, severity: str, block: str, code: str, message: str):
+    def __init__(self, severity: str, block: str, code: str, message: str, sid: Optional[str] = None):
         self.severity = severity  # ERROR, WARNING, INFO
         self.block = block
         self.code = code
         self.message = message
+        self.sid = sid  # Solo si el issue no es de un bloque concreto (p.ej. SID_DUPLICATE)
+        self.md: Dict = {}  # Posición del bloque en el .md fuente (md_file, md_line...)
     
     def __str__(self):
-        return f"  {self.severity} [{self.code}] {self.block}: {self.message}"
+        where = format_md_location(self.md)
+        return f"  {self.severity} [{self.code}] {self.block}: {self.message}" + (f" ({where})" if where else '')
+    
+    def to_issue(self) -> Dict:
+        """Issue en el formato de lib/reporters.py"""
+        issue = {'location': self.block, 'severity': self.severity.lower(),
+                 'message': self.message, 'rule': self.code}
+        if self.sid:
+            issue['sid'] = self.sid
+        issue.update(self.md)
+        return issue
 
 
-def lint_yaml_file(yaml_path: Path) -> Tuple[List[LintError], Dict]:
+def negation_window(content: str, start: int, end: int) -> Tuple[int, int]:
+    """
+    Ventana de contexto de un match: su línea, recortada a la frase que lo
+    contiene y a NEGATION_WINDOW caracteres a cada lado.
+    """
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    if line_end == -1:
+        line_end = len(content)
+
+    win_start = max(line_start, start - NEGATION_WINDOW)
+    win_end = min(line_end, end + NEGATION_WINDOW)
+
+    for brk in SENTENCE_BREAK_RE.finditer(content, win_start, start):
+        win_start = brk.end()
+    brk = SENTENCE_BREAK_RE.search(content, end, win_end)
+    if brk:
+        win_end = brk.start()
+    return win_start, win_end
+
+
+def is_negation_context(content: str, match: re.Match) -> bool:
+    """True si hay un patrón de negación en la ventana local del match."""
+    win_start, win_end = negation_window(content, match.start(), match.end())
+    return NEGATION_RE.search(content, win_start, win_end) is not None
+
+
+def summarize_block(block_name: str, block_data, profiler: RuleProfiler = NULL_PROFILER) -> Dict:
+    """
+    Reglas por bloque de lint_yaml_file.
+    
+    Retorna un resumen serializable (ver lib/lint_memo.py):
+        {'valid', 'issues': [[severidad, código, mensaje]], 'block_type', 'sid',
+         'required': [claves de REQUIRED_BLOCKS detectadas]}
+    """
+    if not isinstance(block_data, dict):
+        return {'valid': False, 'issues': [['WARNING', 'BLOCK_INVALID', "Bloque no es un diccionario"]],
+                'block_type': None, 'sid': None, 'required': []}
+    
+    issues = []
+    required = []
+    
+    # 2.1 Validar atributos obligatorios
+    with profiler.measure('MISSING_ATTRS') as m:
+        missing_attrs = []
+        for attr in REQUIRED_ATTRIBUTES:
+            if attr not in block_data:
+                missing_attrs.append(attr)
+        m.hits = int(bool(missing_attrs))
+    
+    if missing_attrs:
+        issues.append([
+            'ERROR', 'MISSING_ATTRS',
+            f"Faltan atributos: {', '.join(missing_attrs)}"
+        ])
+    
+    # 2.2 Validar block_type
+    block_type = block_data.get('block_type', '')
+    if block_type not in VALID_BLOCK_TYPES:
+        issues.append([
+            'WARNING', 'INVALID_BLOCK_TYPE',
+            f"block_type '{block_type}' no está en tipos válidos: {VALID_BLOCK_TYPES}"
+        ])
+    
+    # 2.3 Validar SID
+    sid = block_data.get('sid', '')
+    with profiler.measure('SID_FORMAT', len(str(sid))) as m:
+        issues_before = len(issues)
+        if sid:
+            # Validar formato SID: <block_type>.<accion>.<relacion>.<nivel>
+            # Acepta tanto 4 partes como 5+ partes (para relaciones compuestas)
+            sid_parts = sid.split('.')
+            if len(sid_parts) < 4:
+                issues.append([
+                    'WARNING', 'SID_FORMAT',
+                    f"SID mal formado: '{sid}' (esperado al menos 4 partes: <type>.<accion>.<relacion>.<nivel>)"
+                ])
+            elif sid_parts[0] != block_type:
+                issues.append([
+                    'WARNING', 'SID_MISMATCH',
+                    f"SID '{sid}' no coincide con block_type '{block_type}'"
+                ])
+        else:
+            issues.append(['ERROR', 'MISSING_SID', "Falta atributo 'sid'"])
+        m.hits = len(issues) - issues_before
+    
+    # 2.4 Validar content (deny-terms con contexto)
+    content = str(block_data.get('content', ''))
+    
+    # Eximir bloques EXAMPLE y ANTIPATTERN de validación DENY_TERMS
+    if block_type not in DENY_TERMS_EXEMPT_TYPES:
+        for deny_pattern, deny_re in zip(DENY_TERMS, DENY_TERMS_RE):
+            with profiler.measure(f'DENY_TERM:{deny_pattern}', len(content)) as m:
+                matches = list(deny_re.finditer(content))
+                m.hits = len(matches)
+            if not matches:
+                continue
+    
+            # Basta un uso fuera de contexto de negación/antipatrón para ERROR
+            with profiler.measure('DENY_TERM_CONTEXT') as m:
+                direct = next((hit for hit in matches if not is_negation_context(content, hit)), None)
+                m.hits = int(direct is None)
+    
+            if direct is None:
+                # Contexto de antipatrón descriptivo → WARNING en lugar de ERROR
+                line = content.count('\n', 0, matches[0].start()) + 1
+                issues.append([
+                    'WARNING', 'DENY_TERM_CONTEXT',
+                    f"Término prohibido en contexto de negación/antipatrón: '{deny_pattern[:30]}...' "
+                    f"(línea {line}; verificar que es descriptivo y no prescriptivo)"
+                ])
+            else:
+                # Uso directo del antipatrón → ERROR
+                line = content.count('\n', 0, direct.start()) + 1
+                issues.append([
+                    'ERROR', 'DENY_TERM',
+                    f"Término prohibido detectado: patrón '{deny_pattern[:30]}...' (línea {line})"
+                ])
+    else:
+        # Bloque EXAMPLE/ANTIPATTERN → solo INFO
+        issues.append([
+            'INFO', 'EXEMPT_DENY_TERMS',
+            f"Bloque tipo '{block_type}' exento de validación DENY_TERMS (ejemplo/antipatrón descriptivo)"
+        ])
+    
+    # 2.5 Detectar bloques obligatorios
+    for req_key, req_config in REQUIRED_BLOCKS.items():
+        with profiler.measure(f'REQUIRED_BLOCK:{req_key}', len(content)) as m:
+            for pattern in req_config['patterns']:
+                if re.search(pattern, content, re.IGNORECASE):
+                    required.append(req_key)
+                    m.hits = 1
+                    break
+    
+    return {'valid': True, 'issues': issues, 'block_type': block_type, 'sid': sid, 'required': required}
+
+
+def open_memo(db_path=None) -> LintMemo:
+    """Memo por bloque de este linter (la versión de reglas es el hash de este archivo)."""
+    return LintMemo('yaml_lint', ruleset_fingerprint(Path(__file__).resolve()), db_path)
+
+
+@traced('yaml_lint.lint_file',
+        lambda result, yaml_path, *args, **kwargs: agent_file_attrs(
+            yaml_path, errors=result[1].get('errors', len(result[0])), warnings=result[1].get('warnings', 0)))
+def lint_yaml_file(yaml_path: Path, profiler: RuleProfiler = NULL_PROFILER,
+                   memo: Optional[LintMemo] = None) -> Tuple[List[LintError], Dict]:
     """
     Valida un archivo YAML de agente.
     Retorna (errores, stats)
+    
+    Con un RuleProfiler, cada regla (DENY_TERM:<patrón>, REQUIRED_BLOCK:<clave>,
+    SID_FORMAT, ...) registra tiempo, bytes inspeccionados y hits.
+    
+    Con un LintMemo (ver open_memo), solo se re-evalúan los bloques que cambiaron;
+    las comprobaciones globales se recalculan desde los resúmenes por bloque.
     """
     try:
-        with open(yaml_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        with profiler.measure('YAML_LOAD', yaml_path.stat().st_size):
+            data = load_yaml(yaml_path, copy=False)
     except yaml.YAMLError as e:
         return [LintError('ERROR', 'FILE', 'YAML_INVALID', f"YAML inválido: {e}")], {}
     except Exception as e:
         return [LintError('ERROR', 'FILE', 'READ_ERROR', f"Error leyendo archivo: {e}")], {}
     
+    return lint_agent_data(data, yaml_path, profiler, memo)
+
+
+def lint_agent_data(data, yaml_path: Optional[Path] = None, profiler: RuleProfiler = NULL_PROFILER,
+                    memo: Optional[LintMemo] = None) -> Tuple[List[LintError], Dict]:
+    """
+    Valida un agente ya cargado (dict del YAML), p.ej. recibido por sls.py.
+    `yaml_path` solo se usa para ubicar el .md fuente si el agente no trae source_map.
+    Retorna (errores, stats)
+    """
     errors = []
     
     # 1. Validar estructura básica
-    if 'agent' not in data:
+    if not isinstance(data, dict) or 'agent' not in data:
         errors.append(LintError('ERROR', 'ROOT', 'MISSING_AGENT', "Falta clave 'agent' en raíz"))
         return errors, {}
     
     agent = data['agent']
     
+    if not isinstance(agent, dict):
+        errors.append(LintError('ERROR', 'agent', 'INVALID_TYPE', "'agent' debe ser un diccionario"))
+        return errors, {}
+    
     if 'name' not in agent:
         errors.append(LintError('ERROR', 'agent', 'MISSING_NAME', "Falta 'agent.name'"))
     
@@ -138,118 +358,51 @@ def lint_yaml_file(yaml_path: Path) -> Tuple[List[LintError], Dict]:
         errors.append(LintError('ERROR', 'blocks', 'INVALID_TYPE', "'blocks' debe ser un diccionario"))
         return errors, {}
     
-    # 2. Validar bloques individuales
+    # 2. Validar bloques individuales (resúmenes reutilizados del memo si el bloque no cambió)
+    summaries = evaluate_blocks(
+        blocks, lambda name, data: summarize_block(name, data, profiler), memo
+    )
+    
     sids_found = []
     block_types_count = Counter()
     required_blocks_found = {key: False for key in REQUIRED_BLOCKS.keys()}
     
-    for block_name, block_data in blocks.items():
-        if not isinstance(block_data, dict):
-            errors.append(LintError('WARNING', block_name, 'BLOCK_INVALID', "Bloque no es un diccionario"))
+    for block_name, summary in summaries.items():
+        errors.extend(LintError(sev, block_name, code, msg) for sev, code, msg in summary['issues'])
+        if not summary['valid']:
             continue
-        
-        # 2.1 Validar atributos obligatorios
-        missing_attrs = []
-        for attr in REQUIRED_ATTRIBUTES:
-            if attr not in block_data:
-                missing_attrs.append(attr)
-        
-        if missing_attrs:
-            errors.append(LintError(
-                'ERROR', block_name, 'MISSING_ATTRS',
-                f"Faltan atributos: {', '.join(missing_attrs)}"
-            ))
-        
-        # 2.2 Validar block_type
-        block_type = block_data.get('block_type', '')
-        if block_type not in VALID_BLOCK_TYPES:
-            errors.append(LintError(
-                'WARNING', block_name, 'INVALID_BLOCK_TYPE',
-                f"block_type '{block_type}' no está en tipos válidos: {VALID_BLOCK_TYPES}"
-            ))
-        
-        block_types_count[block_type] += 1
-        
-        # 2.3 Validar SID
-        sid = block_data.get('sid', '')
-        if sid:
-            sids_found.append(sid)
-            
-            # Validar formato SID: <block_type>.<accion>.<relacion>.<nivel>
-            # Acepta tanto 4 partes como 5+ partes (para relaciones compuestas)
-            sid_parts = sid.split('.')
-            if len(sid_parts) < 4:
+        block_types_count[summary['block_type']] += 1
+        if summary['sid']:
+            sids_found.append(summary['sid'])
+        for req_key in summary['required']:
+            required_blocks_found[req_key] = True
+    
+    # 3. Validar unicidad de SIDs
+    with profiler.measure('SID_DUPLICATE') as m:
+        sid_counts = Counter(sids_found)
+        for sid, count in sid_counts.items():
+            if count > 1:
+                m.hits += 1
                 errors.append(LintError(
-                    'WARNING', block_name, 'SID_FORMAT',
-                    f"SID mal formado: '{sid}' (esperado al menos 4 partes: <type>.<accion>.<relacion>.<nivel>)"
+                    'ERROR', 'GLOBAL', 'SID_DUPLICATE',
+                    f"SID duplicado '{sid}' aparece {count} veces", sid=sid
                 ))
-            elif sid_parts[0] != block_type:
+    
+    # 3.5 Detectar bloques auto-numerados (duplicados en .md fuente)
+    with profiler.measure('AUTO_NUMBERED_BLOCK') as m:
+        for block_name in blocks.keys():
+            if re.search(r' \(\d+\)$', block_name):
+                m.hits += 1
+                original_name = re.sub(r' \(\d+\)$', '', block_name)
                 errors.append(LintError(
-                    'WARNING', block_name, 'SID_MISMATCH',
-                    f"SID '{sid}' no coincide con block_type '{block_type}'"
+                    'ERROR', block_name, 'AUTO_NUMBERED_BLOCK',
+                    f"Bloque duplicado en .md fuente: '{original_name}' → eliminar duplicados en archivo .md"
                 ))
-        else:
-            errors.append(LintError('ERROR', block_name, 'MISSING_SID', "Falta atributo 'sid'"))
-        
-        # 2.4 Validar content (deny-terms con contexto)
-        content = str(block_data.get('content', ''))
-        content_lower = content.lower()
-        
-        # Eximir bloques EXAMPLE y ANTIPATTERN de validación DENY_TERMS
-        if block_type not in DENY_TERMS_EXEMPT_TYPES:
-            for deny_pattern in DENY_TERMS:
-                if re.search(deny_pattern, content_lower, re.IGNORECASE):
-                    # Verificar si está en contexto de negación/antipatrón
-                    is_negation_context = False
-                    for negation_pattern in NEGATION_PATTERNS:
-                        if re.search(negation_pattern, content, re.IGNORECASE | re.MULTILINE):
-                            is_negation_context = True
-                            break
-                    
-                    if is_negation_context:
-                        # Contexto de antipatrón descriptivo → WARNING en lugar de ERROR
-                        errors.append(LintError(
-                            'WARNING', block_name, 'DENY_TERM_CONTEXT',
-                            f"Término prohibido en contexto de negación/antipatrón: '{deny_pattern[:30]}...' "
-                            f"(Verificar que es descriptivo y no prescriptivo)"
-                        ))
-                    else:
-                        # Uso directo del antipatrón → ERROR
-                        errors.append(LintError(
-                            'ERROR', block_name, 'DENY_TERM',
-                            f"Término prohibido detectado: patrón '{deny_pattern[:30]}...'"
-                        ))
-        else:
-            # Bloque EXAMPLE/ANTIPATTERN → solo INFO
-            errors.append(LintError(
-                'INFO', block_name, 'EXEMPT_DENY_TERMS',
-                f"Bloque tipo '{block_type}' exento de validación DENY_TERMS (ejemplo/antipatrón descriptivo)"
-            ))
-        
-        # 2.5 Detectar bloques obligatorios
-        for req_key, req_config in REQUIRED_BLOCKS.items():
-            for pattern in req_config['patterns']:
-                if re.search(pattern, content, re.IGNORECASE):
-                    required_blocks_found[req_key] = True
-                    break
     
-    # 3. Validar unicidad de SIDs
-    sid_counts = Counter(sids_found)
-    for sid, count in sid_counts.items():
-        if count > 1:
-            errors.append(LintError(
-                'ERROR', 'GLOBAL', 'SID_DUPLICATE',
-                f"SID duplicado '{sid}' aparece {count} veces"
-            ))
-    
-    # 3.5 Detectar bloques auto-numerados (duplicados en .md fuente)
-    for block_name in blocks.keys():
-        if re.search(r' \(\d+\)$', block_name):
-            original_name = re.sub(r' \(\d+\)$', '', block_name)
-            errors.append(LintError(
-                'ERROR', block_name, 'AUTO_NUMBERED_BLOCK',
-                f"Bloque duplicado en .md fuente: '{original_name}' → eliminar duplicados en archivo .md"
-            ))
+    # 4. Posición en el .md fuente (agent.source_map, o el .md si el YAML no lo trae)
+    md_file, positions = agent_source_map(agent, yaml_path)
+    for error in errors:
+        error.md = md_location(error.block, md_file, positions)
     
     # 5. Estadísticas
     stats = {
@@ -273,8 +426,28 @@ def main():
     parser.add_argument('files', nargs='+', help='Archivos .yaml a validar')
     parser.add_argument('--batch', action='store_true', help='Procesar múltiples archivos')
     parser.add_argument('--strict', action='store_true', help='Tratar warnings como errores')
+    parser.add_argument('--profile', action='store_true',
+                        help='Perfilar cada regla (llamadas, tiempo total/p95, bytes, hits)')
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help='Guardar el perfil en JSON (implica --profile)')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='Perfil de memoria (tracemalloc): pico y memoria retenida por etapa y agente')
+    parser.add_argument('--memprofile-json', metavar='PATH',
+                        help='Guardar el perfil de memoria en JSON (implica --memprofile)')
+    parser.add_argument('--memo', action='store_true',
+                        help='Re-lint incremental: reusar y guardar resultados por bloque en un memo SQLite')
+    parser.add_argument('--memo-path', default=str(DEFAULT_MEMO_PATH),
+                        help=f'Archivo del memo (default: {DEFAULT_MEMO_PATH})')
+    parser.add_argument('--no-memo', action='store_true',
+                        help='Evaluar todos los bloques sin memo (default; anula --memo)')
+    parser.add_argument('--sarif', metavar='PATH',
+                        help='Guardar además los resultados en SARIF 2.1.0 (code scanning)')
     
     args = parser.parse_args()
+    profiler = RuleProfiler() if (args.profile or args.profile_json) else NULL_PROFILER
+    mem = MemoryProfiler() if (args.memprofile or args.memprofile_json) else NULL_MEMPROFILER
+    memo = open_memo(args.memo_path) if args.memo and not args.no_memo else None
+    sarif = open_reporter('sarif', args.sarif, tool_name='yaml_lint', rules=LINT_RULES) if args.sarif else None
     
     if args.batch:
         import glob
@@ -290,31 +463,57 @@ def main():
     total_warnings = 0
     failed_files = []
     
-    for f in files:
-        if not f.exists():
-            print(f"⚠️  {f}: no existe")
-            continue
-        
-        errors, stats = lint_yaml_file(f)
-        
-        if errors:
-            print(f"{'❌' if stats.get('errors', 0) > 0 else '⚠️'} {f.name}:")
-            for error in errors:
-                print(error)
-            print(f"   Stats: {stats['total_blocks']} bloques, {stats['sids_count']} SIDs, "
-                  f"{stats['required_blocks']}/4 bloques obligatorios")
-            print(f"   Errores: {stats['errors']}, Warnings: {stats['warnings']}\n")
+    with mem.stage('yaml_lint.batch'):
+        for f in files:
+            if not f.exists():
+                print(f"⚠️  {f}: no existe")
+                continue
             
-            total_errors += stats['errors']
-            total_warnings += stats['warnings']
+            with mem.stage('yaml_lint.lint_file', agent=f.stem):
+                errors, stats = lint_yaml_file(f, profiler, memo)
+            if sarif:
+                with mem.stage('yaml_lint.sarif', agent=f.stem):
+                    sarif.report_file(f, (e.to_issue() for e in errors))
             
-            if stats['errors'] > 0 or (args.strict and stats['warnings'] > 0):
-                failed_files.append(f.name)
-        else:
-            print(f"✅ {f.name}: OK ({stats['total_blocks']} bloques, {stats['sids_count']} SIDs)")
+            if not stats:  # La estructura no permitió validar los bloques
+                stats = {'errors': sum(1 for e in errors if e.severity == 'ERROR'),
+                         'warnings': sum(1 for e in errors if e.severity == 'WARNING')}
+            if errors:
+                print(f"{'❌' if stats.get('errors', 0) > 0 else '⚠️'} {f.name}:")
+                for error in errors:
+                    print(error)
+                if 'total_blocks' in stats:
+                    print(f"   Stats: {stats['total_blocks']} bloques, {stats['sids_count']} SIDs, "
+                          f"{stats['required_blocks']}/4 bloques obligatorios")
+                print(f"   Errores: {stats['errors']}, Warnings: {stats['warnings']}\n")
+                
+                total_errors += stats['errors']
+                total_warnings += stats['warnings']
+                
+                if stats['errors'] > 0 or (args.strict and stats['warnings'] > 0):
+                    failed_files.append(f.name)
+            else:
+                print(f"✅ {f.name}: OK ({stats['total_blocks']} bloques, {stats['sids_count']} SIDs)")
     
     print(f"\n{'='*60}")
     print(f"Total: {total_errors} errores, {total_warnings} warnings")
+    if memo is not None:
+        print(f"♻️  Memo: {memo.format_stats()}")
+    if sarif:
+        sarif.close()
+        print(f"💾 SARIF: {args.sarif}")
+    
+    if profiler.enabled:
+        print(f"\n⏱️  Perfil por regla:\n{profiler.format_table()}")
+        if args.profile_json:
+            profiler.save_json(args.profile_json, include_samples=True)
+            print(f"💾 Perfil JSON: {args.profile_json}")
+    
+    if mem.enabled:
+        print(f"\n🧠 Perfil de memoria (tracemalloc):\n{mem.format_report()}")
+        if args.memprofile_json:
+            mem.save_json(args.memprofile_json)
+            print(f"💾 Perfil de memoria JSON: {args.memprofile_json}")
     
     if failed_files:
         print(f"❌ FAIL: {len(failed_files)} archivos con problemas:")
@@ -18,6 +18,10 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from collections import Counter
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.yaml_cache import load_yaml
+from lib.tracing import agent_file_attrs, traced
+
 # ============================================================================
 # CARGA DE REGLAS DESDE SCHEMA CANÓNICO
 # ============================================================================
@@ -40,10 +44,9 @@ def load_aps_rules(schema_path: str = "swarm/schemas/aps_v3.5_rules.yaml") -> Di
         return get_legacy_rules()
     
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            rules = yaml.safe_load(f)
-            print(f"✅ Reglas APS v{rules.get('version', 'unknown')} cargadas desde {schema_path}")
-            return rules
+        rules = load_yaml(path, copy=False)
+        print(f"✅ Reglas APS v{rules.get('version', 'unknown')} cargadas desde {schema_path}")
+        return rules
     except yaml.YAMLError as e:
         print(f"❌ ERROR: Schema APS malformado: {e}")
         print(f"   Usando reglas por defecto (legacy)")
@@ -262,6 +265,8 @@ def validate_deny_terms(blocks: Dict[str, Dict], rules: Dict) -> List[str]:
 # ORQUESTACIÓN PRINCIPAL
 # ============================================================================
 
+@traced('yaml_lint_v2.lint_file',
+        lambda counts, yaml_path, rules: agent_file_attrs(yaml_path, errors=counts[0], warnings=counts[1]))
 def lint_yaml_file(yaml_path: str, rules: Dict) -> Tuple[int, int]:
     """
     Valida un archivo YAML contra las reglas APS.
@@ -281,8 +286,7 @@ def lint_yaml_file(yaml_path: str, rules: Dict) -> Tuple[int, int]:
     
     # Cargar YAML
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_yaml(path, copy=False)
     except yaml.YAMLError as e:
         print(f"❌ ERROR: YAML malformado: {e}")
         return (1, 0)
@@ -10,6 +10,11 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.yaml_cache import load_yaml
+from lib.resources import TOOLING_DIR, exists as resource_exists, load_yaml_resource
+from lib.tracing import traced
+
 # ============================================================================
 # CONFIGURACIÓN
 # ============================================================================
@@ -312,9 +317,8 @@ def check_duplicate_sections(blocks: Dict[str, Any]) -> List[Dict[str, str]]:
 # ============================================================================
 
 def load_rules(rules_path: Path) -> Dict:
-    """Carga reglas de validación desde YAML"""
-    with open(rules_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    """Carga reglas de validación desde YAML (en el zipapp, del snapshot precompilado)"""
+    return load_yaml_resource(rules_path)
 
 def validate_structure(data: Dict, rules: Dict) -> List[Dict[str, str]]:
     """Valida estructura básica del YAML"""
@@ -375,6 +379,8 @@ def validate_required_blocks(blocks: Dict[str, Any], rules: Dict, agent_name: st
     
     return errors
 
+@traced('yaml_lint_v3.validate_agent',
+        lambda issues, agent_name, blocks: {'agent': agent_name, 'blocks': len(blocks), 'issues': len(issues)})
 def validate_agent_semantic(agent_name: str, blocks: Dict[str, Any]) -> List[Dict[str, str]]:
     """Validación semántica completa de un agente"""
     issues = []
@@ -418,21 +424,20 @@ def main():
         sys.exit(1)
     
     yaml_path = Path(sys.argv[1])
-    rules_path = Path(__file__).parent.parent / 'schemas' / 'aps_v3.5_rules.yaml'
+    rules_path = TOOLING_DIR / 'schemas' / 'aps_v3.5_rules.yaml'
     
     if not yaml_path.exists():
         print(f"❌ ERROR: Archivo no encontrado: {yaml_path}")
         sys.exit(1)
     
-    if not rules_path.exists():
+    if not resource_exists(rules_path):
         print(f"⚠️  WARNING: Reglas no encontradas: {rules_path}")
         rules = {}
     else:
         rules = load_rules(rules_path)
     
     # Cargar YAML
-    with open(yaml_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(yaml_path, copy=False)
     
     print(f"\n🔍 Validando: {yaml_path.name}")
     print("=" * 80)
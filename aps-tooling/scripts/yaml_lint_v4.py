@@ -22,6 +22,9 @@ USO:
     
     # Output formato JSON
     python3 yaml_lint_v4.py agent.yaml --format json
+    
+    # SARIF 2.1.0 (code scanning) en stdout
+    python3 yaml_lint_v4.py agent.yaml --format sarif > v4.sarif
 
 AUTOR: APS v3.5 Validation Team
 FECHA: 2025-11-19
@@ -37,6 +40,22 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.regex_guard import RegexGuard, DEFAULT_CALL_BUDGET_MS
+from lib.profiler import RuleProfiler, NULL_PROFILER
+from lib.yaml_cache import load_yaml
+from lib.resources import BUNDLE, TOOLING_DIR, load_yaml_resource
+from lib.lint_memo import LintMemo, DEFAULT_MEMO_PATH, evaluate_blocks, ruleset_fingerprint
+from lib.reporters import open_reporter
+from lib.md_blocks import attach_md_locations, format_md_location
+from lib.tracing import agent_file_attrs, traced
+
+
+# Reglas por defecto: las de swarm/rules en el repo; en el zipapp, su copia
+# empaquetada (build_zipapp.py), sin depender de archivos junto al .pyz
+DEFAULT_RULES_FILE = (BUNDLE / 'rules' if BUNDLE else TOOLING_DIR.parent / 'swarm' / 'rules') \
+    / 'validation_rules_v1.yaml'
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # CLASE: ValidationRule
@@ -45,18 +64,23 @@ from collections import defaultdict
 class ValidationRule:
     """Representa una regla de validación cargada desde YAML"""
     
-    def __init__(self, rule_id: str, config: Dict[str, Any]):
+    def __init__(self, rule_id: str, config: Dict[str, Any], guard: Optional[RegexGuard] = None):
         self.rule_id = rule_id
         self.pattern = config.get('pattern', '')
         self.severity = config.get('severity', 'warning')
         self.message = config.get('message', 'Validation issue detected')
-        self.compiled_pattern = re.compile(self.pattern, re.IGNORECASE) if self.pattern else None
+        # Los patrones vienen de archivos de reglas: se compilan bajo RegexGuard
+        # (análisis de backtracking, gaps acotados y presupuesto de tiempo)
+        self.guard = guard or RegexGuard()
+        self.compiled_pattern = (
+            self.guard.compile(rule_id, self.pattern, re.IGNORECASE) if self.pattern else None
+        )
     
     def matches(self, text: str) -> bool:
         """Retorna True si el patrón coincide con el texto"""
         if not self.compiled_pattern:
             return False
-        return bool(self.compiled_pattern.search(text))
+        return self.compiled_pattern.search(text) is not None
     
     def __repr__(self):
         return f"ValidationRule(id={self.rule_id}, severity={self.severity})"
@@ -69,8 +93,9 @@ class ValidationRule:
 class RuleEngine:
     """Motor de reglas que carga y aplica validaciones desde archivo YAML"""
     
-    def __init__(self, rules_file: Path):
+    def __init__(self, rules_file: Path, guard: Optional[RegexGuard] = None):
         self.rules_file = rules_file
+        self.guard = guard or RegexGuard()
         self.config = self._load_rules()
         self.rules_by_category = self._parse_rules()
         self.role_permissions = self.config.get('role_permissions', {})
@@ -81,9 +106,10 @@ class RuleEngine:
     def _load_rules(self) -> Dict:
         """Carga el archivo de reglas YAML"""
         try:
-            with open(self.rules_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
+            if self.rules_file == DEFAULT_RULES_FILE:
+                return load_yaml_resource(self.rules_file)
+            return load_yaml(self.rules_file, copy=False)
+        except OSError:  # FileNotFoundError, o el archivo no está en el zipapp
             print(f"❌ ERROR: Archivo de reglas no encontrado: {self.rules_file}")
             sys.exit(1)
         except yaml.YAMLError as e:
@@ -97,12 +123,18 @@ class RuleEngine:
         suspicious = self.config.get('suspicious_patterns', {})
         for category, subcategories in suspicious.items():
             for subcat_name, rule_list in subcategories.items():
-                for rule_config in rule_list:
+                for idx, rule_config in enumerate(rule_list):
                     rule_id = f"{category}.{subcat_name}"
-                    rules[category].append(ValidationRule(rule_id, rule_config))
+                    if len(rule_list) > 1:
+                        rule_id = f"{rule_id}[{idx}]"
+                    rules[category].append(ValidationRule(rule_id, rule_config, self.guard))
         
         return dict(rules)
     
+    def search(self, rule_id: str, pattern: str, text: str, flags: int = re.IGNORECASE) -> bool:
+        """Búsqueda con un patrón derivado del archivo de reglas, bajo RegexGuard"""
+        return self.guard.search(rule_id, pattern, text, flags) is not None
+    
     def get_rules_for_category(self, category: str) -> List[ValidationRule]:
         """Retorna reglas para una categoría específica"""
         return self.rules_by_category.get(category, [])
@@ -126,6 +158,18 @@ class RuleEngine:
         return state_config.get('forbidden_keys', [])
 
 
+# Metadatos de reglas (SARIF): id → (severidad por defecto, descripción)
+V4_RULES = {
+    'entry_guard': ('error', 'Entry Guard con patrones sospechosos o lógica incompleta'),
+    'exit_strategy': ('error', 'Exit Strategy incompleta o sin keywords obligatorias'),
+    'loop_contract': ('warning', 'Loop Contract sin condición de salida o límite de iteraciones'),
+    'state_json': ('error', 'STATE_JSON con claves prohibidas o estructura inválida'),
+    'mvc_permissions': ('error', 'Violación de permisos MVC según el rol del agente'),
+    'duplicate_blocks': ('warning', 'Bloques semánticamente duplicados'),
+    'regex_guard': ('error', 'Regla de texto desactivada por tiempo: sus checks no se aplicaron'),
+}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CLASE: SemanticValidator
 # ═══════════════════════════════════════════════════════════════════════════
@@ -133,18 +177,38 @@ class RuleEngine:
 class SemanticValidator:
     """Validador semántico que usa RuleEngine para aplicar reglas"""
     
-    def __init__(self, rule_engine: RuleEngine):
+    def __init__(self, rule_engine: RuleEngine, profiler: Optional[RuleProfiler] = None,
+                 memo: Optional[LintMemo] = None):
         self.rules = rule_engine
         self.issues = []
-    
+        self.profiler = profiler or NULL_PROFILER
+        self.memo = memo
+        self._rule = None  # Regla en curso (se anota en cada issue)
+    
+    @staticmethod
+    def open_memo(rule_engine: RuleEngine, db_path=None) -> LintMemo:
+        """Memo por bloque; la versión cubre este archivo, el de reglas y la config del guard"""
+        version = ruleset_fingerprint(Path(__file__).resolve(), Path(rule_engine.rules_file),
+                                      rule_engine.guard.config_fingerprint())
+        return LintMemo('yaml_lint_v4', version, db_path)
+    
+    def _run_check(self, check, block_name: str, content: str, *args):
+        """Ejecuta un _validate_* midiendo tiempo, bytes y issues generados (--profile)"""
+        before = len(self.issues)
+        self._rule = check.__name__[len('_validate_'):]
+        with self.profiler.measure(f"v4.{check.__name__}", len(content)) as m:
+            check(block_name, content, *args)
+            m.hits = len(self.issues) - before
+    
+    @traced('yaml_lint_v4.validate_file',
+            lambda counts, self, yaml_file: agent_file_attrs(yaml_file, errors=counts[0], warnings=counts[1]))
     def validate_file(self, yaml_file: Path) -> Tuple[int, int]:
         """
         Valida un archivo YAML de agente
         Retorna: (num_errors, num_warnings)
         """
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = load_yaml(yaml_file, copy=False)
         except Exception as e:
             print(f"❌ ERROR: No se pudo leer {yaml_file}: {e}")
             return (1, 0)
@@ -158,39 +222,76 @@ class SemanticValidator:
             blocks = data.get('blocks', {})
         
         agent_role = self._determine_role(agent_name)
+        self.rules.guard.begin_scope()  # Presupuesto de las reglas de texto por archivo
+        
+        # Validar cada bloque (solo los que cambiaron si hay memo; el rol es parte de la clave)
+        summaries = evaluate_blocks(
+            blocks, lambda name, data: self._summarize_block(name, data, agent_role),
+            self.memo, context=agent_role, guard=self.rules.guard
+        )
+        for summary in summaries.values():
+            self.issues.extend(summary['issues'])
+        
+        # 6. Validar duplicados semánticos (sobre las palabras de cada resumen)
+        before = len(self.issues)
+        self._rule = 'duplicate_blocks'
+        with self.profiler.measure('v4._validate_duplicate_blocks') as m:
+            self._validate_duplicate_blocks(
+                [(name, set(summary['words'])) for name, summary in summaries.items()]
+            )
+            m.hits = len(self.issues) - before
         
-        # Validar cada bloque
-        for block_name, block_content in blocks.items():
-            # Soportar ambas estructuras: dict con 'content' o string directo
-            if isinstance(block_content, dict):
-                content = block_content.get('content', '')
-            else:
-                content = str(block_content)
-            
-            # 1. Validar Entry Guards
-            if self._is_entry_guard(block_name):
-                self._validate_entry_guard(block_name, content)
-            
-            # 2. Validar Exit Strategies
-            if self._is_exit_strategy(block_name):
-                self._validate_exit_strategy(block_name, content)
-            
-            # 3. Validar Loop Contracts
-            if self._is_loop_contract(block_name):
-                self._validate_loop_contract(block_name, content)
-            
-            # 4. Validar STATE_JSON
-            if self._is_state_json(block_name):
-                self._validate_state_json(block_name, content)
-            
-            # 5. Validar permisos MVC
-            self._validate_mvc_permissions(block_name, content, agent_role)
+        # Reglas que RegexGuard desactivó por tiempo en este archivo: no se aplicaron
+        self._rule = 'regex_guard'
+        for stats in self.rules.guard.disabled_in_scope():
+            self._add_issue('GLOBAL', 'error',
+                            f"Regla '{stats['rule_id']}' desactivada por tiempo, no se aplicó "
+                            f"a este archivo: {stats['disabled']}")
         
-        # 6. Validar duplicados semánticos
-        self._validate_duplicate_blocks(blocks)
+        # Posición de cada issue en el .md fuente (fuera del memo: cambia al editar otros bloques)
+        attach_md_locations(self.issues, data.get('agent', {}), yaml_file)
         
         return self._count_issues()
     
+    def _summarize_block(self, block_name: str, block_content: Any, agent_role: str) -> Dict:
+        """
+        Aplica las reglas por bloque (1-5) y retorna un resumen serializable:
+        {'issues': [...], 'words': [palabras del contenido para detectar duplicados]}
+        """
+        # Soportar ambas estructuras: dict con 'content' o string directo
+        if isinstance(block_content, dict):
+            content = block_content.get('content', '')
+        else:
+            content = str(block_content)
+        
+        before = len(self.issues)
+        
+        # 1. Validar Entry Guards
+        if self._is_entry_guard(block_name):
+            self._run_check(self._validate_entry_guard, block_name, content)
+        
+        # 2. Validar Exit Strategies
+        if self._is_exit_strategy(block_name):
+            self._run_check(self._validate_exit_strategy, block_name, content)
+        
+        # 3. Validar Loop Contracts
+        if self._is_loop_contract(block_name):
+            self._run_check(self._validate_loop_contract, block_name, content)
+        
+        # 4. Validar STATE_JSON
+        if self._is_state_json(block_name):
+            self._run_check(self._validate_state_json, block_name, content)
+        
+        # 5. Validar permisos MVC
+        self._run_check(self._validate_mvc_permissions, block_name, content, agent_role)
+        
+        issues = self.issues[before:]
+        del self.issues[before:]
+        return {
+            'issues': issues,
+            'words': sorted(set(re.findall(r'\w+', content.lower()))),
+        }
+    
     def _determine_role(self, agent_name: str) -> str:
         """Determina el rol del agente basado en su nombre"""
         name_lower = agent_name.lower()
@@ -233,7 +334,8 @@ class SemanticValidator:
         kw_config = self.rules.get_required_keywords('entry_guard')
         if kw_config:
             must_contain = kw_config.get('must_contain_any', [])
-            if not any(re.search(kw, content, re.IGNORECASE) for kw in must_contain):
+            if not any(self.rules.search(f"required_keywords.entry_guard", kw, content)
+                       for kw in must_contain):
                 self._add_issue(
                     block_name,
                     kw_config.get('severity', 'error'),
@@ -251,7 +353,8 @@ class SemanticValidator:
         kw_config = self.rules.get_required_keywords('exit_strategy')
         if kw_config:
             must_contain = kw_config.get('must_contain_any', [])
-            if not any(re.search(kw, content, re.IGNORECASE) for kw in must_contain):
+            if not any(self.rules.search(f"required_keywords.exit_strategy", kw, content)
+                       for kw in must_contain):
                 self._add_issue(
                     block_name,
                     kw_config.get('severity', 'error'),
@@ -269,7 +372,8 @@ class SemanticValidator:
         kw_config = self.rules.get_required_keywords('loop_contract')
         if kw_config:
             must_contain = kw_config.get('must_contain_any', [])
-            if not any(re.search(kw, content, re.IGNORECASE) for kw in must_contain):
+            if not any(self.rules.search(f"required_keywords.loop_contract", kw, content)
+                       for kw in must_contain):
                 self._add_issue(
                     block_name,
                     kw_config.get('severity', 'warning'),
@@ -286,7 +390,7 @@ class SemanticValidator:
         # Verificar claves prohibidas
         forbidden = self.rules.get_forbidden_state_keys()
         for key in forbidden:
-            if re.search(rf'["\']?{key}["\']?\s*:', content, re.IGNORECASE):
+            if self.rules.search('state_json.forbidden_keys', rf'["\']?{key}["\']?\s*:', content):
                 self._add_issue(
                     block_name,
                     'error',
@@ -304,7 +408,7 @@ class SemanticValidator:
         for forbidden_pattern in cannot_modify:
             # Buscar asignaciones a campos prohibidos
             pattern = rf'{forbidden_pattern}\s*='
-            if re.search(pattern, content):
+            if self.rules.search(f'role_permissions.{agent_role}.cannot_modify', pattern, content, 0):
                 self._add_issue(
                     block_name,
                     'error',
@@ -317,28 +421,16 @@ class SemanticValidator:
                 if 'direct_activation' in rule.rule_id and rule.matches(content):
                     self._add_issue(block_name, rule.severity, rule.message)
     
-    def _validate_duplicate_blocks(self, blocks: Dict):
+    def _validate_duplicate_blocks(self, block_words: List[Tuple[str, Set[str]]]):
         """Detecta bloques con contenido muy similar (duplicados semánticos)"""
         if not self.rules.semantic_validators.get('duplicate_detection', {}).get('enabled', True):
             return
         
         threshold = self.rules.get_duplicate_threshold()
-        block_items = list(blocks.items())
+        block_items = [(name, words) for name, words in block_words if words]
         
-        for i, (name1, content1) in enumerate(block_items):
-            text1 = content1.get('content', '')
-            words1 = set(re.findall(r'\w+', text1.lower()))
-            
-            if len(words1) == 0:
-                continue
-            
-            for name2, content2 in block_items[i+1:]:
-                text2 = content2.get('content', '')
-                words2 = set(re.findall(r'\w+', text2.lower()))
-                
-                if len(words2) == 0:
-                    continue
-                
+        for i, (name1, words1) in enumerate(block_items):
+            for name2, words2 in block_items[i+1:]:
                 # Calcular similitud
                 common = words1 & words2
                 total = words1 | words2
@@ -356,7 +448,8 @@ class SemanticValidator:
         self.issues.append({
             'location': location,
             'severity': severity,
-            'message': message
+            'message': message,
+            'rule': self._rule
         })
     
     def _count_issues(self) -> Tuple[int, int]:
@@ -365,6 +458,11 @@ class SemanticValidator:
         warnings = sum(1 for issue in self.issues if issue['severity'] == 'warning')
         return (errors, warnings)
     
+    @staticmethod
+    def _md_suffix(issue: Dict) -> str:
+        where = format_md_location(issue)
+        return f" ({where})" if where else ''
+    
     def print_report(self):
         """Imprime reporte de validación"""
         errors = [i for i in self.issues if i['severity'] == 'error']
@@ -373,12 +471,12 @@ class SemanticValidator:
         if errors:
             print(f"\n❌ ERRORES: {len(errors)}")
             for issue in errors:
-                print(f"  ❌ ERROR en '{issue['location']}': {issue['message']}")
+                print(f"  ❌ ERROR en '{issue['location']}'{self._md_suffix(issue)}: {issue['message']}")
         
         if warnings:
             print(f"\n⚠️  WARNINGS: {len(warnings)}")
             for issue in warnings:
-                print(f"  ⚠️  WARNING en '{issue['location']}': {issue['message']}")
+                print(f"  ⚠️  WARNING en '{issue['location']}'{self._md_suffix(issue)}: {issue['message']}")
         
         if not errors and not warnings:
             print("\n✅ VALIDACIÓN EXITOSA: No se encontraron problemas semánticos")
@@ -411,17 +509,54 @@ Ejemplos:
     parser.add_argument(
         '--rules',
         type=Path,
-        default=Path(__file__).parent.parent.parent / 'swarm' / 'rules' / 'validation_rules_v1.yaml',
-        help='Archivo de reglas de validación (default: swarm/rules/validation_rules_v1.yaml)'
+        default=DEFAULT_RULES_FILE,
+        help='Archivo de reglas de validación (default: swarm/rules/validation_rules_v1.yaml, '
+             'empaquetado en aps.pyz)'
     )
     parser.add_argument(
         '--format',
-        choices=['detailed', 'summary', 'json'],
+        choices=['detailed', 'summary', 'json', 'sarif'],
         default='detailed',
         help='Formato de salida del reporte'
     )
+    parser.add_argument(
+        '--regex-budget',
+        type=float,
+        default=DEFAULT_CALL_BUDGET_MS,
+        metavar='MS',
+        help=f'Tiempo máximo por búsqueda regex; la regla que lo supera se desactiva '
+             f'(default: {DEFAULT_CALL_BUDGET_MS} ms)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Perfilar cada regla y validación (llamadas, tiempo total/p95, bytes, hits)'
+    )
+    parser.add_argument(
+        '--profile-json',
+        type=Path,
+        metavar='PATH',
+        help='Guardar el perfil en JSON (implica --profile)'
+    )
+    parser.add_argument(
+        '--memo',
+        action='store_true',
+        help='Re-lint incremental: reusar y guardar resultados por bloque en un memo SQLite'
+    )
+    parser.add_argument(
+        '--memo-path',
+        type=Path,
+        default=DEFAULT_MEMO_PATH,
+        help=f'Archivo del memo (default: {DEFAULT_MEMO_PATH})'
+    )
+    parser.add_argument(
+        '--no-memo',
+        action='store_true',
+        help='Evaluar todos los bloques sin memo (default; anula --memo)'
+    )
     
     args = parser.parse_args()
+    profiler = RuleProfiler() if (args.profile or args.profile_json) else None
     
     # Validar archivo de entrada
     if not args.yaml_file.exists():
@@ -429,12 +564,15 @@ Ejemplos:
         sys.exit(1)
     
     # Cargar reglas
-    rule_engine = RuleEngine(args.rules)
-    print(f"📋 Reglas cargadas desde: {args.rules}")
-    print(f"📄 Validando: {args.yaml_file}\n")
+    rule_engine = RuleEngine(args.rules, RegexGuard(call_budget_ms=args.regex_budget, profiler=profiler))
+    log = sys.stderr if args.format == 'sarif' else sys.stdout  # stdout solo con el SARIF
+    print(f"📋 Reglas cargadas desde: {args.rules}", file=log)
+    print(f"📄 Validando: {args.yaml_file}\n", file=log)
     
     # Validar
-    validator = SemanticValidator(rule_engine)
+    use_memo = args.memo and not args.no_memo
+    memo = SemanticValidator.open_memo(rule_engine, args.memo_path) if use_memo else None
+    validator = SemanticValidator(rule_engine, profiler, memo)
     errors, warnings = validator.validate_file(args.yaml_file)
     
     # Reportar
@@ -444,10 +582,29 @@ Ejemplos:
             'file': str(args.yaml_file),
             'errors': errors,
             'warnings': warnings,
-            'issues': validator.issues
+            'issues': validator.issues,
+            'regex_guard': rule_engine.guard.report(),
+            'profile': profiler.to_dict() if profiler else None,
+            'memo': memo.stats if memo else None
         }, indent=2))
+    elif args.format == 'sarif':
+        reporter = open_reporter('sarif', tool_name='yaml_lint_v4', rules=V4_RULES)
+        reporter.report_file(args.yaml_file, validator.issues)
+        reporter.close()
     else:
         validator.print_report()
+        guard_lines = rule_engine.guard.format_report()
+        if guard_lines:
+            print("\n🛡️  REGEX GUARD:")
+            for line in guard_lines:
+                print(f"  {line}")
+        if profiler:
+            print(f"\n⏱️  PERFIL POR REGLA:\n{profiler.format_table()}")
+        if memo:
+            print(f"\n♻️  Memo: {memo.format_stats()}")
+    
+    if args.profile_json:
+        profiler.save_json(args.profile_json, include_samples=True)
     
     # Exit code
     sys.exit(1 if errors > 0 else 0)
@@ -41,6 +41,10 @@ from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict, Counter
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.yaml_cache import load_yaml, dump_yaml
+from lib.tracing import agent_file_attrs, traced
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # CLASE: IntelligentRuleLearner
@@ -75,8 +79,7 @@ class IntelligentRuleLearner:
     def _analyze_file(self, yaml_file: Path):
         """Analiza un archivo individual y extrae patrones"""
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = load_yaml(yaml_file, copy=False)
         except Exception:
             return
         
@@ -335,11 +338,12 @@ class SimpleValidator:
         self.rules = rules
         self.issues = []
     
+    @traced('yaml_lint_v5.validate_file',
+            lambda counts, self, yaml_file: agent_file_attrs(yaml_file, errors=counts[0], warnings=counts[1]))
     def validate_file(self, yaml_file: Path) -> Tuple[int, int]:
         """Valida un archivo YAML"""
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = load_yaml(yaml_file, copy=False)
         except Exception as e:
             print(f"❌ ERROR: No se pudo leer {yaml_file}: {e}")
             return (1, 0)
@@ -457,7 +461,7 @@ Ejemplos:
         print("🧠 MODO: Aprender reglas del SWARM\n")
         learner = IntelligentRuleLearner()
         rules = learner.learn_from_swarm(args.yaml_files)
-        print("\n" + yaml.dump(rules, default_flow_style=False, allow_unicode=True))
+        print("\n" + dump_yaml(rules, default_flow_style=False))
         sys.exit(0)
     
     elif args.domain:
@@ -470,8 +474,7 @@ Ejemplos:
         # MODO: Manual (archivo de reglas)
         print(f"📋 MODO: Reglas manuales desde {args.rules}\n")
         try:
-            with open(args.rules, 'r', encoding='utf-8') as f:
-                rules = yaml.safe_load(f)
+            rules = load_yaml(args.rules, copy=False)
         except Exception as e:
             print(f"❌ ERROR: No se pudo cargar reglas: {e}")
             sys.exit(1)
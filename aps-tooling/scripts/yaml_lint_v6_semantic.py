@@ -19,6 +19,10 @@ VALIDACIONES IMPLEMENTADAS:
 USO:
     python3 yaml_lint_v6_semantic.py archivo.yaml
     python3 yaml_lint_v6_semantic.py swarm/agents/**/*.yaml
+    python3 yaml_lint_v6_semantic.py swarm/agents/**/*.yaml --format sarif -o lint.sarif
+
+REPORTES (lib/reporters.py): consola + archivo markdown | json | junit | sarif,
+escritos en streaming archivo a archivo.
 
 AUTOR: APS v3.5 Validation Team
 FECHA: 2025-11-19
@@ -32,43 +36,190 @@ import yaml
 import json
 import argparse
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.regex_guard import RegexGuard, DEFAULT_CALL_BUDGET_MS
+from lib.profiler import RuleProfiler, NULL_PROFILER
+from lib.memprofile import MemoryProfiler, NULL_MEMPROFILER
+from lib.yaml_cache import load_yaml
+from lib.lint_memo import LintMemo, DEFAULT_MEMO_PATH, evaluate_blocks, ruleset_fingerprint
+from lib.reporters import ConsoleReporter, REPORTERS, REPORT_SUFFIXES, open_reporter
+from lib.md_blocks import attach_md_locations
+from lib.tracing import agent_file_attrs, traced
+
+
+# Metadatos de reglas (SARIF): id → (severidad por defecto, descripción)
+V6_RULES = {
+    'read_error': ('error', 'No se pudo leer el archivo YAML'),
+    'structure': ('error', "Estructura inválida: 'agent', 'blocks' o 'content' con un tipo inesperado"),
+    'sid_uniqueness': ('error', 'SID repetido en varios bloques'),
+    'semantic_contradictions': ('error', 'Bloques con SIDs contradictorios (MUST vs MUST_NOT)'),
+    'required_blocks': ('warning', 'Falta un tipo de bloque obligatorio'),
+    'sid_block_type_alignment': ('warning', 'El SID no concuerda con block_type'),
+    'state_json_consistency': ('warning', 'Estructuras STATE_JSON inconsistentes entre bloques'),
+    'phase_mappings': ('warning', 'Mapeo de fases incompleto'),
+    'deny_terms_by_sid': ('error', 'Término prohibido en un bloque que no lo permite'),
+    'confidence_levels': ('info', 'Bloque con confianza LOW'),
+    'regex_guard': ('error', 'Regla de texto desactivada por tiempo: sus checks no se aplicaron'),
+}
+
 
 class SemanticValidator:
     """Validador semántico basado en análisis de SIDs"""
     
-    def __init__(self):
+    # Orden de las validaciones en el reporte
+    CHECKS = [
+        '_validate_sid_uniqueness',
+        '_validate_semantic_contradictions',
+        '_validate_required_blocks',
+        '_validate_sid_block_type_alignment',
+        '_validate_state_json_consistency',
+        '_validate_phase_mappings',
+        '_validate_deny_terms_by_sid',
+        '_validate_confidence_levels',
+    ]
+    
+    # Validaciones que solo miran un bloque: sus issues se guardan en el resumen del bloque
+    BLOCK_CHECKS = [
+        '_validate_sid_block_type_alignment',
+        '_validate_phase_mappings',
+        '_validate_deny_terms_by_sid',
+    ]
+    
+    def __init__(self, guard: RegexGuard = None, profiler: RuleProfiler = None,
+                 memo: LintMemo = None):
         self.issues = []
-    
+        # Patrones de texto sobre contenido multi-KB: gaps acotados y presupuesto de tiempo
+        self.guard = guard or RegexGuard()
+        self.profiler = profiler or NULL_PROFILER
+        self.memo = memo
+        self._rule = None
+    
+    @staticmethod
+    def open_memo(guard: RegexGuard, db_path=None) -> LintMemo:
+        """Memo por bloque; la versión cubre este archivo y la config del guard"""
+        version = ruleset_fingerprint(Path(__file__).resolve(), guard.config_fingerprint())
+        return LintMemo('yaml_lint_v6', version, db_path)
+    
+    @traced('yaml_lint_v6.validate_file',
+            lambda counts, self, yaml_path: agent_file_attrs(yaml_path, errors=counts[0], warnings=counts[1]))
     def validate_file(self, yaml_path: Path) -> Tuple[int, int]:
-        """Valida un archivo YAML y retorna (errores, warnings)"""
+        """
+        Valida un archivo YAML y retorna (errores, warnings).
+        self.issues contiene solo los issues de este archivo (cada issue lleva
+        'rule': la validación que lo generó).
+        """
+        self.issues = []
         try:
-            with open(yaml_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = load_yaml(yaml_path, copy=False)
         except Exception as e:
+            self._rule = 'read_error'
             self._add_issue('FILE', 'error', f"Error leyendo archivo: {e}")
             return self._count_issues()
+        return self.validate_data(data, yaml_path)
+    
+    def validate_data(self, data: Dict, yaml_path: Optional[Path] = None) -> Tuple[int, int]:
+        """
+        Valida un agente ya cargado (dict del YAML) y retorna (errores, warnings).
+        `yaml_path` solo se usa para ubicar el .md fuente si el agente no trae source_map.
+        """
+        self.issues = []
+        self.guard.begin_scope()  # Presupuesto de las reglas de texto por archivo
+        blocks = self._valid_blocks(data)
+        if blocks is None:
+            return self._count_issues()
         
-        # Extraer bloques
-        if 'agent' in data:
-            blocks = data['agent'].get('blocks', {})
-        else:
-            blocks = data.get('blocks', {})
+        # Resumen por bloque (SID, tipo, confianza, estructuras STATE_JSON e issues
+        # de las validaciones de un solo bloque); con memo solo se evalúan los que cambiaron
+        summaries = evaluate_blocks(blocks, self._summarize_block, self.memo, guard=self.guard)
+        
+        # Ejecutar validaciones semánticas: las globales se recalculan desde los resúmenes
+        for check in self.CHECKS:
+            if check in self.BLOCK_CHECKS:
+                for summary in summaries.values():
+                    self.issues.extend(summary['issues'][check])
+                continue
+            before = len(self.issues)
+            self._rule = self._rule_id(check)
+            with self.profiler.measure(f"v6.{check}") as m:
+                getattr(self, check)(summaries)
+                m.hits = len(self.issues) - before
+        self._report_disabled_rules()
         
-        # Ejecutar validaciones semánticas
-        self._validate_sid_uniqueness(blocks)
-        self._validate_semantic_contradictions(blocks)
-        self._validate_required_blocks(blocks)
-        self._validate_sid_block_type_alignment(blocks)
-        self._validate_state_json_consistency(blocks)
-        self._validate_phase_mappings(blocks)
-        self._validate_deny_terms_by_sid(blocks)
-        self._validate_confidence_levels(blocks)
+        # Posición de cada issue en el .md fuente (fuera del memo: cambia al editar otros bloques)
+        attach_md_locations(self.issues, data.get('agent', {}), yaml_path)
         
         return self._count_issues()
     
+    def _valid_blocks(self, data) -> Optional[Dict[str, Dict]]:
+        """
+        Bloques validables del agente. Los problemas de estructura se registran
+        como errores 'structure'; None si no hay bloques que validar.
+        """
+        self._rule = 'structure'
+        if not isinstance(data, dict):
+            self._add_issue('ROOT', 'error', "El YAML no es un mapeo (falta 'agent')")
+            return None
+        agent = data['agent'] if 'agent' in data else data
+        if not isinstance(agent, dict):
+            self._add_issue('agent', 'error', "'agent' debe ser un mapeo")
+            return None
+        blocks = agent.get('blocks', {})
+        if not isinstance(blocks, dict):
+            self._add_issue('blocks', 'error', "'blocks' debe ser un diccionario")
+            return None
+        valid = {}
+        for name, block in blocks.items():
+            if not isinstance(block, dict):
+                continue
+            if not isinstance(block.get('content', ''), str):
+                self._add_issue(name, 'error', "'content' debe ser texto")
+                continue
+            valid[name] = block
+        return valid
+    
+    @staticmethod
+    def _rule_id(check: str) -> str:
+        """ID de regla de una validación: '_validate_sid_uniqueness' → 'sid_uniqueness'"""
+        return check[len('_validate_'):]
+    
+    def _report_disabled_rules(self):
+        """Un error por regla de texto que RegexGuard desactivó en este archivo"""
+        self._rule = 'regex_guard'
+        for stats in self.guard.disabled_in_scope():
+            self._add_issue('GLOBAL', 'error',
+                            f"Regla '{stats['rule_id']}' desactivada por tiempo, no se aplicó "
+                            f"a este archivo: {stats['disabled']}")
+    
+    def _summarize_block(self, block_name: str, block_data: Dict) -> Dict:
+        """Aplica las validaciones de un solo bloque y retorna su resumen serializable"""
+        content = block_data.get('content', '')
+        
+        with self.profiler.measure('v6._extract_json_structures', len(str(content))):
+            json_structures = self._extract_json_structures(block_name, content)
+        
+        summary = {
+            'sid': block_data.get('sid', ''),
+            'block_type': block_data.get('block_type', ''),
+            'confidence': block_data.get('confidence', 'MEDIUM'),
+            'json_structures': json_structures,
+            'issues': {},
+        }
+        
+        single = {block_name: block_data}
+        for check in self.BLOCK_CHECKS:
+            before = len(self.issues)
+            self._rule = self._rule_id(check)
+            with self.profiler.measure(f"v6.{check}", len(str(content))) as m:
+                getattr(self, check)(single)
+                m.hits = len(self.issues) - before
+            summary['issues'][check] = self.issues[before:]
+            del self.issues[before:]
+        
+        return summary
+    
     # ═══════════════════════════════════════════════════════════════════════════
     # VALIDACIÓN 1: SIDs Duplicados
     # ═══════════════════════════════════════════════════════════════════════════
@@ -198,29 +349,32 @@ class SemanticValidator:
     # VALIDACIÓN 5: STATE_JSON Inconsistente
     # ═══════════════════════════════════════════════════════════════════════════
     
-    def _validate_state_json_consistency(self, blocks: Dict):
-        """Detecta ejemplos de STATE_JSON con estructuras diferentes"""
+    def _extract_json_structures(self, block_name: str, content: str) -> List[Dict]:
+        """Claves de cada ejemplo ```json``` del bloque (parte del resumen por bloque)"""
         json_structures = []
         
-        for block_name, block_data in blocks.items():
-            if not isinstance(block_data, dict):
-                continue
-                
-            content = block_data.get('content', '')
-            
-            # Buscar bloques JSON en código
-            json_blocks = re.findall(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
-            
-            for json_str in json_blocks:
-                try:
-                    parsed = json.loads(json_str)
-                    structure = set(parsed.keys())
-                    json_structures.append({
-                        'block': block_name,
-                        'keys': structure
-                    })
-                except:
-                    pass
+        # Buscar bloques JSON en código
+        json_blocks = re.findall(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
+        
+        for json_str in json_blocks:
+            try:
+                parsed = json.loads(json_str)
+                json_structures.append({
+                    'block': block_name,
+                    'keys': list(parsed.keys())
+                })
+            except:
+                pass
+        
+        return json_structures
+    
+    def _validate_state_json_consistency(self, summaries: Dict):
+        """Detecta ejemplos de STATE_JSON con estructuras diferentes"""
+        json_structures = [
+            {'block': item['block'], 'keys': set(item['keys'])}
+            for summary in summaries.values()
+            for item in summary['json_structures']
+        ]
         
         # Comparar estructuras
         if len(json_structures) > 1:
@@ -303,7 +457,7 @@ class SemanticValidator:
             
             # Validar contenido
             for pattern, message in DENY_PATTERNS_TEXT:
-                if re.search(pattern, content):
+                if self.guard.search(f"deny_text:{message}", pattern, content):
                     self._add_issue(
                         block_name,
                         'error',
@@ -342,7 +496,8 @@ class SemanticValidator:
         self.issues.append({
             'location': location,
             'severity': severity,
-            'message': message
+            'message': message,
+            'rule': self._rule
         })
     
     def _count_issues(self) -> Tuple[int, int]:
@@ -351,195 +506,68 @@ class SemanticValidator:
         warnings = sum(1 for i in self.issues if i['severity'] == 'warning')
         return (errors, warnings)
     
-    def save_report(self, output_path: Path, validated_files: List[Path]):
-        """Guarda el reporte en formato Markdown"""
-        from datetime import datetime
-        
-        errors = [i for i in self.issues if i['severity'] == 'error']
-        warnings = [i for i in self.issues if i['severity'] == 'warning']
-        infos = [i for i in self.issues if i['severity'] == 'info']
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Header
-            f.write("# Reporte de Validación Semántica APS v3.5\n\n")
-            f.write(f"**Fecha**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"**Archivos validados**: {len(validated_files)}\n\n")
-            
-            for vf in validated_files:
-                f.write(f"- `{vf}`\n")
-            
-            f.write("\n---\n\n")
-            
-            # Resumen
-            f.write("## 📊 Resumen Ejecutivo\n\n")
-            f.write(f"- ❌ **Errores críticos**: {len(errors)}\n")
-            f.write(f"- ⚠️  **Warnings**: {len(warnings)}\n")
-            f.write(f"- ℹ️  **Información**: {len(infos)}\n\n")
-            
-            if len(errors) > 0:
-                f.write("**Estado**: 🚫 VALIDACIÓN FALLIDA - Bloquea integración\n\n")
-                f.write("**Próximo paso**: Corregir errores críticos en archivos `.md` fuente\n\n")
-            elif len(warnings) > 0:
-                f.write("**Estado**: ⚠️  VALIDACIÓN CON WARNINGS - Requiere revisión\n\n")
-                f.write("**Próximo paso**: Revisar warnings antes de integrar\n\n")
-            else:
-                f.write("**Estado**: ✅ LISTO PARA INTEGRACIÓN\n\n")
-            
-            f.write("---\n\n")
-            
-            # Errores detallados
-            if errors:
-                f.write("## ❌ Errores Críticos\n\n")
-                for idx, issue in enumerate(errors, 1):
-                    f.write(f"### {idx}. {issue['location']}\n\n")
-                    f.write(f"**Problema**: {issue['message']}\n\n")
-                    
-                    # Recomendaciones
-                    if 'SID duplicado' in issue['message']:
-                        f.write("**Acción recomendada**: Consolidar bloques duplicados o renombrar SID único\n\n")
-                        f.write("**Documentación**: `APS/LINTER_RULES.md § 1.3` (Unicidad de SIDs)\n\n")
-                    elif 'Contradicción' in issue['message']:
-                        f.write("**Acción recomendada**: Decidir política única y eliminar instrucción contradictoria\n\n")
-                        f.write("**Documentación**: `METODOLOGIA § 2` (Problema operativo - Contradicciones)\n\n")
-                    elif 'DENY_TERM' in issue['message']:
-                        f.write("**Acción recomendada**: Añadir validación de confirmación de usuario\n\n")
-                        f.write("**Documentación**: `APS/LINTER_RULES.md § 2.1` (DENY_TERMS)\n\n")
-                    
-                    f.write("---\n\n")
-            
-            # Warnings
-            if warnings:
-                f.write("## ⚠️  Warnings\n\n")
-                for idx, issue in enumerate(warnings, 1):
-                    f.write(f"### {idx}. {issue['location']}\n\n")
-                    f.write(f"**Problema**: {issue['message']}\n\n")
-                    
-                    if 'no encontrado' in issue['message']:
-                        if 'Entry Guard' in issue['message']:
-                            f.write("**Acción recomendada**: Añadir bloque de validación de entrada\n\n")
-                            f.write("**Template SID**: `BLK.verificar.control.active_agent.guard`\n\n")
-                        elif 'Exit Strategy' in issue['message']:
-                            f.write("**Acción recomendada**: Definir condiciones de terminación\n\n")
-                            f.write("**Template SID**: `BLK.detectar.salida.protocol`\n\n")
-                        elif 'State JSON' in issue['message']:
-                            f.write("**Acción recomendada**: Añadir protocolo STATE_JSON\n\n")
-                            f.write("**Template SID**: `PROT.generar.state_json.template`\n\n")
-                    elif 'inconsistente' in issue['message']:
-                        f.write("**Acción recomendada**: Unificar estructura de STATE_JSON\n\n")
-                        f.write("**Documentación**: `APS § 11` (Protocolo STATE_JSON)\n\n")
-                    elif 'mapeada a' in issue['message']:
-                        f.write("**Acción recomendada**: Asignar cada fase a un solo agente\n\n")
-                    
-                    f.write("---\n\n")
-            
-            # Info
-            if infos:
-                f.write("## ℹ️  Información\n\n")
-                for issue in infos:
-                    f.write(f"- {issue['message']}\n")
-                    if 'LOW confidence' in issue['message']:
-                        f.write("  - **Acción**: Revisar bloques y enriquecer con vocabulario APS\n")
-                        f.write("  - **Ver**: `aps-tooling/schemas/sid_vocabulary_v1.yaml`\n")
-                f.write("\n")
-            
-            f.write("---\n\n")
-            f.write("*Generado por yaml_lint_v6_semantic.py*\n")
-    
-    def print_report(self):
-        """Imprime reporte detallado de validación"""
-        errors = [i for i in self.issues if i['severity'] == 'error']
-        warnings = [i for i in self.issues if i['severity'] == 'warning']
-        infos = [i for i in self.issues if i['severity'] == 'info']
-        
-        print("\n" + "="*80)
-        print("📋 REPORTE DE VALIDACIÓN SEMÁNTICA APS v3.5")
-        print("="*80)
-        
-        if errors:
-            print(f"\n❌ ERRORES CRÍTICOS: {len(errors)}")
-            print("-" * 80)
-            
-            for idx, issue in enumerate(errors, 1):
-                print(f"\n{idx}. 📍 Ubicación: {issue['location']}")
-                print(f"   ❌ Problema: {issue['message']}")
-                
-                # Añadir recomendación según tipo de error
-                if 'SID duplicado' in issue['message']:
-                    print(f"   💡 Acción: Consolidar bloques duplicados o renombrar SID único")
-                    print(f"   📖 Documentación: APS/LINTER_RULES.md § 1.3 (Unicidad de SIDs)")
-                    
-                elif 'Contradicción' in issue['message']:
-                    print(f"   💡 Acción: Decidir política única y eliminar instrucción contradictoria")
-                    print(f"   📖 Ver: METODOLOGIA § 2 (Problema operativo - Contradicciones)")
-                    
-                elif 'DENY_TERM' in issue['message']:
-                    print(f"   💡 Acción: Añadir validación de confirmación de usuario antes de ejecutar")
-                    print(f"   📖 Regla: APS/LINTER_RULES.md § 2.1 (DENY_TERMS)")
-        
-        if warnings:
-            print(f"\n\n⚠️  WARNINGS: {len(warnings)}")
-            print("-" * 80)
-            
-            for idx, issue in enumerate(warnings, 1):
-                print(f"\n{idx}. 📍 Ubicación: {issue['location']}")
-                print(f"   ⚠️  Problema: {issue['message']}")
-                
-                # Añadir recomendación según tipo de warning
-                if 'no encontrado' in issue['message']:
-                    if 'Entry Guard' in issue['message']:
-                        print(f"   💡 Acción: Añadir bloque de validación de entrada")
-                        print(f"   📝 Template: BLK.verificar.control.active_agent.guard")
-                    elif 'Exit Strategy' in issue['message']:
-                        print(f"   💡 Acción: Definir condiciones de terminación del agente")
-                        print(f"   📝 Template: BLK.detectar.salida.protocol")
-                    elif 'State JSON' in issue['message']:
-                        print(f"   💡 Acción: Añadir protocolo STATE_JSON para handoff")
-                        print(f"   📝 Template: PROT.generar.state_json.template")
-                        
-                elif 'Desplazamiento' in issue['message']:
-                    print(f"   💡 Acción: Mover contenido a sección correcta o ajustar block_type")
-                    
-                elif 'inconsistente' in issue['message']:
-                    print(f"   💡 Acción: Unificar estructura de STATE_JSON en todo el agente")
-                    print(f"   📖 Ver: APS § 11 (Protocolo STATE_JSON)")
-                    
-                elif 'mapeada a' in issue['message']:
-                    print(f"   💡 Acción: Asignar cada fase a un solo agente responsable")
-        
-        if infos:
-            print(f"\n\nℹ️  INFORMACIÓN: {len(infos)}")
-            print("-" * 80)
-            
-            for issue in infos:
-                print(f"\n   ℹ️  {issue['message']}")
-                if 'LOW confidence' in issue['message']:
-                    print(f"   💡 Acción: Revisar bloques marcados y enriquecer con vocabulario APS")
-                    print(f"   📖 Ver: aps-tooling/schemas/sid_vocabulary_v1.yaml")
-        
-        if not errors and not warnings and not infos:
-            print("\n✅ VALIDACIÓN EXITOSA: Sin problemas detectados")
-            print("\nEl agente cumple con todos los requisitos semánticos de APS v3.5")
-        
-        # Resumen ejecutivo
-        print("\n" + "="*80)
-        print("📊 RESUMEN EJECUTIVO")
-        print("="*80)
-        print(f"   ❌ Errores críticos:  {len(errors)}")
-        print(f"   ⚠️  Warnings:          {len(warnings)}")
-        print(f"   ℹ️  Información:       {len(infos)}")
-        
-        if len(errors) > 0:
-            print(f"\n   🚫 Estado: VALIDACIÓN FALLIDA - Bloquea integración")
-            print(f"   📝 Próximo paso: Corregir errores críticos en archivo .md fuente")
-        elif len(warnings) > 0:
-            print(f"\n   ⚠️  Estado: VALIDACIÓN CON WARNINGS - Requiere revisión")
-            print(f"   📝 Próximo paso: Revisar warnings antes de integrar")
-        else:
-            print(f"\n   ✅ Estado: LISTO PARA INTEGRACIÓN")
-        
-        print("="*80 + "\n")
-        
-        return len(errors)
+    def save_report(self, output_path: Path, validated_file: Path, fmt: str = 'markdown'):
+        """Guarda el reporte del último archivo validado (markdown, json, junit o sarif)"""
+        reporter = open_reporter(fmt, output_path, **report_options(fmt))
+        reporter.report_file(validated_file, self.issues)
+        reporter.close()
+    
+    def print_report(self) -> int:
+        """Imprime el reporte del último archivo validado; retorna el número de errores"""
+        reporter = ConsoleReporter(advice=recommendations)
+        reporter.report_file('', self.issues)
+        return reporter.close()['error']
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPORTES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def recommendations(issue: Dict) -> List[Tuple[str, str]]:
+    """Acción recomendada, documentación o template SID según el tipo de issue"""
+    message = issue['message']
+    if issue['severity'] == 'error':
+        if 'SID duplicado' in message:
+            return [('action', 'Consolidar bloques duplicados o renombrar SID único'),
+                    ('doc', 'APS/LINTER_RULES.md § 1.3 (Unicidad de SIDs)')]
+        if 'Contradicción' in message:
+            return [('action', 'Decidir política única y eliminar instrucción contradictoria'),
+                    ('doc', 'METODOLOGIA § 2 (Problema operativo - Contradicciones)')]
+        if 'DENY_TERM' in message:
+            return [('action', 'Añadir validación de confirmación de usuario antes de ejecutar'),
+                    ('doc', 'APS/LINTER_RULES.md § 2.1 (DENY_TERMS)')]
+    elif issue['severity'] == 'warning':
+        if 'no encontrado' in message:
+            if 'Entry Guard' in message:
+                return [('action', 'Añadir bloque de validación de entrada'),
+                        ('template', 'BLK.verificar.control.active_agent.guard')]
+            if 'Exit Strategy' in message:
+                return [('action', 'Definir condiciones de terminación del agente'),
+                        ('template', 'BLK.detectar.salida.protocol')]
+            if 'State JSON' in message:
+                return [('action', 'Añadir protocolo STATE_JSON para handoff'),
+                        ('template', 'PROT.generar.state_json.template')]
+        elif 'Desplazamiento' in message:
+            return [('action', 'Mover contenido a sección correcta o ajustar block_type')]
+        elif 'inconsistente' in message:
+            return [('action', 'Unificar estructura de STATE_JSON en todo el agente'),
+                    ('doc', 'APS § 11 (Protocolo STATE_JSON)')]
+        elif 'mapeada a' in message:
+            return [('action', 'Asignar cada fase a un solo agente responsable')]
+    elif 'LOW confidence' in message:
+        return [('action', 'Revisar bloques marcados y enriquecer con vocabulario APS'),
+                ('doc', 'aps-tooling/schemas/sid_vocabulary_v1.yaml')]
+    return []
+
+
+def report_options(fmt: str) -> Dict:
+    """Argumentos del reporter de archivo para cada formato"""
+    if fmt == 'markdown':
+        return {'title': 'Reporte de Validación Semántica APS v3.5', 'advice': recommendations,
+                'generator': 'yaml_lint_v6_semantic.py'}
+    if fmt == 'sarif':
+        return {'tool_name': 'yaml_lint_v6_semantic', 'tool_version': '6.0', 'rules': V6_RULES}
+    return {'title': 'yaml_lint_v6_semantic'}
 
 
 def main():
@@ -551,6 +579,7 @@ Ejemplos:
   python3 yaml_lint_v6_semantic.py agent.yaml
   python3 yaml_lint_v6_semantic.py swarm/agents/**/*.yaml
   python3 yaml_lint_v6_semantic.py agent.yaml --output report.md
+  python3 yaml_lint_v6_semantic.py swarm/agents/**/*.yaml --format junit -o lint.xml
         """
     )
     
@@ -567,36 +596,84 @@ Ejemplos:
         help='Guardar reporte en archivo (opcional)'
     )
     
+    parser.add_argument(
+        '--format',
+        choices=list(REPORTERS),
+        default='markdown',
+        help='Formato del reporte guardado (default: markdown)'
+    )
+    
+    parser.add_argument(
+        '--regex-budget',
+        type=float,
+        default=DEFAULT_CALL_BUDGET_MS,
+        metavar='MS',
+        help=f'Tiempo máximo por búsqueda regex; la regla que lo supera se desactiva '
+             f'(default: {DEFAULT_CALL_BUDGET_MS} ms)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Perfilar cada validación y patrón (llamadas, tiempo total/p95, bytes, hits)'
+    )
+    
+    parser.add_argument(
+        '--profile-json',
+        type=Path,
+        metavar='PATH',
+        help='Guardar el perfil en JSON (implica --profile)'
+    )
+    
+    parser.add_argument(
+        '--memprofile',
+        action='store_true',
+        help='Perfil de memoria (tracemalloc): pico y memoria retenida por etapa y agente, sitios de asignación'
+    )
+    
+    parser.add_argument(
+        '--memprofile-json',
+        type=Path,
+        metavar='PATH',
+        help='Guardar el perfil de memoria en JSON (implica --memprofile)'
+    )
+    
+    parser.add_argument(
+        '--memo',
+        action='store_true',
+        help='Re-lint incremental: reusar y guardar resultados por bloque en un memo SQLite'
+    )
+    
+    parser.add_argument(
+        '--memo-path',
+        type=Path,
+        default=DEFAULT_MEMO_PATH,
+        help=f'Archivo del memo (default: {DEFAULT_MEMO_PATH})'
+    )
+    
+    parser.add_argument(
+        '--no-memo',
+        action='store_true',
+        help='Evaluar todos los bloques sin memo (default; anula --memo)'
+    )
+    
     args = parser.parse_args()
+    profiler = RuleProfiler() if (args.profile or args.profile_json) else None
+    mem = MemoryProfiler() if (args.memprofile or args.memprofile_json) else NULL_MEMPROFILER
     
     print("🔍 APS v3.5 - Validador Semántico (basado en SIDs)")
     print("="*80 + "\n")
     
-    validator = SemanticValidator()
-    total_errors = 0
-    total_warnings = 0
-    
-    for yaml_file in args.yaml_files:
-        if not yaml_file.exists():
-            print(f"❌ Archivo no encontrado: {yaml_file}")
-            continue
-            
-        print(f"📄 Validando: {yaml_file.name}")
-        print("-" * 80)
-        
-        errors, warnings = validator.validate_file(yaml_file)
-        total_errors += errors
-        total_warnings += warnings
-    
-    # Reporte en terminal
-    exit_code = validator.print_report()
+    with mem.stage('v6.setup'):
+        guard = RegexGuard(call_budget_ms=args.regex_budget, profiler=profiler)
+        use_memo = args.memo and not args.no_memo
+        memo = SemanticValidator.open_memo(guard, args.memo_path) if use_memo else None
+        validator = SemanticValidator(guard, profiler, memo)
     
-    # Guardar reporte en archivo si se especificó
+    # Destino del reporte: --output o auto-guardado en swarm/reports/validation/
     if args.output:
-        validator.save_report(args.output, args.yaml_files)
-        print(f"\n💾 Reporte guardado en: {args.output}")
+        report_file = args.output
     else:
-        # Auto-guardar en swarm/reports/validation/
         from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
@@ -608,10 +685,54 @@ Ejemplos:
         
         report_dir = Path('swarm/reports/validation')
         report_dir.mkdir(parents=True, exist_ok=True)
-        
-        report_file = report_dir / f"{swarm_name}_validation_{timestamp}.md"
-        validator.save_report(report_file, args.yaml_files)
-        print(f"\n💾 Reporte auto-guardado en: {report_file}")
+        report_file = report_dir / f"{swarm_name}_validation_{timestamp}{REPORT_SUFFIXES[args.format]}"
+    
+    # Los reporters reciben los issues archivo a archivo (nada se acumula entre archivos)
+    console = ConsoleReporter(advice=recommendations)
+    file_reporter = open_reporter(args.format, report_file, **report_options(args.format))
+    
+    with mem.stage('v6.lint'):
+        for yaml_file in args.yaml_files:
+            if not yaml_file.exists():
+                print(f"❌ Archivo no encontrado: {yaml_file}")
+                continue
+                
+            print(f"📄 Validando: {yaml_file.name}")
+            print("-" * 80)
+            
+            with mem.stage('v6.validate_file', agent=yaml_file.stem):
+                validator.validate_file(yaml_file)
+            with mem.stage('v6.report', agent=yaml_file.stem):
+                console.report_file(yaml_file, validator.issues)
+                file_reporter.report_file(yaml_file, validator.issues)
+    
+    # Resumen en terminal
+    with mem.stage('v6.close'):
+        exit_code = console.close()['error']
+        file_reporter.close()
+    
+    guard_lines = validator.guard.format_report()
+    if guard_lines:
+        print("🛡️  REGEX GUARD:")
+        for line in guard_lines:
+            print(f"  {line}")
+    
+    if memo:
+        print(f"♻️  Memo: {memo.format_stats()}\n")
+    
+    if profiler:
+        print(f"⏱️  PERFIL POR REGLA:\n{profiler.format_table()}")
+        if args.profile_json:
+            profiler.save_json(args.profile_json, include_samples=True)
+            print(f"💾 Perfil JSON: {args.profile_json}")
+    
+    if mem.enabled:
+        print(f"🧠 PERFIL DE MEMORIA (tracemalloc):\n{mem.format_report()}\n")
+        if args.memprofile_json:
+            mem.save_json(args.memprofile_json)
+            print(f"💾 Perfil de memoria JSON: {args.memprofile_json}")
+    
+    print(f"\n💾 Reporte {'guardado' if args.output else 'auto-guardado'} en: {report_file}")
     
     # Exit code
     sys.exit(exit_code if exit_code < 3 else 2)
@@ -12,6 +12,11 @@ Uso:
     # Modo interactivo (colores, emojis)
     python3 yaml_pipeline_cli.py --batch "swarm/agents/**/*.md"
     
+    # Perfil por fase y por regla de lint
+    python3 yaml_pipeline_cli.py --batch "swarm/agents/**/*.md" --profile
+    python3 yaml_pipeline_cli.py --batch "swarm/agents/**/*.md" --trace trace.json
+    python3 yaml_pipeline_cli.py --batch "swarm/agents/**/*.md" --memprofile
+    
 Exit Codes:
     0 = Success (sin errores ni warnings)
     1 = Warnings (ej: LOW confidence SIDs)
@@ -23,14 +28,22 @@ Exit Codes:
 
 import argparse
 import json
+import os
 import sys
 import glob
 import subprocess
 import shlex
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.profiler import RuleProfiler, NULL_PROFILER
+from lib.memprofile import MemoryProfiler, NULL_MEMPROFILER
+from lib.tracing import span, start_trace
+from lib.resources import BUNDLE, TOOLING_DIR
+
 # Exit codes
 EXIT_CODE_SUCCESS = 0
 EXIT_CODE_WARNINGS = 1
@@ -46,11 +59,48 @@ ALLOWED_SCRIPTS = [
     'code/yaml_lint.py'
 ]
 
+# Cada script es un comando de aps (el zipapp aps.pyz o el directorio
+# aps-tooling): no depende de code/ ni del directorio de trabajo
+BUNDLED_COMMANDS = {
+    'code/md2yaml.py': 'md2yaml',
+    'code/enrich_yaml_with_llm.py': 'enrich',
+    'code/yaml_lint.py': 'lint'
+}
+
+# Directorios permitidos, relativos a la raíz del repo (REPO_ROOT), no al
+# directorio de trabajo
 ALLOWED_PREFIXES = [
     'swarm/agents/',
     'code/'
 ]
 
+# Raíz del repo explícita (p.ej. un aps.pyz copiado fuera del repo)
+REPO_ROOT_ENV = 'APS_REPO_ROOT'
+
+
+def find_repo_root() -> Path:
+    """
+    Raíz del repo contra la que se anclan ALLOWED_PREFIXES: $APS_REPO_ROOT, o
+    el toplevel git del directorio de aps-tooling / del aps.pyz (dist/aps.pyz
+    dentro del repo), o el directorio de trabajo si no están en un repo git.
+    """
+    value = os.environ.get(REPO_ROOT_ENV, '').strip()
+    if value:
+        return Path(value).resolve()
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'],
+            cwd=str((BUNDLE or TOOLING_DIR).parent), capture_output=True, text=True, timeout=10
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return Path(result.stdout.strip()).resolve()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return Path.cwd().resolve()
+
+
+REPO_ROOT = find_repo_root()
+
 
 class SecurityError(Exception):
     """Raised when security validation fails."""
@@ -70,10 +120,9 @@ def validate_file_path(file_path: str) -> Path:
     if not path.exists():
         raise SecurityError(f"Path no existe: {file_path}")
     
-    # 2. Verificar prefijos permitidos
-    relative = str(path.relative_to(Path.cwd()))
-    if not any(relative.startswith(prefix) for prefix in ALLOWED_PREFIXES):
-        raise SecurityError(f"Path fuera de scope permitido: {relative}")
+    # 2. Verificar prefijos permitidos (path ya resuelto: sin '..' ni symlinks)
+    if not any(path.is_relative_to(REPO_ROOT / prefix) for prefix in ALLOWED_PREFIXES):
+        raise SecurityError(f"Path fuera de scope permitido: {path} (raíz: {REPO_ROOT})")
     
     # 3. Verificar extensión
     if path.suffix not in ['.md', '.yaml', '.py']:
@@ -96,7 +145,7 @@ def execute_safe_command(script: str, *args) -> Tuple[int, str, str]:
         raise SecurityError(f"Script no permitido: {script}")
     
     # Construir comando - NO usar shlex.quote() aquí porque subprocess.run ya maneja esto
-    cmd = ['python3', script] + [str(arg) for arg in args]
+    cmd = [sys.executable, str(BUNDLE or TOOLING_DIR), BUNDLED_COMMANDS[script]] + [str(arg) for arg in args]
     
     try:
         result = subprocess.run(
@@ -110,39 +159,59 @@ def execute_safe_command(script: str, *args) -> Tuple[int, str, str]:
         raise SecurityError(f"Timeout ejecutando {script}")
 
 
-def parse_lint_output(stdout: str, stderr: str) -> Dict:
+def parse_lint_sarif(sarif_path: str) -> Dict:
     """
-    Parsea salida de yaml_lint.py.
+    Lee los resultados de yaml_lint.py desde su SARIF (--sarif).
+    
+    Cada issue conserva código de regla, bloque, línea en el YAML y línea del
+    bloque en el .md fuente, en vez de depender del texto (emojis) que el linter
+    imprime en consola.
     
     Returns:
         {
-            "errors": [...],
+            "errors": [{"severity", "code", "message", "block", "line", "md_line"}, ...],
             "warnings": [...],
-            "duplicates": [...],
+            "duplicates": ["bloque: mensaje", ...],
             "auto_numbered": [...]
         }
+        o None si el SARIF no llegó a escribirse
     """
+    try:
+        with open(sarif_path, 'r', encoding='utf-8') as f:
+            runs = json.load(f).get('runs', [])
+    except (OSError, ValueError):
+        return None
+    
     errors = []
     warnings = []
     duplicates = []
     auto_numbered = []
     
-    # Parsear stderr (donde yaml_lint.py escribe los errores)
-    for line in stderr.split('\n'):
-        if '❌' in line or 'ERROR' in line:
-            errors.append({
-                "severity": "ERROR",
-                "message": line.strip()
-            })
-        elif '⚠️' in line or 'WARNING' in line:
-            warnings.append({
-                "severity": "WARNING",
-                "message": line.strip()
-            })
-        elif 'DUPLICADO' in line.upper():
-            duplicates.append(line.strip())
-        elif 'AUTO-NUMERADO' in line.upper():
-            auto_numbered.append(line.strip())
+    for run in runs:
+        for result in run.get('results', []):
+            location = (result.get('locations') or [{}])[0]
+            logical = (location.get('logicalLocations') or [{}])[0]
+            region = location.get('physicalLocation', {}).get('region', {})
+            md_region = ((result.get('relatedLocations') or [{}])[0]
+                         .get('physicalLocation', {}).get('region', {}))
+            issue = {
+                "severity": "ERROR" if result.get('level') == 'error' else "WARNING",
+                "code": result.get('ruleId', ''),
+                "message": result.get('message', {}).get('text', ''),
+                "block": logical.get('name', ''),
+                "line": region.get('startLine'),
+                "md_line": md_region.get('startLine')
+            }
+            
+            if result.get('level') == 'error':
+                errors.append(issue)
+            elif result.get('level') == 'warning':
+                warnings.append(issue)
+            
+            if issue["code"] == 'SID_DUPLICATE':
+                duplicates.append(f"{issue['block']}: {issue['message']}")
+            elif issue["code"] == 'AUTO_NUMBERED_BLOCK':
+                auto_numbered.append(f"{issue['block']}: {issue['message']}")
     
     return {
         "errors": errors,
@@ -152,10 +221,13 @@ def parse_lint_output(stdout: str, stderr: str) -> Dict:
     }
 
 
-def process_single_file(md_file: str, ci_mode: bool) -> Dict:
+def process_single_file(md_file: str, ci_mode: bool, profiler: RuleProfiler = NULL_PROFILER) -> Dict:
     """
     Procesa un archivo .md individual.
     
+    Con profiler activo se mide cada fase (pipeline.*) y se incorpora el perfil
+    por regla de yaml_lint.py (--profile-json).
+    
     Returns:
         {
             "source": "archivo.md",
@@ -175,10 +247,12 @@ def process_single_file(md_file: str, ci_mode: bool) -> Dict:
             print(f"🔄 Procesando: {md_file}")
         
         # FASE 1: Conversión MD → YAML
-        exit_code, stdout, stderr = execute_safe_command(
-            'code/md2yaml.py',
-            str(md_path)
-        )
+        with profiler.measure('pipeline.md2yaml', md_path.stat().st_size), \
+                span('pipeline.md2yaml', file=str(md_path), agent=md_path.stem):
+            exit_code, stdout, stderr = execute_safe_command(
+                'code/md2yaml.py',
+                str(md_path)
+            )
         
         if exit_code != 0:
             return {
@@ -199,12 +273,36 @@ def process_single_file(md_file: str, ci_mode: bool) -> Dict:
             print(f"  ⏩ Saltando enriquecimiento (requiere @sid-generator manual)")
         
         # FASE 3: Validación
-        exit_code, stdout, stderr = execute_safe_command(
-            'code/yaml_lint.py',
-            str(yaml_path)
-        )
+        fd, sarif_path = tempfile.mkstemp(prefix='lint_', suffix='.sarif')
+        os.close(fd)
+        lint_args = [str(yaml_path), '--sarif', sarif_path]
+        profile_path = None
+        if profiler.enabled:
+            fd, profile_path = tempfile.mkstemp(prefix='lint_profile_', suffix='.json')
+            os.close(fd)
+            lint_args += ['--profile-json', profile_path]
+        
+        try:
+            with profiler.measure('pipeline.yaml_lint', yaml_path.stat().st_size if yaml_path.exists() else 0), \
+                    span('pipeline.yaml_lint', file=str(yaml_path), agent=yaml_path.stem) as sp:
+                exit_code, stdout, stderr = execute_safe_command('code/yaml_lint.py', *lint_args)
+                sp.set(exit_code=exit_code)
+            if profile_path:
+                profiler.merge(load_profile_json(profile_path))
+            lint_result = parse_lint_sarif(sarif_path)
+        finally:
+            os.unlink(sarif_path)
+            if profile_path:
+                os.unlink(profile_path)
         
-        lint_result = parse_lint_output(stdout, stderr)
+        if lint_result is None or (exit_code != 0 and not lint_result["errors"]):
+            # El linter falló antes de reportar (sin SARIF o sin errores que expliquen el exit code)
+            lint_result = lint_result or {"errors": [], "warnings": [], "duplicates": [], "auto_numbered": []}
+            lint_result["errors"].append({
+                "severity": "ERROR",
+                "code": "LINT_FAILED",
+                "message": f"yaml_lint.py failed: {stderr.strip() or stdout.strip()}"
+            })
         
         # Contar bloques (leer YAML)
         blocks = count_blocks_in_yaml(yaml_path)
@@ -248,6 +346,15 @@ def process_single_file(md_file: str, ci_mode: bool) -> Dict:
         }
 
 
+def load_profile_json(path: str) -> Dict:
+    """Lee el perfil JSON de un subproceso (vacío si no llegó a escribirse)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
 def count_blocks_in_yaml(yaml_path: Path) -> int:
     """Cuenta bloques en YAML (simple conteo de líneas 'sid:')."""
     try:
@@ -258,13 +365,17 @@ def count_blocks_in_yaml(yaml_path: Path) -> int:
         return 0
 
 
-def run_batch(pattern: str, ci_mode: bool = False) -> int:
+def run_batch(pattern: str, ci_mode: bool = False, profiler: Optional[RuleProfiler] = None,
+              mem: MemoryProfiler = NULL_MEMPROFILER) -> int:
     """
     Ejecuta pipeline en modo batch.
     
     Args:
         pattern: Glob pattern (ej: "swarm/agents/**/*.md")
         ci_mode: Si True, salida JSON sin emojis
+        profiler: RuleProfiler para --profile (None = sin perfilado)
+        mem: MemoryProfiler para --memprofile (memoria de este proceso: resultados
+             acumulados y reporte; md2yaml/yaml_lint corren en subprocesos)
     
     Returns:
         Exit code (0=success, 1=warnings, 2=errors)
@@ -300,35 +411,42 @@ def run_batch(pattern: str, ci_mode: bool = False) -> int:
     
     max_exit_code = EXIT_CODE_SUCCESS
     
-    for md_file in files:
-        file_result = process_single_file(md_file, ci_mode)
-        results["files"].append(file_result)
+    with mem.stage('pipeline.batch'):
+        for md_file in files:
+            with mem.stage('pipeline.file', agent=Path(md_file).stem):
+                file_result = process_single_file(md_file, ci_mode, profiler or NULL_PROFILER)
+            results["files"].append(file_result)
+            
+            # Actualizar contadores
+            if file_result["status"] == "success":
+                results["summary"]["files_success"] += 1
+            elif file_result["status"] == "warning":
+                results["summary"]["files_warnings"] += 1
+                max_exit_code = max(max_exit_code, EXIT_CODE_WARNINGS)
+            elif file_result["status"] == "error":
+                results["summary"]["files_errors"] += 1
+                max_exit_code = max(max_exit_code, EXIT_CODE_ERRORS)
+            elif file_result["status"] == "security_error":
+                results["summary"]["files_errors"] += 1
+                max_exit_code = EXIT_CODE_SECURITY_ERROR
+            elif file_result["status"] == "internal_error":
+                results["summary"]["files_errors"] += 1
+                max_exit_code = EXIT_CODE_INTERNAL_ERROR
+            
+            results["summary"]["total_blocks"] += file_result.get("blocks", 0)
         
-        # Actualizar contadores
-        if file_result["status"] == "success":
-            results["summary"]["files_success"] += 1
-        elif file_result["status"] == "warning":
-            results["summary"]["files_warnings"] += 1
-            max_exit_code = max(max_exit_code, EXIT_CODE_WARNINGS)
-        elif file_result["status"] == "error":
-            results["summary"]["files_errors"] += 1
-            max_exit_code = max(max_exit_code, EXIT_CODE_ERRORS)
-        elif file_result["status"] == "security_error":
-            results["summary"]["files_errors"] += 1
-            max_exit_code = EXIT_CODE_SECURITY_ERROR
-        elif file_result["status"] == "internal_error":
-            results["summary"]["files_errors"] += 1
-            max_exit_code = EXIT_CODE_INTERNAL_ERROR
-        
-        results["summary"]["total_blocks"] += file_result.get("blocks", 0)
-    
     results["exit_code"] = max_exit_code
     results["status"] = get_status_from_exit_code(max_exit_code)
+    if profiler:
+        results["profile"] = profiler.to_dict()
     
-    if ci_mode:
-        print(json.dumps(results, indent=2))
-    else:
-        print_human_summary(results)
+    with mem.stage('pipeline.report'):
+        if ci_mode:
+            print(json.dumps(results, indent=2))
+        else:
+            print_human_summary(results)
+            if profiler:
+                print(f"\n⏱️  PERFIL (fases y reglas de lint):\n{profiler.format_table()}")
     
     return max_exit_code
 
@@ -426,11 +544,54 @@ Exit Codes:
         help='Alias para --ci-mode'
     )
     
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Perfilar fases del pipeline y reglas de lint (tabla o clave "profile" en JSON)'
+    )
+    
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Guardar además el perfil en JSON (implica --profile)'
+    )
+    
+    parser.add_argument(
+        '--memprofile',
+        action='store_true',
+        help='Perfil de memoria (tracemalloc) del proceso del pipeline por etapa y agente '
+             '(en modo CI se imprime en stderr)'
+    )
+    
+    parser.add_argument(
+        '--memprofile-json',
+        metavar='PATH',
+        help='Guardar el perfil de memoria en JSON (implica --memprofile)'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        metavar='PATH',
+        help='Traza de spans de todas las etapas (.json: Chrome trace-event, .jsonl: un evento por línea)'
+    )
+    
     args = parser.parse_args()
     ci_mode = args.ci_mode or args.output_json
+    profiler = RuleProfiler() if (args.profile or args.profile_json) else None
+    mem = MemoryProfiler() if (args.memprofile or args.memprofile_json) else NULL_MEMPROFILER
+    if args.trace:
+        start_trace(args.trace)  # Exporta APS_TRACE: md2yaml.py y yaml_lint.py escriben en la misma traza
     
     try:
-        exit_code = run_batch(args.batch, ci_mode)
+        exit_code = run_batch(args.batch, ci_mode, profiler, mem)
+        if args.profile_json:
+            profiler.save_json(args.profile_json, include_samples=True)
+        if mem.enabled:
+            # stderr en modo CI: stdout es el JSON de resultados
+            print(f"\n🧠 PERFIL DE MEMORIA (tracemalloc):\n{mem.format_report()}",
+                  file=sys.stderr if ci_mode else sys.stdout)
+            if args.memprofile_json:
+                mem.save_json(args.memprofile_json)
         sys.exit(exit_code)
     except KeyboardInterrupt:
         if ci_mode:
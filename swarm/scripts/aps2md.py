@@ -1,7 +1,281 @@
 #!/usr/bin/env python3
 """
 aps2md.py - Renderiza agent.apS.yaml de vuelta a prompt.md
+
+Regenera el Markdown de un agente desde el YAML de bloques (md2yaml) en una
+sola pasada por agente (lista de fragmentos + join), en el orden de los
+bloques del YAML. Así los arreglos hechos en bloque sobre los YAML
+(apply_patch.py) vuelven al .md, que sigue siendo la fuente.
+
+- Render fiel: del .md existente se copian tal cual el texto anterior al
+  primer encabezado y cada bloque cuyo encabezado y contenido no cambiaron
+  (espacios finales, líneas en blanco, bloques de código); solo se
+  re-renderizan los bloques nuevos o modificados
+- Niveles de encabezado de los re-renderizados: los del .md existente (o la
+  línea de agent.source_map); sin .md, "#" para el primer bloque y "##" para el resto
+- Un .md está al día si md2yaml extrae de él los mismos bloques que tiene el
+  YAML (no se comparan bytes): entonces no se reescribe
+- Los bloques auto-numerados por md2yaml ("X (2)") se escriben con su
+  encabezado original ("X") para que la re-extracción les dé el mismo nombre
+
+Garantía de ida y vuelta: cada render se re-extrae con
+md2yaml.extract_blocks_from_md y debe dar los mismos bloques (nombre, orden,
+tipo y contenido) que el YAML; si no, el .md no se escribe. Los SIDs
+enriquecidos (accion/relacion/nivel) viven en el YAML, no en el .md.
+
+Uso:
+    python3 swarm/scripts/aps2md.py swarm/agents/J2C/01-orchestrator.yaml
+    python3 swarm/scripts/aps2md.py 'swarm/agents/**/*.yaml' --jobs 8
+    python3 swarm/scripts/aps2md.py 'swarm/agents/**/*.yaml' --check     # CI: ¿.md al día?
+    python3 swarm/scripts/aps2md.py agent.yaml --output-dir /tmp/md
+
+Exit codes: 0 = OK, 1 = hay .md desactualizados (--check), 2 = ida y vuelta fallida o error
 """
 
+import argparse
+import glob
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sls
+
+TOOLING_DIR = sls.find_tooling_dir()
+for _path in (TOOLING_DIR / 'scripts', TOOLING_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from md2yaml import extract_blocks_from_md  # noqa: E402
+from lib.md_blocks import AUTO_NUMBER_RE, HEADER_RE, read_source_lines, split_blocks, split_lines  # noqa: E402
+from lib.yaml_cache import load_yaml  # noqa: E402
+from lib.yaml_editor import write_text_atomic  # noqa: E402
+
+EXIT_OK = 0
+EXIT_OUTDATED = 1
+EXIT_FAILED = 2
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RENDER
+# ═══════════════════════════════════════════════════════════════════════════
+
+def header_names(names: List[str]) -> List[str]:
+    """
+    Texto del encabezado de cada bloque: "X (n)" vuelve a "X" cuando es la
+    n-ésima aparición de "X" (md2yaml la numerará igual al re-extraer).
+    """
+    counts: Dict[str, int] = {}
+    headers = []
+    for name in names:
+        raw = name
+        match = AUTO_NUMBER_RE.search(name)
+        if match:
+            base = name[:match.start()]
+            if counts.get(base, 0) + 1 == int(match.group(0)[2:-1]):
+                raw = base
+        counts[raw] = counts.get(raw, 0) + 1
+        headers.append(raw)
+    return headers
+
+
+def render_agent(agent: Dict, source_lines: Sequence[str] = (), levels: Optional[Dict[str, int]] = None) -> str:
+    """
+    Markdown de un agente ({'name', 'blocks', ...}) en una pasada.
+
+    Con las líneas del .md actual, el texto anterior al primer encabezado y los
+    bloques cuyo encabezado y contenido no cambiaron se copian tal cual (saltos
+    forzados con dos espacios, líneas en blanco, bloques de código); solo se
+    re-renderizan los bloques nuevos o modificados.
+
+    Args:
+        agent: Contenido de la clave 'agent' del YAML
+        source_lines: Líneas del .md actual (lib.md_blocks.read_source_lines)
+        levels: {bloque: nivel de encabezado} para los re-renderizados (ver source_levels)
+    """
+    blocks = [(name, block) for name, block in (agent.get('blocks') or {}).items() if isinstance(block, dict)]
+    levels = levels or {}
+    original = {b.name: b for b in split_blocks(source_lines)}
+    first_header = min((b.header_line for b in original.values()), default=len(source_lines))
+
+    out = list(source_lines[:first_header])
+    for i, ((name, block), header) in enumerate(zip(blocks, header_names([name for name, _ in blocks]))):
+        content = str(block.get('content') or '')
+        kept = original.get(name)
+        if kept is not None and kept.raw_name == header and kept.content(source_lines) == content:
+            out.extend(source_lines[kept.header_line:kept.end_line])
+            continue
+        out.append(f"{'#' * (levels.get(name) or (1 if i == 0 else 2))} {header}")
+        out.append('')
+        if content:
+            out.extend(content.split('\n'))
+            out.append('')
+    if out and out[-1] != '':
+        out.append('')  # Una línea final
+    return '\n'.join(out)
+
+
+def source_levels(lines: Sequence[str], agent: Dict) -> Dict[str, int]:
+    """
+    Nivel de encabezado de cada bloque en el .md actual; para los bloques que
+    ya no están en él (renombrados), el de la línea que indica agent.source_map.
+    """
+    levels = {}
+    for name, position in (agent.get('source_map') or {}).items():
+        line = position.get('line', 0) - 1 if isinstance(position, dict) else -1
+        if 0 <= line < len(lines):
+            match = HEADER_RE.match(lines[line])
+            if match:
+                levels[name] = len(match.group(1))
+    for block in split_blocks(lines):
+        levels[block.name] = len(HEADER_RE.match(lines[block.header_line]).group(1))
+    return levels
+
+
+def roundtrip_problems(agent: Dict, lines: Sequence[str], md_path: str) -> List[str]:
+    """
+    Diferencias entre los bloques del YAML y los que md2yaml extrae de `lines`
+    (vacío = el Markdown da exactamente esos bloques).
+    """
+    extracted = extract_blocks_from_md(md_path, lines=list(lines))
+    expected = {name: block for name, block in (agent.get('blocks') or {}).items() if isinstance(block, dict)}
+    problems = []
+    if list(extracted) != list(expected):
+        missing = [name for name in expected if name not in extracted]
+        extra = [name for name in extracted if name not in expected]
+        detail = f"faltan {missing[:3]}" if missing else f"sobran {extra[:3]}" if extra else "orden distinto"
+        problems.append(f"bloques distintos tras re-extraer: {detail}")
+        return problems
+    for name, block in expected.items():
+        got = extracted[name]
+        if got['content'] != (block.get('content') or ''):
+            problems.append(f"{name}: el contenido no sobrevive al Markdown "
+                            "(espacios finales o líneas que parecen encabezados)")
+        elif block.get('block_type') and got['block_type'] != block['block_type']:
+            problems.append(f"{name}: block_type {block['block_type']} no se deduce del nombre "
+                            f"(md2yaml daría {got['block_type']})")
+    return problems
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ARCHIVOS (un agente por tarea; paralelo con --jobs)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def find_source_md(agent: Dict, yaml_path: Path) -> Optional[Path]:
+    """El .md del agente: agent.source_md o el .md hermano del YAML."""
+    candidates = []
+    if agent.get('source_md'):
+        candidates += [Path(agent['source_md']), yaml_path.parent / Path(agent['source_md']).name]
+    candidates.append(yaml_path.with_suffix('.md'))
+    return next((c for c in candidates if c.is_file()), None)
+
+
+def process_file(yaml_path: str, output_dir: Optional[str] = None, check: bool = False) -> Dict:
+    """
+    Renderiza un YAML y escribe (o compara, con check) su .md.
+
+    Returns:
+        {'yaml', 'md', 'blocks', 'status', 'problems'}; status: unchanged,
+        written, outdated (check), failed
+    """
+    path = Path(yaml_path)
+    result = {'yaml': yaml_path, 'md': None, 'blocks': 0, 'status': 'failed', 'problems': []}
+    try:
+        data = load_yaml(path, copy=False, cache=False)
+        if not isinstance(data, dict) or not isinstance(data.get('agent'), dict):
+            result['problems'].append("no es un YAML de agente (falta 'agent')")
+            return result
+        agent = data['agent']
+        source = find_source_md(agent, path)
+        if output_dir:
+            target = Path(output_dir) / f"{path.stem}.md"
+        else:
+            target = source or path.with_suffix('.md')
+        result['md'] = str(target)
+
+        lines = read_source_lines(source) if source else []
+        current = lines if target == source else read_source_lines(target) if target.is_file() else None
+        result['blocks'] = len(agent.get('blocks') or {})
+        # Al día = md2yaml extrae del .md actual los bloques del YAML (no se comparan bytes)
+        if current is not None and not roundtrip_problems(agent, current, str(target)):
+            result['status'] = 'unchanged'
+            return result
+
+        text = render_agent(agent, lines, source_levels(lines, agent))
+        result['problems'] = roundtrip_problems(agent, split_lines(text), str(target))
+        if result['problems']:
+            return result
+        if check:
+            result['status'] = 'outdated'
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(target, text)
+            result['status'] = 'written'
+    except Exception as e:
+        result['problems'].append(f"{type(e).__name__}: {e}")
+    return result
+
+
+def _process(args: Tuple[str, Optional[str], bool]) -> Dict:
+    return process_file(*args)
+
+
+def expand(patterns: List[str]) -> List[str]:
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern])
+    return sorted(set(f for f in files if f.endswith(('.yaml', '.yml'))))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Regenera el Markdown de agentes desde sus YAML de bloques',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Uso:', 1)[1]
+    )
+    parser.add_argument('files', nargs='+', help='YAMLs de agentes o patrones glob')
+    parser.add_argument('--output-dir', help='Escribir los .md aquí (default: el .md fuente del agente)')
+    parser.add_argument('--check', action='store_true',
+                        help='No escribir: exit 1 si algún .md no coincide con su YAML')
+    parser.add_argument('--jobs', type=int, default=1, help='Procesos en paralelo (default: 1)')
+    parser.add_argument('--json', action='store_true', help='Resultado en JSON')
+    args = parser.parse_args()
+
+    files = expand(args.files)
+    if not files:
+        print("❌ No se encontraron archivos .yaml")
+        sys.exit(EXIT_FAILED)
+
+    start = time.perf_counter()
+    tasks = [(f, args.output_dir, args.check) for f in files]
+    if args.jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_process, tasks, chunksize=max(1, len(tasks) // (args.jobs * 4))))
+    else:
+        results = [_process(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('written', 'unchanged', 'outdated', 'failed')}
+    if args.json:
+        print(json.dumps({'results': results, 'summary': dict(counts, seconds=round(elapsed, 3))},
+                         indent=2, ensure_ascii=False))
+    else:
+        icons = {'written': '📝', 'outdated': '⚠️ ', 'failed': '❌'}
+        for r in results:
+            if r['status'] in icons:
+                print(f"{icons[r['status']]} {r['yaml']} → {r['md']} ({r['blocks']} bloques)")
+                for problem in r['problems']:
+                    print(f"   {problem}")
+        print(f"\n📊 {len(results)} agentes: {counts['written']} escritos, {counts['unchanged']} sin cambios, "
+              f"{counts['outdated']} desactualizados, {counts['failed']} con errores ({elapsed:.2f}s)")
+
+    if counts['failed']:
+        sys.exit(EXIT_FAILED)
+    sys.exit(EXIT_OUTDATED if counts['outdated'] else EXIT_OK)
+
+
 if __name__ == "__main__":
-    print("TODO")
+    main()
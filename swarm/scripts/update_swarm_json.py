@@ -1,7 +1,355 @@
 #!/usr/bin/env python3
 """
 update_swarm_json.py - Actualiza swarm.json con los agentes procesados
+
+Registro incremental de agentes: por cada agente guarda su archivo fuente, el
+hash del contenido, el número de bloques, su conjunto de SIDs y el último
+resultado de lint (yaml_lint + yaml_lint_v6, los mismos checks que sls.py).
+Los agentes cuyo hash no ha cambiado (y se validaron con las mismas reglas) no
+se vuelven a convertir ni a validar; swarm.json se reescribe de forma atómica
+y solo si algo cambió.
+
+Así swarm.json sirve de índice barato para el resto de herramientas (lint,
+diff, informes): basta comparar hashes con el registro en lugar de releer y
+validar todas las fuentes.
+
+Estructura:
+    {
+      "version": "0.1",
+      "updated_at": "2026-01-01T00:00:00Z",
+      "agents": {
+        "<nombre>": {
+          "source": "agents/J2C/01-orchestrator.md",   # relativo a swarm.json
+          "hash": "<sha1 del contenido>",
+          "blocks": 42,
+          "sids": ["BLK.definir.rol.nuclear", ...],    # SIDs reales, ordenados
+          "pending_sids": 3,                            # bloques aún con TEMP_*
+          "lint": {"ruleset": "<huella>", "errors": 0, "warnings": 2,
+                   "rules": {"SID_FORMAT": 2}}
+        }
+      }
+    }
+
+Fuentes: los .md de agents/; un .yaml se registra solo si no tiene .md al lado
+(el .yaml generado desde un .md no es la fuente).
+
+Uso:
+    python3 swarm/scripts/update_swarm_json.py                     # agents/**/*.md|yaml
+    python3 swarm/scripts/update_swarm_json.py 'swarm/agents/J2C/*.md' --jobs 4
+    python3 swarm/scripts/update_swarm_json.py --check             # CI: 1 si el registro está desfasado
+    python3 swarm/scripts/update_swarm_json.py --no-lint --json
+
+Exit codes: 0 = OK, 1 = registro desfasado (--check), 2 = error
 """
 
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import sls
+
+SWARM_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_REGISTRY = SWARM_DIR / 'swarm.json'
+DEFAULT_PATTERNS = ('agents/**/*.md', 'agents/**/*.yaml')
+REGISTRY_VERSION = '0.1'
+
+EXIT_OK = 0
+EXIT_STALE = 1
+EXIT_ERROR = 2
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REGISTRO (lectura, índice y escritura atómica)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def load_registry(path: Path = DEFAULT_REGISTRY) -> Dict:
+    """swarm.json, o un registro vacío si no existe."""
+    if not path.exists():
+        return {'version': REGISTRY_VERSION, 'agents': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    registry.setdefault('agents', {})
+    return registry
+
+
+def save_registry(registry: Dict, path: Path = DEFAULT_REGISTRY) -> None:
+    """
+    Escribe swarm.json de forma atómica (temporal en el mismo directorio + rename),
+    conservando los permisos del archivo anterior (mkstemp lo crearía con 0600).
+    """
+    data = json.dumps(registry, indent=2, ensure_ascii=False) + '\n'
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.swarm.', suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def is_current(entry: Optional[Dict], source: str, digest: str, ruleset: Optional[str]) -> bool:
+    """
+    ¿La entrada del registro sigue valiendo para esta fuente?
+
+    ruleset=None: no importa el lint (solo hash y ruta). Un lint en el que el
+    RegexGuard desactivó reglas (regla 'regex_guard') está incompleto: se repite.
+    """
+    if not entry or entry.get('source') != source or entry.get('hash') != digest:
+        return False
+    if ruleset is None:
+        return True
+    lint = entry.get('lint') or {}
+    return lint.get('ruleset') == ruleset and 'regex_guard' not in (lint.get('rules') or {})
+
+
+def collect_sources(patterns: List[str], root: Path) -> Tuple[Dict[str, Path], List[str]]:
+    """
+    Fuentes por nombre de agente: .md preferido sobre el .yaml del mismo directorio.
+
+    Returns:
+        ({nombre: ruta}, avisos de nombres duplicados en directorios distintos)
+    """
+    files = set()
+    for pattern in patterns:
+        base = pattern if Path(pattern).is_absolute() or Path(pattern).exists() else str(root / pattern)
+        files.update(Path(p) for p in glob.glob(base, recursive=True))
+    md_stems = {(p.parent, p.stem) for p in files if p.suffix == '.md'}
+
+    sources: Dict[str, Path] = {}
+    warnings = []
+    for path in sorted(files):
+        if path.suffix not in ('.md', '.yaml', '.yml') or not path.is_file():
+            continue
+        if path.suffix != '.md' and (path.parent, path.stem) in md_stems:
+            continue  # Generado desde el .md
+        if path.stem in sources:
+            warnings.append(f"{path}: el agente '{path.stem}' ya está registrado desde {sources[path.stem]}")
+            continue
+        sources[path.stem] = path
+    return sources, warnings
+
+
+def relative_source(path: Path, root: Path) -> str:
+    try:
+        return path.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEXADO DE UN AGENTE (en el proceso o en un worker del pool)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def index_agent(worker: 'sls.LintWorker', item: Dict) -> Dict:
+    """
+    Entrada del registro para un agente: bloques, SIDs y lint.
+
+    Args:
+        item: {path, source, kind, content, hash, lint}
+    """
+    entry = {'source': item['source'], 'hash': item['hash']}
+    try:
+        data = worker.load(item['path'], item['kind'], item['content'])
+        blocks = data['agent'].get('blocks') or {}
+    except Exception as e:
+        entry.update({'blocks': 0, 'sids': [], 'pending_sids': 0, 'error': f"{type(e).__name__}: {e}"})
+        return entry
+
+    sids = [str(b.get('sid', '')) for b in blocks.values() if isinstance(b, dict)]
+    entry['blocks'] = len(blocks)
+    entry['sids'] = sorted({sid for sid in sids if sid and not sid.startswith('TEMP_')})
+    entry['pending_sids'] = sum(1 for sid in sids if not sid or sid.startswith('TEMP_'))
+    if item['lint']:
+        result = worker.lint_data(data)
+        rules: Dict[str, int] = {}
+        for issues in result['issues'].values():
+            for issue in issues:
+                if issue['severity'] in ('error', 'warning'):
+                    rules[issue['rule']] = rules.get(issue['rule'], 0) + 1
+        entry['lint'] = {'ruleset': worker.ruleset, 'errors': result['errors'],
+                         'warnings': result['warnings'], 'rules': dict(sorted(rules.items()))}
+    return entry
+
+
+def _index_in_worker(item: Dict) -> Dict:
+    return index_agent(sls._worker, item)
+
+
+def _pool_ruleset() -> str:
+    return sls._worker.ruleset
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ACTUALIZACIÓN INCREMENTAL
+# ═══════════════════════════════════════════════════════════════════════════
+
+def update_registry(registry: Dict, sources: Dict[str, Path], root: Path,
+                    lint: bool = True, jobs: int = 1, prune: bool = True) -> Dict:
+    """
+    Actualiza `registry` en sitio con las fuentes que cambiaron.
+
+    Args:
+        registry: Contenido de swarm.json (load_registry)
+        sources: {nombre: ruta} (collect_sources)
+        root: Directorio de swarm.json (las rutas se guardan relativas a él)
+        lint: Validar los agentes nuevos o modificados
+        jobs: Procesos para convertir/validar (1 = en este proceso)
+        prune: Quitar agentes cuya fuente ya no existe
+
+    Returns:
+        {'added', 'updated', 'unchanged', 'removed': [nombres], 'ruleset'}
+    """
+    agents = registry['agents']
+    pool = None
+    worker = None
+    if jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=sls._init_worker,
+                                   initargs=(str(sls.find_tooling_dir()),))
+        ruleset = pool.submit(_pool_ruleset).result() if lint else None
+    else:
+        worker = sls.LintWorker(sls.find_tooling_dir())
+        ruleset = worker.ruleset if lint else None
+
+    summary = {'added': [], 'updated': [], 'unchanged': [], 'removed': [], 'ruleset': ruleset}
+    pending = []
+    for name, path in sources.items():
+        content = path.read_text(encoding='utf-8')
+        source = relative_source(path, root)
+        digest = content_hash(content)
+        if is_current(agents.get(name), source, digest, ruleset):
+            summary['unchanged'].append(name)
+            continue
+        summary['updated' if name in agents else 'added'].append(name)
+        pending.append((name, {'path': str(path), 'source': source, 'content': content, 'hash': digest,
+                               'kind': sls.payload_kind(str(path)), 'lint': lint}))
+
+    try:
+        if pool is not None:
+            entries = pool.map(_index_in_worker, [item for _, item in pending], chunksize=4)
+        else:
+            entries = (index_agent(worker, item) for _, item in pending)
+        for (name, _), entry in zip(pending, entries):
+            agents[name] = entry  # Sin --lint la entrada nueva no arrastra el lint anterior
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if prune:
+        for name in sorted(agents):
+            if name not in sources and not (root / agents[name].get('source', '')).is_file():
+                del agents[name]
+                summary['removed'].append(name)
+
+    registry['agents'] = dict(sorted(agents.items()))
+    return summary
+
+
+def check_registry(registry: Dict, sources: Dict[str, Path], root: Path) -> Dict:
+    """Qué cambiaría update_registry (solo hashes, sin convertir ni validar)."""
+    agents = registry['agents']
+    summary = {'added': [], 'updated': [], 'unchanged': [], 'removed': []}
+    for name, path in sources.items():
+        digest = content_hash(path.read_text(encoding='utf-8'))
+        if name not in agents:
+            summary['added'].append(name)
+        elif is_current(agents[name], relative_source(path, root), digest, None):
+            summary['unchanged'].append(name)
+        else:
+            summary['updated'].append(name)
+    summary['removed'] = [name for name in sorted(agents)
+                          if name not in sources and not (root / agents[name].get('source', '')).is_file()]
+    return summary
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Registro incremental de agentes en swarm.json',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Uso:', 1)[1]
+    )
+    parser.add_argument('patterns', nargs='*',
+                        help=f"Fuentes (.md/.yaml) o globs; default: {' '.join(DEFAULT_PATTERNS)} junto a swarm.json")
+    parser.add_argument('--registry', type=Path, default=DEFAULT_REGISTRY,
+                        help=f'swarm.json a actualizar (default: {DEFAULT_REGISTRY})')
+    parser.add_argument('--no-lint', action='store_true', help='Registrar sin validar')
+    parser.add_argument('--jobs', type=int, default=1, help='Procesos para convertir y validar (default: 1)')
+    parser.add_argument('--no-prune', action='store_true', help='Conservar agentes cuya fuente ya no existe')
+    parser.add_argument('--check', action='store_true',
+                        help='No escribir: exit 1 si el registro no refleja las fuentes')
+    parser.add_argument('--json', action='store_true', help='Resumen en JSON')
+    args = parser.parse_args()
+
+    root = args.registry.resolve().parent
+    try:
+        registry = load_registry(args.registry)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ No se pudo leer {args.registry}: {e}", file=sys.stderr)
+        sys.exit(EXIT_ERROR)
+    sources, warnings = collect_sources(args.patterns or list(DEFAULT_PATTERNS), root)
+    for warning in warnings:
+        print(f"⚠️  {warning}", file=sys.stderr)
+
+    start = time.perf_counter()
+    if args.check:
+        summary = check_registry(registry, sources, root)
+        stale = bool(summary['added'] or summary['updated'] or summary['removed'])
+    else:
+        before = json.dumps(registry['agents'], sort_keys=True)
+        summary = update_registry(registry, sources, root, lint=not args.no_lint,
+                                  jobs=args.jobs, prune=not args.no_prune)
+        stale = False
+        # Sin cambios no se reescribe: el mtime de swarm.json indica la última actualización real
+        summary['written'] = json.dumps(registry['agents'], sort_keys=True) != before
+        if summary['written']:
+            registry = {'version': registry.get('version', REGISTRY_VERSION), 'updated_at': None, **registry}
+            registry['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())  # Tras el spread: no gana el anterior
+            save_registry(registry, args.registry)
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        for key, icon in (('added', '➕'), ('updated', '🔄'), ('removed', '➖')):
+            for name in summary[key]:
+                entry = registry['agents'].get(name, {})
+                lint = entry.get('lint') or {}
+                detail = (f" ({entry.get('blocks', 0)} bloques, {lint['errors']} errores, {lint['warnings']} warnings)"
+                          if lint else '')
+                if entry.get('error'):
+                    detail = f" ❌ {entry['error']}"
+                print(f"{icon} {name}{detail}")
+        action = 'desfasados' if args.check else 'actualizados'
+        print(f"📋 {args.registry}: {len(summary['added'])} nuevos, {len(summary['updated'])} {action}, "
+              f"{len(summary['unchanged'])} sin cambios, {len(summary['removed'])} eliminados "
+              f"({summary['seconds']:.2f}s)")
+
+    sys.exit(EXIT_STALE if stale else EXIT_OK)
+
+
 if __name__ == "__main__":
-    print("TODO")
+    main()